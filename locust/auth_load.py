@@ -0,0 +1,71 @@
+"""
+Carga sobre la autenticación de ms-usuarios: logins con contraseña (bcrypt)
+frente a renovaciones con refresh token.
+
+    locust -f locust/auth_load.py PasswordLoginUser --loadtest-customers 200
+    locust -f locust/auth_load.py RefreshTokenUser --loadtest-customers 200
+
+Cada clase pide sin pausa, así que las RPS de "/api/v1/auth/login" y
+"/api/v1/auth/refresh" son los logins por segundo que aguanta el servicio
+con cada camino. El coste de verificar los tokens en el resto de servicios
+se mide con `npm run bench:auth` en ms-usuarios y con las estadísticas
+tokenCache de /status y /health.
+"""
+import itertools
+
+from locust import constant, events, task
+
+from common import API_HOST, CUSTOMER_CREDENTIALS, ApiHttpUser
+
+LOGIN_PATH = "/api/v1/auth/login"
+REFRESH_PATH = "/api/v1/auth/refresh"
+
+accounts = [CUSTOMER_CREDENTIALS]
+_cursor = itertools.count()
+
+
+def next_account():
+    return accounts[next(_cursor) % len(accounts)]
+
+
+@events.init.add_listener
+def _on_init(environment, **kwargs):
+    options = environment.parsed_options
+    if options is None:
+        return
+    accounts.extend({"email": f"loadtest.customer{i}@test.com", "password": options.account_password}
+                    for i in range(1, options.loadtest_customers + 1))
+
+
+class PasswordLoginUser(ApiHttpUser):
+    """Hace login con email y contraseña en cada iteración."""
+    host = API_HOST
+    wait_time = constant(0)
+
+    @task
+    def login(self):
+        self.client.post(LOGIN_PATH, json=next_account(), name=LOGIN_PATH)
+
+
+class RefreshTokenUser(ApiHttpUser):
+    """Hace login una vez y después solo renueva el token con el refresh token."""
+    host = API_HOST
+    wait_time = constant(0)
+
+    def on_start(self):
+        self.refresh_token = None
+        with self.client.post(LOGIN_PATH, json=next_account(), name=f"{LOGIN_PATH} (inicial)",
+                              catch_response=True) as response:
+            if response.status_code == 200:
+                self.refresh_token = response.json().get("refreshToken")
+            if not self.refresh_token:
+                response.failure("El login no devolvió refreshToken")
+
+    @task
+    def refresh(self):
+        if not self.refresh_token:
+            return
+        with self.client.post(REFRESH_PATH, json={"refreshToken": self.refresh_token}, name=REFRESH_PATH,
+                              catch_response=True) as response:
+            if response.status_code == 200:
+                self.refresh_token = response.json().get("refreshToken") or self.refresh_token
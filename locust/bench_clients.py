@@ -0,0 +1,100 @@
+"""
+Benchmark de clientes HTTP: ejecuta los mismos journeys de test.py con el
+HttpUser (requests) y con el FastHttpUser (geventhttpclient) y compara las
+peticiones por segundo que consigue un proceso de locust por núcleo de CPU.
+
+Cada ejecución usa un único proceso de locust (un núcleo). El RPS por núcleo
+se calcula con el tiempo de CPU consumido por ese proceso, de modo que el
+resultado no depende de si el generador llegó a saturarse o no.
+
+Uso:
+    python locust/bench_clients.py --users 200 --run-time 60s
+    python locust/bench_clients.py --classes AnonymousUser --host http://localhost:8000
+"""
+import argparse
+import csv
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+LOCUSTFILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test.py")
+CLIENTS = ("requests", "fast")
+
+
+def _children_cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_locust(client, args, workdir):
+    """Lanza locust en modo headless con el cliente indicado y devuelve sus métricas agregadas."""
+    csv_prefix = os.path.join(workdir, client)
+    command = [
+        sys.executable, "-m", "locust", "-f", LOCUSTFILE, "--headless", "--only-summary",
+        "--http-client", client,
+        "-u", str(args.users), "-r", str(args.spawn_rate), "-t", args.run_time,
+        "--csv", csv_prefix,
+    ]
+    if args.host:
+        command += ["--host", args.host]
+    command += args.extra
+    command += args.classes
+
+    cpu_before = _children_cpu_seconds()
+    started = time.monotonic()
+    subprocess.run(command, check=False)
+    wall_seconds = time.monotonic() - started
+    cpu_seconds = _children_cpu_seconds() - cpu_before
+
+    with open(f"{csv_prefix}_stats.csv", newline="", encoding="utf-8") as f:
+        aggregated = next(row for row in csv.DictReader(f) if row["Name"] == "Aggregated")
+
+    requests_count = int(aggregated["Request Count"])
+    return {
+        "client": client,
+        "requests": requests_count,
+        "failures": int(aggregated["Failure Count"]),
+        "rps": float(aggregated["Requests/s"]),
+        "rps_per_core": requests_count / cpu_seconds if cpu_seconds else 0.0,
+        "cpu_seconds": cpu_seconds,
+        "wall_seconds": wall_seconds,
+        "p50": aggregated["50%"],
+        "p95": aggregated["95%"],
+    }
+
+
+def print_report(results):
+    header = f"{'cliente':<10}{'peticiones':>12}{'fallos':>9}{'RPS':>10}{'RPS/núcleo':>12}{'CPU s':>9}{'p50':>8}{'p95':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['client']:<10}{r['requests']:>12}{r['failures']:>9}{r['rps']:>10.1f}"
+              f"{r['rps_per_core']:>12.1f}{r['cpu_seconds']:>9.1f}{r['p50']:>8}{r['p95']:>8}")
+    baseline = next((r for r in results if r["client"] == "requests"), None)
+    fast = next((r for r in results if r["client"] == "fast"), None)
+    if baseline and fast and baseline["rps_per_core"]:
+        print(f"\nFastHttpUser: x{fast['rps_per_core'] / baseline['rps_per_core']:.2f} RPS por núcleo respecto a HttpUser")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--spawn-rate", type=float, default=50)
+    parser.add_argument("--run-time", default="60s")
+    parser.add_argument("--host", default="")
+    parser.add_argument("--clients", nargs="+", choices=CLIENTS, default=list(CLIENTS))
+    parser.add_argument("--classes", nargs="*", default=[], help="Clases de usuario a ejecutar (por defecto todas)")
+    parser.add_argument("extra", nargs=argparse.REMAINDER, help="Argumentos adicionales para locust tras --")
+    args = parser.parse_args()
+    args.extra = [a for a in args.extra if a != "--"]
+
+    with tempfile.TemporaryDirectory(prefix="bench-clients-") as workdir:
+        results = [run_locust(client, args, workdir) for client in args.clients]
+    print_report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Capa de benchmark para los locustfiles: guarda histogramas HDR por nombre de
+petición y por journey en --benchmark-out y, si se indica --benchmark-baseline,
+compara contra la línea base y termina con código 1 si hay regresiones de
+p95/p99 o de throughput.
+
+    # Generar la línea base
+    locust -f locust/test.py,locust/benchmark.py --headless -u 200 -r 20 -t 10m \
+        --benchmark-out baselines/main.json
+
+    # Ejecución a validar
+    locust -f locust/test.py,locust/benchmark.py --headless -u 200 -r 20 -t 10m \
+        --benchmark-out results/pr.json --benchmark-baseline baselines/main.json --benchmark-p95 10
+
+Un journey es cada tarea (@task) de cada clase de usuario, p. ej.
+"JOURNEY CustomerUser.intensive_cart_and_order_flow": su duración es la de
+todas las peticiones que hace la tarea, sin contar el wait_time.
+"""
+import functools
+import logging
+import time
+
+from locust import events
+from locust.exception import InterruptTaskSet, RescheduleTask, RescheduleTaskImmediately, StopUser
+from locust.runners import MasterRunner, WorkerRunner
+
+from benchmark_store import BenchmarkResult, Thresholds, add_threshold_arguments, compare, default_meta, format_report
+
+logger = logging.getLogger(__name__)
+
+JOURNEY_TYPE = "JOURNEY"
+CONTROL_EXCEPTIONS = (InterruptTaskSet, RescheduleTask, RescheduleTaskImmediately, StopUser)
+
+
+class BenchmarkRecorder:
+    """Acumula los histogramas; en los workers se vacía en cada report_to_master."""
+
+    def __init__(self):
+        self.result = BenchmarkResult()
+        self.started_at = None
+        self.stopped_at = None
+
+    def on_request(self, request_type, name, response_time, exception):
+        group = "journeys" if request_type == JOURNEY_TYPE else "requests"
+        self.result.record(group, f"{request_type} {name}", response_time, failed=exception is not None)
+
+    def drain(self):
+        result, self.result = self.result, BenchmarkResult()
+        return result
+
+    @property
+    def duration(self):
+        if self.started_at is None:
+            return 0
+        return (self.stopped_at or time.time()) - self.started_at
+
+
+recorder = BenchmarkRecorder()
+
+
+def _journey(user_class, task_func, environment):
+    """Envuelve una tarea para registrar su duración como un journey."""
+    name = f"{user_class.__name__}.{task_func.__name__}"
+
+    def fire(start, exception=None):
+        environment.events.request.fire(
+            request_type=JOURNEY_TYPE,
+            name=name,
+            response_time=(time.perf_counter() - start) * 1000,
+            response_length=0,
+            exception=exception,
+            context={},
+        )
+
+    @functools.wraps(task_func)
+    def wrapper(*args, **kwargs):
+        # Un usuario detenido a mitad de tarea (GreenletExit) no cuenta como journey
+        start = time.perf_counter()
+        try:
+            result = task_func(*args, **kwargs)
+        except CONTROL_EXCEPTIONS:
+            fire(start)
+            raise
+        except Exception as e:
+            fire(start, e)
+            raise
+        fire(start)
+        return result
+
+    return wrapper
+
+
+def instrument_journeys(environment):
+    for user_class in environment.user_classes:
+        wrapped = {}
+        tasks = []
+        for task_func in user_class.tasks:
+            if callable(task_func) and not isinstance(task_func, type):
+                if task_func not in wrapped:
+                    wrapped[task_func] = _journey(user_class, task_func, environment)
+                task_func = wrapped[task_func]
+            tasks.append(task_func)
+        user_class.tasks = tasks
+
+
+def save_and_gate(environment):
+    options = environment.parsed_options
+    result = recorder.result
+    result.meta = default_meta(recorder.duration, host=environment.host, users=options.num_users)
+    # Resumen de /metrics de los servicios, si se cargó service_metrics.py
+    if getattr(environment, "service_metrics", None):
+        result.meta["serviceMetrics"] = environment.service_metrics
+    # Descarga del gateway, si se cargó gateway_profile.py antes que este archivo
+    if getattr(environment, "gateway_profile", None):
+        result.meta["gateway"] = environment.gateway_profile
+    if result.is_empty():
+        logger.warning("Benchmark: no se registraron peticiones, no se guarda el resultado")
+        return
+    if options.benchmark_out:
+        result.save(options.benchmark_out)
+        logger.info("Benchmark guardado en %s", options.benchmark_out)
+    if options.benchmark_baseline:
+        thresholds = Thresholds(options.benchmark_p95, options.benchmark_p99, options.benchmark_rps,
+                                options.benchmark_min_count)
+        rows, regressions = compare(BenchmarkResult.load(options.benchmark_baseline), result, thresholds)
+        print(format_report(rows, regressions))
+        if regressions:
+            logger.error("Benchmark: %s regresiones respecto a %s", len(regressions), options.benchmark_baseline)
+            environment.process_exit_code = 1
+
+
+# ==============================================================================
+# --- INTEGRACIÓN CON LOCUST ---
+# ==============================================================================
+
+@events.init_command_line_parser.add_listener
+def _add_arguments(parser):
+    parser.add_argument("--benchmark-out", type=str, env_var="LOCUST_BENCHMARK_OUT", default="",
+                        help="Archivo JSON donde guardar los histogramas de la ejecución")
+    parser.add_argument("--benchmark-baseline", type=str, env_var="LOCUST_BENCHMARK_BASELINE", default="",
+                        help="Resultado de referencia contra el que comparar (sale con 1 si hay regresiones)")
+    add_threshold_arguments(parser, prefix="benchmark-")
+
+
+@events.init.add_listener
+def _on_init(environment, **kwargs):
+    if not isinstance(environment.runner, MasterRunner):
+        instrument_journeys(environment)
+
+
+@events.request.add_listener
+def _on_request(request_type, name, response_time, exception, **kwargs):
+    recorder.on_request(request_type, name, response_time, exception)
+
+
+@events.test_start.add_listener
+def _on_test_start(environment, **kwargs):
+    recorder.started_at = time.time()
+    recorder.stopped_at = None
+
+
+@events.test_stop.add_listener
+def _on_test_stop(environment, **kwargs):
+    recorder.stopped_at = time.time()
+
+
+@events.report_to_master.add_listener
+def _on_report_to_master(client_id, data):
+    data["benchmark"] = recorder.drain().to_dict()
+
+
+@events.worker_report.add_listener
+def _on_worker_report(client_id, data):
+    if "benchmark" in data:
+        recorder.result.merge(BenchmarkResult.from_dict(data["benchmark"]))
+
+
+@events.quitting.add_listener
+def _on_quitting(environment, **kwargs):
+    # Se guarda al salir: para entonces el master ya recibió el último informe de los workers
+    if not isinstance(environment.runner, WorkerRunner):
+        save_and_gate(environment)
@@ -0,0 +1,242 @@
+"""
+Almacén de resultados de benchmark: histogramas HDR por nombre de petición y
+por journey, guardados en un JSON compacto (histogramas comprimidos en base64
+con el formato estándar de HdrHistogram), y comparación contra una línea base.
+
+Lo usa benchmark.py durante las pruebas, y también se puede invocar a mano:
+
+    python locust/benchmark_store.py show results/run.json
+    python locust/benchmark_store.py compare baselines/main.json results/run.json --p95 10 --p99 15 --rps 10
+
+`compare` sale con código 1 si alguna petición empeora más que los umbrales.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from hdrh.histogram import HdrHistogram
+
+FORMAT_VERSION = 1
+# Rango de 1 ms a 1 hora con 3 dígitos significativos (~0.1% de error)
+LOWEST_MS = 1
+HIGHEST_MS = 60 * 60 * 1000
+SIGNIFICANT_FIGURES = 3
+PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+def new_histogram():
+    return HdrHistogram(LOWEST_MS, HIGHEST_MS, SIGNIFICANT_FIGURES)
+
+
+class Series:
+    """Histograma de latencias y contadores de una petición o journey."""
+
+    def __init__(self, histogram=None, failures=0):
+        self.histogram = histogram or new_histogram()
+        self.failures = failures
+
+    @property
+    def count(self):
+        return self.histogram.get_total_count()
+
+    def record(self, response_time_ms, failed=False):
+        self.histogram.record_value(min(max(int(round(response_time_ms)), 0), HIGHEST_MS))
+        if failed:
+            self.failures += 1
+
+    def merge(self, other):
+        self.histogram.add(other.histogram)
+        self.failures += other.failures
+
+    def percentile(self, p):
+        return self.histogram.get_value_at_percentile(p)
+
+    def encode(self):
+        return {"failures": self.failures, "hist": self.histogram.encode().decode("ascii")}
+
+    @classmethod
+    def decode(cls, data):
+        return cls(HdrHistogram.decode(data["hist"].encode("ascii")), data["failures"])
+
+
+class BenchmarkResult:
+    """
+    Resultado de una ejecución: series por clave "<tipo> <nombre>" agrupadas en
+    "requests" (peticiones) y "journeys" (tareas completas de cada usuario).
+    """
+
+    GROUPS = ("requests", "journeys")
+
+    def __init__(self, meta=None):
+        self.meta = meta or {}
+        self.series = {group: {} for group in self.GROUPS}
+
+    def record(self, group, key, response_time_ms, failed=False):
+        self.series[group].setdefault(key, Series()).record(response_time_ms, failed)
+
+    def merge(self, other):
+        for group in self.GROUPS:
+            for key, series in other.series[group].items():
+                self.series[group].setdefault(key, Series()).merge(series)
+
+    def is_empty(self):
+        return not any(self.series.values())
+
+    def to_dict(self):
+        return {group: {key: s.encode() for key, s in series.items()} for group, series in self.series.items()}
+
+    @classmethod
+    def from_dict(cls, data, meta=None):
+        result = cls(meta)
+        for group in cls.GROUPS:
+            result.series[group] = {key: Series.decode(s) for key, s in data.get(group, {}).items()}
+        return result
+
+    def summary(self, group, key):
+        series = self.series[group][key]
+        duration = self.meta.get("duration") or 0
+        summary = {f"p{p:g}": series.percentile(p) for p in PERCENTILES}
+        summary.update({
+            "count": series.count,
+            "failures": series.failures,
+            "rps": series.count / duration if duration else 0.0,
+        })
+        return summary
+
+    def save(self, path):
+        data = {"version": FORMAT_VERSION, "meta": self.meta, **self.to_dict()}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"), sort_keys=True)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{path}: versión de formato no soportada {data.get('version')}")
+        return cls.from_dict(data, data.get("meta"))
+
+
+def default_meta(duration, **extra):
+    return {"createdAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "duration": duration, **extra}
+
+
+# ==============================================================================
+# --- COMPARACIÓN ---
+# ==============================================================================
+
+class Thresholds:
+    """Empeoramiento máximo tolerado, en porcentaje, respecto a la línea base."""
+
+    def __init__(self, p95=10.0, p99=15.0, rps=10.0, min_count=20):
+        self.p95 = p95
+        self.p99 = p99
+        self.rps = rps
+        self.min_count = min_count
+
+
+def _change(baseline, current):
+    if not baseline:
+        return 0.0
+    return 100.0 * (current - baseline) / baseline
+
+
+def compare(baseline, current, thresholds):
+    """
+    Devuelve (filas, regresiones). Cada fila describe una serie presente en la
+    línea base; las regresiones son las filas que superan algún umbral.
+    """
+    rows, regressions = [], []
+    for group in BenchmarkResult.GROUPS:
+        for key in sorted(baseline.series[group]):
+            base = baseline.summary(group, key)
+            if base["count"] < thresholds.min_count:
+                continue
+            if key not in current.series[group]:
+                row = {"group": group, "key": key, "base": base, "current": None, "problems": ["sin datos"]}
+                rows.append(row)
+                regressions.append(row)
+                continue
+            cur = current.summary(group, key)
+            problems = []
+            if cur["count"] >= thresholds.min_count:
+                if _change(base["p95"], cur["p95"]) > thresholds.p95:
+                    problems.append(f"p95 +{_change(base['p95'], cur['p95']):.1f}%")
+                if _change(base["p99"], cur["p99"]) > thresholds.p99:
+                    problems.append(f"p99 +{_change(base['p99'], cur['p99']):.1f}%")
+                if group == "requests" and -_change(base["rps"], cur["rps"]) > thresholds.rps:
+                    problems.append(f"rps {_change(base['rps'], cur['rps']):.1f}%")
+            row = {"group": group, "key": key, "base": base, "current": cur, "problems": problems}
+            rows.append(row)
+            if problems:
+                regressions.append(row)
+    return rows, regressions
+
+
+def format_report(rows, regressions):
+    lines = [f"{'':2}{'serie':<60}{'p95 base':>10}{'p95':>8}{'p99 base':>10}{'p99':>8}{'rps base':>10}{'rps':>8}"]
+    for row in rows:
+        base, cur = row["base"], row["current"] or {}
+        mark = "!!" if row["problems"] else "  "
+        lines.append(
+            f"{mark}{row['key'][:59]:<60}{base['p95']:>10}{cur.get('p95', '-'):>8}{base['p99']:>10}{cur.get('p99', '-'):>8}"
+            f"{base['rps']:>10.2f}{cur.get('rps', 0.0):>8.2f}"
+        )
+    if regressions:
+        lines.append("")
+        lines.append(f"{len(regressions)} regresiones:")
+        lines.extend(f"  {row['key']}: {', '.join(row['problems'])}" for row in regressions)
+    else:
+        lines.append("")
+        lines.append("Sin regresiones respecto a la línea base.")
+    return "\n".join(lines)
+
+
+def format_summary(result):
+    lines = [f"{'serie':<60}{'n':>8}{'fallos':>8}{'rps':>8}" + "".join(f"{'p' + format(p, 'g'):>8}" for p in PERCENTILES)]
+    for group in BenchmarkResult.GROUPS:
+        for key in sorted(result.series[group]):
+            s = result.summary(group, key)
+            lines.append(f"{key[:59]:<60}{s['count']:>8}{s['failures']:>8}{s['rps']:>8.2f}"
+                         + "".join(f"{s['p' + format(p, 'g')]:>8}" for p in PERCENTILES))
+    return "\n".join(lines)
+
+
+def add_threshold_arguments(parser, prefix=""):
+    parser.add_argument(f"--{prefix}p95", type=float, default=10.0, help="Empeoramiento máximo del p95 en %%")
+    parser.add_argument(f"--{prefix}p99", type=float, default=15.0, help="Empeoramiento máximo del p99 en %%")
+    parser.add_argument(f"--{prefix}rps", type=float, default=10.0, help="Caída máxima del throughput en %%")
+    parser.add_argument(f"--{prefix}min-count", type=int, default=20,
+                        help="Muestras mínimas para comparar una serie")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    show = commands.add_parser("show", help="Muestra los percentiles de un resultado")
+    show.add_argument("result")
+    diff = commands.add_parser("compare", help="Compara un resultado contra una línea base")
+    diff.add_argument("baseline")
+    diff.add_argument("current")
+    add_threshold_arguments(diff)
+    args = parser.parse_args()
+
+    if args.command == "show":
+        print(format_summary(BenchmarkResult.load(args.result)))
+        return 0
+
+    thresholds = Thresholds(args.p95, args.p99, args.rps, args.min_count)
+    rows, regressions = compare(BenchmarkResult.load(args.baseline), BenchmarkResult.load(args.current), thresholds)
+    print(format_report(rows, regressions))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
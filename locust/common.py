@@ -0,0 +1,138 @@
+"""
+Configuración y clases base compartidas por los locustfiles del proyecto
+(test.py, flash_sale.py...).
+
+--http-client fast cambia el cliente de todos los usuarios al FastHttpUser
+(geventhttpclient con pool de conexiones keep-alive), que da varias veces
+más RPS por núcleo que el HttpUser basado en requests:
+
+    locust -f locust/test.py --http-client fast
+
+--async-checkout hace que los pedidos usen el checkout asíncrono de ms-tickets
+(202 + resultado por websocket) para compararlo con el síncrono.
+"""
+import os
+import sys
+import time
+import uuid
+
+from locust import FastHttpUser, HttpUser, events
+
+from token_pool import token_pool
+
+# ------------------------------------------------------------------------------
+# --- DATOS Y CONFIGURACIÓN DE PRUEBA ---
+# ------------------------------------------------------------------------------
+# Asegúrate de que estos usuarios existen en tu BBDD después de ejecutar los seeders.
+CUSTOMER_CREDENTIALS = {"email": "customer@test.com", "password": "password"}
+ORGANIZER_CREDENTIALS = {"email": "organizer@test.com", "password": "password"}
+
+# El host es la URL de tu API Gateway Kong. Ajusta si es diferente.
+API_HOST = "http://localhost:8000"
+
+token_pool.setup(API_HOST, {"customer": CUSTOMER_CREDENTIALS, "organizer": ORGANIZER_CREDENTIALS})
+
+HTTP_CLIENTS = ("requests", "fast")
+CORRELATION_HEADER = "X-Correlation-Id"
+CORRELATION_PREFIX = "lt"
+# POST /api/v1/orders responde 201 en el checkout síncrono y 202 en el asíncrono
+ORDER_CREATED_STATUSES = (201, 202)
+
+
+def new_correlation_id():
+    """
+    Id de correlación con la hora de envío embebida (lt-<epoch ms>-<aleatorio>): así
+    quien reciba el final del pipeline (pipeline.py) puede calcular la latencia sin
+    compartir estado con el proceso que hizo la petición.
+    """
+    return f"{CORRELATION_PREFIX}-{time.time_ns() // 1_000_000}-{uuid.uuid4().hex[:12]}"
+
+
+def correlation_sent_at(correlation_id):
+    """Hora de envío (epoch ms) de un id generado por new_correlation_id, o None si no es uno."""
+    parts = (correlation_id or "").split("-")
+    if len(parts) == 3 and parts[0] == CORRELATION_PREFIX and parts[1].isdigit():
+        return int(parts[1])
+    return None
+
+
+def rejected_by_gateway(response):
+    """
+    429 del rate-limiting de Kong: la petición no llegó al servicio, así que la
+    respuesta no trae X-Kong-Upstream-Latency (un 429 de la sala de espera sí).
+    """
+    headers = response.headers
+    return (response.status_code == 429 and "RateLimit-Limit" in headers
+            and "X-Kong-Upstream-Latency" not in headers)
+
+
+def _selected_http_client():
+    """
+    La clase base de los usuarios se decide al importar el locustfile, antes de que
+    locust procese los argumentos, así que --http-client se lee directamente de argv.
+    """
+    for i, arg in enumerate(sys.argv):
+        if arg.startswith("--http-client="):
+            return arg.split("=", 1)[1]
+        if arg == "--http-client" and i + 1 < len(sys.argv):
+            return sys.argv[i + 1]
+    return os.environ.get("LOCUST_HTTP_CLIENT", "requests")
+
+
+HTTP_CLIENT = _selected_http_client()
+if HTTP_CLIENT not in HTTP_CLIENTS:
+    raise ValueError(f"--http-client debe ser uno de {HTTP_CLIENTS}, no '{HTTP_CLIENT}'")
+
+
+class FastApiUser(FastHttpUser):
+    """FastHttpUser con timeouts alineados a los del HttpUser y un pool de conexiones por usuario."""
+    abstract = True
+    concurrency = 4
+    connection_timeout = 60.0
+    network_timeout = 60.0
+
+
+ApiHttpUser = FastApiUser if HTTP_CLIENT == "fast" else HttpUser
+
+
+@events.init_command_line_parser.add_listener
+def _add_arguments(parser):
+    parser.add_argument("--http-client", choices=HTTP_CLIENTS, env_var="LOCUST_HTTP_CLIENT", default="requests",
+                        help="Cliente HTTP de los usuarios: requests (HttpUser) o fast (FastHttpUser)")
+    parser.add_argument("--async-checkout", action="store_true", env_var="LOCUST_ASYNC_CHECKOUT", default=False,
+                        help="Pide el checkout asíncrono de ms-tickets (Prefer: respond-async, responde 202)")
+
+
+class BaseApiUser(ApiHttpUser):
+    """
+    Clase base para usuarios que necesitan autenticarse.
+    Toma su token del pool compartido (token_pool.py) en lugar de hacer login
+    con bcrypt por cada usuario virtual.
+    """
+    host = API_HOST
+    abstract = True  # Para que Locust no intente instanciar esta clase directamente.
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.account = None
+        self.token = None
+
+    def acquire_token(self, role):
+        """Asigna al usuario una cuenta del pool y devuelve su token."""
+        self.account, self.token = token_pool.acquire(role)
+        return self.token
+
+    @property
+    def headers(self):
+        # Se lee del pool en cada petición para recoger los tokens renovados tras un 401
+        if self.account:
+            self.token = token_pool.token_for(self.account) or self.token
+        headers = {CORRELATION_HEADER: new_correlation_id()}
+        if getattr(self.environment.parsed_options, "async_checkout", False):
+            headers["Prefer"] = "respond-async"
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        return headers
+
+    def context(self):
+        return {"account": self.account, "token": self.token}
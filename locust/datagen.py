@@ -0,0 +1,464 @@
+"""
+Generador de datos sintéticos para pruebas de escala.
+
+Carga con COPY, en las bases de datos de cada servicio:
+    ms_usuarios  users (dataset.customer{N}@test.com / dataset.organizer{N}@test.com)
+    ms_eventos   categories, venues, zones, events
+    ms_tickets   categories_replica, events_replica, ticket_types, orders,
+                 order_items, tickets, carts, cart_items
+
+Es determinista: con la misma --seed, --scale y --anchor-date se generan las
+mismas filas con los mismos ids (a partir de --id-base, para no chocar con los
+datos de los seeders). `sold` de cada tipo de ticket cuadra con los tickets
+históricos generados.
+
+Al terminar escribe un manifiesto (--manifest) con los ids de los eventos en
+venta y sus tipos de ticket, que la suite de locust lee con --dataset.
+
+    python locust/datagen.py --scale 10 --reset --manifest locust/dataset.json
+    locust -f locust/test.py --dataset locust/dataset.json --dataset-customers 2000
+
+Tamaño aproximado por unidad de --scale: 10.000 clientes, 5.000 eventos,
+~20.000 tipos de ticket, 20.000 órdenes (~50.000 tickets) y 2.000 carritos.
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from array import array
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+
+import bcrypt
+import psycopg
+
+DEFAULT_DB = "postgresql://root@localhost:26257/{name}?sslmode=disable"
+# Clave con la que ms-tickets firma el QR (JWT_SECRET de ticket.service.js)
+DEFAULT_QR_SECRET = "tu-jwt-secret-super-secreto"
+
+PER_SCALE = {
+    "customers": 10_000,
+    "organizers": 200,
+    "venues": 500,
+    "events": 5_000,
+    "orders": 20_000,
+    "carts": 2_000,
+}
+CATEGORIES = ("Música", "Deportes", "Teatro", "Comedia", "Cursos", "Festivales", "Conferencias", "Ferias",
+              "Cine", "Danza", "Ópera", "Gastronomía", "Tecnología", "Infantil", "Arte", "Literatura")
+CITIES = ("Quito", "Guayaquil", "Cuenca", "Manta", "Loja", "Ambato", "Ibarra", "Riobamba")
+ADJECTIVES = ("Gran", "Noche de", "Festival de", "Clásico de", "Encuentro de", "Gira de", "Taller de", "Copa de")
+ZONES = (("General", 0.6), ("Preferencia", 0.3), ("VIP", 0.1))
+TICKET_NAMES = ("General", "Preferencia", "VIP", "Early Bird", "Palco", "Estudiante")
+# La venta abre un año antes del evento: todos los eventos futuros están en venta
+SALE_WINDOW_DAYS = 365
+
+# Orden de borrado con --reset (primero las tablas que referencian a otras)
+TABLES = {
+    "usuarios": ("users",),
+    "eventos": ("events", "zones", "venues", "categories"),
+    "tickets": ("tickets", "order_items", "orders", "cart_items", "carts", "ticket_types",
+                "events_replica", "categories_replica"),
+}
+
+
+class Spec:
+    """
+    Estructura del dataset (quién referencia a quién, precios, capacidades)
+    guardada en arrays compactos: permite generar millones de filas en streaming
+    y repetir la simulación de órdenes sin volver a leer la base de datos.
+    """
+
+    def __init__(self, seed, scale, id_base, anchor):
+        self.seed = seed
+        self.id_base = id_base
+        self.anchor = anchor
+        self.counts = {key: max(1, int(per_scale * scale)) for key, per_scale in PER_SCALE.items()}
+        self.counts["categories"] = len(CATEGORIES)
+
+        rng = self.rng("structure")
+        events = self.counts["events"]
+        self.event_category = array("l", (rng.randrange(self.counts["categories"]) for _ in range(events)))
+        self.event_venue = array("l", (rng.randrange(self.counts["venues"]) for _ in range(events)))
+        self.event_organizer = array("l", (rng.randrange(self.counts["organizers"]) for _ in range(events)))
+        # Días respecto a --anchor-date: un año de histórico y un año de eventos futuros
+        self.event_start = array("d", (rng.uniform(-365, 365) for _ in range(events)))
+        self.event_published = bytearray(rng.random() < 0.85 for _ in range(events))
+
+        self.event_first_tt = array("l")
+        self.event_tt_count = array("l")
+        self.tt_event = array("l")
+        self.tt_price = array("d")
+        self.tt_quantity = array("l")
+        for event in range(events):
+            count = rng.randint(2, 6)
+            self.event_first_tt.append(len(self.tt_event))
+            self.event_tt_count.append(count)
+            for _ in range(count):
+                self.tt_event.append(event)
+                self.tt_price.append(round(rng.uniform(5, 250), 2))
+                self.tt_quantity.append(rng.choice((100, 250, 500, 1000, 2500, 5000)))
+        self.counts["ticket_types"] = len(self.tt_event)
+
+        self.published = [e for e in range(events) if self.event_published[e]]
+        self.on_sale = [e for e in self.published if self.event_start[e] > 0]
+
+    def rng(self, stream):
+        return random.Random(f"{self.seed}:{stream}")
+
+    def id(self, index):
+        return self.id_base + index + 1
+
+    def day(self, offset_days):
+        return self.anchor + timedelta(days=offset_days)
+
+    def simulate_orders(self):
+        """
+        Genera (user, creada, [(tipo de ticket, cantidad)]) para cada orden. Los
+        eventos más populares (índices bajos) concentran las ventas. Se ejecuta
+        dos veces con el mismo resultado: una para calcular `sold` y otra para escribir.
+        """
+        rng = self.rng("orders")
+        sold = array("l", [0]) * len(self.tt_event)
+        published = self.published
+        for _ in range(self.counts["orders"]):
+            user = rng.randrange(self.counts["customers"])
+            event = published[int(len(published) * rng.random() ** 3)]
+            first, count = self.event_first_tt[event], self.event_tt_count[event]
+            sale_start = self.event_start[event] - SALE_WINDOW_DAYS
+            created = self.day(rng.uniform(sale_start, min(self.event_start[event], 0)))
+            items = []
+            for tt in rng.sample(range(first, first + count), rng.randint(1, min(2, count))):
+                quantity = min(rng.randint(1, 4), self.tt_quantity[tt] - sold[tt])
+                if quantity > 0:
+                    sold[tt] += quantity
+                    items.append((tt, quantity))
+            if items:
+                yield user, created, items
+        self.sold = sold
+
+
+# ==============================================================================
+# --- FILAS POR TABLA ---
+# ==============================================================================
+
+def user_rows(spec, password_hash, role_ids):
+    rng = spec.rng("users")
+    created = spec.day(-800)
+    for role, count, offset in (("customer", spec.counts["customers"], 0),
+                                ("organizer", spec.counts["organizers"], spec.counts["customers"])):
+        for i in range(count):
+            yield (spec.id(offset + i), role.capitalize(), f"Dataset {i + 1}", f"dataset.{role}{i + 1}@test.com",
+                   password_hash, "active", date(rng.randint(1960, 2005), rng.randint(1, 12), rng.randint(1, 28)),
+                   "EC", "true", role_ids[role], created)
+
+
+def organizer_id(spec, index):
+    return spec.id(spec.counts["customers"] + index)
+
+
+def category_rows(spec):
+    created = spec.day(-800)
+    for i, name in enumerate(CATEGORIES):
+        yield spec.id(i), f"{name} (dataset)", f"Eventos de {name.lower()}.", created
+
+
+def venue_rows(spec):
+    rng = spec.rng("venues")
+    created = spec.day(-800)
+    for i in range(spec.counts["venues"]):
+        city = rng.choice(CITIES)
+        yield (spec.id(i), f"Recinto {city} {i + 1}", f"Av. Principal {rng.randint(1, 9999)}", city, "EC",
+               round(rng.uniform(-4.0, 1.0), 4), round(rng.uniform(-80.5, -77.0), 4),
+               organizer_id(spec, rng.randrange(spec.counts["organizers"])), created)
+
+
+def zone_rows(spec):
+    rng = spec.rng("zones")
+    created = spec.day(-800)
+    zone = 0
+    for venue in range(spec.counts["venues"]):
+        capacity = rng.choice((500, 2000, 10000, 40000))
+        for name, share in ZONES:
+            yield spec.id(zone), name, int(capacity * share), spec.id(venue), created
+            zone += 1
+
+
+def event_fields(spec, rng, e):
+    start = spec.day(spec.event_start[e])
+    name = f"{rng.choice(ADJECTIVES)} {CATEGORIES[spec.event_category[e]]} {e + 1}"
+    return (spec.id(e), name, f"Evento sintético {e + 1} generado para pruebas de escala.",
+            start, start + timedelta(hours=rng.choice((2, 3, 4, 8))),
+            "PUBLICADO" if spec.event_published[e] else "BORRADOR",
+            spec.id(spec.event_category[e]), spec.id(spec.event_venue[e]),
+            organizer_id(spec, spec.event_organizer[e]))
+
+
+def event_rows(spec):
+    rng = spec.rng("events")
+    for e in range(spec.counts["events"]):
+        fields = event_fields(spec, rng, e)
+        yield fields[:5] + (f"https://picsum.photos/seed/{e + 1}/800/400",) + fields[5:] + (spec.day(spec.event_start[e] - SALE_WINDOW_DAYS - 30),)
+
+
+def category_replica_rows(spec):
+    now = datetime.now(timezone.utc)
+    for row in category_rows(spec):
+        yield row[:3] + (now, row[3], now)
+
+
+def event_replica_rows(spec):
+    rng = spec.rng("events")
+    now = datetime.now(timezone.utc)
+    for e in range(spec.counts["events"]):
+        created = spec.day(spec.event_start[e] - SALE_WINDOW_DAYS - 30)
+        yield event_fields(spec, rng, e) + (now, created, created)
+
+
+def ticket_type_rows(spec):
+    for tt in range(spec.counts["ticket_types"]):
+        event = spec.tt_event[tt]
+        start = spec.event_start[event]
+        name = TICKET_NAMES[(tt - spec.event_first_tt[event]) % len(TICKET_NAMES)]
+        created = spec.day(start - SALE_WINDOW_DAYS - 30)
+        yield (spec.id(tt), spec.id(event), name, f"Entrada {name} del evento {event + 1}.", spec.tt_price[tt], "USD",
+               spec.tt_quantity[tt], spec.sold[tt], spec.reserved[tt], 1, 10, spec.day(start - SALE_WINDOW_DAYS), spec.day(start), created, created)
+
+
+def order_batches(spec, qr_secret, batch_size):
+    """
+    Recorre la simulación de órdenes y devuelve lotes (orders, order_items, tickets)
+    de batch_size órdenes, para no tener millones de tickets en memoria.
+    """
+    rng = spec.rng("order-fields")
+    item_index = ticket_index = 0
+    batch = ([], [], [])
+    for index, (user, created, items) in enumerate(spec.simulate_orders()):
+        orders, order_items, tickets = batch
+        order_id, user_id = spec.id(index), spec.id(user)
+        owner = f"Customer Dataset {user + 1}"
+        total = round(sum(spec.tt_price[tt] * quantity for tt, quantity in items), 2)
+        billing = {"nombreCompleto": owner, "identificacion": "9999999999", "direccion": "Calle Falsa 123",
+                   "ciudad": "Quito", "pais": "EC"}
+        orders.append((order_id, str(uuid.UUID(int=rng.getrandbits(128), version=4)), user_id, total, "USD",
+                       "COMPLETED", f"pi_dataset_{order_id}", json.dumps(billing), created, created))
+
+        for tt, quantity in items:
+            item_id = spec.id(item_index)
+            item_index += 1
+            order_items.append((item_id, quantity, spec.tt_price[tt], order_id, spec.id(tt)))
+            event = spec.tt_event[tt]
+            event_id = spec.id(event)
+            past = spec.event_start[event] < 0
+            for n in range(quantity):
+                # Mismo código y firma que TicketService.generateTicketsForOrderItem
+                ticket_code = f"TKT-E{event_id}-T{item_id}-{n + 1}"
+                payload = {"ticketCode": ticket_code, "eventId": event_id, "userId": user_id}
+                signature = hmac.new(qr_secret.encode(), json.dumps(payload, separators=(",", ":")).encode(),
+                                     hashlib.sha256).hexdigest()
+                checked_in = past and rng.random() < 0.8
+                tickets.append((spec.id(ticket_index), item_id, user_id, ticket_code, "USED" if checked_in else "VALID",
+                                event_id, spec.day(spec.event_start[event]) if checked_in else None,
+                                json.dumps({**payload, "sig": signature}, separators=(",", ":")), owner, created, created))
+                ticket_index += 1
+
+        if len(orders) >= batch_size:
+            yield batch
+            batch = ([], [], [])
+    if batch[0]:
+        yield batch
+
+
+def cart_rows(spec):
+    """
+    Carritos abandonados y sus ítems. Llena spec.reserved: ms-tickets mantiene en
+    ticket_types.reserved la suma de los ítems de carritos aún no liberados.
+    """
+    rng = spec.rng("carts")
+    carts, items = [], []
+    spec.reserved = [0] * spec.counts["ticket_types"]
+    item = 0
+    for index, user in enumerate(rng.sample(range(spec.counts["customers"]), spec.counts["carts"])):
+        # Carritos abandonados: ya expirados, como los que quedan tras una venta real
+        expires = spec.day(-rng.uniform(0.01, 30))
+        carts.append((spec.id(index), spec.id(user), expires, expires - timedelta(minutes=15), expires))
+        event = rng.choice(spec.on_sale or spec.published)
+        first, count = spec.event_first_tt[event], spec.event_tt_count[event]
+        for tt in rng.sample(range(first, first + count), rng.randint(1, min(2, count))):
+            quantity = min(rng.randint(1, 4), spec.tt_quantity[tt] - spec.sold[tt] - spec.reserved[tt])
+            if quantity <= 0:
+                continue
+            spec.reserved[tt] += quantity
+            items.append((spec.id(item), quantity, spec.tt_price[tt], spec.id(index), spec.id(tt)))
+            item += 1
+    return carts, items
+
+
+# ==============================================================================
+# --- CARGA ---
+# ==============================================================================
+
+def copy_batch(conn, table, columns, rows):
+    column_list = ", ".join(f'"{c}"' for c in columns)
+    with conn.cursor() as cur, cur.copy(f"COPY {table} ({column_list}) FROM STDIN") as copy:
+        for row in rows:
+            copy.write_row(row)
+
+
+def report(table, total, started):
+    elapsed = time.monotonic() - started
+    print(f"  {table:<20}{total:>12} filas {elapsed:>8.1f}s ({total / elapsed if elapsed else 0:,.0f} filas/s)")
+
+
+def copy_rows(conn, table, columns, rows, batch_size):
+    """COPY por lotes de batch_size filas (cada lote en su propia transacción)."""
+    started, total, batch = time.monotonic(), 0, []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            copy_batch(conn, table, columns, batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        copy_batch(conn, table, columns, batch)
+        total += len(batch)
+    report(table, total, started)
+
+
+def reset(conn, service, id_base):
+    for table in TABLES[service]:
+        with conn.cursor() as cur:
+            cur.execute(f"DELETE FROM {table} WHERE id > %s", (id_base,))
+            print(f"  {table:<20}{cur.rowcount:>12} filas borradas")
+
+
+def load_usuarios(conn, spec, args):
+    with conn.cursor() as cur:
+        cur.execute("SELECT nombre, id FROM roles WHERE nombre IN ('customer', 'organizer')")
+        role_ids = dict(cur.fetchall())
+    password_hash = bcrypt.hashpw(args.password.encode(), bcrypt.gensalt(10)).decode()
+    copy_rows(conn, "users", ("id", "nombre", "apellido", "email", "password", "status", "fechaNacimiento", "pais",
+                              "aceptaTerminos", "role_id", "created_at"),
+              user_rows(spec, password_hash, role_ids), args.batch_size)
+
+
+def load_eventos(conn, spec, args):
+    copy_rows(conn, "categories", ("id", "nombre", "descripcion", "created_at"), category_rows(spec), args.batch_size)
+    copy_rows(conn, "venues", ("id", "nombre", "direccion", "ciudad", "pais", "latitud", "longitud", "organizer_id",
+                               "created_at"), venue_rows(spec), args.batch_size)
+    copy_rows(conn, "zones", ("id", "nombre", "capacidad", "venue_id", "created_at"), zone_rows(spec), args.batch_size)
+    copy_rows(conn, "events", ("id", "nombre", "descripcion", "fecha_inicio", "fecha_fin", "imagen_url", "status",
+                               "category_id", "venue_id", "organizer_id", "created_at"),
+              event_rows(spec), args.batch_size)
+
+
+def load_tickets(conn, spec, args):
+    copy_rows(conn, "categories_replica", ("id", "nombre", "descripcion", "last_sync_at", "created_at", "updated_at"),
+              category_replica_rows(spec), args.batch_size)
+    copy_rows(conn, "events_replica", ("id", "nombre", "descripcion", "fecha_inicio", "fecha_fin", "status",
+                                       "category_id", "venue_id", "organizer_id", "last_sync_at", "created_at",
+                                       "updated_at"),
+              event_replica_rows(spec), args.batch_size)
+
+    # Primera pasada de la simulación: solo para conocer `sold` y `reserved` antes de escribir ticket_types
+    for _ in spec.simulate_orders():
+        pass
+    carts, cart_items = cart_rows(spec)
+    copy_rows(conn, "ticket_types", ("id", "event_id", "name", "description", "price", "currency", "quantity", "sold",
+                                     "reserved", "min_per_purchase", "max_per_purchase", "sale_start_date", "sale_end_date",
+                                     "created_at", "updated_at"),
+              ticket_type_rows(spec), args.batch_size)
+
+    started = time.monotonic()
+    totals = [0, 0, 0]
+    for batch in order_batches(spec, args.qr_secret, args.batch_size):
+        for i, (table, columns) in enumerate(ORDER_TABLES):
+            copy_batch(conn, table, columns, batch[i])
+            totals[i] += len(batch[i])
+    for (table, _), total in zip(ORDER_TABLES, totals):
+        report(table, total, started)
+
+    copy_rows(conn, "carts", ("id", "user_id", "expires_at", "created_at", "updated_at"), carts, args.batch_size)
+    copy_rows(conn, "cart_items", ("id", "quantity", "price_at_reservation", "cart_id", "ticket_type_id"),
+              cart_items, args.batch_size)
+
+
+ORDER_TABLES = (
+    ("orders", ("id", "order_code", "user_id", "total_amount", "currency", "status", "payment_gateway_id",
+                "billing_address", "created_at", "updated_at")),
+    ("order_items", ("id", "quantity", "price_at_purchase", "order_id", "ticket_type_id")),
+    ("tickets", ("id", "order_item_id", "user_id", "ticket_code", "status", "event_id", "check_in_timestamp",
+                 "qr_code_data", "owner_name", "created_at", "updated_at")),
+)
+LOADERS = {"usuarios": load_usuarios, "eventos": load_eventos, "tickets": load_tickets}
+
+
+def write_manifest(spec, args):
+    """Ids de eventos en venta (muestra de hasta --manifest-events) con sus tipos de ticket."""
+    events = spec.on_sale
+    if len(events) > args.manifest_events:
+        events = sorted(spec.rng("manifest").sample(events, args.manifest_events))
+    manifest = {
+        "version": 1,
+        "seed": spec.seed,
+        "scale": args.scale,
+        "anchorDate": spec.anchor.date().isoformat(),
+        "idBase": spec.id_base,
+        "customers": spec.counts["customers"],
+        "organizers": spec.counts["organizers"],
+        "events": [
+            [spec.id(e), [spec.id(tt) for tt in range(spec.event_first_tt[e], spec.event_first_tt[e] + spec.event_tt_count[e])]]
+            for e in events
+        ],
+    }
+    tmp_path = f"{args.manifest}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, separators=(",", ":"))
+    os.replace(tmp_path, args.manifest)
+    print(f"Manifiesto con {len(events)} eventos en venta escrito en {args.manifest}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="Factor de escala del dataset")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--id-base", type=int, default=10_000_000, help="Los ids generados empiezan en id-base + 1")
+    parser.add_argument("--anchor-date", type=date.fromisoformat, default=date.today(),
+                        help="Fecha de referencia (YYYY-MM-DD): histórico antes, eventos en venta después")
+    parser.add_argument("--usuarios-db", default=os.environ.get("DATASET_USUARIOS_DB", DEFAULT_DB.format(name="ms_usuarios")))
+    parser.add_argument("--eventos-db", default=os.environ.get("DATASET_EVENTOS_DB", DEFAULT_DB.format(name="ms_eventos")))
+    parser.add_argument("--tickets-db", default=os.environ.get("DATASET_TICKETS_DB", DEFAULT_DB.format(name="ms_tickets")))
+    parser.add_argument("--services", nargs="+", choices=tuple(LOADERS), default=list(LOADERS),
+                        help="Servicios a cargar (por defecto todos)")
+    parser.add_argument("--reset", action="store_true", help="Borra antes las filas con id > id-base")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--password", default="password", help="Contraseña de las cuentas generadas")
+    parser.add_argument("--qr-secret", default=os.environ.get("TICKETS_JWT_SECRET", DEFAULT_QR_SECRET),
+                        help="Clave HMAC con la que ms-tickets valida el QR de los tickets")
+    parser.add_argument("--manifest", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "dataset.json"))
+    parser.add_argument("--manifest-events", type=int, default=20_000,
+                        help="Máximo de eventos en venta incluidos en el manifiesto")
+    args = parser.parse_args()
+
+    anchor = datetime.combine(args.anchor_date, dt_time(12, 0), tzinfo=timezone.utc)
+    spec = Spec(args.seed, args.scale, args.id_base, anchor)
+    print("Dataset: " + ", ".join(f"{key}={value:,}" for key, value in spec.counts.items()))
+
+    urls = {"usuarios": args.usuarios_db, "eventos": args.eventos_db, "tickets": args.tickets_db}
+    for service in args.services:
+        print(f"ms-{service}:")
+        with psycopg.connect(urls[service], autocommit=True) as conn:
+            if args.reset:
+                reset(conn, service, args.id_base)
+            LOADERS[service](conn, spec, args)
+
+    write_manifest(spec, args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
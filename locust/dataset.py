@@ -0,0 +1,62 @@
+"""
+Ids del dataset sintético (generado con datagen.py) para los usuarios de locust.
+
+Con --dataset los journeys eligen evento y tipo de ticket del manifiesto en
+lugar de descubrirlos con GET /api/v1/events?limit=N y GET .../ticket-types
+en cada iteración, y --dataset-customers añade al pool de tokens las cuentas
+dataset.customer{N}@test.com.
+
+    locust -f locust/test.py --dataset locust/dataset.json --dataset-customers 2000
+"""
+import json
+import random
+
+from locust import events
+
+from token_pool import token_pool
+
+
+class Dataset:
+    """Eventos en venta del manifiesto y sus tipos de ticket."""
+
+    def __init__(self):
+        self.event_ids = []
+        self.ticket_types = {}  # event_id -> [ticket_type_id]
+
+    @property
+    def loaded(self):
+        return bool(self.event_ids)
+
+    def load(self, path):
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.ticket_types = {event_id: ticket_type_ids for event_id, ticket_type_ids in manifest["events"]}
+        self.event_ids = list(self.ticket_types)
+        return manifest
+
+    def random_event(self):
+        return random.choice(self.event_ids)
+
+    def ticket_types_for(self, event_id):
+        return self.ticket_types.get(event_id, [])
+
+
+dataset = Dataset()
+
+
+@events.init_command_line_parser.add_listener
+def _add_arguments(parser):
+    parser.add_argument("--dataset", type=str, env_var="LOCUST_DATASET", default="",
+                        help="Manifiesto generado por datagen.py con los ids de eventos y tipos de ticket")
+    parser.add_argument("--dataset-customers", type=int, env_var="LOCUST_DATASET_CUSTOMERS", default=0,
+                        help="Número de cuentas dataset.customer{N}@test.com a repartir entre usuarios")
+
+
+@events.init.add_listener
+def _on_init(environment, **kwargs):
+    options = environment.parsed_options
+    if not options or not options.dataset:
+        return
+    manifest = dataset.load(options.dataset)
+    count = min(options.dataset_customers, manifest["customers"])
+    token_pool.add_seeded_accounts("customer", count, options.account_password, prefix="dataset")
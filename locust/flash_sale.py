@@ -0,0 +1,411 @@
+"""
+Escenario de venta flash: N usuarios compiten por un único tipo de ticket
+con stock limitado (CartService.addItem / OrderService.createOrderFromCart
+bajo contención).
+
+Uso:
+    locust -f locust/flash_sale.py --headless --flash-event-id 3 --flash-quantity 500 \
+        --flash-users 2000 --flash-spawn-rate 500 --loadtest-customers 2000
+
+Si no se indica --flash-ticket-type-id se crea un tipo de ticket nuevo en el
+evento con --flash-quantity entradas. Conviene que --loadtest-customers sea
+mayor o igual que --flash-users: cada cuenta tiene un único carrito.
+
+Al terminar se concilia el estado contra la API: sold <= quantity y número
+de tickets emitidos == incremento de sold. Si falla, el proceso sale con 1.
+
+Con --flash-waiting-room-rate N se abre la sala de espera de ms-tickets para el
+evento (N admisiones por segundo) y cada usuario hace cola antes de reservar;
+el tiempo en cola aparece como "FLASH waiting room admission".
+"""
+import logging
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import gevent
+import requests
+from locust import LoadTestShape, between, events, task
+from locust.runners import MasterRunner, WorkerRunner
+
+from common import API_HOST, ORDER_CREATED_STATUSES, BaseApiUser, rejected_by_gateway
+from token_pool import token_pool
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_TYPE = "flash_sale_target"
+WAITING_ROOM_HEADER = "X-Waiting-Room-Token"
+STAGES = ("add", "commit")
+
+
+class FlashSaleState:
+    """Objetivo de la venta y contadores por etapa (se agregan en el master)."""
+
+    def __init__(self):
+        self.event_id = None
+        self.ticket_type_id = None
+        self.sold_before = 0
+        self.started_at = None
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.counters = {stage: Counter() for stage in STAGES}
+        self.purchased = 0
+
+    def merge(self, data):
+        for stage, counts in data["counters"].items():
+            self.counters[stage].update(counts)
+        self.purchased += data["purchased"]
+
+    def snapshot(self):
+        return {"counters": {stage: dict(c) for stage, c in self.counters.items()}, "purchased": self.purchased}
+
+
+state = FlashSaleState()
+
+
+def _api_host(environment):
+    return environment.host or API_HOST
+
+
+def _auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+# ==============================================================================
+# --- USUARIO Y FORMA DE CARGA ---
+# ==============================================================================
+
+class FlashSaleUser(BaseApiUser):
+    """
+    Cliente en la estampida: intenta reservar y pagar el ticket objetivo en bucle.
+    """
+    wait_time = between(0.1, 0.5)
+
+    def on_start(self):
+        self.acquire_token("customer")
+        self.queue_token = None
+        self.admitted = False
+
+    @task
+    def grab_ticket(self):
+        if not self.token or not state.ticket_type_id:
+            gevent.sleep(0.5)
+            return
+        options = self.environment.parsed_options
+        if options.flash_waiting_room_rate and not self._wait_for_turn(options.flash_waiting_room_poll):
+            return
+
+        quantity = random.randint(1, options.flash_max_per_user)
+        cart_payload = {"ticketTypeId": str(state.ticket_type_id), "cantidad": quantity}
+        cart_headers = self.headers
+        if self.queue_token:
+            cart_headers[WAITING_ROOM_HEADER] = self.queue_token
+        with self.client.post("/api/v1/cart/items", json=cart_payload, headers=cart_headers,
+                              name="/api/v1/cart/items (flash add)", catch_response=True) as response:
+            if not self._record("add", response):
+                return
+
+        order_payload = {
+            "paymentMethodId": "pm_card_visa",
+            "billingAddress": {
+                "nombreCompleto": "Usuario Flash Sale",
+                "identificacion": f"{random.randint(1000000000, 9999999999)}",
+                "direccion": "Calle Falsa 123",
+                "ciudad": "Quito",
+                "pais": "EC"
+            }
+        }
+        with self.client.post("/api/v1/orders", json=order_payload, headers=self.headers,
+                              name="/api/v1/orders (flash commit)", catch_response=True) as response:
+            if self._record("commit", response):
+                state.purchased += quantity
+
+    def _wait_for_turn(self, poll_seconds):
+        """Hace cola en la sala de espera del evento hasta que le toca; registra el tiempo de espera."""
+        if self.admitted:
+            return True
+        started = time.perf_counter()
+        base = f"/api/v1/waiting-room/{state.event_id}"
+        if not self.queue_token:
+            with self.client.post(f"{base}/join", headers=self.headers, name="/api/v1/waiting-room/[id]/join (flash)",
+                                  catch_response=True) as response:
+                if response.status_code != 200:
+                    response.failure(f"join: {response.status_code}")
+                    return False
+                status = response.json()
+                self.queue_token = status["token"]
+        else:
+            status = {"admitted": False, "etaSeconds": 0}
+
+        while not status["admitted"]:
+            gevent.sleep(min(max(status["etaSeconds"], 0.2), poll_seconds))
+            headers = {**self.headers, WAITING_ROOM_HEADER: self.queue_token}
+            with self.client.get(f"{base}/status", headers=headers, name="/api/v1/waiting-room/[id]/status (flash)",
+                                 catch_response=True) as response:
+                if response.status_code != 200:
+                    response.failure(f"status: {response.status_code}")
+                    return False
+                status = response.json()
+
+        self.admitted = True
+        self.environment.events.request.fire(
+            request_type="FLASH",
+            name="waiting room admission",
+            response_time=(time.perf_counter() - started) * 1000,
+            response_length=0,
+            exception=None,
+            context={},
+        )
+        return True
+
+    def _record(self, stage, response):
+        """Clasifica la respuesta. Un 409 es el resultado esperado cuando se agota el stock."""
+        counters = state.counters[stage]
+        counters["attempts"] += 1
+        if response.status_code in (200, *ORDER_CREATED_STATUSES):
+            counters["ok"] += 1
+            return True
+
+        if response.status_code == 429 and not rejected_by_gateway(response):
+            # La sala de espera aún no nos ha admitido (p. ej. se reabrió): volver a la cola
+            self.admitted = False
+        if response.status_code == 409:
+            counters["conflict"] += 1
+            response.success()
+            self.environment.events.request.fire(
+                request_type="FLASH",
+                name=f"{stage} conflict (409)",
+                response_time=response.request_meta["response_time"],
+                response_length=0,
+                exception=None,
+                context={},
+            )
+        else:
+            counters["error"] += 1
+            response.failure(f"{stage}: {response.status_code}")
+        # Liberar la reserva para no retener stock de un carrito que ya no va a pagar
+        self.client.delete("/api/v1/cart", headers=self.headers, name="/api/v1/cart (flash release)")
+        return False
+
+
+class FlashSaleShape(LoadTestShape):
+    """
+    Estampida de apertura de venta: todos los usuarios llegan casi a la vez,
+    se mantienen durante --flash-duration segundos y la prueba termina.
+    """
+
+    def tick(self):
+        options = self.runner.environment.parsed_options
+        if self.get_run_time() > options.flash_duration:
+            return None
+        return options.flash_users, options.flash_spawn_rate
+
+
+# ==============================================================================
+# --- PREPARACIÓN Y CONCILIACIÓN ---
+# ==============================================================================
+
+def prepare_target(environment):
+    """Resuelve (o crea) el tipo de ticket objetivo y guarda el `sold` inicial."""
+    options = environment.parsed_options
+    host = _api_host(environment)
+    state.event_id = options.flash_event_id
+    state.started_at = datetime.now(timezone.utc)
+
+    if options.flash_ticket_type_id not in ("", "0"):
+        state.ticket_type_id = options.flash_ticket_type_id
+    else:
+        _, organizer_token = token_pool.acquire("organizer")
+        now = datetime.now(timezone.utc)
+        payload = {
+            "nombre": f"Flash Sale {now:%H%M%S}",
+            "descripcion": "Tipo de ticket generado por locust para la prueba de venta flash.",
+            "precio": 25.0,
+            "cantidad": options.flash_quantity,
+            "maxPorCompra": options.flash_max_per_user,
+            "fechaInicioVenta": now.isoformat(),
+            "fechaFinVenta": (now + timedelta(days=1)).isoformat(),
+        }
+        response = requests.post(f"{host}/api/v1/events/{state.event_id}/ticket-types",
+                                 json=payload, headers=_auth(organizer_token), timeout=30)
+        response.raise_for_status()
+        state.ticket_type_id = str(response.json()["id"])
+
+    ticket_type = _get_ticket_type(host)
+    state.sold_before = ticket_type["sold"]
+    logger.info("Venta flash sobre ticket type %s (evento %s): quantity=%s sold=%s",
+                state.ticket_type_id, state.event_id, ticket_type["quantity"], ticket_type["sold"])
+
+
+def set_waiting_room(environment, open_room):
+    """Abre (o cierra al terminar) la sala de espera del evento con la cuenta de organizador."""
+    options = environment.parsed_options
+    if not options.flash_waiting_room_rate:
+        return
+    _, organizer_token = token_pool.acquire("organizer")
+    url = f"{_api_host(environment)}/api/v1/waiting-room/{state.event_id}"
+    if open_room:
+        response = requests.put(url, json={"ratePerSecond": options.flash_waiting_room_rate},
+                                headers=_auth(organizer_token), timeout=30)
+        response.raise_for_status()
+        logger.info("Sala de espera abierta para el evento %s: %s admisiones/s", state.event_id,
+                    options.flash_waiting_room_rate)
+    else:
+        requests.delete(url, headers=_auth(organizer_token), timeout=30)
+
+
+def _get_ticket_type(host):
+    response = requests.get(f"{host}/api/v1/events/{state.event_id}/ticket-types/{state.ticket_type_id}", timeout=30)
+    response.raise_for_status()
+    return response.json()
+
+
+def _parse_date(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _count_issued_tickets(host, token):
+    """Cuenta los tickets del tipo objetivo emitidos para una cuenta desde el inicio de la prueba."""
+    session = requests.Session()
+    session.headers.update(_auth(token))
+
+    order_item_ids = set()
+    cursor = None
+    while True:
+        params = {"limit": 100, **({"cursor": cursor} if cursor else {})}
+        response = session.get(f"{host}/api/v1/orders", params=params, timeout=30)
+        response.raise_for_status()
+        body = response.json()
+        orders = body.get("data", [])
+        recent = [o for o in orders if _parse_date(o["createdAt"]) >= state.started_at]
+        for order in recent:
+            detail = session.get(f"{host}/api/v1/orders/{order['id']}", timeout=30)
+            detail.raise_for_status()
+            order_item_ids.update(item["id"] for item in detail.json().get("items", [])
+                                  if str(item.get("ticketTypeId")) == state.ticket_type_id)
+        # Las órdenes vienen ordenadas por fecha descendente
+        cursor = body.get("pagination", {}).get("nextCursor")
+        if len(recent) < len(orders) or not cursor:
+            break
+
+    if not order_item_ids:
+        return 0
+    issued = 0
+    cursor = None
+    while True:
+        params = {"eventId": state.event_id, "limit": 100, **({"cursor": cursor} if cursor else {})}
+        response = session.get(f"{host}/api/v1/tickets", params=params, timeout=30)
+        response.raise_for_status()
+        body = response.json()
+        issued += sum(1 for ticket in body.get("data", []) if ticket.get("orderItemId") in order_item_ids)
+        cursor = body.get("pagination", {}).get("nextCursor")
+        if not cursor:
+            return issued
+
+
+def reconcile(environment):
+    """Comprueba que no hubo sobreventa y que se emitió un ticket por cada entrada vendida."""
+    host = _api_host(environment)
+    ticket_type = _get_ticket_type(host)
+    sold_delta = ticket_type["sold"] - state.sold_before
+    issued = sum(_count_issued_tickets(host, token) for _, token in token_pool.role_tokens("customer"))
+
+    logger.info("Conciliación venta flash: quantity=%s sold=%s (+%s) tickets emitidos=%s comprados según locust=%s",
+                ticket_type["quantity"], ticket_type["sold"], sold_delta, issued, state.purchased)
+
+    errors = []
+    if ticket_type["sold"] > ticket_type["quantity"]:
+        errors.append(f"sobreventa: sold={ticket_type['sold']} > quantity={ticket_type['quantity']}")
+    if issued != sold_delta:
+        errors.append(f"tickets emitidos ({issued}) != incremento de sold ({sold_delta})")
+    if state.purchased != sold_delta:
+        # Puede ocurrir si una respuesta se perdió por timeout; no invalida la prueba por sí solo
+        logger.warning("Locust registró %s entradas compradas pero sold aumentó en %s", state.purchased, sold_delta)
+
+    for error in errors:
+        logger.error("Conciliación fallida: %s", error)
+    if errors:
+        environment.process_exit_code = 1
+
+
+def log_stage_summary():
+    for stage in STAGES:
+        counters = state.counters[stage]
+        attempts = counters["attempts"] or 1
+        logger.info("Etapa %-6s intentos=%s ok=%s 409=%s (%.1f%%) errores=%s", stage, counters["attempts"],
+                    counters["ok"], counters["conflict"], 100.0 * counters["conflict"] / attempts, counters["error"])
+
+
+# ==============================================================================
+# --- INTEGRACIÓN CON LOCUST ---
+# ==============================================================================
+
+@events.init_command_line_parser.add_listener
+def _add_arguments(parser):
+    parser.add_argument("--flash-event-id", type=int, env_var="LOCUST_FLASH_EVENT_ID", default=1,
+                        help="Evento al que pertenece el tipo de ticket de la venta flash")
+    # Como texto: la API devuelve los id INT8 como strings y así se comparan
+    parser.add_argument("--flash-ticket-type-id", type=str, env_var="LOCUST_FLASH_TICKET_TYPE_ID", default="",
+                        help="Tipo de ticket existente a usar (vacío o 0 = crear uno nuevo)")
+    parser.add_argument("--flash-quantity", type=int, env_var="LOCUST_FLASH_QUANTITY", default=500,
+                        help="Stock del tipo de ticket creado para la prueba")
+    parser.add_argument("--flash-max-per-user", type=int, env_var="LOCUST_FLASH_MAX_PER_USER", default=2,
+                        help="Entradas máximas por intento de compra")
+    parser.add_argument("--flash-users", type=int, env_var="LOCUST_FLASH_USERS", default=1000,
+                        help="Usuarios concurrentes en la estampida")
+    parser.add_argument("--flash-spawn-rate", type=float, env_var="LOCUST_FLASH_SPAWN_RATE", default=500,
+                        help="Usuarios por segundo al abrir la venta")
+    parser.add_argument("--flash-duration", type=int, env_var="LOCUST_FLASH_DURATION", default=120,
+                        help="Duración de la venta en segundos")
+    parser.add_argument("--flash-waiting-room-rate", type=float, env_var="LOCUST_FLASH_WAITING_ROOM_RATE", default=0,
+                        help="Abre la sala de espera del evento con estas admisiones por segundo (0 = sin sala)")
+    parser.add_argument("--flash-waiting-room-poll", type=float, env_var="LOCUST_FLASH_WAITING_ROOM_POLL", default=2,
+                        help="Intervalo máximo entre consultas de turno en la sala de espera")
+    parser.add_argument("--flash-settle-seconds", type=float, env_var="LOCUST_FLASH_SETTLE_SECONDS", default=3,
+                        help="Espera antes de conciliar para que terminen las órdenes en curso")
+
+
+@events.init.add_listener
+def _on_init(environment, **kwargs):
+    if isinstance(environment.runner, WorkerRunner):
+        environment.runner.register_message(MESSAGE_TYPE, lambda msg, **kw: _set_target(msg.data))
+
+
+def _set_target(data):
+    state.event_id = data["eventId"]
+    state.ticket_type_id = str(data["ticketTypeId"])
+
+
+@events.test_start.add_listener
+def _on_test_start(environment, **kwargs):
+    if isinstance(environment.runner, WorkerRunner):
+        return
+    token_pool.ensure_ready()
+    prepare_target(environment)
+    set_waiting_room(environment, open_room=True)
+    if isinstance(environment.runner, MasterRunner):
+        environment.runner.send_message(MESSAGE_TYPE, {"eventId": state.event_id, "ticketTypeId": state.ticket_type_id})
+
+
+@events.report_to_master.add_listener
+def _on_report_to_master(client_id, data):
+    data["flash_sale"] = state.snapshot()
+    state.reset_counters()
+
+
+@events.worker_report.add_listener
+def _on_worker_report(client_id, data):
+    if "flash_sale" in data:
+        state.merge(data["flash_sale"])
+
+
+@events.test_stop.add_listener
+def _on_test_stop(environment, **kwargs):
+    if isinstance(environment.runner, WorkerRunner) or not state.ticket_type_id:
+        return
+    gevent.sleep(environment.parsed_options.flash_settle_seconds)
+    set_waiting_room(environment, open_room=False)
+    log_stage_summary()
+    reconcile(environment)
@@ -0,0 +1,222 @@
+"""
+Efecto del perfil de rendimiento de Kong (proxy-cache del catálogo y
+rate-limiting de /cart/items, /orders y /auth/login) visto desde locust:
+cuántas peticiones respondió el gateway sin llegar a los servicios.
+
+    # Referencia: sin la caché del gateway (todas las peticiones llevan Cache-Control: no-cache)
+    locust -f locust/test.py,locust/service_metrics.py,locust/gateway_profile.py --headless -u 200 -r 20 -t 10m \
+        --gateway-bypass-cache --gateway-out results/gateway-off.json --metrics-out results/metrics-off
+
+    # Con la caché, comparando contra la referencia
+    locust -f locust/test.py,locust/service_metrics.py,locust/gateway_profile.py --headless -u 200 -r 20 -t 10m \
+        --gateway-out results/gateway-on.json --metrics-out results/metrics-on \
+        --gateway-baseline results/gateway-off.json
+
+Por nombre de petición se cuentan los X-Cache-Status de Kong (Hit, Miss,
+Bypass, Refresh) y los 429 del rate-limiting. Los aciertos de caché y los
+rechazos del gateway son carga que no llega al servicio; el resto sí. Las
+latencias y el trabajo que eso ahorra en cada servicio salen en el resumen de
+service_metrics.py de cada ejecución.
+
+El resumen se imprime al terminar, se guarda en --gateway-out, se sirve en la
+interfaz web en /gateway-profile y, si benchmark.py se carga después
+(-f ...,locust/gateway_profile.py,locust/benchmark.py), viaja en el "meta" del
+resultado de --benchmark-out.
+"""
+import functools
+import json
+import logging
+import os
+import time
+from collections import Counter
+
+from locust import FastHttpUser, events
+from locust.runners import WorkerRunner
+
+from common import rejected_by_gateway
+
+logger = logging.getLogger(__name__)
+
+CACHE_HEADER = "X-Cache-Status"
+BYPASS_HEADERS = {"Cache-Control": "no-cache"}
+TOP_N = 20
+
+
+class GatewayProfileRecorder:
+    """Contadores por nombre de petición; en los workers se vacían en cada report_to_master."""
+
+    def __init__(self):
+        self.routes = {}
+        self.started_at = None
+        self.stopped_at = None
+        self.summary = None
+
+    def on_request(self, name, response):
+        counts = self.routes.setdefault(name, Counter())
+        counts["requests"] += 1
+        if rejected_by_gateway(response):
+            counts["shed"] += 1
+            return
+        cache_status = response.headers.get(CACHE_HEADER)
+        if cache_status:
+            counts[cache_status.lower()] += 1
+
+    def drain(self):
+        routes, self.routes = self.routes, {}
+        return {name: dict(counts) for name, counts in routes.items()}
+
+    def merge(self, data):
+        for name, counts in data.items():
+            self.routes.setdefault(name, Counter()).update(counts)
+
+    def build_summary(self, bypass_cache):
+        duration = max((self.stopped_at or time.time()) - (self.started_at or time.time()), 1e-9)
+        routes = []
+        totals = Counter()
+        for name, counts in self.routes.items():
+            totals.update(counts)
+            if counts["hit"] or counts["miss"] or counts["bypass"] or counts["shed"]:
+                routes.append({"name": name, **_ratios(counts)})
+        routes.sort(key=lambda row: row["hit"] + row["shed"], reverse=True)
+        self.summary = {
+            "bypassCache": bypass_cache,
+            "durationS": round(duration, 1),
+            "totals": {
+                **_ratios(totals),
+                "requestRps": round(totals["requests"] / duration, 2),
+                "backendRps": round((totals["requests"] - totals["hit"] - totals["shed"]) / duration, 2),
+            },
+            "routes": routes,
+        }
+        return self.summary
+
+
+def _ratios(counts):
+    requests = counts["requests"]
+    offloaded = counts["hit"] + counts["shed"]
+    return {
+        "requests": requests,
+        "hit": counts["hit"],
+        "miss": counts["miss"],
+        "bypass": counts["bypass"],
+        "refresh": counts["refresh"],
+        "shed": counts["shed"],
+        "offloadRatio": round(offloaded / requests, 4) if requests else 0,
+    }
+
+
+def format_summary(summary, baseline=None):
+    totals = summary["totals"]
+    mode = "sin caché del gateway (Cache-Control: no-cache)" if summary["bypassCache"] else "con caché del gateway"
+    lines = ["", f"=== Gateway: {mode} ===",
+             f"  Peticiones {totals['requests']} ({totals['requestRps']}/s), al backend {totals['backendRps']}/s, "
+             f"aciertos de caché {totals['hit']}, rechazadas (429) {totals['shed']}, "
+             f"descargadas {totals['offloadRatio']:.1%}"]
+    for row in summary["routes"][:TOP_N]:
+        lines.append(f"  {row['name']:<60} n={row['requests']:<8} hit={row['hit']:<7} miss={row['miss']:<7} "
+                     f"429={row['shed']:<6} descargadas={row['offloadRatio']:.1%}")
+    if baseline:
+        before = baseline["totals"]
+        lines.append("\n  Comparación con la referencia:")
+        for label, key in (("Peticiones/s", "requestRps"), ("Al backend/s", "backendRps"),
+                           ("Descargadas", "offloadRatio"), ("Rechazadas (429)", "shed")):
+            lines.append(f"  {label:<20} {before[key]!s:>10} -> {totals[key]!s:<10}")
+    return "\n".join(lines)
+
+
+def bypass_gateway_cache(user_classes):
+    """Añade Cache-Control: no-cache a todas las peticiones: Kong (cache_control: true) no sirve desde caché."""
+    for user_class in user_classes:
+        if issubclass(user_class, FastHttpUser):
+            user_class.default_headers = {**(user_class.default_headers or {}), **BYPASS_HEADERS}
+            continue
+
+        init = user_class.__init__
+
+        @functools.wraps(init)
+        def __init__(self, *args, _init=init, **kwargs):
+            _init(self, *args, **kwargs)
+            self.client.headers.update(BYPASS_HEADERS)
+
+        user_class.__init__ = __init__
+
+
+recorder = GatewayProfileRecorder()
+
+
+# ==============================================================================
+# --- INTEGRACIÓN CON LOCUST ---
+# ==============================================================================
+
+@events.init_command_line_parser.add_listener
+def _add_arguments(parser):
+    parser.add_argument("--gateway-bypass-cache", action="store_true", env_var="LOCUST_GATEWAY_BYPASS_CACHE",
+                        default=False, help="Ejecución de referencia: pide a Kong que no sirva desde su caché")
+    parser.add_argument("--gateway-out", type=str, env_var="LOCUST_GATEWAY_OUT", default="",
+                        help="Archivo JSON donde guardar el resumen del gateway")
+    parser.add_argument("--gateway-baseline", type=str, env_var="LOCUST_GATEWAY_BASELINE", default="",
+                        help="Resumen de otra ejecución (--gateway-out) con el que comparar")
+
+
+@events.init.add_listener
+def _on_init(environment, **kwargs):
+    options = environment.parsed_options
+    if options is None:
+        return
+    if options.gateway_bypass_cache:
+        bypass_gateway_cache(environment.user_classes)
+    environment.gateway_profile = None
+    if environment.web_ui and not isinstance(environment.runner, WorkerRunner):
+        @environment.web_ui.app.route("/gateway-profile")
+        def _gateway_profile():
+            return environment.gateway_profile or {"totals": {}, "routes": []}
+
+
+@events.request.add_listener
+def _on_request(name, response=None, **kwargs):
+    # Los journeys de benchmark.py y las peticiones sin respuesta no pasan por el gateway
+    if response is not None and getattr(response, "headers", None) is not None:
+        recorder.on_request(name, response)
+
+
+@events.test_start.add_listener
+def _on_test_start(environment, **kwargs):
+    recorder.routes = {}
+    recorder.started_at = time.time()
+    recorder.stopped_at = None
+
+
+@events.test_stop.add_listener
+def _on_test_stop(environment, **kwargs):
+    recorder.stopped_at = time.time()
+
+
+@events.report_to_master.add_listener
+def _on_report_to_master(client_id, data):
+    data["gateway_profile"] = recorder.drain()
+
+
+@events.worker_report.add_listener
+def _on_worker_report(client_id, data):
+    if "gateway_profile" in data:
+        recorder.merge(data["gateway_profile"])
+
+
+@events.quitting.add_listener
+def _on_quitting(environment, **kwargs):
+    # Como en benchmark.py: al salir el master ya tiene el último informe de los workers
+    if isinstance(environment.runner, WorkerRunner) or not recorder.routes:
+        return
+    options = environment.parsed_options
+    summary = recorder.build_summary(options.gateway_bypass_cache)
+    environment.gateway_profile = summary
+    baseline = None
+    if options.gateway_baseline and os.path.exists(options.gateway_baseline):
+        with open(options.gateway_baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print(format_summary(summary, baseline))
+    if options.gateway_out:
+        os.makedirs(os.path.dirname(options.gateway_out) or ".", exist_ok=True)
+        with open(options.gateway_out, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+        logger.info("Resumen del gateway guardado en %s", options.gateway_out)
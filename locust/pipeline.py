@@ -0,0 +1,221 @@
+"""
+Latencia extremo a extremo del pipeline asíncrono de compra:
+
+    POST /api/v1/orders -> purchase.completed (RabbitMQ) -> ms-notifications
+    -> email (SMTP) -> NotificationLog
+
+Cada petición autenticada lleva un X-Correlation-Id con la hora de envío
+(common.new_correlation_id). ms-tickets lo publica como correlationId del
+mensaje AMQP y ms-notifications lo copia en la cabecera X-Correlation-Id del
+email y en el content del NotificationLog.
+
+Este locustfile levanta un sumidero SMTP local que sustituye al servidor de
+correo real: cada email recibido se registra en las estadísticas de locust
+como "PIPELINE order -> email", con la latencia desde el envío de la orden.
+Cuando la cola o el consumidor se quedan atrás, lo que crece es esta
+latencia, no la de /api/v1/orders.
+
+Uso:
+    SMTP_HOST=<máquina de locust> SMTP_PORT=2525 SMTP_USER=loadtest SMTP_PASS=loadtest \
+    SMTP_SECURE=false  (entorno de ms-notifications)
+
+    locust -f locust/test.py,locust/pipeline.py --smtp-sink-port 2525
+
+El sumidero corre en el master (o en el proceso único sin --master). La
+latencia compara la hora de envío del worker con la de recepción del master,
+así que en ejecuciones distribuidas los relojes deben estar sincronizados.
+"""
+import logging
+import time
+
+import gevent
+from gevent.server import StreamServer
+from locust import events
+from locust.runners import WorkerRunner
+
+from common import CORRELATION_HEADER, ORDER_CREATED_STATUSES, correlation_sent_at
+
+logger = logging.getLogger(__name__)
+
+REQUEST_TYPE = "PIPELINE"
+ORDER_PATH = "/api/v1/orders"
+
+
+class PipelineState:
+    """Órdenes creadas (contadas en los workers) y emails recibidos por el sumidero."""
+
+    def __init__(self):
+        self.orders = 0
+        self.emails = 0
+        self.unmatched = 0
+
+
+state = PipelineState()
+
+
+class SmtpSink:
+    """
+    Servidor SMTP mínimo sobre gevent: acepta cualquier AUTH/MAIL/RCPT, lee el
+    mensaje y descarta el cuerpo quedándose solo con X-Correlation-Id.
+    """
+
+    def __init__(self, environment, host, port):
+        self.environment = environment
+        self.server = StreamServer((host, port), self._handle)
+
+    def start(self):
+        self.server.start()
+        logger.info("Sumidero SMTP escuchando en %s:%s", *self.server.address[:2])
+
+    def stop(self):
+        self.server.stop()
+
+    def _handle(self, sock, address):
+        reader = sock.makefile("rb")
+
+        def reply(line):
+            sock.sendall(f"{line}\r\n".encode())
+
+        reply("220 locust-smtp-sink ESMTP")
+        try:
+            while True:
+                line = reader.readline()
+                if not line:
+                    break
+                command = line.decode(errors="replace").strip()
+                verb = command.split(" ", 1)[0].upper()
+                if verb == "EHLO":
+                    reply("250-locust-smtp-sink")
+                    reply("250-AUTH PLAIN LOGIN")
+                    reply("250 8BITMIME")
+                elif verb == "AUTH":
+                    self._authenticate(command, reader, reply)
+                elif verb == "DATA":
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    self._record(self._read_headers(reader))
+                    reply("250 2.0.0 OK")
+                elif verb == "QUIT":
+                    reply("221 2.0.0 Bye")
+                    break
+                elif verb in ("HELO", "MAIL", "RCPT", "RSET", "NOOP"):
+                    reply("250 OK")
+                else:
+                    reply("502 5.5.2 Command not implemented")
+        except OSError:
+            pass
+        finally:
+            reader.close()
+            sock.close()
+
+    @staticmethod
+    def _authenticate(command, reader, reply):
+        # Se acepta cualquier credencial; solo hay que consumir las respuestas del cliente
+        args = command.split()[1:]
+        mechanism = args[0].upper() if args else ""
+        if mechanism == "PLAIN" and len(args) == 1:
+            reply("334 ")
+            reader.readline()
+        elif mechanism == "LOGIN":
+            if len(args) == 1:
+                reply("334 VXNlcm5hbWU6")
+                reader.readline()
+            reply("334 UGFzc3dvcmQ6")
+            reader.readline()
+        reply("235 2.7.0 Authentication successful")
+
+    @staticmethod
+    def _read_headers(reader):
+        headers = {}
+        in_headers = True
+        while True:
+            line = reader.readline()
+            if not line or line in (b".\r\n", b".\n"):
+                return headers
+            if in_headers:
+                text = line.decode(errors="replace").rstrip("\r\n")
+                if not text:
+                    in_headers = False
+                elif ":" in text and not text[0].isspace():
+                    name, value = text.split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+
+    def _record(self, headers):
+        state.emails += 1
+        sent_at = correlation_sent_at(headers.get(CORRELATION_HEADER.lower()))
+        if sent_at is None:
+            state.unmatched += 1
+            return
+        self.environment.events.request.fire(
+            request_type=REQUEST_TYPE,
+            name="order -> email",
+            response_time=max(0, time.time_ns() // 1_000_000 - sent_at),
+            response_length=0,
+            exception=None,
+            context={},
+        )
+
+
+sink = None
+
+
+# ==============================================================================
+# --- INTEGRACIÓN CON LOCUST ---
+# ==============================================================================
+
+@events.init_command_line_parser.add_listener
+def _add_arguments(parser):
+    parser.add_argument("--smtp-sink-host", type=str, env_var="LOCUST_SMTP_SINK_HOST", default="0.0.0.0",
+                        help="Interfaz en la que escucha el sumidero SMTP")
+    parser.add_argument("--smtp-sink-port", type=int, env_var="LOCUST_SMTP_SINK_PORT", default=2525,
+                        help="Puerto del sumidero SMTP (0 = no levantarlo)")
+    parser.add_argument("--pipeline-settle-seconds", type=float, env_var="LOCUST_PIPELINE_SETTLE_SECONDS", default=30,
+                        help="Espera al terminar para que se vacíe la cola antes de contar los emails pendientes")
+
+
+@events.init.add_listener
+def _on_init(environment, **kwargs):
+    global sink
+    options = environment.parsed_options
+    if isinstance(environment.runner, WorkerRunner) or not options or not options.smtp_sink_port:
+        return
+    sink = SmtpSink(environment, options.smtp_sink_host, options.smtp_sink_port)
+    sink.start()
+
+
+@events.request.add_listener
+def _on_request(request_type, name, exception, response=None, **kwargs):
+    if (request_type == "POST" and name.startswith(ORDER_PATH) and exception is None
+            and getattr(response, "status_code", None) in ORDER_CREATED_STATUSES):
+        state.orders += 1
+
+
+@events.report_to_master.add_listener
+def _on_report_to_master(client_id, data):
+    data["pipeline_orders"] = state.orders
+    state.orders = 0
+
+
+@events.worker_report.add_listener
+def _on_worker_report(client_id, data):
+    state.orders += data.get("pipeline_orders", 0)
+
+
+@events.test_stop.add_listener
+def _on_test_stop(environment, **kwargs):
+    if sink is None:
+        return
+    deadline = time.monotonic() + environment.parsed_options.pipeline_settle_seconds
+    while state.emails - state.unmatched < state.orders and time.monotonic() < deadline:
+        gevent.sleep(0.5)
+    pending = state.orders - (state.emails - state.unmatched)
+    logger.info("Pipeline: órdenes=%s emails=%s sin correlationId=%s pendientes=%s",
+                state.orders, state.emails, state.unmatched, pending)
+    if pending > 0:
+        logger.warning("%s órdenes sin email tras %ss: la cola o el consumidor no dieron abasto",
+                       pending, environment.parsed_options.pipeline_settle_seconds)
+
+
+@events.quit.add_listener
+def _on_quit(exit_code, **kwargs):
+    if sink is not None:
+        sink.stop()
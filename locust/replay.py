@@ -0,0 +1,328 @@
+"""
+Replay de tráfico real a partir de los access logs de Kong.
+
+En lugar de los journeys y pesos fijos de test.py, reproduce las peticiones
+de un log (p. ej. la noche de una apertura de venta) respetando sus tiempos,
+comprimidos --replay-speed veces, contra otro entorno:
+
+    docker logs kong-gateway 2>/dev/null | gzip > onsale.log.gz
+    python locust/replay_log.py onsale.log.gz        # qué hay en el log
+
+    locust -f locust/replay.py --headless --host http://staging:8000 \
+        --replay-log onsale.log.gz --replay-speed 4 \
+        --replay-from 2025-11-28T19:00:00-05:00 --replay-to 2025-11-28T23:00:00-05:00 \
+        --loadtest-customers 2000 --dataset locust/dataset.json
+
+El log se lee en streaming (replay_log.py) y las peticiones se agrupan en
+sesiones. Cada sesión usa su propia conexión y, cuando hace falta, una cuenta
+del pool de tokens. Las peticiones se envían a su hora aunque las anteriores
+no hayan terminado (modelo abierto), con hasta --replay-max-inflight en vuelo;
+si se llega al límite o el generador no da abasto, el retraso respecto a la
+hora prevista sale en el resumen final. La prueba termina al acabar el log.
+
+El log no trae cuerpos, así que:
+- POST /cart/items usa un tipo de ticket del último GET .../ticket-types de
+  la sesión (o del dataset) y DELETE /cart/items/[id] un item de su carrito.
+- POST /orders genera los datos de facturación; POST /orders/[id]/refund usa
+  el último pedido de la sesión.
+- POST /auth/login hace login con la cuenta de la sesión (bcrypt incluido).
+- El resto de escrituras (organizadores, registro, check-in...) se omiten y se
+  cuentan por nombre.
+
+Con --dataset los ids de evento del log se asignan de forma estable a los
+eventos del manifiesto, para reproducir contra un entorno con datos
+sintéticos. Sin él se usan tal cual (staging restaurado de producción).
+
+Una sola instancia de ReplayUser lee todo el log. Para repartir un log muy
+grande entre varios procesos: --replay-shard 0/4, 1/4... (por sesión).
+"""
+import random
+import time
+import zlib
+from collections import Counter
+
+import gevent
+from gevent.pool import Pool
+from locust import User, events, task
+from locust.clients import HttpSession
+
+from common import API_HOST, CORRELATION_HEADER, ORDER_CREATED_STATUSES, new_correlation_id
+from dataset import dataset
+from replay_log import (DEFAULT_SESSION_GAP, Session, Sessionizer, parse_time, read_entries, request_name, split_uri,
+                        spread, window)
+from token_pool import token_pool
+
+WAITING_ROOM_HEADER = "X-Waiting-Room-Token"
+# Rutas que exigen token: la sesión toma una cuenta del pool en la primera
+AUTHENTICATED_PREFIXES = ("/api/v1/cart", "/api/v1/orders", "/api/v1/tickets", "/api/v1/waiting-room",
+                          "/api/v1/users")
+LOGIN_PATH = "/api/v1/auth/login"
+EVENT_ID_PATH = ("/api/v1/events/", "/api/v1/waiting-room/")
+# Escrituras que no necesitan cuerpo y se reproducen tal cual
+WRITES_WITHOUT_BODY = {("DELETE", "/api/v1/cart"), ("POST", "/api/v1/waiting-room/[id]/join")}
+EXPIRE_EVERY = 10000
+LATE_THRESHOLD_S = 1.0
+
+
+class ReplaySession(Session):
+    """Sesión del log con su conexión, su cuenta y lo que ha ido viendo."""
+
+    def __init__(self, session_id, key, started_at):
+        super().__init__(session_id, key, started_at)
+        self.client = None
+        self.account = None
+        self.token = None
+        self.queue_token = None
+        self.ticket_type_ids = []
+        self.cart_item_ids = []
+        self.order_ids = []
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+
+
+class ReplayStats:
+    def __init__(self):
+        self.sent = 0
+        self.skipped = Counter()  # nombre -> peticiones omitidas
+        self.late = 0
+        self.max_lag = 0.0
+        self.lines = Counter()
+
+    def record_lag(self, lag):
+        self.max_lag = max(self.max_lag, lag)
+        if lag > LATE_THRESHOLD_S:
+            self.late += 1
+
+
+def map_event_ids(path):
+    """Con --dataset, cambia el id de evento del log por uno del manifiesto (siempre el mismo)."""
+    if not dataset.loaded:
+        return path
+    for prefix in EVENT_ID_PATH:
+        if path.startswith(prefix):
+            event_id, sep, rest = path[len(prefix):].partition("/")
+            if event_id.isdigit():
+                mapped = dataset.event_ids[zlib.crc32(event_id.encode()) % len(dataset.event_ids)]
+                return f"{prefix}{mapped}{sep}{rest}"
+    return path
+
+
+def order_payload():
+    return {
+        "paymentMethodId": f"pm_card_{random.choice(['visa', 'mastercard', 'amex'])}",
+        "billingAddress": {
+            "nombreCompleto": f"Usuario Replay {random.randint(1000, 9999)}",
+            "identificacion": f"{random.randint(1000000000, 9999999999)}",
+            "direccion": "Calle Falsa 123",
+            "ciudad": "Quito",
+            "pais": "EC"
+        }
+    }
+
+
+def _json(response):
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+class ReplayUser(User):
+    """Lee el log y lanza cada petición a su hora en nombre de su sesión."""
+    fixed_count = 1
+    host = API_HOST
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        self.stats = ReplayStats()
+
+    @task
+    def replay(self):
+        options = self.environment.parsed_options
+        shard = tuple(int(part) for part in options.replay_shard.split("/")) if options.replay_shard else None
+        sessionizer = Sessionizer(options.replay_session_gap, shard, factory=ReplaySession)
+        entries = window(spread(read_entries(options.replay_log.split(","), self.stats.lines)),
+                         parse_time(options.replay_from), parse_time(options.replay_to))
+        pool = Pool(options.replay_max_inflight)
+        started_at = log_started_at = None
+
+        for i, entry in enumerate(entries):
+            session = sessionizer.assign(entry)
+            if session is None:
+                continue
+            if started_at is None:
+                started_at, log_started_at = time.time(), entry.timestamp
+            due = started_at + (entry.timestamp - log_started_at) / options.replay_speed
+            delay = due - time.time()
+            if delay > 0:
+                gevent.sleep(delay)
+            pool.spawn(self.send, session, entry, due)
+            if i % EXPIRE_EVERY == 0:
+                sessionizer.expire(entry.timestamp)
+
+        pool.join()
+        sessionizer.close_all()
+        self.report(sessionizer)
+        self.environment.runner.quit()
+
+    # --------------------------------------------------------------------------
+    # Envío de una petición
+    # --------------------------------------------------------------------------
+
+    def send(self, session, entry, due):
+        path, query = split_uri(entry.uri)
+        name = request_name(path)
+        path = map_event_ids(path)
+        method = entry.method
+        body = None
+
+        if name == LOGIN_PATH and method == "POST":
+            self.login(session, due)
+            return
+        if name.startswith("/api/v1/auth/"):
+            return self.skip(method, name)
+        if method not in ("GET", "HEAD"):
+            if name == "/api/v1/cart/items" and method == "POST":
+                ticket_type_id = self.ticket_type_for(session)
+                if ticket_type_id is None:
+                    return self.skip(method, name)
+                body = {"ticketTypeId": str(ticket_type_id), "cantidad": random.randint(1, 2)}
+            elif name == "/api/v1/cart/items/[id]" and method == "DELETE":
+                if not session.cart_item_ids:
+                    return self.skip(method, name)
+                path = f"/api/v1/cart/items/{session.cart_item_ids.pop()}"
+            elif name == "/api/v1/orders" and method == "POST":
+                body = order_payload()
+            elif name == "/api/v1/orders/[id]/refund" and method == "POST":
+                if not session.order_ids:
+                    return self.skip(method, name)
+                path = f"/api/v1/orders/{session.order_ids[-1]}/refund"
+            elif (method, name) not in WRITES_WITHOUT_BODY:
+                return self.skip(method, name)
+
+        headers = self.headers_for(session, path, entry)
+        url = f"{path}?{query}" if query else path
+        self.stats.record_lag(time.time() - due)
+        self.stats.sent += 1
+        response = self.client_for(session).request(
+            method, url, name=name, headers=headers, json=body,
+            context={"account": session.account, "token": session.token} if session.account else {})
+        self.remember(session, method, name, response)
+
+    def login(self, session, due):
+        account = self.account_for(session)
+        credentials = token_pool.credentials(account) if account else None
+        if not credentials:
+            return self.skip("POST", LOGIN_PATH)
+        self.stats.record_lag(time.time() - due)
+        self.stats.sent += 1
+        response = self.client_for(session).post(LOGIN_PATH, json=credentials, name=LOGIN_PATH,
+                                                 headers={CORRELATION_HEADER: new_correlation_id()})
+        data = _json(response) if response.status_code == 200 else None
+        if data and data.get("token"):
+            session.token = data["token"]
+
+    def skip(self, method, name):
+        self.stats.skipped[f"{method} {name}"] += 1
+
+    def client_for(self, session):
+        if session.client is None:
+            session.client = HttpSession(base_url=self.environment.host or self.host,
+                                         request_event=self.environment.events.request, user=self)
+            session.client.trust_env = False
+        return session.client
+
+    def account_for(self, session):
+        if session.account is None:
+            session.account, session.token = token_pool.acquire("customer")
+        return session.account
+
+    def headers_for(self, session, path, entry):
+        headers = {CORRELATION_HEADER: new_correlation_id()}
+        if entry.user_agent:
+            headers["User-Agent"] = entry.user_agent
+        # Las sesiones con token lo envían en todo, como el frontend una vez logueado
+        if session.token is None and (entry.session or path.startswith(AUTHENTICATED_PREFIXES)):
+            self.account_for(session)
+        if session.account:
+            session.token = token_pool.token_for(session.account) or session.token
+        if session.token:
+            headers["Authorization"] = f"Bearer {session.token}"
+        if session.queue_token:
+            headers[WAITING_ROOM_HEADER] = session.queue_token
+        return headers
+
+    def ticket_type_for(self, session):
+        """Tipo de ticket del último evento que consultó la sesión o, si no hay, uno del dataset."""
+        ticket_type_ids = session.ticket_type_ids
+        if not ticket_type_ids and dataset.loaded:
+            ticket_type_ids = dataset.ticket_types_for(dataset.random_event())
+        return random.choice(ticket_type_ids) if ticket_type_ids else None
+
+    def remember(self, session, method, name, response):
+        """Guarda de la respuesta lo que necesitan las siguientes peticiones de la sesión."""
+        if response.status_code >= 300:
+            return
+        if name == "/api/v1/events/[id]/ticket-types" and method == "GET":
+            data = _json(response)
+            if isinstance(data, list) and data:
+                session.ticket_type_ids = [ticket_type["id"] for ticket_type in data if "id" in ticket_type]
+        elif name == "/api/v1/cart" and method == "GET":
+            data = _json(response) or {}
+            session.cart_item_ids = [item["itemId"] for item in data.get("items", []) if item.get("itemId")]
+        elif name == "/api/v1/orders" and method == "POST" and response.status_code in ORDER_CREATED_STATUSES:
+            data = _json(response) or {}
+            if data.get("id"):
+                session.order_ids.append(data["id"])
+        elif name == "/api/v1/waiting-room/[id]/join" and method == "POST":
+            data = _json(response) or {}
+            session.queue_token = data.get("token") or session.queue_token
+
+    def report(self, sessionizer):
+        requests_per_session, seconds_per_session = sessionizer.averages()
+        lines = self.stats.lines
+        print("\n=== Replay ===")
+        print(f"  Peticiones enviadas {self.stats.sent}, omitidas {sum(self.stats.skipped.values())}, "
+              f"sesiones {sessionizer.started} ({requests_per_session} peticiones y "
+              f"{seconds_per_session}s de media)")
+        print(f"  Retraso máximo respecto al log {self.stats.max_lag:.2f}s, "
+              f"{self.stats.late} peticiones con más de {LATE_THRESHOLD_S:.0f}s")
+        print(f"  Líneas sin parsear {lines['unparsed']}, fuera de /api/ {lines['notApi']}")
+        for name, count in self.stats.skipped.most_common(10):
+            print(f"  Omitida {name}: {count}")
+
+
+# ==============================================================================
+# --- INTEGRACIÓN CON LOCUST ---
+# ==============================================================================
+
+@events.init_command_line_parser.add_listener
+def _add_arguments(parser):
+    parser.add_argument("--replay-log", type=str, env_var="LOCUST_REPLAY_LOG", default="",
+                        help="Access logs de Kong a reproducir, separados por comas (.gz admitido, - para stdin)")
+    parser.add_argument("--replay-speed", type=float, env_var="LOCUST_REPLAY_SPEED", default=1.0,
+                        help="Compresión del tiempo: 1 en tiempo real, 4 cuatro veces más rápido")
+    parser.add_argument("--replay-from", type=str, env_var="LOCUST_REPLAY_FROM", default="",
+                        help="Inicio de la ventana del log a reproducir (ISO 8601)")
+    parser.add_argument("--replay-to", type=str, env_var="LOCUST_REPLAY_TO", default="",
+                        help="Fin de la ventana del log a reproducir (ISO 8601)")
+    parser.add_argument("--replay-session-gap", type=float, env_var="LOCUST_REPLAY_SESSION_GAP",
+                        default=DEFAULT_SESSION_GAP, help="Segundos sin peticiones que cierran una sesión")
+    parser.add_argument("--replay-max-inflight", type=int, env_var="LOCUST_REPLAY_MAX_INFLIGHT", default=2000,
+                        help="Peticiones en vuelo como máximo")
+    parser.add_argument("--replay-shard", type=str, env_var="LOCUST_REPLAY_SHARD", default="",
+                        help="Porción i/n de las sesiones que reproduce este proceso (p. ej. 0/4)")
+
+
+@events.init.add_listener
+def _on_init(environment, **kwargs):
+    options = environment.parsed_options
+    if options is None:
+        return
+    if not options.replay_log:
+        raise ValueError("replay.py necesita --replay-log")
+    if options.replay_speed <= 0:
+        raise ValueError("--replay-speed debe ser mayor que 0")
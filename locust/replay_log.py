@@ -0,0 +1,326 @@
+"""
+Lectura en streaming de los access logs de Kong para replay.py.
+
+Acepta, mezclados o no, los dos formatos que puede dejar el gateway:
+
+- El access log de nginx que Kong escribe en KONG_PROXY_ACCESS_LOG (formato
+  combined, p. ej. `docker logs kong-gateway`). La hora tiene resolución de
+  segundo y no hay identidad: la sesión es IP + User-Agent.
+- Las líneas JSON de los plugins de log de Kong (file-log, http-log...), con
+  `started_at` en ms. Si llevan el campo `session` (hash del Authorization,
+  ver README-DOCKER.md) las sesiones son por usuario.
+
+Los archivos se leen línea a línea (también .gz y "-" para stdin): en memoria
+solo están las sesiones activas y las peticiones de los últimos
+REORDER_WINDOW segundos. Varios archivos (p. ej. uno por nodo de Kong) se
+mezclan por hora, y dentro de cada uno se reordenan las líneas que llegan
+desordenadas: nginx escribe cada línea al terminar la petición, no al empezar.
+
+Resumen de un log (volumen, sesiones, pico de RPS y reparto por petición),
+para contrastarlo con los pesos de las tareas de test.py:
+
+    python locust/replay_log.py kong-access.log.gz --from 2025-11-28T19:00:00-05:00
+"""
+import argparse
+import gzip
+import heapq
+import itertools
+import json
+import re
+import sys
+import zlib
+from collections import Counter, namedtuple
+from datetime import datetime
+
+LogEntry = namedtuple("LogEntry", "timestamp method uri client user_agent session status")
+
+API_PREFIX = "/api/"
+DEFAULT_SESSION_GAP = 1800
+# Segundos que una línea puede llegar tarde respecto a las anteriores del mismo archivo
+REORDER_WINDOW = 10
+TOP_N = 25
+
+_COMBINED = re.compile(
+    r'^(?P<client>\S+) \S+ \S+ \[(?P<time>[^\]]+)\] "(?P<method>[A-Z]+) (?P<uri>\S+)[^"]*" '
+    r'(?P<status>\d{3}) \S+ "[^"]*" "(?P<agent>[^"]*)"'
+)
+# Ids numéricos, UUIDs y códigos con dígitos (TKT-...); "v1" y "ticket-types" no lo son
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F-]{32,36}|(?=[A-Za-z0-9_-]*\d)[A-Za-z0-9_-]{8,})$")
+
+
+# ==============================================================================
+# --- PARSEO Y NORMALIZACIÓN ---
+# ==============================================================================
+
+def parse_line(line):
+    """LogEntry de una línea en formato combined o JSON de Kong, o None si no es ninguno."""
+    line = line.strip()
+    if line.startswith("{"):
+        return _parse_json(line)
+    match = _COMBINED.match(line)
+    if not match:
+        return None
+    try:
+        timestamp = datetime.strptime(match["time"], "%d/%b/%Y:%H:%M:%S %z").timestamp()
+    except ValueError:
+        return None
+    return LogEntry(timestamp, match["method"], match["uri"], match["client"], match["agent"], None,
+                    int(match["status"]))
+
+
+def _parse_json(line):
+    try:
+        data = json.loads(line)
+        request = data["request"]
+        headers = request.get("headers") or {}
+        return LogEntry(data["started_at"] / 1000, request["method"], request["uri"], data.get("client_ip", ""),
+                        headers.get("user-agent", ""), data.get("session"),
+                        (data.get("response") or {}).get("status"))
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def request_name(path):
+    """Ruta con los ids sustituidos por [id], como nombra las peticiones test.py."""
+    return "/".join("[id]" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/"))
+
+
+def split_uri(uri):
+    path, _, query = uri.partition("?")
+    return path, query
+
+
+# ==============================================================================
+# --- LECTURA EN STREAMING ---
+# ==============================================================================
+
+def open_log(path):
+    if path == "-":
+        return sys.stdin
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, encoding="utf-8", errors="replace")
+
+
+def read_entries(paths, stats=None):
+    """Peticiones a /api/ de todos los archivos, mezcladas por hora."""
+    stats = stats if stats is not None else Counter()
+    streams = [reorder(_read_log(path, stats)) for path in paths]
+    return heapq.merge(*streams, key=lambda entry: entry.timestamp)
+
+
+def _read_log(path, stats):
+    log = open_log(path)
+    try:
+        for line in log:
+            entry = parse_line(line)
+            if entry is None:
+                stats["unparsed"] += 1
+            elif not entry.uri.startswith(API_PREFIX):
+                stats["notApi"] += 1
+            else:
+                yield entry
+    finally:
+        if log is not sys.stdin:
+            log.close()
+
+
+def reorder(entries, tolerance=REORDER_WINDOW):
+    """
+    Las peticiones en orden de hora si ninguna llega más de `tolerance`
+    segundos tarde; las de la misma hora, en el orden del archivo.
+    """
+    pending = []  # (timestamp, orden de llegada, petición)
+    newest = None
+    for i, entry in enumerate(entries):
+        heapq.heappush(pending, (entry.timestamp, i, entry))
+        newest = entry.timestamp if newest is None else max(newest, entry.timestamp)
+        while pending[0][0] < newest - tolerance:
+            yield heapq.heappop(pending)[2]
+    while pending:
+        yield heapq.heappop(pending)[2]
+
+
+def spread(entries):
+    """
+    Reparte uniformemente dentro de su segundo las peticiones con hora en segundos
+    enteros (formato combined), para no reproducirlas en ráfagas de un segundo.
+    """
+    for timestamp, group in itertools.groupby(entries, key=lambda entry: entry.timestamp):
+        if not float(timestamp).is_integer():
+            yield from group
+            continue
+        group = list(group)
+        for i, entry in enumerate(group):
+            yield entry._replace(timestamp=timestamp + i / len(group))
+
+
+def window(entries, since=None, until=None, tolerance=REORDER_WINDOW):
+    """
+    Peticiones entre `since` y `until` (epoch en segundos). Deja de leer
+    `tolerance` segundos después de `until`, no en la primera que lo pasa.
+    """
+    for entry in entries:
+        if since is not None and entry.timestamp < since:
+            continue
+        if until is not None and entry.timestamp > until:
+            if entry.timestamp > until + tolerance:
+                return
+            continue
+        yield entry
+
+
+def parse_time(value):
+    """Hora ISO 8601 de --from/--to a epoch, o None."""
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+
+# ==============================================================================
+# --- SESIONES ---
+# ==============================================================================
+
+class Session:
+    def __init__(self, session_id, key, started_at):
+        self.id = session_id
+        self.key = key
+        self.started_at = started_at
+        self.last_seen = started_at
+        self.requests = 0
+
+    def close(self):
+        pass
+
+
+class Sessionizer:
+    """
+    Agrupa las peticiones en sesiones: misma clave (campo `session` o IP +
+    User-Agent) y menos de `gap` segundos desde la petición anterior.
+
+    Con `shard=(i, n)` solo se quedan las sesiones cuya clave cae en la
+    porción i de n, para repartir un log entre varios procesos de locust.
+    """
+
+    def __init__(self, gap=DEFAULT_SESSION_GAP, shard=None, factory=Session):
+        self.gap = gap
+        self.shard = shard
+        self.factory = factory
+        self.active = {}  # clave -> sesión
+        self.ids = itertools.count(1)
+        self.started = 0
+        # Totales de las sesiones cerradas: en un log de varios GB no se guarda cada una
+        self.closed = 0
+        self.closed_requests = 0
+        self.closed_seconds = 0.0
+
+    @staticmethod
+    def key_for(entry):
+        return entry.session or f"{entry.client}|{entry.user_agent}"
+
+    def assign(self, entry):
+        """Sesión de la petición, o None si la clave es de otro shard."""
+        key = self.key_for(entry)
+        if self.shard and zlib.crc32(key.encode()) % self.shard[1] != self.shard[0]:
+            return None
+        session = self.active.get(key)
+        if session is None or entry.timestamp - session.last_seen > self.gap:
+            if session is not None:
+                self._close(session)
+            session = self.factory(next(self.ids), key, entry.timestamp)
+            self.active[key] = session
+            self.started += 1
+        session.last_seen = max(session.last_seen, entry.timestamp)
+        session.requests += 1
+        return session
+
+    def expire(self, now):
+        """Cierra las sesiones sin peticiones en los últimos `gap` segundos."""
+        for key, session in list(self.active.items()):
+            if now - session.last_seen > self.gap:
+                del self.active[key]
+                self._close(session)
+
+    def close_all(self):
+        for session in self.active.values():
+            self._close(session)
+        self.active = {}
+
+    def _close(self, session):
+        self.closed += 1
+        self.closed_requests += session.requests
+        self.closed_seconds += session.last_seen - session.started_at
+        session.close()
+
+    def averages(self):
+        """(peticiones, segundos) de media por sesión cerrada."""
+        if not self.closed:
+            return 0, 0
+        return round(self.closed_requests / self.closed, 1), round(self.closed_seconds / self.closed, 1)
+
+
+# ==============================================================================
+# --- RESUMEN DE UN LOG ---
+# ==============================================================================
+
+def summarize(entries, gap=DEFAULT_SESSION_GAP):
+    """Volumen, sesiones, pico de RPS y peticiones por nombre, leyendo el log una sola vez."""
+    names = Counter()
+    sessionizer = Sessionizer(gap)
+    first = last = None
+    second, second_count, peak = None, 0, 0
+    for i, entry in enumerate(entries):
+        path, _ = split_uri(entry.uri)
+        names[f"{entry.method} {request_name(path)}"] += 1
+        first = entry.timestamp if first is None else first
+        last = entry.timestamp
+        if int(entry.timestamp) != second:
+            second, second_count = int(entry.timestamp), 0
+        second_count += 1
+        peak = max(peak, second_count)
+        sessionizer.assign(entry)
+        if i % 10000 == 0:
+            sessionizer.expire(entry.timestamp)
+    sessionizer.close_all()
+    requests_per_session, seconds_per_session = sessionizer.averages()
+
+    total = sum(names.values())
+    return {
+        "requests": total,
+        "from": datetime.fromtimestamp(first).isoformat() if first is not None else None,
+        "to": datetime.fromtimestamp(last).isoformat() if last is not None else None,
+        "durationS": round(last - first, 1) if first is not None else 0,
+        "peakRps": peak,
+        "sessions": sessionizer.started,
+        "requestsPerSession": requests_per_session,
+        "avgSessionS": seconds_per_session,
+        "byName": [{"name": name, "count": count, "share": round(count / total, 4)}
+                   for name, count in names.most_common(TOP_N)],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resumen de un access log de Kong para replay.py")
+    parser.add_argument("logs", nargs="+", help="Archivos de log (.gz admitido, - para stdin)")
+    parser.add_argument("--from", dest="since", default="", help="Inicio de la ventana (ISO 8601)")
+    parser.add_argument("--to", dest="until", default="", help="Fin de la ventana (ISO 8601)")
+    parser.add_argument("--session-gap", type=float, default=DEFAULT_SESSION_GAP,
+                        help="Segundos sin peticiones que cierran una sesión")
+    parser.add_argument("--json", action="store_true", help="Imprime el resumen en JSON")
+    args = parser.parse_args(argv)
+
+    stats = Counter()
+    entries = window(read_entries(args.logs, stats), parse_time(args.since), parse_time(args.until))
+    summary = summarize(entries, args.session_gap)
+    summary["skippedLines"] = dict(stats)
+    if args.json:
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+        return
+    print(f"{summary['requests']} peticiones de {summary['from']} a {summary['to']} "
+          f"({summary['durationS']} s), pico {summary['peakRps']} RPS")
+    print(f"{summary['sessions']} sesiones, {summary['requestsPerSession']} peticiones y "
+          f"{summary['avgSessionS']} s de media")
+    for row in summary["byName"]:
+        print(f"  {row['share']:>7.2%}  {row['count']:>9}  {row['name']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""
+Recoge el /metrics (formato Prometheus) de los microservicios al empezar y al
+terminar la prueba y resume lo ocurrido durante la ejecución: latencia por
+ruta, tiempo por consulta de Sequelize, espera por conexión del pool, retraso
+del event loop, publicación/consumo de RabbitMQ y emits de socket.io.
+
+    locust -f locust/test.py,locust/service_metrics.py --headless -u 200 -r 20 -t 10m \
+        --metrics-out results/metrics
+
+Los contadores e histogramas se restan (fin - inicio), así que el resumen solo
+cubre la prueba aunque los servicios lleven tiempo arrancados. Con
+--metrics-interval se hace además un scrape periódico para quedarse con el
+peor retraso del event loop (el servicio lo mide entre scrapes).
+
+El resumen se imprime al terminar, se guarda en <metrics-out>/summary.json
+junto con los /metrics en crudo, se sirve en la interfaz web en
+/service-metrics y, si también se carga benchmark.py, viaja en el "meta" del
+resultado de --benchmark-out.
+"""
+import json
+import logging
+import math
+import os
+import re
+import time
+
+import gevent
+import requests
+from locust import events
+from locust.runners import WorkerRunner
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TARGETS = ",".join([
+    "tickets=http://localhost:3000/metrics",
+    "eventos=http://localhost:3005/metrics",
+    "usuarios=http://localhost:3010/metrics",
+    "notifications=http://localhost:3001/metrics",
+])
+SCRAPE_TIMEOUT = 5
+TOP_N = 15
+
+_SAMPLE = re.compile(r"^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})?\s+(\S+)")
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+# ==============================================================================
+# --- FORMATO PROMETHEUS ---
+# ==============================================================================
+
+def parse_metrics(text):
+    """Devuelve ({(nombre, etiquetas): valor}, {familia: tipo}); etiquetas es una tupla ordenada."""
+    samples, types = {}, {}
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, family, kind = line.split(maxsplit=3)
+            types[family] = kind
+            continue
+        if not line or line.startswith("#"):
+            continue
+        match = _SAMPLE.match(line)
+        if not match:
+            continue
+        name, raw_labels, value = match.groups()
+        labels = tuple(sorted((k, v.replace('\\"', '"').replace("\\\\", "\\"))
+                              for k, v in _LABEL.findall(raw_labels or "")))
+        samples[(name, labels)] = float(value)
+    return samples, types
+
+
+def family_of(name, types):
+    for suffix in ("_bucket", "_sum", "_count"):
+        if name.endswith(suffix) and types.get(name[:-len(suffix)]) == "histogram":
+            return name[:-len(suffix)]
+    return name
+
+
+def diff(start, end, types):
+    """Contadores e histogramas: fin - inicio (un reinicio del servicio cuenta desde cero). Gauges: fin."""
+    result = {}
+    for key, value in end.items():
+        kind = types.get(family_of(key[0], types))
+        if kind in ("counter", "histogram"):
+            before = start.get(key, 0.0)
+            result[key] = value - before if value >= before else value
+        else:
+            result[key] = value
+    return result
+
+
+def histogram_quantile(q, buckets):
+    """Como histogram_quantile de Prometheus: interpolación lineal dentro del bucket."""
+    buckets = sorted(buckets)
+    if not buckets or buckets[-1][1] <= 0:
+        return None
+    rank = q * buckets[-1][1]
+    prev_bound, prev_count = 0.0, 0.0
+    for bound, count in buckets:
+        if count >= rank:
+            if math.isinf(bound):
+                return prev_bound
+            if count == prev_count:
+                return bound
+            return prev_bound + (bound - prev_bound) * (rank - prev_count) / (count - prev_count)
+        prev_bound, prev_count = bound, count
+    return prev_bound
+
+
+def histograms(samples, family, group_by):
+    """Agrupa las series de un histograma por las etiquetas indicadas: {grupo: {count, sum, buckets}}."""
+    groups = {}
+    for (name, labels), value in samples.items():
+        if not name.startswith(family + "_"):
+            continue
+        label_map = dict(labels)
+        key = tuple(label_map.get(label, "") for label in group_by)
+        group = groups.setdefault(key, {"count": 0.0, "sum": 0.0, "buckets": {}})
+        if name == f"{family}_count":
+            group["count"] += value
+        elif name == f"{family}_sum":
+            group["sum"] += value
+        elif name == f"{family}_bucket":
+            bound = float(label_map["le"])
+            group["buckets"][bound] = group["buckets"].get(bound, 0.0) + value
+    return groups
+
+
+def latency_rows(samples, family, group_by):
+    rows = []
+    for key, group in histograms(samples, family, group_by).items():
+        if group["count"] <= 0:
+            continue
+        buckets = list(group["buckets"].items())
+        row = dict(zip(group_by, key))
+        row.update({
+            "count": int(group["count"]),
+            "avgMs": round(group["sum"] / group["count"] * 1000, 2),
+            "p50Ms": _ms(histogram_quantile(0.5, buckets)),
+            "p99Ms": _ms(histogram_quantile(0.99, buckets)),
+            "totalS": round(group["sum"], 3),
+        })
+        rows.append(row)
+    return sorted(rows, key=lambda r: (r["p99Ms"] or 0, r["count"]), reverse=True)
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def summarize(samples, worst_event_loop):
+    http = latency_rows(samples, "http_request_duration_seconds", ("method", "route"))
+    errors = {}
+    for (name, labels), value in samples.items():
+        label_map = dict(labels)
+        if name == "http_request_duration_seconds_count" and label_map.get("status", "").startswith("5"):
+            key = (label_map.get("method"), label_map.get("route"))
+            errors[key] = errors.get(key, 0) + int(value)
+    for row in http:
+        row["errors5xx"] = errors.get((row["method"], row["route"]), 0)
+
+    emits = {dict(labels).get("event"): int(value) for (name, labels), value in samples.items()
+             if name == "websocket_emits_total" and value > 0}
+    pool = {f"{dict(labels)['pool']}.{dict(labels)['state']}": value for (name, labels), value in samples.items()
+            if name == "db_pool_connections"}
+    return {
+        "http": http[:TOP_N],
+        "dbQueries": latency_rows(samples, "db_query_duration_seconds", ("model", "type"))[:TOP_N],
+        "dbPoolAcquire": latency_rows(samples, "db_pool_acquire_seconds", ()),
+        "dbPoolAtEnd": pool,
+        "amqpPublish": latency_rows(samples, "amqp_publish_duration_seconds", ("exchange", "mode")),
+        "amqpConsume": latency_rows(samples, "amqp_consume_duration_seconds", ("queue", "routing_key")),
+        "amqpConsumeLag": latency_rows(samples, "amqp_consume_lag_seconds", ("queue",)),
+        "websocketEmits": dict(sorted(emits.items(), key=lambda item: -item[1])),
+        "eventLoopLag": worst_event_loop,
+    }
+
+
+# ==============================================================================
+# --- SCRAPER ---
+# ==============================================================================
+
+class ServiceMetricsCollector:
+    def __init__(self):
+        self.targets = {}
+        self.start = {}
+        self.types = {}
+        self.raw = {}
+        self.worst_event_loop = {}
+        self.errors = {}
+        self.summary = None
+        self._poller = None
+
+    def configure(self, targets):
+        self.targets = dict(item.split("=", 1) for item in targets.split(",") if "=" in item)
+
+    def scrape(self, service):
+        url = self.targets[service]
+        try:
+            response = requests.get(url, timeout=SCRAPE_TIMEOUT)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            self.errors[service] = str(e)
+            return None
+        samples, types = parse_metrics(response.text)
+        self.types.setdefault(service, {}).update(types)
+        self.track_event_loop(service, samples)
+        return response.text, samples
+
+    def track_event_loop(self, service, samples):
+        worst = self.worst_event_loop.setdefault(service, {"p99Ms": 0.0, "maxMs": 0.0})
+        for (name, labels), value in samples.items():
+            if name != "nodejs_eventloop_lag_seconds":
+                continue
+            quantile = dict(labels).get("quantile")
+            if quantile == "0.99":
+                worst["p99Ms"] = max(worst["p99Ms"], round(value * 1000, 2))
+            elif quantile == "1":
+                worst["maxMs"] = max(worst["maxMs"], round(value * 1000, 2))
+
+    def on_start(self, interval):
+        self.start, self.raw, self.errors, self.summary = {}, {}, {}, None
+        self.worst_event_loop = {}
+        for service in self.targets:
+            scraped = self.scrape(service)
+            if scraped:
+                self.raw[f"{service}.start"] = scraped[0]
+                self.start[service] = scraped[1]
+        if interval > 0:
+            self._poller = gevent.spawn(self._poll, interval)
+
+    def _poll(self, interval):
+        while True:
+            gevent.sleep(interval)
+            for service in self.targets:
+                self.scrape(service)
+
+    def on_stop(self):
+        if self._poller:
+            self._poller.kill(block=False)
+            self._poller = None
+        summary = {"scrapedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "services": {}, "errors": {}}
+        for service in self.targets:
+            scraped = self.scrape(service)
+            if not scraped:
+                continue
+            self.raw[f"{service}.end"] = scraped[0]
+            samples = diff(self.start.get(service, {}), scraped[1], self.types.get(service, {}))
+            summary["services"][service] = summarize(samples, self.worst_event_loop.get(service))
+        summary["errors"] = dict(self.errors)
+        self.summary = summary
+        return summary
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name, text in self.raw.items():
+            with open(os.path.join(directory, f"{name}.prom"), "w", encoding="utf-8") as f:
+                f.write(text)
+        with open(os.path.join(directory, "summary.json"), "w", encoding="utf-8") as f:
+            json.dump(self.summary, f, indent=2, ensure_ascii=False)
+
+
+def format_summary(summary):
+    lines = ["", "=== Métricas de los servicios durante la prueba ==="]
+    for service, data in summary["services"].items():
+        lines.append(f"\n[{service}]")
+        for row in data["http"]:
+            lines.append(f"  HTTP {row['method']:<6} {row['route']:<55} n={row['count']:<8} "
+                         f"p50={row['p50Ms']}ms p99={row['p99Ms']}ms 5xx={row['errors5xx']}")
+        for row in data["dbQueries"][:5]:
+            lines.append(f"  SQL  {row['model'] + ' ' + row['type']:<62} n={row['count']:<8} "
+                         f"p50={row['p50Ms']}ms p99={row['p99Ms']}ms total={row['totalS']}s")
+        for row in data["dbPoolAcquire"]:
+            lines.append(f"  Pool espera{'':<57} n={row['count']:<8} p50={row['p50Ms']}ms p99={row['p99Ms']}ms")
+        for label, rows, keys in (("AMQP pub", data["amqpPublish"], ("exchange", "mode")),
+                                  ("AMQP con", data["amqpConsume"], ("queue", "routing_key")),
+                                  ("AMQP lag", data["amqpConsumeLag"], ("queue",))):
+            for row in rows:
+                name = " ".join(str(row[k]) for k in keys)
+                lines.append(f"  {label} {name:<59} n={row['count']:<8} p50={row['p50Ms']}ms p99={row['p99Ms']}ms")
+        if data["websocketEmits"]:
+            lines.append("  WS emits " + ", ".join(f"{event}={count}" for event, count in data["websocketEmits"].items()))
+        if data["eventLoopLag"]:
+            lines.append(f"  Event loop peor p99={data['eventLoopLag']['p99Ms']}ms max={data['eventLoopLag']['maxMs']}ms")
+    for service, error in summary["errors"].items():
+        lines.append(f"\n[{service}] sin métricas: {error}")
+    return "\n".join(lines)
+
+
+collector = ServiceMetricsCollector()
+
+
+# ==============================================================================
+# --- INTEGRACIÓN CON LOCUST ---
+# ==============================================================================
+
+@events.init_command_line_parser.add_listener
+def _add_arguments(parser):
+    parser.add_argument("--metrics-targets", type=str, env_var="LOCUST_METRICS_TARGETS", default=DEFAULT_TARGETS,
+                        help="Servicios a consultar: nombre=url de /metrics, separados por comas")
+    parser.add_argument("--metrics-out", type=str, env_var="LOCUST_METRICS_OUT", default="",
+                        help="Directorio donde guardar summary.json y los /metrics en crudo")
+    parser.add_argument("--metrics-interval", type=float, env_var="LOCUST_METRICS_INTERVAL", default=15,
+                        help="Segundos entre scrapes durante la prueba (0: solo al empezar y al terminar)")
+
+
+@events.init.add_listener
+def _on_init(environment, **kwargs):
+    if isinstance(environment.runner, WorkerRunner) or environment.parsed_options is None:
+        return
+    collector.configure(environment.parsed_options.metrics_targets)
+    environment.service_metrics = None
+    if environment.web_ui:
+        @environment.web_ui.app.route("/service-metrics")
+        def _service_metrics():
+            return environment.service_metrics or {"services": {}, "errors": {}}
+
+
+@events.test_start.add_listener
+def _on_test_start(environment, **kwargs):
+    if isinstance(environment.runner, WorkerRunner):
+        return
+    collector.on_start(environment.parsed_options.metrics_interval)
+
+
+@events.test_stop.add_listener
+def _on_test_stop(environment, **kwargs):
+    if isinstance(environment.runner, WorkerRunner):
+        return
+    summary = collector.on_stop()
+    environment.service_metrics = summary
+    print(format_summary(summary))
+    if environment.parsed_options.metrics_out:
+        collector.save(environment.parsed_options.metrics_out)
+        logger.info("Métricas de los servicios guardadas en %s", environment.parsed_options.metrics_out)
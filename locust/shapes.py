@@ -0,0 +1,151 @@
+"""
+Perfiles de carga (LoadTestShape) para reproducir el tráfico real en lugar
+de una rampa plana hasta un número fijo de usuarios.
+
+Se combina con el locustfile de los journeys y se elige con --load-profile:
+
+    locust -f locust/test.py,locust/shapes.py --load-profile spike --profile-users 20
+    locust -f locust/test.py,locust/shapes.py --load-profile diurnal --profile-time-scale 0.05
+
+Perfiles:
+    spike    línea base tranquila -> pico de --profile-peak-multiplier (50x) al
+             publicar un evento -> cola larga decreciente.
+    step     escalones de --profile-step-users cada --profile-step-seconds hasta
+             --profile-max-users: sirve para encontrar el punto de quiebre.
+    soak     carga constante durante --profile-soak-hours horas.
+    diurnal  curva de un día (valle de madrugada, pico por la noche) repetida
+             --profile-days veces.
+
+Además del número de usuarios, cada etapa fija qué clases de usuario corren:
+de madrugada y en la línea base casi todo es navegación anónima, mientras que
+en el pico entran sobre todo clientes que compran.
+
+--profile-time-scale multiplica todas las duraciones (0.1 = diez veces más rápido).
+"""
+import math
+from collections import namedtuple
+
+from locust import LoadTestShape, events
+
+Stage = namedtuple("Stage", "duration users spawn_rate classes")
+
+BROWSING = ("AnonymousUser",)
+SHOPPING = ("AnonymousUser", "CustomerUser")
+EVERYONE = ("AnonymousUser", "CustomerUser", "OrganizerUser")
+ON_SALE = ("CustomerUser", "AnonymousUser")
+
+
+def spike_profile(options):
+    base = options.profile_users
+    peak = base * options.profile_peak_multiplier
+    stages = [
+        Stage(300, base, base, BROWSING),
+        # El evento se publica: se llega al pico en ~10 segundos
+        Stage(600, peak, peak / 10, ON_SALE),
+    ]
+    # Cola larga: la demanda cae por mitades hasta volver a la línea base
+    users = peak // 2
+    while users > base:
+        stages.append(Stage(600, users, peak / 60, SHOPPING))
+        users //= 2
+    stages.append(Stage(600, base, peak / 60, BROWSING))
+    return stages
+
+
+def step_profile(options):
+    step = options.profile_step_users
+    return [
+        Stage(options.profile_step_seconds, users, step, EVERYONE)
+        for users in range(step, options.profile_max_users + 1, step)
+    ]
+
+
+def soak_profile(options):
+    users = options.profile_users
+    return [
+        Stage(300, users, max(1, users / 60), EVERYONE),
+        Stage(options.profile_soak_hours * 3600, users, max(1, users / 60), EVERYONE),
+    ]
+
+
+def diurnal_profile(options):
+    """Un día en 48 tramos de media hora; el máximo cae a las 20:00 y el mínimo a las 08:00."""
+    base = options.profile_users
+    peak = base * options.profile_peak_multiplier
+    slots = 48
+    stages = []
+    for _ in range(options.profile_days):
+        for slot in range(slots):
+            hour = 24 * slot / slots
+            level = (1 - math.cos(2 * math.pi * (hour - 8) / 24)) / 2
+            users = max(1, round(base + (peak - base) * level))
+            if hour < 7:
+                classes = BROWSING
+            elif 18 <= hour < 23:
+                classes = EVERYONE
+            else:
+                classes = SHOPPING
+            stages.append(Stage(86400 / slots, users, max(1, users / 30), classes))
+    return stages
+
+
+PROFILES = {
+    "spike": spike_profile,
+    "step": step_profile,
+    "soak": soak_profile,
+    "diurnal": diurnal_profile,
+}
+
+
+class ProfileShape(LoadTestShape):
+    """
+    Recorre las etapas del perfil elegido con --load-profile y devuelve en cada
+    tick (usuarios, spawn_rate, clases de usuario).
+    """
+
+    stages = None
+
+    def tick(self):
+        if self.stages is None:
+            self.stages = self._build_stages()
+
+        run_time = self.get_run_time()
+        elapsed = 0
+        for stage in self.stages:
+            elapsed += stage.duration
+            if run_time < elapsed:
+                return stage.users, stage.spawn_rate, self._user_classes(stage.classes)
+        return None
+
+    def _build_stages(self):
+        options = self.runner.environment.parsed_options
+        scale = options.profile_time_scale
+        return [stage._replace(duration=stage.duration * scale) for stage in PROFILES[options.load_profile](options)]
+
+    def _user_classes(self, names):
+        # Solo las clases cargadas en esta ejecución; si no hay ninguna se usan todas
+        available = self.runner.user_classes_by_name
+        classes = [available[name] for name in names if name in available]
+        return classes or None
+
+
+@events.init_command_line_parser.add_listener
+def _add_arguments(parser):
+    parser.add_argument("--load-profile", choices=sorted(PROFILES), env_var="LOCUST_LOAD_PROFILE", default="spike",
+                        help="Perfil de carga a ejecutar")
+    parser.add_argument("--profile-users", type=int, env_var="LOCUST_PROFILE_USERS", default=20,
+                        help="Usuarios de la línea base (spike, diurnal) o constantes (soak)")
+    parser.add_argument("--profile-peak-multiplier", type=int, env_var="LOCUST_PROFILE_PEAK_MULTIPLIER", default=50,
+                        help="Multiplicador del pico sobre la línea base")
+    parser.add_argument("--profile-step-users", type=int, env_var="LOCUST_PROFILE_STEP_USERS", default=50,
+                        help="Usuarios añadidos en cada escalón (step)")
+    parser.add_argument("--profile-step-seconds", type=int, env_var="LOCUST_PROFILE_STEP_SECONDS", default=120,
+                        help="Duración de cada escalón en segundos (step)")
+    parser.add_argument("--profile-max-users", type=int, env_var="LOCUST_PROFILE_MAX_USERS", default=1000,
+                        help="Usuarios del último escalón (step)")
+    parser.add_argument("--profile-soak-hours", type=float, env_var="LOCUST_PROFILE_SOAK_HOURS", default=4,
+                        help="Horas de carga constante (soak)")
+    parser.add_argument("--profile-days", type=int, env_var="LOCUST_PROFILE_DAYS", default=1,
+                        help="Días simulados (diurnal)")
+    parser.add_argument("--profile-time-scale", type=float, env_var="LOCUST_PROFILE_TIME_SCALE", default=1.0,
+                        help="Factor aplicado a todas las duraciones del perfil")
@@ -0,0 +1,140 @@
+"""
+Cliente socket.io mínimo (Engine.IO v4 sobre websocket) para los usuarios de
+locust.
+
+Solo implementa lo que usan los servicios del proyecto: conexión al namespace
+"/" con token en `auth`, emisión de eventos y recepción de eventos del
+servidor. Cada conexión cuesta un socket y un greenlet, lo que permite
+mantener decenas de miles de suscriptores por worker, cosa que el cliente
+python-socketio (hilos, reconexión, polling) no permite.
+
+Protocolo (https://socket.io/docs/v4/socket-io-protocol/):
+    servidor -> "0{sid, pingInterval, pingTimeout}"   apertura Engine.IO
+    cliente  -> "40{auth}"                             conexión al namespace
+    servidor -> "40{sid}" | "44{message}"              aceptada | rechazada
+    servidor -> "2"  /  cliente -> "3"                 ping / pong
+    ambos    -> '42["evento", datos...]'               evento
+"""
+import json
+import time
+
+import gevent
+import websocket
+from gevent.event import Event
+
+ENGINE_OPEN = "0"
+ENGINE_CLOSE = "1"
+ENGINE_PING = "2"
+ENGINE_PONG = "3"
+SOCKET_CONNECT = "40"
+SOCKET_DISCONNECT = "41"
+SOCKET_EVENT = "42"
+SOCKET_CONNECT_ERROR = "44"
+
+
+class SocketIOError(Exception):
+    pass
+
+
+def socketio_url(host, path):
+    """Convierte http(s)://host + path de socket.io en la URL websocket de Engine.IO v4."""
+    scheme, rest = host.split("://", 1)
+    ws_scheme = "wss" if scheme == "https" else "ws"
+    return f"{ws_scheme}://{rest.rstrip('/')}/{path.strip('/')}/?EIO=4&transport=websocket"
+
+
+class SocketIOClient:
+    """
+    Conexión socket.io. `on_event(name, args, received_at)` se llama desde el
+    greenlet receptor con la hora de llegada (time.time()) de cada evento.
+    """
+
+    def __init__(self, url, token, on_event, timeout=30):
+        self.url = url
+        self.token = token
+        self.on_event = on_event
+        self.timeout = timeout
+        self.closed = Event()
+        self._ws = None
+        self._receiver = None
+
+    @property
+    def connected(self):
+        return self._ws is not None and not self.closed.is_set()
+
+    def connect(self):
+        """Abre el websocket y entra al namespace "/". Lanza SocketIOError si el servidor lo rechaza."""
+        self.closed.clear()
+        try:
+            self._ws = websocket.create_connection(self.url, timeout=self.timeout, enable_multithread=True)
+            handshake = self._handshake()
+        except (websocket.WebSocketException, OSError, ValueError) as e:
+            self._abort()
+            raise SocketIOError(str(e)) from e
+        except SocketIOError:
+            self._abort()
+            raise
+
+        # Sin tráfico, el servidor envía un ping cada pingInterval y espera el pong pingTimeout
+        self._ws.settimeout((handshake["pingInterval"] + handshake["pingTimeout"]) / 1000)
+        self._receiver = gevent.spawn(self._receive_loop)
+
+    def _handshake(self):
+        packet = self._ws.recv()
+        if not packet.startswith(ENGINE_OPEN):
+            raise SocketIOError(f"Apertura Engine.IO inesperada: {packet[:80]}")
+        handshake = json.loads(packet[1:])
+
+        self._ws.send(SOCKET_CONNECT + json.dumps({"token": self.token}))
+        while True:
+            packet = self._ws.recv()
+            if packet == ENGINE_PING:
+                self._ws.send(ENGINE_PONG)
+            elif packet.startswith(SOCKET_CONNECT):
+                return handshake
+            elif packet.startswith(SOCKET_CONNECT_ERROR):
+                raise SocketIOError(json.loads(packet[2:] or "{}").get("message", "conexión rechazada"))
+
+    def _abort(self):
+        if self._ws is not None:
+            self._ws.close()
+            self._ws = None
+        self.closed.set()
+
+    def emit(self, event, *args):
+        if not self.connected:
+            raise SocketIOError("socket cerrado")
+        self._ws.send(SOCKET_EVENT + json.dumps([event, *args]))
+
+    def close(self):
+        if self._receiver is not None:
+            self._receiver.kill(block=False)
+            self._receiver = None
+        if self._ws is not None:
+            try:
+                self._ws.send(SOCKET_DISCONNECT)
+                self._ws.close()
+            except websocket.WebSocketException:
+                pass
+            self._ws = None
+        self.closed.set()
+
+    def _receive_loop(self):
+        try:
+            while True:
+                packet = self._ws.recv()
+                received_at = time.time()
+                if packet == ENGINE_PING:
+                    self._ws.send(ENGINE_PONG)
+                elif packet.startswith(SOCKET_EVENT):
+                    name, *args = json.loads(packet[2:])
+                    self.on_event(name, args, received_at)
+                elif packet in (ENGINE_CLOSE, SOCKET_DISCONNECT) or not packet:
+                    break
+        except (websocket.WebSocketException, OSError):
+            pass
+        finally:
+            if self._ws is not None:
+                self._ws.close()
+                self._ws = None
+            self.closed.set()
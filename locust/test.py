@@ -1,39 +1,8 @@
 import random
-from locust import HttpUser, task, between, SequentialTaskSet
+from locust import task, between, SequentialTaskSet
 
-# ------------------------------------------------------------------------------
-# --- DATOS Y CONFIGURACIÓN DE PRUEBA ---
-# ------------------------------------------------------------------------------
-# Asegúrate de que estos usuarios existen en tu BBDD después de ejecutar los seeders.
-CUSTOMER_CREDENTIALS = {"email": "customer@test.com", "password": "password"}
-ORGANIZER_CREDENTIALS = {"email": "organizer@test.com", "password": "password"}
-
-# El host es la URL de tu API Gateway Kong. Ajusta si es diferente.
-API_HOST = "http://localhost:8000"
-
-class BaseApiUser(HttpUser):
-    """
-    Clase base para usuarios que necesitan autenticarse.
-    Maneja el login y almacena el token.
-    """
-    host = API_HOST
-    abstract = True  # Para que Locust no intente instanciar esta clase directamente.
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.token = None
-        self.headers = {}
-
-    def login(self, credentials, user_type="User"):
-        """Realiza el login y guarda el token en self.token."""
-        with self.client.post("/api/v1/auth/login", json=credentials, name=f"/api/v1/auth/login ({user_type})") as response:
-            if response.status_code == 200:
-                self.token = response.json().get("token")
-                self.headers = {"Authorization": f"Bearer {self.token}"}
-            else:
-                response.failure(f"Failed to login for {user_type} with email {credentials['email']}")
-                self.token = None # Asegurarse de que no hay token si falla
-        return self.token
+from common import API_HOST, ORDER_CREATED_STATUSES, ApiHttpUser, BaseApiUser
+from dataset import dataset
 
 # ==============================================================================
 # --- TAREAS SECUENCIALES (User Journeys) ---
@@ -50,7 +19,10 @@ class CustomerPurchaseFlow(SequentialTaskSet):
 
     @task
     def view_random_event(self):
-        with self.client.get("/api/v1/events?limit=20", name="/api/v1/events (get random)") as response:
+        if dataset.loaded:
+            self.event_id = dataset.random_event()
+            return
+        with self.client.get("/api/v1/events?limit=20", name="/api/v1/events (get random)", catch_response=True) as response:
             if response.status_code == 200 and response.json():
                 events = response.json()
                 if events:
@@ -65,7 +37,10 @@ class CustomerPurchaseFlow(SequentialTaskSet):
     def view_event_ticket_types(self):
         if not self.event_id:
             self.interrupt()
-        with self.client.get(f"/api/v1/events/{self.event_id}/ticket-types", name="/api/v1/events/[id]/ticket-types") as response:
+        if dataset.loaded:
+            self.ticket_type_id = random.choice(dataset.ticket_types_for(self.event_id))
+            return
+        with self.client.get(f"/api/v1/events/{self.event_id}/ticket-types", name="/api/v1/events/[id]/ticket-types", catch_response=True) as response:
             if response.status_code == 200 and response.json():
                 available_types = response.json()
                 if available_types:
@@ -89,7 +64,7 @@ class CustomerPurchaseFlow(SequentialTaskSet):
             "ticketTypeId": str(self.ticket_type_id),
             "cantidad": random.randint(1, 2)
         }
-        with self.client.post("/api/v1/cart/items", json=cart_payload, headers=self.user.headers, name="/api/v1/cart/items (add)") as response:
+        with self.client.post("/api/v1/cart/items", json=cart_payload, headers=self.user.headers, name="/api/v1/cart/items (add)", catch_response=True) as response:
             if response.status_code != 200:
                 response.failure(f"Failed to add item to cart: {response.status_code}")
                 self.interrupt()
@@ -111,8 +86,8 @@ class CustomerPurchaseFlow(SequentialTaskSet):
                 "pais": "EC"
             }
         }
-        with self.client.post("/api/v1/orders", json=order_payload, headers=self.user.headers, name="/api/v1/orders (create)") as response:
-            if response.status_code == 201:
+        with self.client.post("/api/v1/orders", json=order_payload, headers=self.user.headers, name="/api/v1/orders (create)", catch_response=True) as response:
+            if response.status_code in ORDER_CREATED_STATUSES:
                 # Orden creada exitosamente
                 pass
             else:
@@ -135,7 +110,7 @@ class OrganizerEventFlow(SequentialTaskSet):
             "nombre": f"Venue Creado por Locust {random.randint(1000, 9999)}",
             "direccion": "Av. de la Simulación 123", "ciudad": "Quito", "pais": "EC"
         }
-        with self.client.post("/api/v1/venues", json=venue_payload, headers=self.user.headers, name="/api/v1/venues (create)") as response:
+        with self.client.post("/api/v1/venues", json=venue_payload, headers=self.user.headers, name="/api/v1/venues (create)", catch_response=True) as response:
             if response.status_code == 201:
                 self.venue_id = response.json().get('id')
             else:
@@ -143,7 +118,7 @@ class OrganizerEventFlow(SequentialTaskSet):
 
     @task
     def get_category(self):
-        with self.client.get("/api/v1/categories", name="/api/v1/categories (get for organizer)") as response:
+        with self.client.get("/api/v1/categories", name="/api/v1/categories (get for organizer)", catch_response=True) as response:
             if response.status_code == 200 and response.json():
                 self.category_id = random.choice(response.json())['id']
             else:
@@ -159,7 +134,7 @@ class OrganizerEventFlow(SequentialTaskSet):
             "fechaInicio": "2025-12-01T20:00:00Z", "fechaFin": "2025-12-01T23:00:00Z",
             "categoryId": str(self.category_id), "venueId": str(self.venue_id)
         }
-        with self.client.post("/api/v1/events", json=event_payload, headers=self.user.headers, name="/api/v1/events (create)") as response:
+        with self.client.post("/api/v1/events", json=event_payload, headers=self.user.headers, name="/api/v1/events (create)", catch_response=True) as response:
             if response.status_code == 201:
                 self.event_id = response.json().get('id')
             else:
@@ -189,14 +164,18 @@ class CartAndOrderTestFlow(SequentialTaskSet):
     @task
     def get_available_events_and_tickets(self):
         """Obtener eventos y tipos de tickets disponibles."""
-        with self.client.get("/api/v1/events?limit=15", name="/api/v1/events (for cart test)", headers=self.user.headers) as response:
+        if dataset.loaded:
+            self.event_id = dataset.random_event()
+            self.ticket_type_ids = dataset.ticket_types_for(self.event_id)
+            return
+        with self.client.get("/api/v1/events?limit=15", name="/api/v1/events (for cart test)", headers=self.user.headers, catch_response=True) as response:
             if response.status_code == 200 and response.json():
                 events = response.json()
                 if events:
                     self.event_id = random.choice(events)['id']
                     
                     # Obtener tipos de ticket
-                    with self.client.get(f"/api/v1/events/{self.event_id}/ticket-types", name="/api/v1/events/[id]/ticket-types (for cart test)", headers=self.user.headers) as ticket_response:
+                    with self.client.get(f"/api/v1/events/{self.event_id}/ticket-types", name="/api/v1/events/[id]/ticket-types (for cart test)", headers=self.user.headers, catch_response=True) as ticket_response:
                         if ticket_response.status_code == 200 and ticket_response.json():
                             ticket_types = ticket_response.json()
                             self.ticket_type_ids = [ticket['id'] for ticket in ticket_types]
@@ -230,7 +209,7 @@ class CartAndOrderTestFlow(SequentialTaskSet):
     @task
     def review_cart_contents(self):
         """Revisar el contenido del carrito."""
-        with self.client.get("/api/v1/cart", headers=self.user.headers, name="/api/v1/cart (review contents)") as response:
+        with self.client.get("/api/v1/cart", headers=self.user.headers, name="/api/v1/cart (review contents)", catch_response=True) as response:
             if response.status_code == 200:
                 cart_data = response.json()
                 cart_items = cart_data.get('items', [])
@@ -257,8 +236,8 @@ class CartAndOrderTestFlow(SequentialTaskSet):
                 "pais": "EC"
             }
         }
-        with self.client.post("/api/v1/orders", json=order_payload, headers=self.user.headers, name="/api/v1/orders (create from cart)") as response:
-            if response.status_code == 201:
+        with self.client.post("/api/v1/orders", json=order_payload, headers=self.user.headers, name="/api/v1/orders (create from cart)", catch_response=True) as response:
+            if response.status_code in ORDER_CREATED_STATUSES:
                 order_data = response.json()
                 self.order_id = order_data.get('id')
             else:
@@ -316,7 +295,7 @@ class CartAndOrderTestFlow(SequentialTaskSet):
 # --- DEFINICIÓN DE PERSONAS (Usuarios Virtuales) ---
 # ==============================================================================
 
-class AnonymousUser(HttpUser):
+class AnonymousUser(ApiHttpUser):
     """
     Usuario anónimo que principalmente navega por el sitio.
     """
@@ -324,13 +303,24 @@ class AnonymousUser(HttpUser):
     wait_time = between(1, 4)
     weight = 10 # La mayoría del tráfico es de usuarios anónimos
 
+    events_cursor = None
+
     @task(10)
     def browse_events(self):
-        self.client.get("/api/v1/events", name="/api/v1/events (browse all)")
+        # Recorre el catálogo página a página siguiendo X-Next-Cursor
+        if self.events_cursor:
+            response = self.client.get("/api/v1/events", params={"cursor": self.events_cursor},
+                                       name="/api/v1/events (browse next page)")
+        else:
+            response = self.client.get("/api/v1/events", name="/api/v1/events (browse all)")
+        self.events_cursor = response.headers.get("X-Next-Cursor") if response.status_code == 200 else None
 
     @task(5)
     def view_event_detail(self):
-        with self.client.get("/api/v1/events?limit=50", name="/api/v1/events (get one for detail)") as response:
+        if dataset.loaded:
+            self.client.get(f"/api/v1/events/{dataset.random_event()}", name="/api/v1/events/[id] (detail view)")
+            return
+        with self.client.get("/api/v1/events?limit=50", name="/api/v1/events (get one for detail)", catch_response=True) as response:
             if response.status_code == 200 and response.json():
                 events = response.json()
                 if events:
@@ -353,7 +343,7 @@ class CustomerUser(BaseApiUser):
     weight = 5 # Menos clientes que navegantes, pero son tráfico importante
 
     def on_start(self):
-        self.login(CUSTOMER_CREDENTIALS, "Customer")
+        self.acquire_token("customer")
 
     @task(10)
     def browse(self):
@@ -366,27 +356,36 @@ class CustomerUser(BaseApiUser):
             # Simular el flujo de compra paso a paso
             self._purchase_flow_step_by_step()
 
+    def _pick_event(self, limit, name, headers=None):
+        """Id de un evento al azar: del dataset si se cargó, si no de GET /api/v1/events?limit=N."""
+        if dataset.loaded:
+            return dataset.random_event()
+        with self.client.get(f"/api/v1/events?limit={limit}", name=name, headers=headers, catch_response=True) as response:
+            if response.status_code == 200 and response.json():
+                return random.choice(response.json())['id']
+        return None
+
+    def _ticket_type_ids(self, event_id, name, headers=None):
+        """Ids de los tipos de ticket del evento: del dataset si se cargó, si no de la API."""
+        if dataset.loaded:
+            return dataset.ticket_types_for(event_id)
+        with self.client.get(f"/api/v1/events/{event_id}/ticket-types", name=name, headers=headers, catch_response=True) as response:
+            if response.status_code == 200 and response.json():
+                return [ticket['id'] for ticket in response.json()]
+        return []
+
     def _purchase_flow_step_by_step(self):
         """Ejecutar el flujo de compra paso a paso."""
         # 1. Obtener evento aleatorio
-        with self.client.get("/api/v1/events?limit=20", name="/api/v1/events (purchase flow)") as response:
-            if response.status_code == 200 and response.json():
-                events = response.json()
-                if not events:
-                    return
-                event_id = random.choice(events)['id']
-            else:
-                return
+        event_id = self._pick_event(20, "/api/v1/events (purchase flow)")
+        if not event_id:
+            return
         
         # 2. Obtener tipos de ticket para el evento
-        with self.client.get(f"/api/v1/events/{event_id}/ticket-types", name="/api/v1/events/[id]/ticket-types (purchase flow)") as response:
-            if response.status_code == 200 and response.json():
-                ticket_types = response.json()
-                if not ticket_types:
-                    return
-                ticket_type_id = random.choice(ticket_types)['id']
-            else:
-                return
+        ticket_type_ids = self._ticket_type_ids(event_id, "/api/v1/events/[id]/ticket-types (purchase flow)")
+        if not ticket_type_ids:
+            return
+        ticket_type_id = random.choice(ticket_type_ids)
         
         # 3. Ver carrito actual
         self.client.get("/api/v1/cart", headers=self.headers, name="/api/v1/cart (purchase flow view)")
@@ -396,7 +395,7 @@ class CustomerUser(BaseApiUser):
             "ticketTypeId": str(ticket_type_id),
             "cantidad": random.randint(1, 2)
         }
-        with self.client.post("/api/v1/cart/items", json=cart_payload, headers=self.headers, name="/api/v1/cart/items (purchase flow add)") as response:
+        with self.client.post("/api/v1/cart/items", json=cart_payload, headers=self.headers, name="/api/v1/cart/items (purchase flow add)", catch_response=True) as response:
             if response.status_code != 200:
                 return
         
@@ -428,24 +427,14 @@ class CustomerUser(BaseApiUser):
         self.client.delete("/api/v1/cart", headers=self.headers, name="/api/v1/cart (intensive clear)")
         
         # 2. Obtener eventos
-        with self.client.get("/api/v1/events?limit=15", name="/api/v1/events (intensive flow)") as response:
-            if response.status_code == 200 and response.json():
-                events = response.json()
-                if not events:
-                    return
-                event_id = random.choice(events)['id']
-            else:
-                return
+        event_id = self._pick_event(15, "/api/v1/events (intensive flow)")
+        if not event_id:
+            return
         
         # 3. Obtener tipos de ticket
-        with self.client.get(f"/api/v1/events/{event_id}/ticket-types", name="/api/v1/events/[id]/ticket-types (intensive)") as response:
-            if response.status_code == 200 and response.json():
-                ticket_types = response.json()
-                if not ticket_types:
-                    return
-                ticket_type_ids = [ticket['id'] for ticket in ticket_types]
-            else:
-                return
+        ticket_type_ids = self._ticket_type_ids(event_id, "/api/v1/events/[id]/ticket-types (intensive)")
+        if not ticket_type_ids:
+            return
         
         # 4. Agregar múltiples items
         items_to_add = min(random.randint(2, 4), len(ticket_type_ids))
@@ -459,7 +448,7 @@ class CustomerUser(BaseApiUser):
             self.client.post("/api/v1/cart/items", json=cart_payload, headers=self.headers, name="/api/v1/cart/items (intensive add)")
         
         # 5. Revisar carrito
-        with self.client.get("/api/v1/cart", headers=self.headers, name="/api/v1/cart (intensive review)") as response:
+        with self.client.get("/api/v1/cart", headers=self.headers, name="/api/v1/cart (intensive review)", catch_response=True) as response:
             if response.status_code == 200:
                 cart_data = response.json()
                 cart_items = cart_data.get('items', [])
@@ -482,8 +471,8 @@ class CustomerUser(BaseApiUser):
                 "pais": "EC"
             }
         }
-        with self.client.post("/api/v1/orders", json=order_payload, headers=self.headers, name="/api/v1/orders (intensive create)") as response:
-            if response.status_code == 201:
+        with self.client.post("/api/v1/orders", json=order_payload, headers=self.headers, name="/api/v1/orders (intensive create)", catch_response=True) as response:
+            if response.status_code in ORDER_CREATED_STATUSES:
                 order_data = response.json()
                 order_id = order_data.get('id')
                 if order_id:
@@ -498,7 +487,7 @@ class CustomerUser(BaseApiUser):
         if not self.token:
             return
         # Ver historial de órdenes
-        with self.client.get("/api/v1/orders", name="/api/v1/orders (view history)", headers=self.headers) as response:
+        with self.client.get("/api/v1/orders", name="/api/v1/orders (view history)", headers=self.headers, catch_response=True) as response:
             if response.status_code == 200 and response.json():
                 orders = response.json().get('data', [])
                 if orders:
@@ -515,7 +504,7 @@ class CustomerUser(BaseApiUser):
             return
         
         # Ver el carrito actual
-        with self.client.get("/api/v1/cart", name="/api/v1/cart (view current)", headers=self.headers) as response:
+        with self.client.get("/api/v1/cart", name="/api/v1/cart (view current)", headers=self.headers, catch_response=True) as response:
             if response.status_code == 200:
                 cart_data = response.json()
                 cart_items = cart_data.get('items', [])
@@ -542,28 +531,24 @@ class CustomerUser(BaseApiUser):
             return
             
         # Obtener eventos disponibles
-        with self.client.get("/api/v1/events?limit=10", name="/api/v1/events (for single cart add)", headers=self.headers) as response:
-            if response.status_code == 200 and response.json():
-                events = response.json()
-                if events:
-                    event_id = random.choice(events)['id']
-                    
-                    # Obtener tipos de ticket para este evento
-                    with self.client.get(f"/api/v1/events/{event_id}/ticket-types", name="/api/v1/events/[id]/ticket-types (for cart)", headers=self.headers) as ticket_response:
-                        if ticket_response.status_code == 200 and ticket_response.json():
-                            ticket_types = ticket_response.json()
-                            if ticket_types:
-                                ticket_type_id = random.choice(ticket_types)['id']
-                                
-                                # Agregar al carrito
-                                cart_payload = {
-                                    "ticketTypeId": str(ticket_type_id),
-                                    "cantidad": 1
-                                }
-                                self.client.post("/api/v1/cart/items", 
-                                               json=cart_payload, 
-                                               headers=self.headers, 
-                                               name="/api/v1/cart/items (add single)")
+        event_id = self._pick_event(10, "/api/v1/events (for single cart add)", headers=self.headers)
+        if not event_id:
+            return
+        
+        # Obtener tipos de ticket para este evento
+        ticket_type_ids = self._ticket_type_ids(event_id, "/api/v1/events/[id]/ticket-types (for cart)", headers=self.headers)
+        if not ticket_type_ids:
+            return
+        
+        # Agregar al carrito
+        cart_payload = {
+            "ticketTypeId": str(random.choice(ticket_type_ids)),
+            "cantidad": 1
+        }
+        self.client.post("/api/v1/cart/items", 
+                       json=cart_payload, 
+                       headers=self.headers, 
+                       name="/api/v1/cart/items (add single)")
 
     @task(1)
     def request_order_refund(self):
@@ -572,7 +557,7 @@ class CustomerUser(BaseApiUser):
             return
             
         # Obtener órdenes del usuario
-        with self.client.get("/api/v1/orders", name="/api/v1/orders (for refund)", headers=self.headers) as response:
+        with self.client.get("/api/v1/orders", name="/api/v1/orders (for refund)", headers=self.headers, catch_response=True) as response:
             if response.status_code == 200 and response.json():
                 orders = response.json().get('data', [])
                 if orders:
@@ -603,7 +588,7 @@ class OrganizerUser(BaseApiUser):
     weight = 1 # El tráfico de organizadores es el menos frecuente
 
     def on_start(self):
-        self.login(ORGANIZER_CREDENTIALS, "Organizer")
+        self.acquire_token("organizer")
 
     @task
     def create_and_manage_events(self):
@@ -619,14 +604,14 @@ class OrganizerUser(BaseApiUser):
             "ciudad": "Quito",
             "pais": "EC"
         }
-        with self.client.post("/api/v1/venues", json=venue_payload, headers=self.headers, name="/api/v1/venues (organizer create)") as response:
+        with self.client.post("/api/v1/venues", json=venue_payload, headers=self.headers, name="/api/v1/venues (organizer create)", catch_response=True) as response:
             if response.status_code == 201:
                 venue_id = response.json().get('id')
             else:
                 return
         
         # 2. Obtener categoría
-        with self.client.get("/api/v1/categories", name="/api/v1/categories (organizer get)") as response:
+        with self.client.get("/api/v1/categories", name="/api/v1/categories (organizer get)", catch_response=True) as response:
             if response.status_code == 200 and response.json():
                 category_id = random.choice(response.json())['id']
             else:
@@ -641,7 +626,7 @@ class OrganizerUser(BaseApiUser):
             "categoryId": str(category_id),
             "venueId": str(venue_id)
         }
-        with self.client.post("/api/v1/events", json=event_payload, headers=self.headers, name="/api/v1/events (organizer create)") as response:
+        with self.client.post("/api/v1/events", json=event_payload, headers=self.headers, name="/api/v1/events (organizer create)", catch_response=True) as response:
             if response.status_code == 201:
                 event_id = response.json().get('id')
             else:
@@ -0,0 +1,295 @@
+"""
+Pool compartido de tokens JWT para las pruebas de carga.
+
+Los tokens se obtienen una sola vez (o se cargan desde --token-file) y se
+reparten entre todos los usuarios virtuales y procesos worker. Así la
+velocidad de spawn deja de depender del bcrypt.compare que ms-usuarios
+ejecuta en cada /api/v1/auth/login.
+
+Los tokens de acceso caducan (JWT_EXPIRES_IN, 15 minutos por defecto): al
+recibir un 401 se renuevan con el refresh token en /api/v1/auth/refresh, que
+no pasa por bcrypt, y solo si este también ha caducado se vuelve a hacer login.
+
+Si el gateway limita los logins (429 del rate-limiting de Kong, por IP), se
+espera lo que indique Retry-After y se reintenta. Las cuentas cuyo login falla
+por otro motivo se reintentan una vez pasados LOGIN_RETRY_BACKOFF segundos; si
+vuelve a fallar se descartan y sus usuarios usan el resto de cuentas del rol.
+
+Uso:
+    locust -f locust/test.py --loadtest-customers 500 --token-file .tokens.json
+
+Las cuentas loadtest.customer{N}@test.com / loadtest.organizer{N}@test.com
+las crea el seeder 20251201000000-load-test-users-seed.js de ms-usuarios.
+"""
+import itertools
+import json
+import logging
+import os
+import time
+
+import gevent
+import requests
+from gevent.lock import Semaphore
+from gevent.pool import Pool
+from locust import events
+from locust.runners import MasterRunner, WorkerRunner
+
+LOGIN_PATH = "/api/v1/auth/login"
+REFRESH_PATH = "/api/v1/auth/refresh"
+MESSAGE_TYPE = "token_pool"
+RATE_LIMIT_RETRIES = 5
+LOGIN_RETRY_BACKOFF = 5
+
+logger = logging.getLogger(__name__)
+
+
+class TokenPool:
+    """
+    Tokens por cuenta, agrupados por rol ("customer", "organizer").
+
+    Los refrescos son single-flight: si muchos usuarios reciben un 401 con
+    el mismo token, solo uno de ellos lo renueva.
+    """
+
+    def __init__(self):
+        self.host = None
+        self.token_file = None
+        self.login_concurrency = 8
+        self.environment = None
+        self._accounts = {}  # rol -> [emails]
+        self._credentials = {}  # email -> credenciales
+        self._tokens = {}  # email -> token
+        self._refresh_tokens = {}  # email -> refresh token
+        self._refresh_locks = {}  # email -> Semaphore
+        self._cursors = {}  # rol -> contador round-robin
+        self._failed = set()  # emails cuyo login falló también al reintentar
+        self._ready_lock = Semaphore()
+        self._session = requests.Session()
+
+    def setup(self, host, accounts):
+        """Registra el host por defecto y las cuentas base de cada rol."""
+        self.host = host
+        for role, credentials in accounts.items():
+            self.add_account(role, credentials)
+
+    def add_account(self, role, credentials):
+        email = credentials["email"]
+        if email in self._credentials:
+            return
+        self._credentials[email] = dict(credentials)
+        self._accounts.setdefault(role, []).append(email)
+        self._refresh_locks[email] = Semaphore()
+
+    def add_seeded_accounts(self, role, count, password, prefix="loadtest"):
+        for i in range(1, count + 1):
+            self.add_account(role, {"email": f"{prefix}.{role}{i}@test.com", "password": password})
+
+    def configure(self, environment):
+        """Aplica las opciones de línea de comandos (--loadtest-*, --token-file...)."""
+        self.environment = environment
+        self.host = environment.host or self.host
+        options = environment.parsed_options
+        if options is None:
+            return
+        self.token_file = options.token_file or None
+        self.login_concurrency = max(1, options.login_concurrency)
+        self.add_seeded_accounts("customer", options.loadtest_customers, options.account_password)
+        self.add_seeded_accounts("organizer", options.loadtest_organizers, options.account_password)
+
+    # --------------------------------------------------------------------------
+    # Acceso desde los usuarios virtuales
+    # --------------------------------------------------------------------------
+
+    def acquire(self, role):
+        """Devuelve (email, token) repartiendo las cuentas del rol en round-robin."""
+        self.ensure_ready()
+        available = self.role_tokens(role)
+        if not available:
+            return None, None
+        cursor = self._cursors.setdefault(role, itertools.count())
+        return available[next(cursor) % len(available)]
+
+    def role_tokens(self, role):
+        """Lista de (email, token) de las cuentas del rol que tienen token."""
+        return [(email, self._tokens[email]) for email in self._accounts.get(role, []) if email in self._tokens]
+
+    def token_for(self, email):
+        return self._tokens.get(email)
+
+    def credentials(self, email):
+        """Email y contraseña de la cuenta (replay.py reproduce los logins con ellas)."""
+        credentials = self._credentials.get(email)
+        return {"email": credentials["email"], "password": credentials["password"]} if credentials else None
+
+    def refresh(self, email, stale_token):
+        """Renueva el token de `email` salvo que otro usuario ya lo haya hecho."""
+        lock = self._refresh_locks.get(email)
+        if lock is None:
+            return None
+        with lock:
+            current = self._tokens.get(email)
+            if current and current != stale_token:
+                return current
+            return self._refresh(email) or self._login(email)
+
+    def tokens(self):
+        return {"tokens": dict(self._tokens), "refresh_tokens": dict(self._refresh_tokens)}
+
+    def update(self, data):
+        self._tokens.update(data.get("tokens", {}))
+        self._refresh_tokens.update(data.get("refresh_tokens", {}))
+
+    # --------------------------------------------------------------------------
+    # Obtención y persistencia de tokens
+    # --------------------------------------------------------------------------
+
+    def ensure_ready(self):
+        """
+        Carga o genera los tokens que falten. Solo la primera llamada hace
+        trabajo: las cuentas descartadas no se vuelven a intentar en cada acquire().
+        """
+        if not self._missing():
+            return
+        with self._ready_lock:
+            missing = self._missing()
+            if not missing:
+                return
+            if self.token_file:
+                self._tokens.update(self._load(self.token_file))
+                missing = self._missing()
+            if not missing:
+                return
+            Pool(self.login_concurrency).map(self._login, missing)
+            missing = self._missing()
+            if missing:
+                logger.warning("Falló el login de %d cuentas; se reintenta en %ss", len(missing), LOGIN_RETRY_BACKOFF)
+                gevent.sleep(LOGIN_RETRY_BACKOFF)
+                Pool(self.login_concurrency).map(self._login, missing)
+                missing = self._missing()
+            if missing:
+                self._failed.update(missing)
+                logger.error("Sin token para %d cuentas (p. ej. %s): se descartan", len(missing), missing[0])
+            if self.token_file:
+                self._save(self.token_file)
+
+    def _missing(self):
+        return [email for email in self._credentials if email not in self._tokens and email not in self._failed]
+
+    def _login(self, email):
+        credentials = self._credentials[email]
+        return self._authenticate(email, LOGIN_PATH,
+                                  {"email": credentials["email"], "password": credentials["password"]})
+
+    def _refresh(self, email):
+        refresh_token = self._refresh_tokens.get(email)
+        if not refresh_token:
+            return None
+        return self._authenticate(email, REFRESH_PATH, {"refreshToken": refresh_token})
+
+    def _authenticate(self, email, path, body):
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            response, data = self._post(path, body)
+            if response is None or response.status_code != 429 or attempt == RATE_LIMIT_RETRIES:
+                break
+            gevent.sleep(_retry_after(response))
+        token = data.get("token")
+        if token:
+            self._tokens[email] = token
+            if data.get("refreshToken"):
+                self._refresh_tokens[email] = data["refreshToken"]
+        return token
+
+    def _post(self, path, body):
+        start = time.perf_counter()
+        response, exception, data = None, None, {}
+        try:
+            response = self._session.post(f"{self.host}{path}", json=body, timeout=30)
+            response.raise_for_status()
+            data = response.json()
+        except (requests.RequestException, ValueError) as e:
+            exception = e
+
+        if self.environment is not None:
+            self.environment.events.request.fire(
+                request_type="POST",
+                name=f"{path} (token pool)",
+                response_time=(time.perf_counter() - start) * 1000,
+                response_length=len(response.content) if response is not None else 0,
+                response=response,
+                exception=exception,
+                context={},
+            )
+        return response, data
+
+    def _load(self, path):
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("host") != self.host:
+            return {}
+        # Los tokens caducados se cargan igual: el primer 401 los renueva con su refresh token
+        self._refresh_tokens.update({email: token for email, token in data.get("refreshTokens", {}).items()
+                                     if email in self._credentials})
+        return {email: token for email, token in data.get("tokens", {}).items() if email in self._credentials}
+
+    def _save(self, path):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"host": self.host, "mintedAt": time.time(), "tokens": self._tokens,
+                       "refreshTokens": self._refresh_tokens}, f)
+        os.replace(tmp_path, path)
+
+
+def _retry_after(response):
+    """Segundos de Retry-After (1 si no viene o no es un número)."""
+    try:
+        return max(1.0, float(response.headers.get("Retry-After", 1)))
+    except ValueError:
+        return 1.0
+
+
+token_pool = TokenPool()
+
+
+# ==============================================================================
+# --- INTEGRACIÓN CON LOCUST ---
+# ==============================================================================
+
+@events.init_command_line_parser.add_listener
+def _add_arguments(parser):
+    parser.add_argument("--token-file", type=str, env_var="LOCUST_TOKEN_FILE", default="",
+                        help="Archivo JSON donde se guardan/cargan los tokens del pool")
+    parser.add_argument("--loadtest-customers", type=int, env_var="LOCUST_LOADTEST_CUSTOMERS", default=0,
+                        help="Número de cuentas loadtest.customer{N}@test.com a repartir entre usuarios")
+    parser.add_argument("--loadtest-organizers", type=int, env_var="LOCUST_LOADTEST_ORGANIZERS", default=0,
+                        help="Número de cuentas loadtest.organizer{N}@test.com a repartir entre usuarios")
+    parser.add_argument("--account-password", type=str, env_var="LOCUST_ACCOUNT_PASSWORD", default="password",
+                        help="Contraseña de las cuentas de carga sembradas")
+    parser.add_argument("--login-concurrency", type=int, env_var="LOCUST_LOGIN_CONCURRENCY", default=8,
+                        help="Logins simultáneos al generar el pool de tokens")
+
+
+@events.init.add_listener
+def _on_init(environment, **kwargs):
+    token_pool.configure(environment)
+    if isinstance(environment.runner, WorkerRunner):
+        # Los workers reciben los tokens que el master generó una sola vez
+        environment.runner.register_message(MESSAGE_TYPE, lambda msg, **kw: token_pool.update(msg.data))
+
+
+@events.test_start.add_listener
+def _on_test_start(environment, **kwargs):
+    if isinstance(environment.runner, WorkerRunner):
+        return
+    token_pool.ensure_ready()
+    if isinstance(environment.runner, MasterRunner):
+        environment.runner.send_message(MESSAGE_TYPE, token_pool.tokens())
+
+
+@events.request.add_listener
+def _on_request(context=None, response=None, **kwargs):
+    # Un 401 con token del pool indica que caducó: se renueva para todos los usuarios de esa cuenta
+    account = (context or {}).get("account")
+    if account and response is not None and getattr(response, "status_code", None) == 401:
+        token_pool.refresh(account, context.get("token"))
@@ -0,0 +1,261 @@
+"""
+Usuarios WebSocket de ms-tickets: miden la latencia de las notificaciones en
+tiempo real (websocket.service.js) bajo carga.
+
+    StockSubscriber  solo escucha: se une a las rooms event-{id} de --ws-event-ids
+                     y a su canal de usuario. Registra la latencia de difusión
+                     (timestamp del servidor -> recepción) de cada mensaje.
+    RealtimeBuyer    compra por HTTP con su socket abierto y registra el tiempo
+                     desde el POST /api/v1/orders hasta recibir el stock-updated
+                     del tipo de ticket comprado y el tickets-generated de su orden.
+
+Las métricas aparecen en las estadísticas de locust con tipo "WS".
+
+Uso (decenas de miles de suscriptores, repartidos entre workers):
+    locust -f locust/websocket_users.py --ws-event-ids 1,2 --loadtest-customers 200 --loadtest-organizers 50 \
+        --master --expect-workers 8
+    locust -f locust/websocket_users.py --worker  (x8)
+
+Notas:
+  - ms-tickets asocia tickets-generated al último socket de cada cuenta, así que
+    los compradores necesitan una cuenta cada uno (--loadtest-customers >= compradores)
+    y los suscriptores usan otro rol (--ws-subscriber-role, por defecto organizer).
+  - La latencia de difusión de los suscriptores compara el reloj del servidor con
+    el del worker: solo es fiable con los relojes sincronizados (NTP o misma máquina).
+    La de los compradores se mide íntegramente con el reloj local.
+"""
+import random
+import time
+from datetime import datetime
+
+import gevent
+from gevent.event import Event
+from locust import User, between, constant, events, task
+
+from common import API_HOST, ORDER_CREATED_STATUSES, BaseApiUser
+from socketio_client import SocketIOClient, SocketIOError, socketio_url
+from token_pool import token_pool
+
+REQUEST_TYPE = "WS"
+BROADCAST_EVENTS = ("stock-updated", "low-stock-alert", "ticket-validated", "payment-status", "tickets-generated")
+
+
+def _fire(environment, name, response_time, exception=None):
+    environment.events.request.fire(
+        request_type=REQUEST_TYPE,
+        name=name,
+        response_time=response_time,
+        response_length=0,
+        exception=exception,
+        context={},
+    )
+
+
+def _server_timestamp(data):
+    return datetime.fromisoformat(data["timestamp"].replace("Z", "+00:00")).timestamp()
+
+
+class SocketIOUserMixin:
+    """Conexión socket.io autenticada con el token del usuario y registro de la conexión como métrica."""
+
+    socket = None
+
+    def open_socket(self, token):
+        options = self.environment.parsed_options
+        url = socketio_url(self.host or API_HOST, options.ws_path)
+        self.socket = SocketIOClient(url, token, self.on_socket_event, timeout=options.ws_connect_timeout)
+        start = time.perf_counter()
+        try:
+            self.socket.connect()
+        except SocketIOError as e:
+            _fire(self.environment, "connect", (time.perf_counter() - start) * 1000, exception=e)
+            return False
+        _fire(self.environment, "connect", (time.perf_counter() - start) * 1000)
+        return True
+
+    def close_socket(self):
+        if self.socket is not None:
+            self.socket.close()
+
+    def on_socket_event(self, name, args, received_at):
+        """Evento recibido del servidor; por defecto se ignora (cada usuario trata los que le interesan)."""
+
+
+class StockSubscriber(SocketIOUserMixin, User):
+    """
+    Suscriptor pasivo: mantiene la conexión abierta y mide la difusión de cada
+    mensaje que recibe. Si la conexión se cae, la reabre en la siguiente iteración.
+    """
+    host = API_HOST
+    weight = 50
+    wait_time = constant(1)
+
+    def on_start(self):
+        self.account, self.token = token_pool.acquire(self.environment.parsed_options.ws_subscriber_role)
+
+    @task
+    def listen(self):
+        if not self.token:
+            gevent.sleep(5)
+            return
+        if not self.open_socket(self.token):
+            gevent.sleep(random.uniform(1, 5))
+            return
+        for event_id in self.environment.parsed_options.ws_event_ids:
+            self.socket.emit("join-event", event_id)
+        self.socket.emit("join-user-notifications")
+        self.socket.closed.wait()
+        _fire(self.environment, "disconnect", 0, exception=ConnectionError("conexión cerrada por el servidor"))
+
+    def on_socket_event(self, name, args, received_at):
+        if name not in BROADCAST_EVENTS or not args or "timestamp" not in args[0]:
+            return
+        latency = max(0.0, (received_at - _server_timestamp(args[0])) * 1000)
+        _fire(self.environment, f"{name} (fan-out)", latency)
+
+    def on_stop(self):
+        self.close_socket()
+
+
+class RealtimeBuyer(SocketIOUserMixin, BaseApiUser):
+    """
+    Compra con el socket abierto y mide POST /api/v1/orders -> stock-updated y
+    POST /api/v1/orders -> tickets-generated.
+    """
+    weight = 1
+    wait_time = between(2, 5)
+
+    def on_start(self):
+        self.inbox = []
+        self.inbox_changed = Event()
+        self.joined_events = set()
+        if self.acquire_token("customer") and self.open_socket(self.token):
+            self.socket.emit("join-user-notifications")
+
+    def on_socket_event(self, name, args, received_at):
+        if args:
+            self.inbox.append((name, args[0], received_at))
+            self.inbox_changed.set()
+
+    @task
+    def buy_with_realtime_updates(self):
+        if not self.token:
+            gevent.sleep(5)
+            return
+        if not self.socket.connected:
+            self.joined_events.clear()
+            if not self.open_socket(self.token):
+                return
+            self.socket.emit("join-user-notifications")
+
+        event_id = self._pick_event()
+        if event_id is None:
+            return
+        if event_id not in self.joined_events:
+            self.socket.emit("join-event", event_id)
+            self.joined_events.add(event_id)
+
+        ticket_type_id = self._pick_ticket_type(event_id)
+        if ticket_type_id is None:
+            return
+
+        cart_payload = {"ticketTypeId": str(ticket_type_id), "cantidad": 1}
+        with self.client.post("/api/v1/cart/items", json=cart_payload, headers=self.headers,
+                              name="/api/v1/cart/items (realtime add)", catch_response=True) as response:
+            if response.status_code != 200:
+                response.failure(f"Failed to add to cart: {response.status_code}")
+                return
+
+        order_payload = {
+            "paymentMethodId": "pm_card_visa",
+            "billingAddress": {
+                "nombreCompleto": "Usuario Realtime Locust",
+                "identificacion": "9999999999",
+                "direccion": "Calle Falsa 123",
+                "ciudad": "Locustown",
+                "pais": "EC"
+            }
+        }
+        # Los mensajes pueden llegar antes que la respuesta HTTP: se cuentan desde el envío
+        self.inbox.clear()
+        sent_at = time.time()
+        with self.client.post("/api/v1/orders", json=order_payload, headers=self.headers,
+                              name="/api/v1/orders (realtime create)", catch_response=True) as response:
+            if response.status_code not in ORDER_CREATED_STATUSES:
+                response.failure(f"Failed to create order: {response.status_code}")
+                self.client.delete("/api/v1/cart", headers=self.headers, name="/api/v1/cart (realtime release)")
+                return
+            order_id = response.json().get("id")
+
+        self._await_notifications(sent_at, event_id, ticket_type_id, order_id)
+
+    def _pick_event(self):
+        event_ids = self.environment.parsed_options.ws_event_ids
+        if event_ids:
+            return random.choice(event_ids)
+        with self.client.get("/api/v1/events?limit=20", name="/api/v1/events (realtime)", catch_response=True) as response:
+            if response.status_code == 200 and response.json():
+                return random.choice(response.json())['id']
+            response.failure(f"No events: {response.status_code}")
+        return None
+
+    def _pick_ticket_type(self, event_id):
+        with self.client.get(f"/api/v1/events/{event_id}/ticket-types", name="/api/v1/events/[id]/ticket-types (realtime)",
+                             catch_response=True) as response:
+            if response.status_code != 200:
+                response.failure(f"Failed to get ticket types: {response.status_code}")
+                return None
+            available = [t for t in response.json() if t.get("disponibles", 0) > 0]
+        return random.choice(available)['id'] if available else None
+
+    def _await_notifications(self, sent_at, event_id, ticket_type_id, order_id):
+        """Espera los mensajes de la compra y registra su latencia desde el envío del POST."""
+        expected = {
+            # Un stock-updated por evento con los tipos de ticket que cambiaron en la ventana
+            "stock-updated": lambda d: str(d.get("eventId")) == str(event_id)
+                                       and any(str(u.get("ticketTypeId")) == str(ticket_type_id)
+                                               for u in d.get("updates", [])),
+            "tickets-generated": lambda d: str(d.get("orderId")) == str(order_id),
+        }
+        deadline = time.time() + self.environment.parsed_options.ws_message_timeout
+        while expected:
+            for name, data, received_at in list(self.inbox):
+                matches = expected.get(name)
+                if matches and received_at >= sent_at and matches(data):
+                    _fire(self.environment, f"{name} (after order)", (received_at - sent_at) * 1000)
+                    del expected[name]
+            remaining = deadline - time.time()
+            if not expected or remaining <= 0:
+                break
+            self.inbox_changed.clear()
+            self.inbox_changed.wait(remaining)
+
+        timeout_ms = self.environment.parsed_options.ws_message_timeout * 1000
+        for name in expected:
+            _fire(self.environment, f"{name} (after order)", timeout_ms,
+                  exception=TimeoutError(f"{name} no llegó para la orden {order_id}"))
+
+    def on_stop(self):
+        self.close_socket()
+
+
+# ==============================================================================
+# --- INTEGRACIÓN CON LOCUST ---
+# ==============================================================================
+
+def _event_ids(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+@events.init_command_line_parser.add_listener
+def _add_arguments(parser):
+    parser.add_argument("--ws-event-ids", type=_event_ids, env_var="LOCUST_WS_EVENT_IDS", default="1",
+                        help="Eventos (separados por comas) cuyas rooms se escuchan y donde compran los RealtimeBuyer")
+    parser.add_argument("--ws-path", type=str, env_var="LOCUST_WS_PATH", default="/ws-tickets/ws",
+                        help="Ruta de socket.io de ms-tickets detrás de Kong")
+    parser.add_argument("--ws-subscriber-role", choices=("customer", "organizer"), env_var="LOCUST_WS_SUBSCRIBER_ROLE",
+                        default="organizer", help="Rol de las cuentas de los suscriptores pasivos")
+    parser.add_argument("--ws-connect-timeout", type=float, env_var="LOCUST_WS_CONNECT_TIMEOUT", default=30,
+                        help="Timeout en segundos de la conexión websocket")
+    parser.add_argument("--ws-message-timeout", type=float, env_var="LOCUST_WS_MESSAGE_TIMEOUT", default=10,
+                        help="Segundos a esperar las notificaciones de una compra antes de darlas por perdidas")
@@ -20,8 +20,20 @@ const config={
 
   urlResetPasswordFront: process.env.URL_RESET_PASSWORD_FRONT,
 
+  // Tamaño de página del listado de eventos (por defecto y máximo)
+  eventsPageDefaultLimit: parseInt(process.env.EVENTS_PAGE_DEFAULT_LIMIT, 10) || 50,
+  eventsPageMaxLimit: parseInt(process.env.EVENTS_PAGE_MAX_LIMIT, 10) || 200,
+
   isProd: process.env.NODE_ENV === 'production',
   dbUrl: process.env.DATABASE_URL,
+  // Réplicas de lectura para los listados del catálogo (URLs separadas por comas)
+  dbReplicaUrls: (process.env.DATABASE_REPLICA_URLS || '').split(',').map(url => url.trim()).filter(Boolean),
+
+  // Pool de conexiones (con réplicas, tamaño de cada pool: escritura y lectura)
+  dbPoolMax: parseInt(process.env.DB_POOL_MAX, 10) || 5,
+  dbPoolMin: parseInt(process.env.DB_POOL_MIN, 10) || 0,
+  dbPoolAcquireMs: parseInt(process.env.DB_POOL_ACQUIRE_MS, 10) || 60000,
+  dbPoolIdleMs: parseInt(process.env.DB_POOL_IDLE_MS, 10) || 10000,
 }
 
 module.exports = { config };
@@ -0,0 +1,15 @@
+'use strict';
+const { EVENT_TABLE } = require('../models/event.model');
+
+// Índices del listado paginado por cursor (fecha_inicio, id): el público filtra
+// por status y el organizer por organizer_id
+module.exports = {
+  async up (queryInterface) {
+    await queryInterface.addIndex(EVENT_TABLE, ['status', 'fecha_inicio', 'id'], { name: 'events_status_fecha_inicio_id_idx' });
+    await queryInterface.addIndex(EVENT_TABLE, ['organizer_id', 'fecha_inicio', 'id'], { name: 'events_organizer_id_fecha_inicio_id_idx' });
+  },
+  async down (queryInterface) {
+    await queryInterface.removeIndex(EVENT_TABLE, 'events_organizer_id_fecha_inicio_id_idx');
+    await queryInterface.removeIndex(EVENT_TABLE, 'events_status_fecha_inicio_id_idx');
+  }
+};
@@ -0,0 +1,14 @@
+'use strict';
+const { OUTBOX_TABLE, OutboxMessageSchema } = require('../models/outboxMessage.model');
+
+module.exports = {
+  async up (queryInterface) {
+    await queryInterface.createTable(OUTBOX_TABLE, OutboxMessageSchema);
+    // El relay toma los mensajes vencidos por orden de llegada
+    await queryInterface.addIndex(OUTBOX_TABLE, ['next_attempt_at', 'id'], { name: 'outbox_messages_next_attempt_at_id_idx' });
+  },
+
+  async down (queryInterface) {
+    await queryInterface.dropTable(OUTBOX_TABLE);
+  }
+};
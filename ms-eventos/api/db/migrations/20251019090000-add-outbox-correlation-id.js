@@ -0,0 +1,12 @@
+'use strict';
+const { OUTBOX_TABLE, OutboxMessageSchema } = require('../models/outboxMessage.model');
+
+module.exports = {
+  async up (queryInterface) {
+    await queryInterface.addColumn(OUTBOX_TABLE, 'correlation_id', OutboxMessageSchema.correlationId);
+  },
+
+  async down (queryInterface) {
+    await queryInterface.removeColumn(OUTBOX_TABLE, 'correlation_id');
+  }
+};
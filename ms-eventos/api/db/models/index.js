@@ -3,6 +3,7 @@ const { Category, CategorySchema } = require('./category.model.js');
 const { Venue, VenueSchema } = require('./venue.model.js');
 const { Zone, ZoneSchema } = require('./zone.model.js');
 const { Event, EventSchema } = require('./event.model.js');
+const { OutboxMessage, OutboxMessageSchema } = require('./outboxMessage.model.js');
 
 function setupModels(sequelize) {
   // Inicializar todos los modelos
@@ -10,6 +11,7 @@ function setupModels(sequelize) {
   Venue.init(VenueSchema, Venue.config(sequelize));
   Zone.init(ZoneSchema, Zone.config(sequelize));
   Event.init(EventSchema, Event.config(sequelize));
+  OutboxMessage.init(OutboxMessageSchema, OutboxMessage.config(sequelize));
 
   // Crear todas las asociaciones
   Category.associate(sequelize.models);
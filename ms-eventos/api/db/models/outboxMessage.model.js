@@ -0,0 +1,64 @@
+// api/db/models/outboxMessage.model.js
+const { Model, DataTypes, Sequelize } = require('sequelize');
+
+const OUTBOX_TABLE = 'outbox_messages';
+
+// Mensaje pendiente de publicar en RabbitMQ (ver outbox.service). Se escribe en la
+// misma transacción que el cambio que lo origina y se borra al confirmarse.
+const OutboxMessageSchema = {
+  id: {
+    allowNull: false,
+    autoIncrement: true,
+    primaryKey: true,
+    type: DataTypes.BIGINT,
+  },
+  routingKey: {
+    allowNull: false,
+    type: DataTypes.STRING,
+    field: 'routing_key',
+  },
+  payload: {
+    allowNull: false,
+    type: DataTypes.JSONB,
+  },
+  correlationId: {
+    allowNull: true,
+    type: DataTypes.STRING,
+    field: 'correlation_id',
+  },
+  attempts: {
+    allowNull: false,
+    type: DataTypes.INTEGER,
+    defaultValue: 0,
+  },
+  nextAttemptAt: {
+    allowNull: false,
+    type: DataTypes.DATE,
+    field: 'next_attempt_at',
+    defaultValue: Sequelize.fn('now'),
+  },
+  lastError: {
+    allowNull: true,
+    type: DataTypes.TEXT,
+    field: 'last_error',
+  },
+  createdAt: {
+    allowNull: false,
+    type: DataTypes.DATE,
+    field: 'created_at',
+    defaultValue: Sequelize.fn('now'),
+  },
+};
+
+class OutboxMessage extends Model {
+  static config(sequelize) {
+    return {
+      sequelize,
+      tableName: OUTBOX_TABLE,
+      modelName: 'OutboxMessage',
+      timestamps: false,
+    };
+  }
+}
+
+module.exports = { OUTBOX_TABLE, OutboxMessageSchema, OutboxMessage };
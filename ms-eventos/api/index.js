@@ -7,10 +7,17 @@ const { logErrors,
   boomErrorHandler } = require('./middlewares/error.handler');
 const publisherService = require('./services/publisher.service');
 const websocketService = require('./services/websocket.service');
+const responseCache = require('./services/responseCache.service');
+const outboxService = require('./services/outbox.service');
+const tokenCache = require('./utils/auth/tokenCache');
+const { dbRouting } = require('./libs/sequelize');
+const metrics = require('./libs/metrics');
 
 const app = express();
 const port = process.env.PORT || 3000;
 
+// Latencia por ruta para GET /metrics (antes que el resto de middlewares)
+app.use(metrics.httpMiddleware());
 app.use(express.json());
 /*Para que cualquier cliente/dominio
 pueda hacer peticiones a nuestra API*/
@@ -26,10 +33,11 @@ pueda hacer peticiones a nuestra API*/
 // }
 app.use(cors());
 
-// Inicializar publisher de eventos
+// Inicializar publisher de eventos y el relay del outbox que publica por él
 publisherService.start().catch(err => {
     console.error('Error al inicializar publisher de eventos:', err);
 });
+outboxService.start();
 
 require ('./utils/auth');
 
@@ -44,14 +52,29 @@ app.use(boomErrorHandler);
 app.use(sequelizeHandler);
 app.use(errorHandler);
 
+// Estadísticas de cada componente: en JSON en /status y como app_stat en /metrics
+const componentStats = {
+  responseCache: () => responseCache.getStats(),
+  outbox: () => outboxService.getStats(),
+  tokenCache: () => tokenCache.getStats(),
+  database: () => dbRouting.getStats(),
+};
+for (const [component, getStats] of Object.entries(componentStats)) {
+  metrics.registerStats(component, getStats);
+}
+
 app.get('/status', (req, res) => {
+    const stats = Object.fromEntries(Object.entries(componentStats).map(([component, getStats]) => [component, getStats()]));
     res.json({
         message: 'Microservicio funcionando correctamente EVENTOS',
         timestamp: new Date().toISOString(),
-        version: '1.0.0'
+        version: '1.0.0',
+        ...stats
     });
 });
 
+app.get('/metrics', metrics.handler());
+
 const server = app.listen(port, () => {
   console.log(`Server is running on port http://localhost:${port}/`);
 });
@@ -0,0 +1,5 @@
+// libs/dbRouting.js
+const sequelize = require('sequelize');
+const { DbRouting } = require('@ticket-slave/service-kit');
+
+module.exports = new DbRouting(sequelize);
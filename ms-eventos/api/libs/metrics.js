@@ -0,0 +1,2 @@
+// libs/metrics.js
+module.exports = require('@ticket-slave/service-kit').metrics;
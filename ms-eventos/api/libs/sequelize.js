@@ -3,6 +3,8 @@ const { Sequelize } = require('sequelize');
 
 const { config } = require('../config/config');
 const { setupModels } = require('../db/models');
+const dbRouting = require('./dbRouting');
+const metrics = require('./metrics');
 
 const USER = encodeURIComponent(config.dbUser);
 const PASSWORD = encodeURIComponent(config.dbPassword);
@@ -18,6 +20,13 @@ let URI = '';
 const options = {
   dialect: 'postgres',
   logging: config.isProd ? false : true,
+  replication: dbRouting.replicationOptions(config.dbReplicaUrls),
+  pool: {
+    max: config.dbPoolMax,
+    min: config.dbPoolMin,
+    acquire: config.dbPoolAcquireMs,
+    idle: config.dbPoolIdleMs,
+  },
 }
 
 if (IS_PROD === 'true') {
@@ -30,10 +39,13 @@ if (IS_PROD === 'true') {
 }
 
 const sequelize = new Sequelize(URI, options);
+dbRouting.attach(sequelize, config.dbReplicaUrls, { dialect: options.dialect, ssl: options.ssl });
+metrics.instrumentSequelize(sequelize);
 
 sequelize.authenticate()
   .then(() => {
     console.log('Conexión a la base de datos exitosa');
+    dbRouting.start();
   })
   .catch(err => {
     console.error('No se pudo conectar a la base de datos:', err);
@@ -43,4 +55,4 @@ setupModels(sequelize);
 
 //sequelize.sync(); // sirve para que se sincronice con la base de datos
 
-module.exports = { sequelize };
+module.exports = { sequelize, dbRouting };
@@ -0,0 +1,68 @@
+const responseCache = require('../services/responseCache.service');
+
+// Cabeceras que forman parte de la respuesta cacheada (paginación de listados)
+const CACHED_HEADERS = ['X-Next-Cursor', 'X-Total-Count'];
+
+/**
+ * Sirve GETs desde responseCache y guarda las respuestas 200 que aún no estén.
+ *
+ * Las entradas se etiquetan con el recurso (`namespace`) y con `:list` o
+ * `:<id>` según la ruta, que es lo que invalidan los servicios. Responde 304
+ * si el `If-None-Match` del cliente coincide con el ETag, tanto en aciertos
+ * como en fallos de caché. `bypass(req)` permite saltarse la caché para
+ * respuestas que dependen del usuario.
+ *
+ * En un fallo se toma `responseCache.snapshot()` antes de leer: si mientras
+ * tanto se invalida el recurso, la respuesta se envía pero no se guarda.
+ */
+function cacheResponse(namespace, { bypass } = {}) {
+  return (req, res, next) => {
+    if (!responseCache.enabled || (bypass && bypass(req))) {
+      res.set('X-Cache', 'BYPASS');
+      return next();
+    }
+
+    const key = `${namespace}:${req.originalUrl}`;
+    const { id } = req.params;
+    const tags = [namespace, id ? `${namespace}:${id}` : `${namespace}:list`];
+
+    const cached = responseCache.get(key);
+    if (cached) {
+      res.set('X-Cache', 'HIT');
+      return sendCached(req, res, cached);
+    }
+
+    res.set('X-Cache', 'MISS');
+    const readAt = responseCache.snapshot();
+    const json = res.json.bind(res);
+    res.json = (data) => {
+      if (res.statusCode !== 200) {
+        return json(data);
+      }
+      const headers = {};
+      for (const name of CACHED_HEADERS) {
+        if (res.get(name) !== undefined) headers[name] = res.get(name);
+      }
+      const entry = responseCache.set(key, JSON.stringify(data), tags, headers, readAt);
+      return sendCached(req, res, entry);
+    };
+    next();
+  };
+}
+
+function sendCached(req, res, entry) {
+  res.set(entry.headers);
+  res.set('ETag', entry.etag);
+  // El navegador revalida siempre con el ETag; Kong (cache_control: true) guarda la
+  // respuesta s-maxage segundos. Las peticiones con Authorization no las cachea Kong.
+  res.set('Cache-Control', responseCache.sharedMaxAge > 0
+    ? `public, max-age=0, must-revalidate, s-maxage=${responseCache.sharedMaxAge}`
+    : 'no-cache');
+  if (req.fresh) {
+    responseCache.recordNotModified();
+    return res.status(304).end();
+  }
+  return res.type('json').send(entry.body);
+}
+
+module.exports = { cacheResponse };
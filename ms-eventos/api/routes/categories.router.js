@@ -2,12 +2,13 @@
 const express = require('express');
 const CategoryService = require('../services/category.service');
 const validatorHandler = require('../middlewares/validator.handler');
+const { cacheResponse } = require('../middlewares/cache.handler');
 const { createCategorySchema, updateCategorySchema, getCategorySchema } = require('../schemas/category.schema');
 
 const router = express.Router();
 const service = new CategoryService();
 
-router.get('/', async (req, res, next) => {
+router.get('/', cacheResponse('categories'), async (req, res, next) => {
   try {
     const categories = await service.find();
     res.json(categories);
@@ -18,6 +19,7 @@ router.get('/', async (req, res, next) => {
 
 router.get('/:id',
   validatorHandler(getCategorySchema, 'params'),
+  cacheResponse('categories'),
   async (req, res, next) => {
     try {
       const { id } = req.params;
@@ -3,6 +3,7 @@ const passport = require('passport');
 const EventService = require('../services/event.service');
 const validatorHandler = require('../middlewares/validator.handler');
 const { checkRoles } = require('../middlewares/auth.handler');
+const { cacheResponse } = require('../middlewares/cache.handler');
 const { createEventSchema, updateEventSchema, getEventSchema, queryEventSchema } = require('../schemas/event.schema');
 
 const router = express.Router();
@@ -17,9 +18,20 @@ router.get('/',
       next();
     })(req, res, next);
   },
+  // Admin y organizer ven también borradores: su listado no se comparte en caché
+  cacheResponse('events', {
+    bypass: (req) => Boolean(req.user) && ['admin', 'organizer'].includes(req.user.role),
+  }),
   async (req, res, next) => {
     try {
-      const events = await service.find(req.query, req.user);
+      // El cuerpo sigue siendo un array; la paginación va en cabeceras
+      const { events, nextCursor, totalItems } = await service.find(req.query, req.user);
+      if (nextCursor) {
+        res.set('X-Next-Cursor', nextCursor);
+      }
+      if (totalItems !== undefined) {
+        res.set('X-Total-Count', String(totalItems));
+      }
       res.json(events);
     } catch (error) { next(error); }
   }
@@ -27,6 +39,7 @@ router.get('/',
 
 router.get('/:id',
   validatorHandler(getEventSchema, 'params'),
+  cacheResponse('events'),
   async (req, res, next) => {
     try {
       const { id } = req.params;
@@ -7,6 +7,7 @@ const VenueService = require('../services/venue.service');
 const ZoneService = require('../services/zone.service');
 
 const validatorHandler = require('../middlewares/validator.handler');
+const { cacheResponse } = require('../middlewares/cache.handler');
 const { checkRoles } = require('../middlewares/auth.handler');
 
 const { createVenueSchema, updateVenueSchema, getVenueSchema } = require('../schemas/venue.schema');
@@ -20,7 +21,7 @@ const zoneService = new ZoneService();
 //  RUTAS PARA RECURSO PRINCIPAL: VENUES
 // ===================================
 
-router.get('/', async (req, res, next) => {
+router.get('/', cacheResponse('venues'), async (req, res, next) => {
   try {
     const venues = await venueService.find();
     res.json(venues);
@@ -31,6 +32,7 @@ router.get('/', async (req, res, next) => {
 
 router.get('/:id',
   validatorHandler(getVenueSchema, 'params'),
+  cacheResponse('venues'),
   async (req, res, next) => {
     try {
       const { id } = req.params;
@@ -12,8 +12,10 @@ const categoryId = Joi.string();
 const venueId = Joi.string();
 
 // Para paginación y filtros
-const limit = Joi.number().integer();
-const offset = Joi.number().integer();
+const limit = Joi.number().integer().min(1);
+const offset = Joi.number().integer().min(0);
+const cursor = Joi.string();
+const includeTotal = Joi.boolean();
 
 const createEventSchema = Joi.object({
   nombre: nombre.required(),
@@ -42,6 +44,8 @@ const getEventSchema = Joi.object({
 const queryEventSchema = Joi.object({
   limit: limit,
   offset: offset,
+  cursor: cursor,
+  includeTotal: includeTotal,
   categoryId: categoryId,
   venueId: venueId,
 });
@@ -1,7 +1,15 @@
 // api/services/category.service.js
 const boom = require('@hapi/boom');
 const { sequelize } = require('../libs/sequelize');
-const publisherService = require('./publisher.service');
+const outboxService = require('./outbox.service');
+const responseCache = require('./responseCache.service');
+
+// Mensaje category.created / category.updated que consumen los demás servicios
+const toCategoryMessage = (category) => ({
+  id: category.id,
+  nombre: category.nombre,
+  descripcion: category.descripcion
+});
 
 class CategoryService {
   constructor() {
@@ -9,24 +17,19 @@ class CategoryService {
   }
 
   async create(data) {
-    const newCategory = await this.model.create(data);
+    const newCategory = await sequelize.transaction(async (transaction) => {
+      const created = await this.model.create(data, { transaction });
+      await outboxService.add('category.created', toCategoryMessage(created), transaction);
+      return created;
+    });
 
-    // Publicar evento de creación
-    try {
-      await publisherService.publishCategoryCreated({
-        id: newCategory.id,
-        nombre: newCategory.nombre,
-        descripcion: newCategory.descripcion
-      });
-    } catch (error) {
-      console.error('Error publicando evento category.created:', error);
-    }
+    responseCache.invalidate('categories:list');
 
     return newCategory;
   }
 
   async find() {
-    const categories = await this.model.findAll();
+    const categories = await this.model.findAll({ useReplica: true });
     return categories;
   }
 
@@ -40,32 +43,25 @@ class CategoryService {
 
   async update(id, changes) {
     const category = await this.findOne(id);
-    const updatedCategory = await category.update(changes);
+    const updatedCategory = await sequelize.transaction(async (transaction) => {
+      const updated = await category.update(changes, { transaction });
+      await outboxService.add('category.updated', toCategoryMessage(updated), transaction);
+      return updated;
+    });
 
-    // Publicar evento de actualización
-    try {
-      await publisherService.publishCategoryUpdated({
-        id: updatedCategory.id,
-        nombre: updatedCategory.nombre,
-        descripcion: updatedCategory.descripcion
-      });
-    } catch (error) {
-      console.error('Error publicando evento category.updated:', error);
-    }
+    // Los eventos incluyen su categoría
+    responseCache.invalidate('categories', 'events');
 
     return updatedCategory;
   }
 
   async delete(id) {
     const category = await this.findOne(id);
-    await category.destroy();
-
-    // Publicar evento de eliminación
-    try {
-      await publisherService.publishCategoryDeleted(id);
-    } catch (error) {
-      console.error('Error publicando evento category.deleted:', error);
-    }
+    await sequelize.transaction(async (transaction) => {
+      await category.destroy({ transaction });
+      await outboxService.add('category.deleted', { id }, transaction);
+    });
+    responseCache.invalidate('categories', 'events');
 
     return { id };
   }
@@ -1,7 +1,39 @@
 // api/services/event.service.js
 const boom = require('@hapi/boom');
+const { Op } = require('sequelize');
 const { sequelize } = require('../libs/sequelize');
-const publisherService = require('./publisher.service');
+const { config } = require('../config/config');
+const outboxService = require('./outbox.service');
+const responseCache = require('./responseCache.service');
+
+// Cursor de paginación: (fechaInicio, id) del último evento devuelto, en base64url
+const encodeCursor = (event) => Buffer
+  .from(JSON.stringify([new Date(event.fechaInicio).toISOString(), event.id]))
+  .toString('base64url');
+
+const decodeCursor = (cursor) => {
+  try {
+    const [fechaInicio, id] = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf8'));
+    const date = new Date(fechaInicio);
+    if (Number.isNaN(date.getTime()) || id === undefined) throw new Error('cursor incompleto');
+    return { fechaInicio: date, id };
+  } catch (error) {
+    throw boom.badRequest('Invalid pagination cursor');
+  }
+};
+
+// Mensaje event.created / event.updated que consumen los demás servicios
+const toEventMessage = (event) => ({
+  id: event.id,
+  nombre: event.nombre,
+  descripcion: event.descripcion,
+  fechaInicio: event.fechaInicio,
+  fechaFin: event.fechaFin,
+  status: event.status,
+  categoryId: event.categoryId,
+  venueId: event.venueId,
+  organizerId: event.organizerId
+});
 
 class EventService {
   constructor() {
@@ -22,41 +54,41 @@ class EventService {
       throw boom.notFound('Venue not found');
     }
 
-    const newEvent = await this.model.create({
-      ...data,
-      organizerId: organizerId,
+    // El mensaje se escribe en el outbox en la misma transacción que el evento
+    const newEvent = await sequelize.transaction(async (transaction) => {
+      const created = await this.model.create({
+        ...data,
+        organizerId: organizerId,
+      }, { transaction });
+      await outboxService.add('event.created', toEventMessage(created), transaction);
+      return created;
     });
 
-    // Publicar evento de creación
-    try {
-      await publisherService.publishEventCreated({
-        id: newEvent.id,
-        nombre: newEvent.nombre,
-        descripcion: newEvent.descripcion,
-        fechaInicio: newEvent.fechaInicio,
-        fechaFin: newEvent.fechaFin,
-        status: newEvent.status,
-        categoryId: newEvent.categoryId,
-        venueId: newEvent.venueId,
-        organizerId: newEvent.organizerId
-      });
-    } catch (error) {
-      console.error('Error publicando evento event.created:', error);
-    }
+    responseCache.invalidate('events:list');
 
     return newEvent;
   }
 
+  /**
+   * Listado paginado por cursor en orden (fechaInicio, id). Cada página lee
+   * `limit + 1` filas para saber si hay más, sin COUNT salvo que se pida
+   * `includeTotal`. Con `offset` se mantiene la paginación por desplazamiento.
+   */
   async find(query, user) {
     const options = {
       include: ['category', 'venue'],
       where: {},
+      order: [['fechaInicio', 'ASC'], ['id', 'ASC']],
     };
 
     // Lógica de Paginación
-    const { limit, offset } = query;
-    if (limit && offset) {
-      options.limit = limit;
+    // validatorHandler no convierte tipos: los valores llegan como texto
+    const { cursor } = query;
+    const includeTotal = String(query.includeTotal) === 'true';
+    const offset = parseInt(query.offset, 10) || 0;
+    const limit = Math.min(parseInt(query.limit, 10) || config.eventsPageDefaultLimit, config.eventsPageMaxLimit);
+    options.limit = limit + 1;
+    if (offset && !cursor) {
       options.offset = offset;
     }
 
@@ -82,14 +114,31 @@ class EventService {
       options.where.status = 'PUBLICADO';
     }
 
-    console.log('EventService.find options:', options);
+    const filters = { ...options.where };
+    if (cursor) {
+      const { fechaInicio, id } = decodeCursor(cursor);
+      options.where[Op.or] = [
+        { fechaInicio: { [Op.gt]: fechaInicio } },
+        { fechaInicio, id: { [Op.gt]: id } },
+      ];
+    }
 
-    const events = this.model.findAll(options);
-    return events;
+    const [rows, totalItems] = await Promise.all([
+      this.model.findAll({ ...options, useReplica: true }),
+      includeTotal ? this.model.count({ where: filters, useReplica: true }) : undefined,
+    ]);
+
+    const hasMore = rows.length > limit;
+    const events = hasMore ? rows.slice(0, limit) : rows;
+    return {
+      events,
+      nextCursor: hasMore ? encodeCursor(events[events.length - 1]) : null,
+      totalItems,
+    };
   }
 
   async findOne(id) {
-    const event = this.model.findByPk(id, {
+    const event = await this.model.findByPk(id, {
       include: ['category', 'venue'],
     });
     if (!event) {
@@ -105,24 +154,13 @@ class EventService {
     if (event.organizerId !== user.sub && user.role !== 'admin') {
       throw boom.forbidden('You are not allowed to update this event');
     }
-    const updatedEvent = await event.update(changes);
-
-    // Publicar evento de actualización
-    try {
-      await publisherService.publishEventUpdated({
-        id: updatedEvent.id,
-        nombre: updatedEvent.nombre,
-        descripcion: updatedEvent.descripcion,
-        fechaInicio: updatedEvent.fechaInicio,
-        fechaFin: updatedEvent.fechaFin,
-        status: updatedEvent.status,
-        categoryId: updatedEvent.categoryId,
-        venueId: updatedEvent.venueId,
-        organizerId: updatedEvent.organizerId
-      });
-    } catch (error) {
-      console.error('Error publicando evento event.updated:', error);
-    }
+    const updatedEvent = await sequelize.transaction(async (transaction) => {
+      const updated = await event.update(changes, { transaction });
+      await outboxService.add('event.updated', toEventMessage(updated), transaction);
+      return updated;
+    });
+
+    responseCache.invalidate('events:list', `events:${id}`);
 
     return updatedEvent;
   }
@@ -132,14 +170,11 @@ class EventService {
     if (event.organizerId !== user.sub && user.role !== 'admin') {
       throw boom.forbidden('You are not allowed to delete this event');
     }
-    await event.destroy();
-
-    // Publicar evento de eliminación
-    try {
-      await publisherService.publishEventDeleted(id);
-    } catch (error) {
-      console.error('Error publicando evento event.deleted:', error);
-    }
+    await sequelize.transaction(async (transaction) => {
+      await event.destroy({ transaction });
+      await outboxService.add('event.deleted', { id }, transaction);
+    });
+    responseCache.invalidate('events:list', `events:${id}`);
 
     return { id };
   }
@@ -155,24 +190,13 @@ class EventService {
     }
     // Aquí irían más validaciones de negocio (ej: tiene recinto, categoría, etc.)
 
-    const updatedEvent = await event.update({ status: 'PUBLICADO' });
-
-    // Publicar evento de cambio de estado
-    try {
-      await publisherService.publishEventUpdated({
-        id: updatedEvent.id,
-        nombre: updatedEvent.nombre,
-        descripcion: updatedEvent.descripcion,
-        fechaInicio: updatedEvent.fechaInicio,
-        fechaFin: updatedEvent.fechaFin,
-        status: updatedEvent.status,
-        categoryId: updatedEvent.categoryId,
-        venueId: updatedEvent.venueId,
-        organizerId: updatedEvent.organizerId
-      });
-    } catch (error) {
-      console.error('Error publicando evento event.updated (publish):', error);
-    }
+    const updatedEvent = await sequelize.transaction(async (transaction) => {
+      const updated = await event.update({ status: 'PUBLICADO' }, { transaction });
+      await outboxService.add('event.updated', toEventMessage(updated), transaction);
+      return updated;
+    });
+
+    responseCache.invalidate('events:list', `events:${id}`);
 
     return updatedEvent;
   }
@@ -0,0 +1,201 @@
+// api/services/outbox.service.js
+const { Op } = require('sequelize');
+const { sequelize } = require('../libs/sequelize');
+const publisherService = require('./publisher.service');
+
+const OUTBOX_BATCH_SIZE = parseInt(process.env.OUTBOX_BATCH_SIZE, 10) || 100;
+const OUTBOX_POLL_INTERVAL_MS = parseInt(process.env.OUTBOX_POLL_INTERVAL_MS, 10) || 500;
+const OUTBOX_RETRY_BASE_MS = parseInt(process.env.OUTBOX_RETRY_BASE_MS, 10) || 1000;
+const OUTBOX_RETRY_MAX_MS = parseInt(process.env.OUTBOX_RETRY_MAX_MS, 10) || 60000;
+// Tiempo que un lote queda reservado para la réplica que lo publica
+const OUTBOX_LEASE_MS = parseInt(process.env.OUTBOX_LEASE_MS, 10) || 30000;
+const BACKLOG_SAMPLE_MS = 5000;
+
+/**
+ * Outbox transaccional de los cambios de eventos y categorías.
+ *
+ * Los servicios escriben el mensaje con `add` en la misma transacción que el
+ * cambio, así que la respuesta no espera a RabbitMQ y no se pierde ningún
+ * cambio confirmado. El relay reserva lotes con FOR UPDATE SKIP LOCKED en una
+ * transacción corta, los publica fuera de ella por un canal con
+ * confirmaciones y los borra cuando el broker los confirma; si falla,
+ * reprograma el lote con backoff exponencial.
+ *
+ * Entrega al menos una vez: el id del mensaje viaja como messageId.
+ */
+class OutboxService {
+  constructor() {
+    this.model = sequelize.models.OutboxMessage;
+    this.timer = null;
+    this.running = false;
+    this.woken = false;
+    this.stopped = true;
+    this.stats = {
+      added: 0,
+      published: 0,
+      batches: 0,
+      failedBatches: 0,
+      lastBatchSize: 0,
+      lastPublishMs: 0,
+      maxPublishMs: 0,
+      lastError: null,
+      backlog: 0,
+      oldestPendingMs: 0,
+      backlogSampledAt: null,
+    };
+  }
+
+  /** Añade un mensaje a la transacción en curso y despierta al relay al confirmarla. */
+  async add(routingKey, payload, transaction, { correlationId } = {}) {
+    const message = await this.model.create({ routingKey, payload, correlationId }, { transaction });
+    transaction.afterCommit(() => {
+      this.stats.added++;
+      this.wake();
+    });
+    return message;
+  }
+
+  start() {
+    if (!this.stopped) return;
+    this.stopped = false;
+    this.schedule(0);
+    console.log(`📤 Relay del outbox en marcha (lotes de ${OUTBOX_BATCH_SIZE}, sondeo cada ${OUTBOX_POLL_INTERVAL_MS}ms)`);
+  }
+
+  stop() {
+    this.stopped = true;
+    clearTimeout(this.timer);
+    this.timer = null;
+  }
+
+  schedule(delayMs) {
+    if (this.stopped) return;
+    clearTimeout(this.timer);
+    this.timer = setTimeout(() => this.run(), delayMs);
+    this.timer.unref();
+  }
+
+  wake() {
+    if (this.running) {
+      this.woken = true;
+    } else {
+      this.schedule(0);
+    }
+  }
+
+  async run() {
+    if (this.running) return;
+    this.running = true;
+    this.woken = false;
+    let published = 0;
+    try {
+      published = await this.relayBatch();
+      await this.sampleBacklog();
+    } catch (error) {
+      console.error('❌ Error en el relay del outbox:', error);
+    } finally {
+      this.running = false;
+      // Lote lleno o mensajes nuevos durante el lote: se sigue sin esperar
+      this.schedule(published === OUTBOX_BATCH_SIZE || this.woken ? 0 : OUTBOX_POLL_INTERVAL_MS);
+    }
+  }
+
+  /**
+   * Publica un lote de mensajes vencidos. Devuelve cuántos se publicaron.
+   *
+   * Ninguna transacción queda abierta mientras se espera al broker: los
+   * mensajes se reservan en una transacción corta (se les pasa
+   * next_attempt_at a OUTBOX_LEASE_MS vista, así ninguna otra réplica los
+   * toma), se publican fuera de ella y se borran después. Si la réplica cae
+   * entre publicar y borrar, el lote se vuelve a publicar al vencer la
+   * reserva y los consumidores lo descartan por messageId.
+   */
+  async relayBatch() {
+    const messages = await this.claim();
+    if (messages.length === 0) return 0;
+    const ids = messages.map(m => m.id);
+
+    const startedAt = Date.now();
+    try {
+      await publisherService.publishBatch(messages);
+    } catch (error) {
+      await this.reschedule(messages, error);
+      return 0;
+    }
+
+    await this.model.destroy({ where: { id: ids } });
+    this.recordBatch(messages.length, Date.now() - startedAt);
+    return messages.length;
+  }
+
+  /** Reserva un lote de mensajes vencidos (FOR UPDATE SKIP LOCKED) en una transacción corta. */
+  async claim() {
+    return sequelize.transaction(async (transaction) => {
+      const messages = await this.model.findAll({
+        where: { nextAttemptAt: { [Op.lte]: new Date() } },
+        order: [['id', 'ASC']],
+        limit: OUTBOX_BATCH_SIZE,
+        lock: transaction.LOCK.UPDATE,
+        skipLocked: true,
+        transaction,
+      });
+      if (messages.length > 0) {
+        await this.model.update(
+          { nextAttemptAt: new Date(Date.now() + OUTBOX_LEASE_MS) },
+          { where: { id: messages.map(m => m.id) }, transaction }
+        );
+      }
+      return messages;
+    });
+  }
+
+  async reschedule(messages, error) {
+    this.stats.failedBatches++;
+    this.stats.lastError = error.message;
+    // Todo el lote comparte reintento: se publicó junto y falló junto
+    const attempts = Math.max(...messages.map(m => m.attempts)) + 1;
+    const delayMs = Math.min(OUTBOX_RETRY_BASE_MS * 2 ** (attempts - 1), OUTBOX_RETRY_MAX_MS);
+    await this.model.update({
+      attempts,
+      nextAttemptAt: new Date(Date.now() + delayMs),
+      lastError: error.message,
+    }, { where: { id: messages.map(m => m.id) } });
+    console.error(`❌ No se pudo publicar un lote de ${messages.length} mensajes del outbox (intento ${attempts}), reintento en ${delayMs}ms:`, error.message);
+  }
+
+  recordBatch(size, durationMs) {
+    const stats = this.stats;
+    stats.batches++;
+    stats.published += size;
+    stats.lastBatchSize = size;
+    stats.lastPublishMs = durationMs;
+    stats.maxPublishMs = Math.max(stats.maxPublishMs, durationMs);
+  }
+
+  // Tamaño y antigüedad de la cola, como mucho cada BACKLOG_SAMPLE_MS
+  async sampleBacklog() {
+    const now = Date.now();
+    if (this.stats.backlogSampledAt && now - this.stats.backlogSampledAt < BACKLOG_SAMPLE_MS) return;
+    const [row] = await this.model.findAll({
+      attributes: [
+        [sequelize.fn('COUNT', sequelize.col('id')), 'count'],
+        [sequelize.fn('MIN', sequelize.col('created_at')), 'oldest'],
+      ],
+      raw: true,
+    });
+    this.stats.backlog = parseInt(row.count, 10) || 0;
+    this.stats.oldestPendingMs = row.oldest ? now - new Date(row.oldest).getTime() : 0;
+    this.stats.backlogSampledAt = now;
+  }
+
+  getStats() {
+    return {
+      ...this.stats,
+      backlogSampledAt: this.stats.backlogSampledAt && new Date(this.stats.backlogSampledAt).toISOString(),
+      running: this.running,
+      batchSize: OUTBOX_BATCH_SIZE,
+    };
+  }
+}
+
+module.exports = new OutboxService();
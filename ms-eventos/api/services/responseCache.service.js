@@ -0,0 +1,166 @@
+// api/services/responseCache.service.js
+const crypto = require('crypto');
+const dbRouting = require('../libs/dbRouting');
+
+const CACHE_ENABLED = process.env.RESPONSE_CACHE_ENABLED !== 'false';
+const CACHE_TTL_MS = parseInt(process.env.RESPONSE_CACHE_TTL_MS, 10) || 30000;
+const CACHE_MAX_ENTRIES = parseInt(process.env.RESPONSE_CACHE_MAX_ENTRIES, 10) || 1000;
+// Segundos que Kong puede servir la respuesta sin pasar por aquí (s-maxage); 0 lo desactiva
+const CACHE_SHARED_MAX_AGE_S = Math.max(0, parseInt(process.env.RESPONSE_CACHE_SHARED_MAX_AGE_S ?? '5', 10) || 0);
+
+/**
+ * Caché LRU/TTL en memoria de respuestas JSON ya serializadas del catálogo
+ * público (eventos, categorías y recintos).
+ *
+ * Cada entrada guarda el cuerpo, su ETag y unas etiquetas (`events`,
+ * `events:list`, `events:42`...). Los servicios invalidan por etiqueta en los
+ * mismos puntos en los que publican `event.created`/`event.updated` y demás
+ * cambios, así que en esta réplica no se sirve nada obsoleto; el TTL acota lo
+ * que pueda tardar en verse un cambio hecho por otra réplica.
+ *
+ * Con réplicas de lectura (libs/dbRouting) la invalidación manda además las
+ * lecturas del catálogo al primario durante DB_REPLICA_MAX_LAG_MS, para que
+ * la entrada que se vuelve a llenar no salga de una réplica sin la escritura.
+ * Las lecturas que ya estaban en curso al invalidar no se guardan: quien
+ * rellena una entrada toma `snapshot()` antes de leer y `set()` la descarta si
+ * alguna de sus etiquetas se ha invalidado desde entonces.
+ *
+ * El orden LRU es el de inserción del Map: en cada acierto la entrada se
+ * vuelve a insertar al final y al llenarse se expulsa la primera.
+ *
+ * Las respuestas anónimas llevan además `s-maxage=sharedMaxAge` para que el
+ * proxy-cache de Kong las sirva sin llegar al servicio. Esa copia no se
+ * invalida: un cambio tarda como mucho sharedMaxAge segundos en verse a
+ * través del gateway.
+ */
+class ResponseCacheService {
+  constructor(maxEntries = CACHE_MAX_ENTRIES, ttlMs = CACHE_TTL_MS) {
+    this.enabled = CACHE_ENABLED;
+    this.maxEntries = maxEntries;
+    this.ttlMs = ttlMs;
+    this.sharedMaxAge = CACHE_SHARED_MAX_AGE_S;
+    this.entries = new Map(); // key -> { body, etag, tags, headers, expiresAt }
+    this.version = 0; // se incrementa en cada invalidación
+    this.tagVersions = new Map(); // etiqueta -> versión de su última invalidación (LRU)
+    this.prunedVersion = 0; // versión más alta de las etiquetas ya expulsadas de tagVersions
+    this.stats = {
+      hits: 0,
+      misses: 0,
+      notModified: 0,
+      evictions: 0,
+      expirations: 0,
+      invalidations: 0,
+      staleSkips: 0,
+    };
+  }
+
+  get(key) {
+    const entry = this.entries.get(key);
+    if (!entry) {
+      this.stats.misses++;
+      return null;
+    }
+    this.entries.delete(key);
+    if (entry.expiresAt <= Date.now()) {
+      this.stats.expirations++;
+      this.stats.misses++;
+      return null;
+    }
+    this.entries.set(key, entry);
+    this.stats.hits++;
+    return entry;
+  }
+
+  /** Versión a pasar a set() por quien va a leer de la base de datos para rellenar una entrada. */
+  snapshot() {
+    return this.version;
+  }
+
+  /**
+   * Guarda la respuesta salvo que alguna de sus etiquetas se haya invalidado
+   * después de `readAt` (la lectura puede traer datos de antes de la escritura);
+   * en ese caso la devuelve sin guardarla.
+   */
+  set(key, body, tags = [], headers = {}, readAt = this.version) {
+    const entry = {
+      body,
+      etag: this.etagFor(body),
+      tags,
+      headers,
+      expiresAt: Date.now() + this.ttlMs,
+    };
+    if (this.invalidatedSince(tags, readAt)) {
+      this.stats.staleSkips++;
+      return entry;
+    }
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    while (this.entries.size > this.maxEntries) {
+      this.entries.delete(this.entries.keys().next().value);
+      this.stats.evictions++;
+    }
+    return entry;
+  }
+
+  etagFor(body) {
+    const hash = crypto.createHash('sha1').update(body).digest('base64url');
+    return `"${Buffer.byteLength(body).toString(16)}-${hash}"`;
+  }
+
+  // Sin la versión de una etiqueta expulsada se asume que pudo invalidarse
+  invalidatedSince(tags, version) {
+    if (version < this.prunedVersion) return true;
+    return tags.some(tag => (this.tagVersions.get(tag) || 0) > version);
+  }
+
+  /** Borra las entradas que tengan alguna de las etiquetas indicadas. */
+  invalidate(...tags) {
+    dbRouting.markWrite();
+    this.version++;
+    for (const tag of tags) {
+      this.tagVersions.delete(tag);
+      this.tagVersions.set(tag, this.version);
+    }
+    while (this.tagVersions.size > this.maxEntries) {
+      const [oldest, version] = this.tagVersions.entries().next().value;
+      this.tagVersions.delete(oldest);
+      this.prunedVersion = Math.max(this.prunedVersion, version);
+    }
+    let removed = 0;
+    for (const [key, entry] of this.entries) {
+      if (entry.tags.some(tag => tags.includes(tag))) {
+        this.entries.delete(key);
+        removed++;
+      }
+    }
+    this.stats.invalidations += removed;
+    return removed;
+  }
+
+  clear() {
+    this.version++;
+    this.prunedVersion = this.version;
+    this.tagVersions.clear();
+    this.stats.invalidations += this.entries.size;
+    this.entries.clear();
+  }
+
+  recordNotModified() {
+    this.stats.notModified++;
+  }
+
+  getStats() {
+    const lookups = this.stats.hits + this.stats.misses;
+    return {
+      ...this.stats,
+      enabled: this.enabled,
+      size: this.entries.size,
+      maxEntries: this.maxEntries,
+      ttlMs: this.ttlMs,
+      sharedMaxAge: this.sharedMaxAge,
+      hitRatio: lookups > 0 ? Number((this.stats.hits / lookups).toFixed(4)) : 0,
+    };
+  }
+}
+
+module.exports = new ResponseCacheService();
@@ -1,6 +1,7 @@
 // api/services/venue.service.js (versión limpia)
 const boom = require('@hapi/boom');
 const { sequelize } = require('../libs/sequelize');
+const responseCache = require('./responseCache.service');
 
 class VenueService {
   constructor() {
@@ -12,12 +13,13 @@ class VenueService {
       ...data,
       organizerId,
     });
+    responseCache.invalidate('venues:list');
     return newVenue;
   }
 
   async find() {
     // Para la lista general, no es necesario incluir las zonas
-    const venues = await this.model.findAll();
+    const venues = await this.model.findAll({ useReplica: true });
     return venues;
   }
 
@@ -38,6 +40,8 @@ class VenueService {
       throw boom.notFound('Venue not found');
     }
     const updatedVenue = await venue.update(changes);
+    // Los eventos incluyen su recinto
+    responseCache.invalidate('venues:list', `venues:${id}`, 'events');
     return updatedVenue;
   }
 
@@ -47,6 +51,7 @@ class VenueService {
       throw boom.notFound('Venue not found');
     }
     await venue.destroy();
+    responseCache.invalidate('venues:list', `venues:${id}`, 'events');
     return { id };
   }
 }
@@ -1,6 +1,7 @@
 // api/services/zone.service.js
 const boom = require('@hapi/boom');
 const { sequelize } = require('../libs/sequelize');
+const responseCache = require('./responseCache.service');
 // Importamos VenueService para validar la existencia del recinto padre
 const VenueService = require('./venue.service');
 const venueService = new VenueService();
@@ -25,6 +26,8 @@ class ZoneService {
       ...data,
       venueId,
     });
+    // El detalle del recinto incluye sus zonas
+    responseCache.invalidate(`venues:${venueId}`);
     return newZone;
   }
 
@@ -44,12 +47,14 @@ class ZoneService {
   async update(venueId, zoneId, changes) {
     const zone = await this.findOne(venueId, zoneId); // Reutilizamos para validar
     const updatedZone = await zone.update(changes);
+    responseCache.invalidate(`venues:${venueId}`);
     return updatedZone;
   }
 
   async delete(venueId, zoneId) {
     const zone = await this.findOne(venueId, zoneId); // Reutilizamos para validar
     await zone.destroy();
+    responseCache.invalidate(`venues:${venueId}`);
     return { id: zoneId };
   }
 }
@@ -1,13 +1,33 @@
-const { Strategy, ExtractJwt } = require('passport-jwt');
+const passport = require('passport');
+const { ExtractJwt } = require('passport-jwt');
 const { config } = require('../../../config/config');
+const tokenCache = require('../tokenCache');
 
-const options = {
-    jwtFromRequest: ExtractJwt.fromAuthHeaderAsBearerToken(),
-    secretOrKey: config.jwtSecret
+const jwtFromRequest = ExtractJwt.fromAuthHeaderAsBearerToken();
+
+// Equivale a la estrategia de passport-jwt, pero la firma se verifica una vez
+// por token y TTL (ver tokenCache)
+class CachedJwtStrategy extends passport.Strategy {
+    constructor() {
+        super();
+        this.name = 'jwt';
+    }
+
+    authenticate(req) {
+        const token = jwtFromRequest(req);
+        if (!token) {
+            return this.fail(new Error('No auth token'));
+        }
+        let payload;
+        try {
+            payload = tokenCache.verify(token, config.jwtSecret);
+        } catch (error) {
+            return this.fail(error);
+        }
+        this.success(payload); //se agrega el payload a la request como req.user
+    }
 }
 
-const jwtStrategy = new Strategy(options, (payload, done)=>{
-    return done(null, payload); //se agrega el payload a la request como req.user
-})
+const jwtStrategy = new CachedJwtStrategy();
 
 module.exports = jwtStrategy;
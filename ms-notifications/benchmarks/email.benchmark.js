@@ -0,0 +1,106 @@
+// benchmarks/email.benchmark.js
+//
+// Mide cuántas confirmaciones de compra por segundo envía ms-notifications
+// contra el sumidero SMTP local de smtpSink.js, con y sin pool de conexiones y
+// con distintas ventanas de envío. Cada mensaje recorre el mismo camino que uno
+// de RabbitMQ: plantilla, envío SMTP y registro en NotificationLog.
+//
+// Uso: npm run bench:email -- [mensajes] [latencia del sumidero en ms]
+// Con NODE_ENV=test el NotificationLog va a SQLite en memoria.
+const { fork } = require('child_process');
+const { SmtpSink } = require('./smtpSink');
+
+const MESSAGES = parseInt(process.argv[2], 10) || 2000;
+const SINK_LATENCY_MS = parseInt(process.argv[3], 10) || 20;
+const MODES = [
+    { name: 'sin pool, de uno en uno', SMTP_POOL: 'false', EMAIL_SEND_CONCURRENCY: '1' },
+    { name: 'sin pool, ventana 10', SMTP_POOL: 'false', EMAIL_SEND_CONCURRENCY: '10' },
+    { name: 'pool 5, ventana 10', SMTP_POOL: 'true', SMTP_MAX_CONNECTIONS: '5', EMAIL_SEND_CONCURRENCY: '10' },
+    { name: 'pool 10, ventana 20', SMTP_POOL: 'true', SMTP_MAX_CONNECTIONS: '10', EMAIL_SEND_CONCURRENCY: '20' },
+];
+
+const purchaseMessage = (i) => ({
+    userId: 1 + (i % 500),
+    userEmail: `user${i % 500}@loadtest.local`,
+    userName: `Usuario ${i % 500}`,
+    orderDetails: {
+        id: i + 1,
+        codigoPedido: `BENCH-${i + 1}`,
+        totalAmount: '120.00',
+        currency: 'USD'
+    },
+    correlationId: `bench-${i + 1}`
+});
+
+// Cada modo se mide en un proceso propio: la configuración se lee del entorno
+// al cargar los módulos
+async function runChild() {
+    const { sequelize, NotificationLog } = require('../src/api/models');
+    const notificationService = require('../src/api/services/notification.service');
+    const emailService = require('../src/api/services/email.service');
+    const notificationLogService = require('../src/api/services/notificationLog.service');
+
+    await NotificationLog.sync();
+
+    // Todos los mensajes llegan a la vez, como una cola con prefetch >= MESSAGES
+    const startedAt = Date.now();
+    await Promise.all(Array.from({ length: MESSAGES }, (_, i) =>
+        notificationService.handlePurchaseCompleted(purchaseMessage(i))));
+    await notificationLogService.stop();
+    const elapsedMs = Date.now() - startedAt;
+
+    const email = emailService.getStats();
+    const log = notificationLogService.getStats();
+    const logs = await NotificationLog.count();
+    emailService.close();
+    await sequelize.close();
+
+    process.send({
+        sent: email.sent,
+        failed: email.failed,
+        seconds: Number((elapsedMs / 1000).toFixed(2)),
+        'emails/s': Math.round(email.sent / (elapsedMs / 1000)),
+        avgSendMs: email.avgSendMs,
+        maxSendMs: email.maxSendMs,
+        logBatches: log.batches,
+        logs
+    });
+}
+
+async function runParent() {
+    const sink = new SmtpSink({ latencyMs: SINK_LATENCY_MS });
+    const { port } = await sink.listen();
+    console.log(`Benchmark de emails: ${MESSAGES} mensajes, sumidero SMTP en :${port} con ${SINK_LATENCY_MS}ms por mensaje`);
+
+    const results = [];
+    for (const { name, ...env } of MODES) {
+        sink.received = 0;
+        sink.connections = 0;
+        const result = await new Promise((resolve, reject) => {
+            const child = fork(__filename, process.argv.slice(2), {
+                env: {
+                    ...process.env,
+                    BENCH_CHILD: '1',
+                    SMTP_HOST: '127.0.0.1',
+                    SMTP_PORT: String(port),
+                    SMTP_SECURE: 'false',
+                    SMTP_USER: 'bench',
+                    SMTP_PASS: 'bench',
+                    EMAIL_FROM: 'bench@loadtest.local',
+                    ...env
+                }
+            });
+            child.on('message', resolve);
+            child.on('error', reject);
+            child.on('exit', code => code !== 0 && reject(new Error(`El modo "${name}" terminó con código ${code}`)));
+        });
+        results.push({ mode: name, ...result, received: sink.received, smtpConnections: sink.connections });
+    }
+    await sink.close();
+    console.table(results);
+}
+
+(process.env.BENCH_CHILD ? runChild() : runParent()).catch(error => {
+    console.error('❌ Error en el benchmark:', error);
+    process.exit(1);
+});
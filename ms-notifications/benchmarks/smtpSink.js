@@ -0,0 +1,114 @@
+// benchmarks/smtpSink.js
+const net = require('net');
+
+/**
+ * Servidor SMTP mínimo que acepta cualquier AUTH/MAIL/RCPT y descarta los
+ * mensajes, para medir el envío de emails sin un servidor de correo real.
+ * `latencyMs` retrasa la respuesta a cada mensaje para simular un servidor
+ * remoto; es lo que hace que importen el pool y la ventana de envíos.
+ */
+class SmtpSink {
+    constructor({ latencyMs = 0 } = {}) {
+        this.latencyMs = latencyMs;
+        this.received = 0;
+        this.connections = 0;
+        this.sockets = new Set();
+        this.server = net.createServer(socket => this.handle(socket));
+    }
+
+    listen(port = 0, host = '127.0.0.1') {
+        return new Promise(resolve => {
+            this.server.listen(port, host, () => resolve(this.server.address()));
+        });
+    }
+
+    close() {
+        this.sockets.forEach(socket => socket.destroy());
+        return new Promise(resolve => this.server.close(resolve));
+    }
+
+    handle(socket) {
+        this.connections++;
+        this.sockets.add(socket);
+        socket.on('close', () => this.sockets.delete(socket));
+        socket.on('error', () => { });
+
+        const reply = (line) => socket.write(`${line}\r\n`);
+        let buffer = '';
+        let inData = false;
+        let authSteps = 0;
+
+        reply('220 smtp-sink ESMTP');
+        socket.on('data', chunk => {
+            buffer += chunk.toString('latin1');
+            while (buffer.length > 0) {
+                if (inData) {
+                    const end = buffer.indexOf('\r\n.\r\n');
+                    if (end === -1) {
+                        // Se conserva solo lo justo para detectar el terminador partido entre trozos
+                        buffer = buffer.slice(-4);
+                        return;
+                    }
+                    buffer = buffer.slice(end + 5);
+                    inData = false;
+                    this.received++;
+                    setTimeout(() => reply('250 2.0.0 OK'), this.latencyMs);
+                    continue;
+                }
+
+                const eol = buffer.indexOf('\r\n');
+                if (eol === -1) return;
+                const line = buffer.slice(0, eol);
+                buffer = buffer.slice(eol + 2);
+
+                if (authSteps > 0) {
+                    authSteps--;
+                    reply(authSteps > 0 ? '334 UGFzc3dvcmQ6' : '235 2.7.0 Authentication successful');
+                    continue;
+                }
+
+                const [verb, ...args] = line.split(' ');
+                switch (verb.toUpperCase()) {
+                    case 'EHLO':
+                        socket.write('250-smtp-sink\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n');
+                        break;
+                    case 'AUTH': {
+                        // Se acepta cualquier credencial; solo hay que consumir las respuestas del cliente
+                        const mechanism = (args[0] || '').toUpperCase();
+                        if (mechanism === 'LOGIN') {
+                            authSteps = args.length > 1 ? 1 : 2;
+                            reply(authSteps === 2 ? '334 VXNlcm5hbWU6' : '334 UGFzc3dvcmQ6');
+                        } else if (args.length > 1) {
+                            reply('235 2.7.0 Authentication successful');
+                        } else {
+                            authSteps = 1;
+                            reply('334 ');
+                        }
+                        break;
+                    }
+                    case 'DATA':
+                        inData = true;
+                        // El terminador se busca desde el CRLF anterior al punto
+                        buffer = `\r\n${buffer}`;
+                        reply('354 End data with <CR><LF>.<CR><LF>');
+                        break;
+                    case 'QUIT':
+                        reply('221 2.0.0 Bye');
+                        socket.end();
+                        return;
+                    case 'HELO':
+                    case 'MAIL':
+                    case 'RCPT':
+                    case 'RSET':
+                    case 'NOOP':
+                        reply('250 OK');
+                        break;
+                    default:
+                        reply('502 5.5.2 Command not implemented');
+                }
+            }
+        });
+    }
+}
+
+module.exports = { SmtpSink };
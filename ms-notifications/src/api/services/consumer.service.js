@@ -1,15 +1,38 @@
 // src/api/services/consumer.service.js
 const amqp = require('amqplib');
+const config = require('../../config/config');
 const notificationService = require('./notification.service');
+const metrics = require('../../utils/metrics');
 
 const RABBITMQ_URL = process.env.RABBITMQ_URL;
 const EXCHANGE_TICKETS = 'tickets_exchange';
 const QUEUE_NOTIFICATIONS = 'notifications_queue';
 const ROUTING_KEY_PURCHASE = 'purchase.completed';
+// messageId (id del outbox de ms-tickets) de los últimos mensajes atendidos
+const RECENT_MESSAGE_IDS = 10000;
 
+/**
+ * Consume purchase.completed con hasta `rabbitmqPrefetch` mensajes sin
+ * confirmar a la vez. Cada mensaje se confirma cuando su notificación ha
+ * terminado (email enviado o fallido y log escrito); cuántos emails salen a la
+ * vez lo decide la ventana de email.service, no el prefetch.
+ *
+ * El outbox de ms-tickets entrega al menos una vez: un mensaje cuyo messageId
+ * ya se atendió en esta instancia se confirma sin volver a enviar el email.
+ */
 class ConsumerService {
     constructor() {
         this.channel = null;
+        this.consumerTag = null;
+        this.inFlight = 0;
+        this.idleWaiters = [];
+        this.recentMessageIds = new Set();
+        this.stats = {
+            processed: 0,
+            failed: 0,
+            duplicates: 0,
+            maxInFlight: 0,
+        };
     }
 
     async start() {
@@ -17,7 +40,7 @@ class ConsumerService {
             console.error("❌ La variable RABBITMQ_URL no está definida. El consumidor no se iniciará.");
             return;
         }
-        
+
         try {
             const connection = await amqp.connect(RABBITMQ_URL);
             this.channel = await connection.createChannel();
@@ -26,9 +49,11 @@ class ConsumerService {
             await this.channel.assertExchange(EXCHANGE_TICKETS, 'topic', { durable: true });
             await this.channel.assertQueue(QUEUE_NOTIFICATIONS, { durable: true });
             await this.channel.bindQueue(QUEUE_NOTIFICATIONS, EXCHANGE_TICKETS, ROUTING_KEY_PURCHASE);
+            await this.channel.prefetch(config.rabbitmqPrefetch);
 
             console.log('👂 Esperando mensajes en la cola:', QUEUE_NOTIFICATIONS);
-            this.channel.consume(QUEUE_NOTIFICATIONS, (msg) => this.handleMessage(msg), { noAck: false });
+            const { consumerTag } = await this.channel.consume(QUEUE_NOTIFICATIONS, (msg) => this.handleMessage(msg), { noAck: false });
+            this.consumerTag = consumerTag;
 
         } catch (error) {
             console.error('❌ Error al conectar/configurar RabbitMQ. Reintentando en 5 segundos...', error);
@@ -36,35 +61,79 @@ class ConsumerService {
         }
     }
 
-    handleMessage(msg) {
-        if (msg.content) {
-            const messageContent = msg.content.toString();
-            const routingKey = msg.fields.routingKey;
-            console.log(`\n📬 Mensaje recibido! Routing Key: [${routingKey}]`);
+    async handleMessage(msg) {
+        if (!msg || !msg.content) return;
+        const routingKey = msg.fields.routingKey;
+        const { messageId } = msg.properties;
+        if (messageId && this.recentMessageIds.has(messageId)) {
+            this.stats.duplicates++;
+            this.channel.ack(msg);
+            return;
+        }
+        this.rememberMessageId(messageId);
+        const startedAt = process.hrtime.bigint();
+
+        this.inFlight++;
+        this.stats.maxInFlight = Math.max(this.stats.maxInFlight, this.inFlight);
+        try {
+            const data = JSON.parse(msg.content.toString());
+            // El correlationId viaja como propiedad AMQP; el cuerpo lo incluye por compatibilidad
+            data.correlationId = msg.properties.correlationId || data.correlationId;
+
+            if (routingKey === ROUTING_KEY_PURCHASE) {
+                await notificationService.handlePurchaseCompleted(data);
+            } else {
+                console.warn(`No hay un manejador para la routing key: ${routingKey}`);
+            }
 
-            try {
-                const data = JSON.parse(messageContent);
-                
-                if (routingKey === ROUTING_KEY_PURCHASE) {
-                    notificationService.handlePurchaseCompleted(data);
-                } else {
-                    console.warn(`No hay un manejador para la routing key: ${routingKey}`);
-                }
-                
-                this.channel.ack(msg);
-            } catch (error) {
-                console.error("Error al procesar el mensaje:", error);
-                this.channel.nack(msg, false, false); // No re-encolar para evitar bucles
+            this.stats.processed++;
+            this.channel.ack(msg);
+        } catch (error) {
+            this.stats.failed++;
+            this.recentMessageIds.delete(messageId);
+            console.error("Error al procesar el mensaje:", error);
+            this.channel.nack(msg, false, false); // No re-encolar para evitar bucles
+        } finally {
+            metrics.observeConsume(QUEUE_NOTIFICATIONS, msg, startedAt);
+            this.inFlight--;
+            if (this.inFlight === 0) {
+                this.idleWaiters.splice(0).forEach(resolve => resolve());
             }
         }
     }
 
+    // Se marca al empezar: una copia que llegue mientras se procesa tampoco se envía
+    rememberMessageId(messageId) {
+        if (!messageId) return;
+        this.recentMessageIds.add(messageId);
+        if (this.recentMessageIds.size > RECENT_MESSAGE_IDS) {
+            this.recentMessageIds.delete(this.recentMessageIds.values().next().value);
+        }
+    }
+
+    // Deja de recibir mensajes y espera a que terminen los que están en curso
     async stop() {
         if (this.channel) {
+            if (this.consumerTag) {
+                await this.channel.cancel(this.consumerTag);
+                this.consumerTag = null;
+            }
+            if (this.inFlight > 0) {
+                await new Promise(resolve => this.idleWaiters.push(resolve));
+            }
             await this.channel.close();
+            this.channel = null;
             console.log('🔌 Canal de RabbitMQ cerrado.');
         }
     }
+
+    getStats() {
+        return {
+            ...this.stats,
+            inFlight: this.inFlight,
+            prefetch: config.rabbitmqPrefetch,
+        };
+    }
 }
 
-module.exports = new ConsumerService();
\ No newline at end of file
+module.exports = new ConsumerService();
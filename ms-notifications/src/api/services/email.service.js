@@ -1,5 +1,19 @@
 const nodemailer = require('nodemailer');
 const config = require('../../config/config');
+
+// Errores de conexión de nodemailer que merecen reintento; con respuesta SMTP
+// se reintentan solo los 4xx (temporales)
+const TRANSIENT_ERROR_CODES = new Set(['ECONNECTION', 'ETIMEDOUT', 'ESOCKET', 'EDNS', 'ECONNRESET']);
+
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+/**
+ * Envío de emails con un pool de conexiones SMTP y una ventana de envíos
+ * simultáneos (config.email.concurrency) que no depende del prefetch de
+ * RabbitMQ: los envíos que no caben esperan en una cola FIFO. Los fallos
+ * temporales se reintentan con backoff exponencial sin soltar el hueco de la
+ * ventana, de modo que si el servidor SMTP se degrada el consumo se frena.
+ */
 class EmailService {
     constructor() {
         // Creamos el "transporter" una sola vez al instanciar el servicio
@@ -7,12 +21,27 @@ class EmailService {
             host: config.smtp.host,
             port: config.smtp.port,
             secure: config.smtp.secure,
+            pool: config.smtp.pool,
+            maxConnections: config.smtp.maxConnections,
+            maxMessages: config.smtp.maxMessages,
             auth: {
                 user: config.smtp.auth.user,
                 pass: config.smtp.auth.pass,
             },
         });
-        
+
+        this.active = 0;
+        this.waiting = [];
+        this.stats = {
+            sent: 0,
+            failed: 0,
+            retries: 0,
+            queuedMax: 0,
+            lastSendMs: 0,
+            maxSendMs: 0,
+            totalSendMs: 0,
+        };
+
         // Verificamos la conexión SMTP al iniciar (opcional pero recomendado)
         this.transporter.verify()
             .then(() => console.log('✅ SMTP transporter listo para enviar correos.'))
@@ -24,9 +53,10 @@ class EmailService {
      * @param {string} to - El destinatario del correo.
      * @param {string} subject - El asunto del correo.
      * @param {string} htmlContent - El contenido HTML del correo.
+     * @param {object} [headers] - Cabeceras adicionales (p. ej. X-Correlation-Id).
      * @returns {Promise<object>} - Información sobre el mensaje enviado.
      */
-    async send(to, subject, htmlContent) {
+    async send(to, subject, htmlContent, headers = {}) {
         if (!config.smtp.auth.user) {
             console.error('El servicio de email no está configurado. Revisa las variables de entorno SMTP.');
             // Lanzamos un error para que el servicio que lo llama sepa que falló.
@@ -38,19 +68,94 @@ class EmailService {
             to,
             subject,
             html: htmlContent,
+            headers,
         };
 
+        await this.acquire();
+        const startedAt = Date.now();
         try {
-            console.log(`Enviando email a: ${to} con asunto: ${subject}`);
-            const info = await this.transporter.sendMail(mailOptions);
-            console.log(`Email enviado exitosamente. Message ID: ${info.messageId}`);
+            const info = await this.sendWithRetry(mailOptions);
+            this.recordSend(Date.now() - startedAt);
             return { success: true, messageId: info.messageId };
         } catch (error) {
-            console.error(`Error al enviar correo a ${to}:`, error);
+            this.stats.failed++;
+            console.error(`Error al enviar correo a ${to}:`, error.message);
             // Re-lanzamos el error para que sea capturado por notification.service.js
             throw error;
+        } finally {
+            this.release();
+        }
+    }
+
+    async sendWithRetry(mailOptions) {
+        const { maxAttempts, retryBaseMs, retryMaxMs } = config.email;
+        for (let attempt = 1; ; attempt++) {
+            try {
+                return await this.transporter.sendMail(mailOptions);
+            } catch (error) {
+                if (attempt >= maxAttempts || !this.isTransient(error)) {
+                    throw error;
+                }
+                this.stats.retries++;
+                // Backoff exponencial con jitter para no reintentar todos a la vez
+                const delayMs = Math.min(retryBaseMs * 2 ** (attempt - 1), retryMaxMs);
+                await sleep(delayMs / 2 + Math.random() * delayMs / 2);
+            }
+        }
+    }
+
+    isTransient(error) {
+        if (error.responseCode) {
+            return error.responseCode >= 400 && error.responseCode < 500;
+        }
+        return TRANSIENT_ERROR_CODES.has(error.code);
+    }
+
+    acquire() {
+        if (this.active < config.email.concurrency) {
+            this.active++;
+            return Promise.resolve();
         }
+        return new Promise(resolve => {
+            this.waiting.push(resolve);
+            this.stats.queuedMax = Math.max(this.stats.queuedMax, this.waiting.length);
+        });
+    }
+
+    // El hueco pasa directamente al siguiente en espera
+    release() {
+        const next = this.waiting.shift();
+        if (next) {
+            next();
+        } else {
+            this.active--;
+        }
+    }
+
+    recordSend(durationMs) {
+        const stats = this.stats;
+        stats.sent++;
+        stats.lastSendMs = durationMs;
+        stats.maxSendMs = Math.max(stats.maxSendMs, durationMs);
+        stats.totalSendMs += durationMs;
+    }
+
+    close() {
+        this.transporter.close();
+    }
+
+    getStats() {
+        const { totalSendMs, ...stats } = this.stats;
+        return {
+            ...stats,
+            avgSendMs: stats.sent ? Math.round(totalSendMs / stats.sent) : 0,
+            active: this.active,
+            queued: this.waiting.length,
+            concurrency: config.email.concurrency,
+            pool: config.smtp.pool,
+            maxConnections: config.smtp.maxConnections,
+        };
     }
 }
 
-module.exports = new EmailService();
\ No newline at end of file
+module.exports = new EmailService();
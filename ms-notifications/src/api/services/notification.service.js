@@ -1,7 +1,8 @@
 // src/api/services/notification.service.js
 const emailService = require('./email.service');
-const { NotificationLog } = require('../models');
+const notificationLogService = require('./notificationLog.service');
 const websocketService = require('./websocket.service');
+const templates = require('../templates');
 
 class NotificationService {
     /**
@@ -11,27 +12,24 @@ class NotificationService {
     async handlePurchaseCompleted(eventData) {
         // En un sistema real, el evento de compra debería incluir los datos del usuario.
         // Aquí simulamos que los recibimos.
-        const { userEmail, userName, orderDetails } = eventData;
+        const { userEmail, userName, orderDetails, correlationId } = eventData;
         
         if (!userEmail || !orderDetails) {
             console.error('Error: Faltan datos en el evento de compra completada.', eventData);
             return;
         }
 
-        const subject = `Confirmación de tu pedido #${orderDetails.codigoPedido}`;
-        const htmlContent = `
-            <h1>¡Gracias por tu compra, ${userName || 'cliente'}!</h1>
-            <p>Hemos recibido tu pedido con código <strong>${orderDetails.codigoPedido}</strong>.</p>
-            <p>Total: ${orderDetails.totalAmount} ${orderDetails.currency}</p>
-            <p>En breve recibirás tus entradas en un correo separado.</p>
-        `;
+        const { subject, html: htmlContent } = templates.render('PURCHASE_CONFIRMATION', {
+            userName: userName || 'cliente',
+            orderDetails
+        });
 
         let status = 'SENT', failReason = null;
         let emailId = `email_${Date.now()}`;
         
         try {
-            await emailService.send(userEmail, subject, htmlContent);
-            console.log(`Correo de confirmación de compra enviado a ${userEmail}`);
+            const headers = correlationId ? { 'X-Correlation-Id': correlationId } : {};
+            await emailService.send(userEmail, subject, htmlContent, headers);
             
             // *** WebSocket: Notificar entrega exitosa de email ***
             websocketService.notifyEmailDeliveryStatus(eventData.userId, {
@@ -58,12 +56,12 @@ class NotificationService {
             });
         }
 
-        await NotificationLog.create({
+        await notificationLogService.add({
             channel: 'EMAIL',
             recipient: userEmail,
             template: 'PURCHASE_CONFIRMATION',
             status,
-            content: { subject, orderId: orderDetails.id, emailId },
+            content: { subject, orderId: orderDetails.id, emailId, correlationId },
             failReason
         });
 
@@ -88,7 +86,7 @@ class NotificationService {
         const success = websocketService.sendPushNotification(userId, notificationData);
         
         // Log en base de datos
-        await NotificationLog.create({
+        await notificationLogService.add({
             channel: 'PUSH',
             recipient: userId.toString(),
             template: notificationData.type.toUpperCase(),
@@ -106,7 +104,7 @@ class NotificationService {
         websocketService.notifyEventUpdate(eventId, updateData);
 
         // Log de la notificación
-        await NotificationLog.create({
+        await notificationLogService.add({
             channel: 'PUSH',
             recipient: `event_${eventId}`,
             template: 'EVENT_UPDATE',
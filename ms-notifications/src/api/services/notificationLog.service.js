@@ -0,0 +1,77 @@
+// src/api/services/notificationLog.service.js
+const { NotificationLog } = require('../models');
+const config = require('../../config/config');
+
+/**
+ * Escritura por lotes de NotificationLog.
+ *
+ * `add` encola el registro y devuelve una promesa que se resuelve cuando su
+ * lote se ha escrito con un único bulkCreate, al llenarse el lote
+ * (config.notificationLog.batchSize) o al pasar flushMs desde el primero.
+ * El consumidor confirma el mensaje después, así que un registro no se pierde
+ * por un ack adelantado. Si el lote falla se registra el error y la promesa
+ * se resuelve igualmente: reintentar el mensaje reenviaría el email.
+ */
+class NotificationLogService {
+    constructor() {
+        this.buffer = [];
+        this.timer = null;
+        this.stats = {
+            written: 0,
+            batches: 0,
+            failedRows: 0,
+            lastBatchSize: 0,
+            lastFlushMs: 0,
+            lastError: null,
+        };
+    }
+
+    add(entry) {
+        return new Promise(resolve => {
+            this.buffer.push({ entry, resolve });
+            if (this.buffer.length >= config.notificationLog.batchSize) {
+                this.flush();
+            } else if (!this.timer) {
+                // Sin unref: hay promesas esperando a este flush
+                this.timer = setTimeout(() => this.flush(), config.notificationLog.flushMs);
+            }
+        });
+    }
+
+    async flush() {
+        clearTimeout(this.timer);
+        this.timer = null;
+        if (this.buffer.length === 0) return;
+        const batch = this.buffer;
+        this.buffer = [];
+
+        const startedAt = Date.now();
+        try {
+            await NotificationLog.bulkCreate(batch.map(item => item.entry), { validate: true });
+            this.stats.written += batch.length;
+            this.stats.batches++;
+            this.stats.lastBatchSize = batch.length;
+            this.stats.lastFlushMs = Date.now() - startedAt;
+        } catch (error) {
+            this.stats.failedRows += batch.length;
+            this.stats.lastError = error.message;
+            console.error(`❌ No se pudo escribir un lote de ${batch.length} registros de notificación:`, error.message);
+        } finally {
+            batch.forEach(item => item.resolve());
+        }
+    }
+
+    async stop() {
+        await this.flush();
+    }
+
+    getStats() {
+        return {
+            ...this.stats,
+            pending: this.buffer.length,
+            batchSize: config.notificationLog.batchSize,
+        };
+    }
+}
+
+module.exports = new NotificationLogService();
@@ -1,6 +1,7 @@
 // src/api/services/websocket.service.js
 const { Server } = require('socket.io');
 const jwt = require('jsonwebtoken');
+const metrics = require('../../utils/metrics');
 
 const JWT_SECRET = process.env.JWT_SECRET || 'notifications-jwt-secret-super-secreto-2025';
 
@@ -20,6 +21,7 @@ class WebSocketService {
             path: '/ws'
         });
 
+        metrics.instrumentSocketIo(this.io);
         this.setupAuthentication();
         this.setupEventHandlers();
         
@@ -0,0 +1,72 @@
+// src/api/templates/index.js
+
+/**
+ * Plantillas de email precompiladas.
+ *
+ * Cada plantilla se trocea una sola vez al cargar el módulo en partes fijas y
+ * rutas de variables (`{{ orderDetails.codigoPedido }}`), así que renderizar es
+ * solo concatenar. Los valores se escapan como HTML salvo en el asunto.
+ */
+const HTML_ESCAPES = { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' };
+
+const escapeHtml = (value) => String(value).replace(/[&<>"']/g, char => HTML_ESCAPES[char]);
+
+function compile(source, { escape = true } = {}) {
+    const statics = [];
+    const paths = [];
+    const pattern = /\{\{\s*([\w.]+)\s*\}\}/g;
+    let last = 0;
+    let match;
+    while ((match = pattern.exec(source)) !== null) {
+        statics.push(source.slice(last, match.index));
+        paths.push(match[1].split('.'));
+        last = pattern.lastIndex;
+    }
+    statics.push(source.slice(last));
+
+    return (data) => {
+        let output = statics[0];
+        for (let i = 0; i < paths.length; i++) {
+            let value = data;
+            for (const key of paths[i]) {
+                value = value == null ? undefined : value[key];
+            }
+            if (value != null) {
+                output += escape ? escapeHtml(value) : String(value);
+            }
+            output += statics[i + 1];
+        }
+        return output;
+    };
+}
+
+const templates = {
+    PURCHASE_CONFIRMATION: {
+        subject: compile('Confirmación de tu pedido #{{ orderDetails.codigoPedido }}', { escape: false }),
+        html: compile(`
+            <h1>¡Gracias por tu compra, {{ userName }}!</h1>
+            <p>Hemos recibido tu pedido con código <strong>{{ orderDetails.codigoPedido }}</strong>.</p>
+            <p>Total: {{ orderDetails.totalAmount }} {{ orderDetails.currency }}</p>
+            <p>En breve recibirás tus entradas en un correo separado.</p>
+        `),
+    },
+};
+
+/**
+ * Renderiza una plantilla de email.
+ * @param {string} name - Nombre de la plantilla (p. ej. PURCHASE_CONFIRMATION).
+ * @param {object} data - Variables de la plantilla.
+ * @returns {{ subject: string, html: string }}
+ */
+function render(name, data) {
+    const template = templates[name];
+    if (!template) {
+        throw new Error(`Plantilla de email desconocida: ${name}`);
+    }
+    return { subject: template.subject(data), html: template.html(data) };
+}
+
+module.exports = {
+    compile,
+    render,
+};
@@ -1,8 +1,15 @@
 const express = require('express');
 const config = require('./config');
+const consumerService = require('./api/services/consumer.service');
+const emailService = require('./api/services/email.service');
+const notificationLogService = require('./api/services/notificationLog.service');
+const metrics = require('./utils/metrics');
 
 const app = express();
 
+// Latencia por ruta para GET /metrics (antes que el resto de middlewares)
+app.use(metrics.httpMiddleware());
+
 // Aplicar configuraciones
 config.express(app);
 config.cors(app);
@@ -16,14 +23,28 @@ app.get('/status', (req, res) => {
     });
 });
 
+// Estadísticas de cada componente: en JSON en /health y como app_stat en /metrics
+const componentStats = {
+    consumer: () => consumerService.getStats(),
+    email: () => emailService.getStats(),
+    notificationLog: () => notificationLogService.getStats()
+};
+for (const [component, getStats] of Object.entries(componentStats)) {
+    metrics.registerStats(component, getStats);
+}
+
 app.get('/health', (req, res) => {
+    const stats = Object.fromEntries(Object.entries(componentStats).map(([component, getStats]) => [component, getStats()]));
     res.json({
         status: 'OK',
         timestamp: new Date().toISOString(),
-        uptime: process.uptime()
+        uptime: process.uptime(),
+        ...stats
     });
 });
 
+app.get('/metrics', metrics.handler());
+
 // Rutas de la API
 const apiRoutes = require('./api/routes');
 app.use('/', apiRoutes);
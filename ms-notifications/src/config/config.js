@@ -9,6 +9,9 @@ const config = {
 
     // Configuración de RabbitMQ
     rabbitmqUrl: process.env.RABBITMQ_URL,
+    // Mensajes sin confirmar que RabbitMQ entrega a la vez; el límite de envíos
+    // SMTP simultáneos es email.concurrency, independiente de este valor
+    rabbitmqPrefetch: parseInt(process.env.NOTIFICATIONS_PREFETCH, 10) || 100,
 
     // Configuración de SMTP (NUEVO)
     smtp: {
@@ -19,8 +22,26 @@ const config = {
             user: process.env.SMTP_USER,
             pass: process.env.SMTP_PASS,
         },
+        // Pool de conexiones SMTP reutilizadas entre envíos
+        pool: process.env.SMTP_POOL !== 'false',
+        maxConnections: parseInt(process.env.SMTP_MAX_CONNECTIONS, 10) || 5,
+        maxMessages: parseInt(process.env.SMTP_MAX_MESSAGES, 10) || 100,
     },
     emailFrom: process.env.EMAIL_FROM,
+
+    // Pipeline de envío de emails
+    email: {
+        concurrency: parseInt(process.env.EMAIL_SEND_CONCURRENCY, 10) || 10,
+        maxAttempts: parseInt(process.env.EMAIL_MAX_ATTEMPTS, 10) || 4,
+        retryBaseMs: parseInt(process.env.EMAIL_RETRY_BASE_MS, 10) || 500,
+        retryMaxMs: parseInt(process.env.EMAIL_RETRY_MAX_MS, 10) || 10000,
+    },
+
+    // Escritura por lotes de NotificationLog
+    notificationLog: {
+        batchSize: parseInt(process.env.NOTIFICATION_LOG_BATCH_SIZE, 10) || 100,
+        flushMs: parseInt(process.env.NOTIFICATION_LOG_FLUSH_MS, 10) || 200,
+    },
 };
 
 module.exports = config;
\ No newline at end of file
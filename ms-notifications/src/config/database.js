@@ -1,4 +1,5 @@
 const { Sequelize } = require('sequelize');
+const metrics = require('../utils/metrics');
 
 const isTest = process.env.NODE_ENV === 'test';
 
@@ -37,6 +38,9 @@ if (isTest) {
     });
 }
 
+// Tiempo por consulta y espera por conexión en GET /metrics
+metrics.instrumentSequelize(sequelize);
+
 module.exports = {
     sequelize,
     Sequelize
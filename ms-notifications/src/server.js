@@ -3,6 +3,8 @@ const app = require('./app');
 const { sequelize } = require('./api/models');
 const consumerService = require('./api/services/consumer.service');
 const websocketService = require('./api/services/websocket.service');
+const emailService = require('./api/services/email.service');
+const notificationLogService = require('./api/services/notificationLog.service');
 
 const PORT = process.env.PORT || 3001;
 
@@ -31,7 +33,9 @@ const startServer = async () => {
         // Manejo de cierre graceful
         const gracefulShutdown = async () => {
             console.log('🔄 Cerrando servicios...');
-            await consumerService.stop(); 
+            await consumerService.stop();
+            await notificationLogService.stop();
+            emailService.close();
             server.close(() => {
                 console.log('✅ Servidor HTTP cerrado.');
                 sequelize.close().then(() => {
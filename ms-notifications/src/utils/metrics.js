@@ -0,0 +1,2 @@
+// src/utils/metrics.js
+module.exports = require('@ticket-slave/service-kit').metrics;
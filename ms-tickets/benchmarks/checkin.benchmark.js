@@ -0,0 +1,110 @@
+// benchmarks/checkin.benchmark.js
+//
+// Mide escaneos por segundo en la apertura de puertas con:
+// - legacy: findOne + save por escaneo, como hacía TicketService.checkIn.
+// - micro-batch: POST /check-in concurrente, agrupado por CheckInService.
+// - batch: POST /check-in/batch en lotes de CHECKIN_BATCH_MAX.
+// - reescaneo: los mismos QR otra vez con el índice del evento precargado.
+//
+// Las entradas se generan con TicketService.generateTicketsForOrder a partir de
+// un tipo de ticket con eventId en string, como lo devuelve pg para un INT8, y
+// el benchmark falla si el reescaneo no se responde entero desde el índice.
+//
+// Uso: npm run bench:checkin -- [entradas] [puertas concurrentes]
+// Con NODE_ENV=test usa SQLite en memoria; con DATABASE_URL, esa base de datos.
+const { sequelize } = require('../src/config/database');
+const Ticket = require('../src/api/models/ticket.model');
+const ticketService = require('../src/api/services/ticket.service');
+const checkInService = require('../src/api/services/checkIn.service');
+const websocketService = require('../src/api/services/websocket.service');
+
+const TICKETS = parseInt(process.argv[2], 10) || 5000;
+const GATES = parseInt(process.argv[3], 10) || 50;
+const BATCH_SIZE = parseInt(process.env.CHECKIN_BATCH_MAX, 10) || 500;
+const EVENT_ID = 1;
+
+async function resetTickets() {
+    await Ticket.update({ status: 'VALID', checkInTimestamp: null }, { where: { eventId: EVENT_ID } });
+}
+
+// Reparte los QR entre GATES puertas que escanean sin pausa
+async function gates(qrCodes, scan) {
+    let next = 0;
+    const gate = async () => {
+        while (next < qrCodes.length) {
+            await scan(qrCodes[next++]);
+        }
+    };
+    await Promise.all(Array.from({ length: GATES }, gate));
+}
+
+async function measure(mode, run) {
+    const startedAt = process.hrtime.bigint();
+    await run();
+    const seconds = Number(process.hrtime.bigint() - startedAt) / 1e9;
+    const used = await Ticket.count({ where: { eventId: EVENT_ID, status: 'USED' } });
+    return {
+        modo: mode,
+        segundos: Number(seconds.toFixed(2)),
+        'escaneos/s': Math.round(TICKETS / seconds),
+        usadas: used
+    };
+}
+
+async function legacyCheckIn(qrCodeData) {
+    const { ticketCode } = checkInService.parseQr(qrCodeData);
+    const ticket = await Ticket.findOne({ where: { ticketCode } });
+    if (ticket.status === 'USED') return;
+    ticket.status = 'USED';
+    ticket.checkInTimestamp = new Date();
+    await ticket.save();
+}
+
+async function main() {
+    // Solo interesa la tabla de entradas: sin pedidos ni tipos de entrada detrás
+    if (sequelize.getDialect() === 'sqlite') {
+        await sequelize.query('PRAGMA foreign_keys = OFF');
+    }
+    await Ticket.sync();
+    websocketService.notifyTicketsValidated = () => {};
+
+    const order = { userId: 1, billingAddress: { nombreCompleto: 'Asistente' } };
+    const ticketTypes = new Map([[1, { id: 1, eventId: String(EVENT_ID) }]]);
+    const rows = await ticketService.generateTicketsForOrder(order, [{ id: 1, ticketTypeId: 1, quantity: TICKETS }], ticketTypes);
+    const qrCodes = rows.map(row => row.qrCodeData);
+
+    console.log(`Benchmark de check-in: ${TICKETS} entradas, ${GATES} puertas concurrentes`);
+    const results = [];
+
+    results.push(await measure('legacy (findOne + save)', () => gates(qrCodes, legacyCheckIn)));
+    await resetTickets();
+
+    results.push(await measure('micro-batch (POST /check-in)', () => gates(qrCodes, qr => checkInService.checkIn(qr))));
+    await resetTickets();
+
+    results.push(await measure(`batch (${BATCH_SIZE} por lote)`, async () => {
+        for (let i = 0; i < qrCodes.length; i += BATCH_SIZE) {
+            const scans = qrCodes.slice(i, i + BATCH_SIZE).map(qrCodeData => ({ qrCodeData }));
+            await checkInService.validateBatch(scans);
+        }
+    }));
+
+    // Todas las entradas están usadas: con el índice precargado no se toca la base de datos
+    await checkInService.preload(EVENT_ID, { role: 'admin' });
+    const hitsBefore = checkInService.getStats().indexHits;
+    results.push(await measure('reescaneo con índice', () => gates(qrCodes, qr => checkInService.checkIn(qr))));
+
+    console.table(results);
+    const { statements, indexHits } = checkInService.getStats();
+    console.log(`Sentencias UPDATE: ${statements}, respuestas desde el índice: ${indexHits}`);
+    await checkInService.stop();
+    await sequelize.close();
+    if (indexHits - hitsBefore !== TICKETS) {
+        throw new Error(`El reescaneo solo respondió ${indexHits - hitsBefore} de ${TICKETS} desde el índice`);
+    }
+}
+
+main().catch(error => {
+    console.error('❌ Error en el benchmark:', error);
+    process.exit(1);
+});
@@ -0,0 +1,97 @@
+// benchmarks/consumer.benchmark.js
+//
+// Mide cuánto tarda ConsumerService en poner al día las réplicas con una
+// ráfaga de mensajes de ms-eventos, en modo single y en modo batch, usando el
+// broker en memoria de localAmqp.js en lugar de RabbitMQ.
+//
+// Uso: npm run bench:consumer -- [mensajes] [ids distintos]
+// Con NODE_ENV=test usa SQLite en memoria; con DATABASE_URL, esa base de datos.
+const { fork } = require('child_process');
+const { LocalAmqpBroker } = require('./localAmqp');
+
+const MESSAGES = parseInt(process.argv[2], 10) || 5000;
+const DISTINCT_IDS = parseInt(process.argv[3], 10) || 1000;
+const MODES = ['single', 'batch'];
+
+const eventMessage = (id, i) => ({
+    id,
+    nombre: `Evento ${id} (rev ${i})`,
+    descripcion: 'Evento generado por el benchmark del consumer',
+    fechaInicio: new Date(Date.now() + 86400000).toISOString(),
+    fechaFin: new Date(Date.now() + 2 * 86400000).toISOString(),
+    status: 'PUBLICADO',
+    categoryId: 1 + (id % 10),
+    venueId: 1,
+    organizerId: 1
+});
+
+// Cada modo se mide en un proceso propio: la configuración del consumer se lee
+// del entorno al cargar el módulo y así cada uno parte de una base limpia
+async function runChild() {
+    const { sequelize } = require('../src/config/database');
+    const EventReplica = require('../src/api/models/eventReplica.model');
+    const CategoryReplica = require('../src/api/models/categoryReplica.model');
+    const consumerService = require('../src/api/services/consumer.service');
+
+    await EventReplica.sync();
+    await CategoryReplica.sync();
+
+    const broker = new LocalAmqpBroker();
+    await consumerService.start(() => broker.connect());
+
+    const startedAt = Date.now();
+    for (let i = 0; i < MESSAGES; i++) {
+        const id = 1 + (i % DISTINCT_IDS);
+        // Uno de cada diez mensajes es de categorías
+        const [routingKey, payload] = i % 10 === 0
+            ? ['category.updated', { id: 1 + (id % 10), nombre: `Categoría ${id % 10}`, descripcion: `rev ${i}` }]
+            : ['event.updated', eventMessage(id, i)];
+        broker.publish('events_exchange', routingKey, Buffer.from(JSON.stringify(payload)), {
+            persistent: true,
+            timestamp: Math.floor(Date.now() / 1000),
+            headers: { 'x-published-at-ms': Date.now() }
+        });
+    }
+    await broker.whenIdle();
+    const elapsedMs = Date.now() - startedAt;
+
+    const stats = consumerService.getStats();
+    const replicas = await EventReplica.count();
+    await consumerService.stop();
+    await sequelize.close();
+
+    process.send({
+        mode: stats.mode,
+        messages: stats.processed,
+        seconds: Number((elapsedMs / 1000).toFixed(2)),
+        'msg/s': Math.round(stats.processed / (elapsedMs / 1000)),
+        batches: stats.batches,
+        coalesced: stats.coalesced,
+        rowsUpserted: stats.rowsUpserted,
+        avgLagMs: stats.avgLagMs,
+        maxLagMs: stats.maxLagMs,
+        replicas
+    });
+}
+
+async function runParent() {
+    console.log(`Benchmark del consumer: ${MESSAGES} mensajes sobre ${DISTINCT_IDS} ids`);
+    const results = [];
+    for (const mode of MODES) {
+        const result = await new Promise((resolve, reject) => {
+            const child = fork(__filename, process.argv.slice(2), {
+                env: { ...process.env, BENCH_CHILD: '1', EVENTS_CONSUMER_MODE: mode }
+            });
+            child.on('message', resolve);
+            child.on('error', reject);
+            child.on('exit', code => code !== 0 && reject(new Error(`El modo ${mode} terminó con código ${code}`)));
+        });
+        results.push(result);
+    }
+    console.table(results);
+}
+
+(process.env.BENCH_CHILD ? runChild() : runParent()).catch(error => {
+    console.error('❌ Error en el benchmark:', error);
+    process.exit(1);
+});
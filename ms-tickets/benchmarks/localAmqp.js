@@ -0,0 +1,164 @@
+// benchmarks/localAmqp.js
+
+/**
+ * Sustituto en memoria de RabbitMQ con la parte de la API de amqplib que usa
+ * ConsumerService: exchanges topic con routing keys exactas, colas, prefetch
+ * por canal, ack/nack (también múltiples) y entrega sin esperar al handler,
+ * igual que amqplib. Sirve para medir el consumer sin un broker real.
+ */
+class LocalAmqpBroker {
+    constructor() {
+        this.bindings = new Map(); // `${exchange}:${routingKey}` -> Set<queue>
+        this.queues = new Map(); // queue -> [{ content, fields, properties }]
+        this.channels = new Set();
+        this.idleWaiters = [];
+    }
+
+    async connect() {
+        return new LocalConnection(this);
+    }
+
+    publish(exchange, routingKey, content, options = {}) {
+        const queues = this.bindings.get(`${exchange}:${routingKey}`) || new Set();
+        for (const queue of queues) {
+            this.queues.get(queue).push({
+                content,
+                fields: { exchange, routingKey, redelivered: false },
+                properties: { ...options }
+            });
+        }
+        this.dispatch();
+        return true;
+    }
+
+    dispatch() {
+        for (const channel of this.channels) {
+            channel.dispatch();
+        }
+        this.checkIdle();
+    }
+
+    isIdle() {
+        for (const messages of this.queues.values()) {
+            if (messages.length > 0) return false;
+        }
+        for (const channel of this.channels) {
+            if (channel.unacked.size > 0) return false;
+        }
+        return true;
+    }
+
+    /** Resuelve cuando todas las colas están vacías y no queda nada sin confirmar. */
+    whenIdle() {
+        if (this.isIdle()) return Promise.resolve();
+        return new Promise(resolve => this.idleWaiters.push(resolve));
+    }
+
+    checkIdle() {
+        if (this.idleWaiters.length > 0 && this.isIdle()) {
+            const waiters = this.idleWaiters;
+            this.idleWaiters = [];
+            for (const resolve of waiters) resolve();
+        }
+    }
+}
+
+class LocalConnection {
+    constructor(broker) {
+        this.broker = broker;
+    }
+
+    async createChannel() {
+        const channel = new LocalChannel(this.broker);
+        this.broker.channels.add(channel);
+        return channel;
+    }
+
+    async close() { }
+}
+
+class LocalChannel {
+    constructor(broker) {
+        this.broker = broker;
+        this.prefetchCount = 0; // 0 = sin límite, como en RabbitMQ
+        this.consumers = []; // [{ queue, onMessage }]
+        this.unacked = new Map(); // deliveryTag -> { queue, message }
+        this.nextDeliveryTag = 1;
+    }
+
+    async assertExchange() { }
+
+    async assertQueue(queue) {
+        if (!this.broker.queues.has(queue)) {
+            this.broker.queues.set(queue, []);
+        }
+        return { queue };
+    }
+
+    async bindQueue(queue, exchange, routingKey) {
+        const key = `${exchange}:${routingKey}`;
+        if (!this.broker.bindings.has(key)) {
+            this.broker.bindings.set(key, new Set());
+        }
+        this.broker.bindings.get(key).add(queue);
+    }
+
+    async prefetch(count) {
+        this.prefetchCount = count;
+    }
+
+    async consume(queue, onMessage) {
+        this.consumers.push({ queue, onMessage });
+        this.dispatch();
+    }
+
+    publish(exchange, routingKey, content, options) {
+        return this.broker.publish(exchange, routingKey, content, options);
+    }
+
+    dispatch() {
+        for (const { queue, onMessage } of this.consumers) {
+            const messages = this.broker.queues.get(queue) || [];
+            while (messages.length > 0 && (this.prefetchCount === 0 || this.unacked.size < this.prefetchCount)) {
+                const message = messages.shift();
+                const deliveryTag = this.nextDeliveryTag++;
+                const delivered = { ...message, fields: { ...message.fields, deliveryTag } };
+                this.unacked.set(deliveryTag, { queue, message });
+                // amqplib no espera a la promesa del handler
+                setImmediate(() => onMessage(delivered));
+            }
+        }
+    }
+
+    settle(msg, allUpTo, requeue) {
+        const tags = allUpTo
+            ? [...this.unacked.keys()].filter(tag => tag <= msg.fields.deliveryTag)
+            : [msg.fields.deliveryTag];
+        for (const tag of tags) {
+            const pending = this.unacked.get(tag);
+            if (!pending) continue;
+            this.unacked.delete(tag);
+            if (requeue) {
+                this.broker.queues.get(pending.queue).unshift({
+                    ...pending.message,
+                    fields: { ...pending.message.fields, redelivered: true }
+                });
+            }
+        }
+        this.broker.dispatch();
+    }
+
+    ack(msg, allUpTo = false) {
+        this.settle(msg, allUpTo, false);
+    }
+
+    nack(msg, allUpTo = false, requeue = true) {
+        this.settle(msg, allUpTo, requeue);
+    }
+
+    async close() {
+        this.broker.channels.delete(this);
+    }
+}
+
+module.exports = { LocalAmqpBroker };
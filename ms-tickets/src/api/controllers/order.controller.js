@@ -1,12 +1,24 @@
 // src/api/controllers/order.controller.js
 const orderService = require('../services/order.service');
 
+// ORDER_PROCESSING_MODE=async activa el checkout asíncrono para todos los pedidos;
+// en modo sync (por defecto) un cliente lo puede pedir con `Prefer: respond-async`.
+const ORDER_PROCESSING_MODE = process.env.ORDER_PROCESSING_MODE || 'sync';
+
+const wantsAsync = (req) => ORDER_PROCESSING_MODE === 'async' || /\brespond-async\b/i.test(req.get('Prefer') || '');
+
 class OrderController {
     async create(req, res, next) {
         try {
             const userId = req.user.sub; // Usar 'sub' del JWT decodificado
             const userEmail = req.user.email; // Obtener email del JWT
-            const orderDetails = await orderService.createOrderFromCart(userId, req.body, userEmail);
+            const correlationId = req.get('X-Correlation-Id'); // Permite seguir la compra hasta la notificación
+            if (wantsAsync(req)) {
+                const accepted = await orderService.acceptOrderFromCart(userId, req.body, userEmail, correlationId);
+                res.status(202).location(`/api/v1/orders/${accepted.id}`).json(accepted);
+                return;
+            }
+            const orderDetails = await orderService.createOrderFromCart(userId, req.body, userEmail, correlationId);
             res.status(201).json(orderDetails);
         } catch (error) {
             next(error);
@@ -16,8 +28,8 @@ class OrderController {
     async getAll(req, res, next) {
         try {
             const userId = req.user.sub; // Usar 'sub' del JWT decodificado
-            const { page, limit } = req.query;
-            const orders = await orderService.findUserOrders(userId, { page, limit });
+            const { page, limit, cursor, includeTotal } = req.query;
+            const orders = await orderService.findUserOrders(userId, { page, limit, cursor, includeTotal });
             res.status(200).json(orders);
         } catch (error) {
             next(error);
@@ -1,13 +1,14 @@
 // src/api/controllers/ticket.controller.js
 const ticketService = require('../services/ticket.service');
+const checkInService = require('../services/checkIn.service');
 
 class TicketController {
   async getAll(req, res, next) {
     try {
       const userId = req.user.sub; // Usar 'sub' del JWT decodificado
-      const { eventId, status } = req.query;
-      const tickets = await ticketService.findUserTickets(userId, { eventId, status });
-      res.status(200).json({ data: tickets });
+      const { eventId, status, limit, cursor, includeTotal } = req.query;
+      const tickets = await ticketService.findUserTickets(userId, { eventId, status }, { limit, cursor, includeTotal });
+      res.status(200).json(tickets);
     } catch (error) {
       next(error);
     }
@@ -45,6 +46,47 @@ class TicketController {
       next(error);
     }
   }
+
+  async checkInBatch(req, res, next) {
+    try {
+      const { scans } = req.body;
+      const result = await checkInService.validateBatch(scans);
+      res.status(200).json(result);
+    } catch (error) {
+      next(error);
+    }
+  }
+
+  async preloadCheckIn(req, res, next) {
+    try {
+      const { eventId } = req.params;
+      const index = await checkInService.preload(eventId, req.user);
+      res.status(200).json(index);
+    } catch (error) {
+      next(error);
+    }
+  }
+
+  async unloadCheckIn(req, res, next) {
+    try {
+      const { eventId } = req.params;
+      await checkInService.unload(eventId, req.user);
+      res.status(204).send();
+    } catch (error) {
+      next(error);
+    }
+  }
+
+  async syncCheckIn(req, res, next) {
+    try {
+      const { eventId } = req.params;
+      const { cursor, limit } = req.query;
+      const changes = await checkInService.sync(eventId, { cursor, limit }, req.user);
+      res.status(200).json(changes);
+    } catch (error) {
+      next(error);
+    }
+  }
 }
 
 module.exports = new TicketController();
\ No newline at end of file
@@ -0,0 +1,62 @@
+// src/api/controllers/waitingRoom.controller.js
+const waitingRoomService = require('../services/waitingRoom.service');
+const { WAITING_ROOM_HEADER } = require('../middleware/waitingRoom.middleware');
+const { BadRequestError } = require('../../utils/errors');
+
+class WaitingRoomController {
+    async open(req, res, next) {
+        try {
+            const { eventId } = req.params;
+            const room = await waitingRoomService.openRoom(eventId, req.body, req.user);
+            res.status(200).json(room);
+        } catch (error) {
+            next(error);
+        }
+    }
+
+    async getOne(req, res, next) {
+        try {
+            const { eventId } = req.params;
+            res.status(200).json(waitingRoomService.getRoom(eventId));
+        } catch (error) {
+            next(error);
+        }
+    }
+
+    async close(req, res, next) {
+        try {
+            const { eventId } = req.params;
+            await waitingRoomService.closeRoom(eventId, req.user);
+            res.status(204).send();
+        } catch (error) {
+            next(error);
+        }
+    }
+
+    async join(req, res, next) {
+        try {
+            const userId = req.user.sub; // Usar 'sub' del JWT decodificado
+            const { eventId } = req.params;
+            const entry = await waitingRoomService.join(eventId, userId);
+            res.status(200).json(entry);
+        } catch (error) {
+            next(error);
+        }
+    }
+
+    async status(req, res, next) {
+        try {
+            const userId = req.user.sub; // Usar 'sub' del JWT decodificado
+            const { eventId } = req.params;
+            const ticket = waitingRoomService.verifyToken(req.get(WAITING_ROOM_HEADER), eventId, userId);
+            if (!ticket) {
+                throw new BadRequestError(`Falta la cabecera ${WAITING_ROOM_HEADER} o no es válida para este evento.`);
+            }
+            res.status(200).json(await waitingRoomService.status(eventId, ticket));
+        } catch (error) {
+            next(error);
+        }
+    }
+}
+
+module.exports = new WaitingRoomController();
@@ -1,5 +1,5 @@
 // src/api/dtos/order.dto.js
-const { body } = require('express-validator');
+const { body, query } = require('express-validator');
 
 const createOrderDTO = [
     body('paymentMethodId')
@@ -32,6 +32,28 @@ const createOrderDTO = [
         .notEmpty().withMessage('El país es requerido en la dirección de facturación.'),
 ];
 
+const listOrdersDTO = [
+    query('page')
+        .optional()
+        .isInt({ min: 1 }).withMessage('page debe ser un número entero positivo.')
+        .toInt(),
+
+    query('limit')
+        .optional()
+        .isInt({ min: 1 }).withMessage('limit debe ser un número entero positivo.')
+        .toInt(),
+
+    query('cursor')
+        .optional()
+        .isString().withMessage('cursor debe ser una cadena de texto.'),
+
+    query('includeTotal')
+        .optional()
+        .isBoolean().withMessage('includeTotal debe ser true o false.')
+        .toBoolean(),
+];
+
 module.exports = {
     createOrderDTO,
+    listOrdersDTO,
 };
\ No newline at end of file
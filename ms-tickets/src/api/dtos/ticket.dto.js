@@ -1,5 +1,5 @@
 // src/api/dtos/ticket.dto.js
-const { body } = require('express-validator');
+const { body, param, query } = require('express-validator');
 
 const checkInDTO = [
   body('qrCodeData')
@@ -8,6 +8,56 @@ const checkInDTO = [
     .isJSON().withMessage('El formato del QR debe ser un JSON válido.'),
 ];
 
+const checkInBatchDTO = [
+  body('scans')
+    .isArray({ min: 1 }).withMessage('scans debe ser una lista con al menos un escaneo.'),
+
+  body('scans.*.qrCodeData')
+    .isString().withMessage('Cada escaneo necesita qrCodeData.'),
+
+  body('scans.*.scannedAt')
+    .optional()
+    .isISO8601().withMessage('scannedAt debe ser una fecha ISO 8601.'),
+];
+
+const checkInEventDTO = [
+  param('eventId')
+    .isInt({ min: 1 }).withMessage('El eventId debe ser un número entero positivo.'),
+];
+
+const checkInSyncDTO = [
+  ...checkInEventDTO,
+
+  query('cursor')
+    .optional()
+    .isString().withMessage('cursor debe ser una cadena de texto.'),
+
+  query('limit')
+    .optional()
+    .isInt({ min: 1 }).withMessage('limit debe ser un número entero positivo.')
+    .toInt(),
+];
+
+const listTicketsDTO = [
+  query('limit')
+    .optional()
+    .isInt({ min: 1 }).withMessage('limit debe ser un número entero positivo.')
+    .toInt(),
+
+  query('cursor')
+    .optional()
+    .isString().withMessage('cursor debe ser una cadena de texto.'),
+
+  query('includeTotal')
+    .optional()
+    .isBoolean().withMessage('includeTotal debe ser true o false.')
+    .toBoolean(),
+];
+
 module.exports = {
   checkInDTO,
+  checkInBatchDTO,
+  checkInEventDTO,
+  checkInSyncDTO,
+  listTicketsDTO,
 };
\ No newline at end of file
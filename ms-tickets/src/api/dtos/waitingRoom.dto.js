@@ -0,0 +1,22 @@
+// src/api/dtos/waitingRoom.dto.js
+const { body, param } = require('express-validator');
+
+const eventIdParam = param('eventId')
+    .isInt({ min: 1 }).withMessage('El eventId debe ser un número entero positivo.');
+
+const openWaitingRoomDTO = [
+    eventIdParam,
+    body('ratePerSecond')
+        .optional()
+        .isFloat({ gt: 0 }).withMessage('ratePerSecond debe ser un número mayor que 0.')
+        .toFloat(),
+];
+
+const waitingRoomEventDTO = [
+    eventIdParam,
+];
+
+module.exports = {
+    openWaitingRoomDTO,
+    waitingRoomEventDTO,
+};
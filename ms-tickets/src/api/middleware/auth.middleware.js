@@ -1,11 +1,11 @@
 // src/api/middleware/auth.middleware.js
 
-const jwt = require('jsonwebtoken');
 const { jwtSecret } = require('../../config/config');
+const tokenCache = require('../../utils/tokenCache');
 
 /**
  * Middleware de autenticación.
- * Valida un token JWT,
+ * Valida un token JWT (una vez por token y TTL, ver utils/tokenCache),
  * y adjunta el payload al objeto `req.user`.
  */
 const authenticate = (req, res, next) => {
@@ -15,7 +15,7 @@ const authenticate = (req, res, next) => {
     }
     const token = authHeader.split(' ')[1];
     try {
-        const payload = jwt.verify(token, jwtSecret);
+        const payload = tokenCache.verify(token, jwtSecret);
         req.user = payload; // El payload debe contener el id y otros claims
         next();
     } catch (err) {
@@ -23,6 +23,18 @@ const authenticate = (req, res, next) => {
     }
 };
 
+/**
+ * Middleware de autorización por rol (claim `role` del JWT).
+ * Debe usarse después de `authenticate`.
+ */
+const authorizeRoles = (...roles) => (req, res, next) => {
+    if (!req.user || !roles.includes(req.user.role)) {
+        return res.status(403).json({ message: 'Prohibido: no tienes permisos para esta acción' });
+    }
+    next();
+};
+
 module.exports = {
-    authenticate
+    authenticate,
+    authorizeRoles
 };
\ No newline at end of file
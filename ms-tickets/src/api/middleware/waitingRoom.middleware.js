@@ -0,0 +1,50 @@
+// src/api/middleware/waitingRoom.middleware.js
+
+const waitingRoomService = require('../services/waitingRoom.service');
+
+const WAITING_ROOM_HEADER = 'X-Waiting-Room-Token';
+
+/**
+ * Middleware de admisión para POST /cart/items.
+ * Si el evento del tipo de ticket tiene la sala de espera abierta, exige un
+ * token de la sala (cabecera X-Waiting-Room-Token) cuyo turno ya haya pasado.
+ * Debe usarse después de `authenticate` y de la validación del body.
+ */
+const requireAdmission = async (req, res, next) => {
+    try {
+        if (!waitingRoomService.hasOpenRooms()) {
+            return next();
+        }
+
+        const eventId = await waitingRoomService.eventIdForTicketType(req.body.ticketTypeId);
+        if (eventId === null || !waitingRoomService.isOpen(eventId)) {
+            return next();
+        }
+
+        const ticket = waitingRoomService.verifyToken(req.get(WAITING_ROOM_HEADER), eventId, req.user.sub);
+        if (!ticket) {
+            return res.status(403).json({
+                message: 'Este evento tiene sala de espera: únete a la cola para comprar.',
+                waitingRoom: `/api/v1/waiting-room/${eventId}/join`
+            });
+        }
+
+        if (!waitingRoomService.isAdmitted(eventId, ticket)) {
+            const status = await waitingRoomService.status(eventId, ticket);
+            res.set('Retry-After', String(Math.max(1, status.etaSeconds)));
+            return res.status(429).json({
+                message: 'Todavía no es tu turno.',
+                ...status
+            });
+        }
+
+        next();
+    } catch (error) {
+        next(error);
+    }
+};
+
+module.exports = {
+    WAITING_ROOM_HEADER,
+    requireAdmission
+};
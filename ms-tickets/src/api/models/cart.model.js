@@ -27,6 +27,10 @@ Cart.init({
     tableName: 'carts',
     timestamps: true,
     underscored: true,
+    indexes: [
+        // Lo usa el barrido de carritos expirados (cartSweeper.service)
+        { fields: ['expires_at'] },
+    ],
 });
 
 
@@ -55,6 +59,9 @@ CartItem.init({
     tableName: 'cart_items',
     timestamps: false, // Los ítems no necesitan sus propios timestamps
     underscored: true,
+    indexes: [
+        { fields: ['cart_id'] },
+    ],
 });
 
 module.exports = { Cart, CartItem };
\ No newline at end of file
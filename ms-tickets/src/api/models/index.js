@@ -6,6 +6,7 @@ const { Order, OrderItem } = require('./order.model');
 const Ticket = require('./ticket.model');
 const EventReplica = require('./eventReplica.model');
 const CategoryReplica = require('./categoryReplica.model');
+const OutboxMessage = require('./outboxMessage.model');
 
 // Importar modelos
 const db = {
@@ -17,7 +18,8 @@ const db = {
     OrderItem,
     Ticket,
     EventReplica,
-    CategoryReplica
+    CategoryReplica,
+    OutboxMessage
 };
 
 // --- Definir Asociaciones ---
@@ -37,7 +37,8 @@ Order.init({
         allowNull: false,
         defaultValue: 'PENDING',
         validate: {
-            isIn: [['COMPLETED', 'PENDING', 'FAILED', 'REFUNDED']],
+            // REFUND_REQUIRED: cobrado pero sin entradas; pendiente de que la pasarela devuelva el pago
+            isIn: [['COMPLETED', 'PENDING', 'FAILED', 'REFUND_REQUIRED', 'REFUNDED']],
         },
     },
     paymentGatewayId: {
@@ -56,6 +57,10 @@ Order.init({
     tableName: 'orders',
     timestamps: true,
     underscored: true,
+    indexes: [
+        // Historial del usuario paginado por cursor (utils/pagination)
+        { fields: ['user_id', 'created_at', 'id'] },
+    ],
 });
 
 class OrderItem extends Model { }
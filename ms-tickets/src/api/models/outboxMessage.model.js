@@ -0,0 +1,56 @@
+// src/api/models/outboxMessage.model.js
+const { DataTypes, Model } = require('sequelize');
+const { sequelize } = require('../../config/database');
+
+// Mensaje pendiente de publicar en RabbitMQ (ver outbox.service). Se escribe en la
+// misma transacción que el cambio que lo origina y se borra al confirmarse.
+class OutboxMessage extends Model { }
+OutboxMessage.init({
+    id: {
+        type: DataTypes.BIGINT,
+        autoIncrement: true,
+        primaryKey: true,
+    },
+    routingKey: {
+        type: DataTypes.STRING,
+        allowNull: false,
+        field: 'routing_key',
+    },
+    payload: {
+        type: DataTypes.JSONB,
+        allowNull: false,
+    },
+    correlationId: {
+        type: DataTypes.STRING,
+        allowNull: true,
+        field: 'correlation_id',
+    },
+    attempts: {
+        type: DataTypes.INTEGER,
+        allowNull: false,
+        defaultValue: 0,
+    },
+    nextAttemptAt: {
+        type: DataTypes.DATE,
+        allowNull: false,
+        defaultValue: DataTypes.NOW,
+        field: 'next_attempt_at',
+    },
+    lastError: {
+        type: DataTypes.TEXT,
+        allowNull: true,
+        field: 'last_error',
+    }
+}, {
+    sequelize,
+    modelName: 'OutboxMessage',
+    tableName: 'outbox_messages',
+    timestamps: true,
+    underscored: true,
+    indexes: [
+        // El relay toma los mensajes vencidos por orden de llegada
+        { fields: ['next_attempt_at', 'id'] },
+    ],
+});
+
+module.exports = OutboxMessage;
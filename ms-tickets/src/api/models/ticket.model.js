@@ -64,6 +64,13 @@ Ticket.init({
     tableName: 'tickets',
     timestamps: true,
     underscored: true,
+    indexes: [
+        // Listado de entradas del usuario paginado por cursor (utils/pagination)
+        { fields: ['user_id', 'created_at', 'id'] },
+        { fields: ['user_id', 'event_id', 'created_at', 'id'] },
+        // Sincronización de los escáneres de check-in por cursor (updated_at, id)
+        { fields: ['event_id', 'updated_at', 'id'] },
+    ],
 });
 
 module.exports = Ticket;
\ No newline at end of file
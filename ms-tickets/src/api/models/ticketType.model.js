@@ -50,6 +50,13 @@ TicketType.init({
         defaultValue: 0,
         field: 'sold',
     },
+    // Entradas retenidas en carritos no liberados (ver reservation.service)
+    reserved: {
+        type: DataTypes.INTEGER,
+        allowNull: false,
+        defaultValue: 0,
+        field: 'reserved',
+    },
     // Campo virtual para calcular los tickets disponibles
     available: {
         type: DataTypes.VIRTUAL,
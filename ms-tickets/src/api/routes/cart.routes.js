@@ -4,6 +4,7 @@ const cartController = require('../controllers/cart.controller');
 const { addItemToCartDTO } = require('../dtos/cart.dto');
 const { handleValidationErrors } = require('../middleware/validation.middleware');
 const { authenticate } = require('../middleware/auth.middleware');
+const { requireAdmission } = require('../middleware/waitingRoom.middleware');
 
 const router = express.Router();
 
@@ -21,6 +22,7 @@ router.post(
     '/items',
     addItemToCartDTO,
     handleValidationErrors,
+    requireAdmission,
     cartController.addItem
 );
 
@@ -4,6 +4,7 @@ const ticketTypeRoutes = require('./ticketType.routes');
 const cartRoutes = require('./cart.routes');
 const orderRoutes = require('./order.routes');
 const ticketRoutes = require('./ticket.routes'); 
+const waitingRoomRoutes = require('./waitingRoom.routes');
 
 
 const router = express.Router();
@@ -20,4 +21,7 @@ router.use('/orders', orderRoutes);
 // Rutas de Entradas Individuales
 router.use('/tickets', ticketRoutes);
 
+// Sala de espera por evento (admisión al carrito)
+router.use('/waiting-room', waitingRoomRoutes);
+
 module.exports = router;
\ No newline at end of file
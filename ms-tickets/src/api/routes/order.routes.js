@@ -1,7 +1,7 @@
 // src/api/routes/order.routes.js
 const express = require('express');
 const orderController = require('../controllers/order.controller');
-const { createOrderDTO } = require('../dtos/order.dto');
+const { createOrderDTO, listOrdersDTO } = require('../dtos/order.dto');
 const { handleValidationErrors } = require('../middleware/validation.middleware');
 const { authenticate } = require('../middleware/auth.middleware');
 
@@ -18,7 +18,7 @@ router.post(
 );
 
 // GET /api/v1/orders
-router.get('/', orderController.getAll);
+router.get('/', listOrdersDTO, handleValidationErrors, orderController.getAll);
 
 // GET /api/v1/orders/:id
 router.get('/:id', orderController.getOne);
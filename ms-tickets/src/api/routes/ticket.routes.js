@@ -1,9 +1,9 @@
 // src/api/routes/ticket.routes.js
 const express = require('express');
 const ticketController = require('../controllers/ticket.controller');
-const { checkInDTO } = require('../dtos/ticket.dto');
+const { checkInDTO, checkInBatchDTO, checkInEventDTO, checkInSyncDTO, listTicketsDTO } = require('../dtos/ticket.dto');
 const { handleValidationErrors } = require('../middleware/validation.middleware');
-const { authenticate } = require('../middleware/auth.middleware');
+const { authenticate, authorizeRoles } = require('../middleware/auth.middleware');
 
 const router = express.Router();
 
@@ -16,11 +16,50 @@ router.post(
   ticketController.checkIn
 );
 
+// POST /api/v1/tickets/check-in/batch (lote de escaneos, también los subidos por escáneres sin conexión)
+router.post(
+  '/check-in/batch',
+  authenticate,
+  checkInBatchDTO,
+  handleValidationErrors,
+  ticketController.checkInBatch
+);
+
+// PUT /api/v1/tickets/check-in/events/:eventId/index (precargar el índice antes de abrir puertas)
+router.put(
+  '/check-in/events/:eventId/index',
+  authenticate,
+  authorizeRoles('organizer', 'admin'),
+  checkInEventDTO,
+  handleValidationErrors,
+  ticketController.preloadCheckIn
+);
+
+// DELETE /api/v1/tickets/check-in/events/:eventId/index
+router.delete(
+  '/check-in/events/:eventId/index',
+  authenticate,
+  authorizeRoles('organizer', 'admin'),
+  checkInEventDTO,
+  handleValidationErrors,
+  ticketController.unloadCheckIn
+);
+
+// GET /api/v1/tickets/check-in/events/:eventId/sync?cursor= (cambios para los escáneres)
+router.get(
+  '/check-in/events/:eventId/sync',
+  authenticate,
+  authorizeRoles('organizer', 'admin'),
+  checkInSyncDTO,
+  handleValidationErrors,
+  ticketController.syncCheckIn
+);
+
 // Las siguientes rutas son para el usuario final y requieren autenticación
 router.use(authenticate);
 
 // GET /api/v1/tickets
-router.get('/', ticketController.getAll);
+router.get('/', listTicketsDTO, handleValidationErrors, ticketController.getAll);
 
 // GET /api/v1/tickets/:id
 router.get('/:id', ticketController.getOne);
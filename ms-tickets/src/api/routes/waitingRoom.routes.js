@@ -0,0 +1,39 @@
+// src/api/routes/waitingRoom.routes.js
+const express = require('express');
+const waitingRoomController = require('../controllers/waitingRoom.controller');
+const { openWaitingRoomDTO, waitingRoomEventDTO } = require('../dtos/waitingRoom.dto');
+const { handleValidationErrors } = require('../middleware/validation.middleware');
+const { authenticate, authorizeRoles } = require('../middleware/auth.middleware');
+
+const router = express.Router();
+
+router.use(authenticate);
+
+// PUT /api/v1/waiting-room/:eventId (abrir o reconfigurar la sala)
+router.put(
+    '/:eventId',
+    authorizeRoles('organizer', 'admin'),
+    openWaitingRoomDTO,
+    handleValidationErrors,
+    waitingRoomController.open
+);
+
+// GET /api/v1/waiting-room/:eventId
+router.get('/:eventId', waitingRoomEventDTO, handleValidationErrors, waitingRoomController.getOne);
+
+// DELETE /api/v1/waiting-room/:eventId (cerrar la sala)
+router.delete(
+    '/:eventId',
+    authorizeRoles('organizer', 'admin'),
+    waitingRoomEventDTO,
+    handleValidationErrors,
+    waitingRoomController.close
+);
+
+// POST /api/v1/waiting-room/:eventId/join
+router.post('/:eventId/join', waitingRoomEventDTO, handleValidationErrors, waitingRoomController.join);
+
+// GET /api/v1/waiting-room/:eventId/status
+router.get('/:eventId/status', waitingRoomEventDTO, handleValidationErrors, waitingRoomController.status);
+
+module.exports = router;
@@ -1,7 +1,7 @@
 // src/api/services/cart.service.js
 const { sequelize, Cart, CartItem, TicketType } = require('../models');
-const { Op } = require('sequelize');
 const { NotFoundError, ConflictError, BadRequestError } = require('../../utils/errors');
+const reservationService = require('./reservation.service');
 
 const CART_EXPIRATION_MINUTES = 15;
 
@@ -9,35 +9,36 @@ class CartService {
 
     /**
      * Obtiene o crea un carrito para un usuario. Si el carrito existente ha expirado,
-     * se limpia y se reinicia su temporizador.
+     * se limpia (liberando su reserva) y se reinicia su temporizador.
      */
-    async getOrCreateCartForUser(userId) {
-        let cart = await Cart.findOne({ where: { userId } });
+    async getOrCreateCartForUser(userId, transaction) {
+        let cart = await Cart.findOne({ where: { userId }, lock: transaction && transaction.LOCK.UPDATE, transaction });
 
         const now = new Date();
         const expirationTime = new Date(now.getTime() + CART_EXPIRATION_MINUTES * 60 * 1000);
 
         if (!cart) {
-            return await Cart.create({ userId, expiresAt: expirationTime });
+            return await Cart.create({ userId, expiresAt: expirationTime }, { transaction });
         }
 
         if (cart.expiresAt < now) {
             // El carrito ha expirado, lo vaciamos y reiniciamos
-            await CartItem.destroy({ where: { cartId: cart.id } });
+            await reservationService.releaseCart(cart.id, transaction);
             cart.expiresAt = expirationTime;
-            await cart.save();
+            await cart.save({ transaction });
         }
 
         return cart;
     }
 
     /**
-     * Añade un ítem al carrito, verificando el stock disponible.
+     * Añade un ítem al carrito, reservando el stock en el libro de reservas.
      */
     async addItem(userId, ticketTypeId, quantity) {
+        quantity = parseInt(quantity, 10);
         const transaction = await sequelize.transaction();
         try {
-            const cart = await this.getOrCreateCartForUser(userId);
+            const cart = await this.getOrCreateCartForUser(userId, transaction);
 
             const ticketType = await TicketType.findByPk(ticketTypeId, { transaction });
             if (!ticketType) {
@@ -48,44 +49,20 @@ class CartService {
                 throw new BadRequestError(`No puedes comprar más de ${ticketType.maxPerPurchase} entradas de este tipo por transacción.`);
             }
 
-            // Verificar stock: total - vendidos - reservados en otros carritos
-            // Primero obtenemos los IDs de carritos que no han expirado
-            const activeCartIds = await Cart.findAll({
-                where: {
-                    expiresAt: {
-                        [Op.gt]: new Date()
-                    }
-                },
-                attributes: ['id'],
-                transaction
-            });
-
-            const activeCartIdValues = activeCartIds.map(cart => cart.id);
-
-            // Luego calculamos la cantidad reservada para este tipo de ticket
-            const reservedQuantity = await CartItem.sum('quantity', {
-                where: {
-                    ticketTypeId,
-                    cartId: {
-                        [Op.in]: activeCartIdValues.length > 0 ? activeCartIdValues : [0]
-                    }
-                },
-                transaction
-            }) || 0;
-
-            const availableStock = ticketType.quantity - ticketType.sold - reservedQuantity;
-            if (quantity > availableStock) {
+            // Verificar y reservar stock (total - vendidos - reservados) en una sola sentencia
+            const reserved = await reservationService.reserve(ticketType.id, quantity, transaction);
+            if (!reserved) {
                 throw new ConflictError('No hay suficientes entradas disponibles para satisfacer la solicitud.');
             }
 
-            let cartItem = await CartItem.findOne({ where: { cartId: cart.id, ticketTypeId } });
+            let cartItem = await CartItem.findOne({ where: { cartId: cart.id, ticketTypeId: ticketType.id }, transaction });
             if (cartItem) {
                 cartItem.quantity += quantity;
                 await cartItem.save({ transaction });
             } else {
                 await CartItem.create({
                     cartId: cart.id,
-                    ticketTypeId,
+                    ticketTypeId: ticketType.id,
                     quantity,
                     priceAtReservation: ticketType.price
                 }, { transaction });
@@ -94,7 +71,9 @@ class CartService {
             await transaction.commit();
             return this.getCart(userId);
         } catch (error) {
-            await transaction.rollback();
+            if (!transaction.finished) {
+                await transaction.rollback();
+            }
             throw error; // Re-lanza el error para que sea manejado por el controlador
         }
     }
@@ -160,16 +139,22 @@ class CartService {
     }
 
     async removeItem(userId, itemId) {
-        const cart = await this.getOrCreateCartForUser(userId);
-        const result = await CartItem.destroy({ where: { id: itemId, cartId: cart.id } });
-        if (result === 0) {
-            throw new NotFoundError('El ítem no existe en el carrito.');
-        }
+        await sequelize.transaction(async (transaction) => {
+            const cart = await this.getOrCreateCartForUser(userId, transaction);
+            const item = await CartItem.findOne({ where: { id: itemId, cartId: cart.id }, transaction });
+            if (!item) {
+                throw new NotFoundError('El ítem no existe en el carrito.');
+            }
+            await item.destroy({ transaction });
+            await reservationService.release([item], transaction);
+        });
     }
 
     async clearCart(userId) {
-        const cart = await this.getOrCreateCartForUser(userId);
-        await CartItem.destroy({ where: { cartId: cart.id } });
+        await sequelize.transaction(async (transaction) => {
+            const cart = await this.getOrCreateCartForUser(userId, transaction);
+            await reservationService.releaseCart(cart.id, transaction);
+        });
     }
 }
 
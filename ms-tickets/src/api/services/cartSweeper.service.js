@@ -0,0 +1,167 @@
+// src/api/services/cartSweeper.service.js
+const { sequelize, Cart, CartItem, TicketType } = require('../models');
+const { Op } = require('sequelize');
+const reservationService = require('./reservation.service');
+const ticketTypeService = require('./ticketType.service');
+const websocketService = require('./websocket.service');
+
+const SWEEP_INTERVAL_MS = parseInt(process.env.CART_SWEEP_INTERVAL_MS, 10) || 30000;
+const SWEEP_BATCH_SIZE = parseInt(process.env.CART_SWEEP_BATCH_SIZE, 10) || 500;
+// Tope de lotes por barrido para no acaparar el pool tras una venta masiva
+const SWEEP_MAX_BATCHES = parseInt(process.env.CART_SWEEP_MAX_BATCHES, 10) || 20;
+
+/**
+ * Barrido periódico de carritos expirados.
+ *
+ * Busca los carritos con `expires_at` vencido (índice sobre expires_at), borra
+ * sus ítems y el propio carrito por lotes, devuelve el stock al libro de
+ * reservas y notifica `cart-expired` a cada usuario y un único `stock-updated`
+ * por tipo de ticket afectado en todo el barrido.
+ */
+class CartSweeperService {
+    constructor() {
+        this.timer = null;
+        this.running = false;
+        this.stats = {
+            sweeps: 0,
+            cartsReclaimed: 0,
+            itemsReclaimed: 0,
+            ticketsReleased: 0,
+            errors: 0,
+            lastSweepAt: null,
+            lastDurationMs: 0,
+            maxDurationMs: 0,
+            totalDurationMs: 0
+        };
+    }
+
+    start(intervalMs = SWEEP_INTERVAL_MS) {
+        if (this.timer) return;
+        this.timer = setInterval(() => this.sweep(), intervalMs);
+        this.timer.unref();
+        console.log(`🧹 Barrido de carritos expirados cada ${intervalMs / 1000}s (lotes de ${SWEEP_BATCH_SIZE})`);
+    }
+
+    stop() {
+        clearInterval(this.timer);
+        this.timer = null;
+    }
+
+    async sweep() {
+        // Un barrido lento no se solapa con el siguiente tick
+        if (this.running) return;
+        this.running = true;
+
+        const startedAt = Date.now();
+        const touchedTicketTypes = new Set();
+        let carts = 0;
+        let items = 0;
+        let tickets = 0;
+        try {
+            for (let batch = 0; batch < SWEEP_MAX_BATCHES; batch++) {
+                const result = await this.sweepBatch(new Date());
+                carts += result.carts.length;
+                items += result.items.length;
+                for (const item of result.items) {
+                    tickets += item.quantity;
+                    touchedTicketTypes.add(item.ticketTypeId);
+                }
+                this.notifyExpiredCarts(result.carts, result.items);
+                if (result.carts.length < SWEEP_BATCH_SIZE) break;
+            }
+            await this.notifyStockChanges(touchedTicketTypes);
+        } catch (error) {
+            this.stats.errors++;
+            console.error('❌ Error en el barrido de carritos expirados:', error);
+        } finally {
+            this.running = false;
+            this.recordSweep(Date.now() - startedAt, carts, items, tickets);
+        }
+    }
+
+    /**
+     * Un lote en una transacción: bloquea hasta SWEEP_BATCH_SIZE carritos
+     * expirados, borra sus ítems y libera la reserva, y borra los carritos
+     * (getOrCreateCartForUser crea uno nuevo cuando el usuario vuelve).
+     *
+     * El bloqueo FOR UPDATE es el mismo que toman CartService y OrderService:
+     * si un usuario renueva o compra su carrito a la vez, la condición de
+     * expiración se vuelve a evaluar y el carrito queda fuera del lote.
+     */
+    async sweepBatch(now) {
+        return sequelize.transaction(async (transaction) => {
+            const carts = await Cart.findAll({
+                where: { expiresAt: { [Op.lt]: now } },
+                attributes: ['id', 'userId', 'expiresAt'],
+                order: [['expiresAt', 'ASC']],
+                limit: SWEEP_BATCH_SIZE,
+                lock: transaction.LOCK.UPDATE,
+                transaction
+            });
+            if (carts.length === 0) {
+                return { carts, items: [] };
+            }
+
+            const cartIds = carts.map(cart => cart.id);
+            const items = await CartItem.findAll({
+                where: { cartId: { [Op.in]: cartIds } },
+                attributes: ['id', 'cartId', 'ticketTypeId', 'quantity'],
+                transaction
+            });
+
+            if (items.length > 0) {
+                await CartItem.destroy({ where: { cartId: { [Op.in]: cartIds } }, transaction });
+                await reservationService.release(items, transaction);
+            }
+            await Cart.destroy({ where: { id: { [Op.in]: cartIds } }, transaction });
+
+            return { carts, items };
+        });
+    }
+
+    notifyExpiredCarts(carts, items) {
+        const itemsPerCart = new Map();
+        for (const item of items) {
+            itemsPerCart.set(item.cartId, (itemsPerCart.get(item.cartId) || 0) + 1);
+        }
+        for (const cart of carts) {
+            // Los carritos vacíos no retenían nada: no hay nada que avisar
+            const itemsCount = itemsPerCart.get(cart.id);
+            if (itemsCount) {
+                websocketService.notifyCartExpired(cart.userId, { id: cart.id, expiresAt: cart.expiresAt, itemsCount });
+            }
+        }
+    }
+
+    async notifyStockChanges(ticketTypeIds) {
+        if (ticketTypeIds.size === 0) return;
+        const ticketTypes = await TicketType.findAll({
+            where: { id: { [Op.in]: [...ticketTypeIds] } },
+            attributes: ['id', 'eventId', 'quantity', 'sold', 'reserved']
+        });
+        for (const ticketType of ticketTypes) {
+            ticketTypeService.notifyStockChange(ticketType);
+        }
+    }
+
+    recordSweep(durationMs, carts, items, tickets) {
+        const stats = this.stats;
+        stats.sweeps++;
+        stats.cartsReclaimed += carts;
+        stats.itemsReclaimed += items;
+        stats.ticketsReleased += tickets;
+        stats.lastSweepAt = new Date().toISOString();
+        stats.lastDurationMs = durationMs;
+        stats.maxDurationMs = Math.max(stats.maxDurationMs, durationMs);
+        stats.totalDurationMs += durationMs;
+        if (carts > 0) {
+            console.log(`🧹 Barrido: ${carts} carritos, ${items} ítems y ${tickets} entradas liberadas en ${durationMs}ms`);
+        }
+    }
+
+    getStats() {
+        return { ...this.stats, running: this.running };
+    }
+}
+
+module.exports = new CartSweeperService();
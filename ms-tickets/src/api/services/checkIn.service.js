@@ -0,0 +1,417 @@
+// src/api/services/checkIn.service.js
+const crypto = require('crypto');
+const { Op, QueryTypes } = require('sequelize');
+const { sequelize, Ticket } = require('../models');
+const { NotFoundError, AppError, BadRequestError } = require('../../utils/errors');
+const websocketService = require('./websocket.service');
+const { assertCanManageEvent } = require('./eventAccess.service');
+
+const QR_SECRET = process.env.JWT_SECRET || 'tu-jwt-secret-super-secreto';
+const CHECKIN_BATCH_MAX = parseInt(process.env.CHECKIN_BATCH_MAX, 10) || 500;
+const CHECKIN_FLUSH_MS = parseInt(process.env.CHECKIN_FLUSH_MS, 10) || 10;
+const CHECKIN_SYNC_DEFAULT_LIMIT = parseInt(process.env.CHECKIN_SYNC_DEFAULT_LIMIT, 10) || 1000;
+const CHECKIN_SYNC_MAX_LIMIT = parseInt(process.env.CHECKIN_SYNC_MAX_LIMIT, 10) || 5000;
+const CHECKIN_SYNC_SETTLE_MS = process.env.CHECKIN_SYNC_SETTLE_MS !== undefined
+    ? parseInt(process.env.CHECKIN_SYNC_SETTLE_MS, 10)
+    : 5000;
+
+// event_id es INT8: pg lo devuelve como string, y en el QR va tal como lo
+// guardó generateTicketsForOrder. Los índices se indexan siempre por el string.
+const indexKey = (eventId) => String(eventId);
+
+// En SQLite (NODE_ENV=test) las fechas son texto; en CockroachDB/Postgres el
+// VALUES necesita el tipo explícito para asignarlo a check_in_timestamp
+const TIMESTAMP_TYPE = sequelize.getDialect() === 'sqlite' ? 'TEXT' : 'TIMESTAMPTZ';
+
+const RESULT_MESSAGES = {
+    VALIDATED: 'Acceso permitido.',
+    ALREADY_USED: 'Acceso permitido (previamente validado).',
+    CANCELLED: 'La entrada ha sido cancelada o reembolsada.',
+    NOT_FOUND: 'La entrada no existe en el sistema.',
+    DUPLICATE: 'Código repetido en el mismo lote.',
+};
+
+/**
+ * Motor de check-in para la apertura de puertas.
+ *
+ * - Cada lote de escaneos se marca como USED con una única sentencia
+ *   (UPDATE ... FROM VALUES ... WHERE status = 'VALID' RETURNING), que es
+ *   atómica: un código solo puede validarse una vez aunque dos puertas lo
+ *   escaneen a la vez. Los escaneos individuales de POST /check-in se agrupan
+ *   durante CHECKIN_FLUSH_MS y van en la misma sentencia.
+ * - `preload(eventId)` carga en memoria el estado de todas las entradas del
+ *   evento. Con el índice cargado los reescaneos de entradas ya usadas o
+ *   canceladas se responden sin ir a la base de datos; el resto sigue pasando
+ *   por el UPDATE, que es quien decide.
+ * - `sync(eventId, cursor)` devuelve las entradas del evento cambiadas desde
+ *   el cursor, para que los escáneres validen sin conexión y suban después sus
+ *   escaneos por lotes (con `scannedAt`).
+ */
+class CheckInService {
+    constructor() {
+        this.indexes = new Map(); // indexKey(eventId) -> { tickets: Map<ticketCode, estado>, loadedAt }
+        this.pending = [];
+        this.timer = null;
+        this.stats = {
+            scans: 0,
+            validated: 0,
+            alreadyUsed: 0,
+            rejected: 0,
+            indexHits: 0,
+            statements: 0,
+            batches: 0,
+            lastBatchSize: 0,
+            lastStatementMs: 0,
+            maxStatementMs: 0
+        };
+    }
+
+    /** Firma del QR: HMAC-SHA256 del payload en JSON. */
+    sign(qrPayload) {
+        return crypto.createHmac('sha256', QR_SECRET).update(JSON.stringify(qrPayload)).digest('hex');
+    }
+
+    /**
+     * Lee y verifica el contenido de un QR.
+     * @returns {{ticketCode: string, eventId: string|number}}
+     */
+    parseQr(qrCodeData) {
+        let payload;
+        try {
+            payload = JSON.parse(qrCodeData);
+        } catch (e) {
+            throw new AppError('Formato de QR inválido.', 400);
+        }
+
+        const { sig, ...dataToVerify } = payload;
+        if (!sig) {
+            throw new AppError('Firma del QR ausente.', 400);
+        }
+
+        const expected = Buffer.from(this.sign(dataToVerify), 'hex');
+        const received = Buffer.from(String(sig), 'hex');
+        if (received.length !== expected.length || !crypto.timingSafeEqual(received, expected)) {
+            throw new AppError('Firma del QR inválida. Posible falsificación.', 400);
+        }
+        return { ticketCode: payload.ticketCode, eventId: payload.eventId };
+    }
+
+    /**
+     * Check-in de un solo QR. Se agrupa con los escaneos que lleguen en los
+     * siguientes CHECKIN_FLUSH_MS y se valida en la misma sentencia.
+     */
+    async checkIn(qrCodeData) {
+        const scan = this.parseQr(qrCodeData);
+        const result = await new Promise((resolve, reject) => {
+            this.pending.push({ scan, resolve, reject });
+            if (this.pending.length >= CHECKIN_BATCH_MAX) {
+                this.flush();
+            } else if (!this.timer) {
+                this.timer = setTimeout(() => this.flush(), CHECKIN_FLUSH_MS);
+            }
+        });
+
+        if (result.status === 'NOT_FOUND') {
+            throw new NotFoundError(result.message);
+        }
+        if (result.status === 'CANCELLED') {
+            throw new AppError(result.message, 410); // 410 Gone
+        }
+        // Otra puerta validó el mismo código en esta ventana
+        if (result.status === 'DUPLICATE') {
+            return { ...result, status: 'ALREADY_USED', message: RESULT_MESSAGES.ALREADY_USED };
+        }
+        return result;
+    }
+
+    async flush() {
+        clearTimeout(this.timer);
+        this.timer = null;
+        const batch = this.pending.splice(0, CHECKIN_BATCH_MAX);
+        if (batch.length === 0) return;
+        if (this.pending.length > 0) {
+            this.timer = setTimeout(() => this.flush(), 0);
+        }
+
+        try {
+            const results = await this.validate(batch.map(item => item.scan));
+            batch.forEach((item, i) => item.resolve(results[i]));
+        } catch (error) {
+            batch.forEach(item => item.reject(error));
+        }
+    }
+
+    /**
+     * Valida un lote de QR (POST /check-in/batch). Los QR con formato o firma
+     * inválidos se devuelven como INVALID sin tocar la base de datos.
+     * @param {Array<{qrCodeData: string, scannedAt?: string}>} scans
+     */
+    async validateBatch(scans) {
+        if (scans.length > CHECKIN_BATCH_MAX) {
+            throw new BadRequestError(`Un lote admite como mucho ${CHECKIN_BATCH_MAX} escaneos.`);
+        }
+        const parsed = scans.map(({ qrCodeData, scannedAt }) => {
+            try {
+                return { ...this.parseQr(qrCodeData), scannedAt };
+            } catch (error) {
+                return { error };
+            }
+        });
+        const valid = parsed.filter(scan => !scan.error);
+        const results = await this.validate(valid);
+
+        let next = 0;
+        const all = parsed.map(scan => scan.error
+            ? { ticketCode: null, status: 'INVALID', message: scan.error.message }
+            : results[next++]);
+        const summary = {};
+        for (const { status } of all) {
+            summary[status] = (summary[status] || 0) + 1;
+        }
+        return { results: all, summary };
+    }
+
+    /**
+     * Núcleo del motor: índice en memoria, un UPDATE para todo el lote y una
+     * lectura de los códigos que no se pudieron marcar para saber por qué.
+     * Devuelve un resultado por escaneo, en el mismo orden.
+     */
+    async validate(scans) {
+        this.stats.batches++;
+        this.stats.lastBatchSize = scans.length;
+        this.stats.scans += scans.length;
+        const now = new Date();
+        const results = new Array(scans.length);
+        const toUpdate = new Map(); // ticketCode -> fecha del escaneo
+        const positions = new Map(); // ticketCode -> posición del primer escaneo
+        const duplicates = [];
+
+        scans.forEach((scan, i) => {
+            if (positions.has(scan.ticketCode)) {
+                duplicates.push(i);
+                return;
+            }
+            positions.set(scan.ticketCode, i);
+
+            const known = this.indexes.get(indexKey(scan.eventId))?.tickets.get(scan.ticketCode);
+            if (known && known.status !== 'VALID') {
+                this.stats.indexHits++;
+                results[i] = this.result(scan.ticketCode, known.status === 'USED' ? 'ALREADY_USED' : 'CANCELLED', known);
+                return;
+            }
+            // Un escaneo sin conexión conserva su hora, pero nunca en el futuro
+            const scannedAt = scan.scannedAt ? new Date(Math.min(new Date(scan.scannedAt).getTime(), now.getTime())) : now;
+            toUpdate.set(scan.ticketCode, Number.isNaN(scannedAt.getTime()) ? now : scannedAt);
+        });
+
+        if (toUpdate.size > 0) {
+            const updated = await this.markUsed(toUpdate, now);
+            const updatedCodes = new Set(updated.map(row => row.ticketCode));
+            for (const row of updated) {
+                results[positions.get(row.ticketCode)] = this.result(row.ticketCode, 'VALIDATED', row);
+                this.remember(row.eventId, row);
+            }
+
+            const rest = [...toUpdate.keys()].filter(code => !updatedCodes.has(code));
+            if (rest.length > 0) {
+                const rows = await Ticket.findAll({
+                    where: { ticketCode: { [Op.in]: rest } },
+                    attributes: ['ticketCode', 'eventId', 'status', 'checkInTimestamp', 'ownerName'],
+                    raw: true
+                });
+                const byCode = new Map(rows.map(row => [row.ticketCode, row]));
+                for (const code of rest) {
+                    const row = byCode.get(code);
+                    const status = !row ? 'NOT_FOUND' : row.status === 'CANCELLED' ? 'CANCELLED' : 'ALREADY_USED';
+                    results[positions.get(code)] = this.result(code, status, row);
+                    if (row) this.remember(row.eventId, row);
+                }
+            }
+            this.notifyValidated(updated);
+        }
+
+        // Los repetidos dentro del lote corren la suerte del primero; si ese entró, son DUPLICATE
+        for (const i of duplicates) {
+            const first = results[positions.get(scans[i].ticketCode)];
+            const status = first.status === 'VALIDATED' || first.status === 'ALREADY_USED' ? 'DUPLICATE' : first.status;
+            results[i] = { ...first, status, message: RESULT_MESSAGES[status] };
+        }
+
+        for (const { status } of results) {
+            if (status === 'VALIDATED') this.stats.validated++;
+            else if (status === 'ALREADY_USED') this.stats.alreadyUsed++;
+            else this.stats.rejected++;
+        }
+        return results;
+    }
+
+    /** Marca como USED, en una sentencia, los códigos que sigan VALID. Devuelve las filas marcadas. */
+    async markUsed(scannedAtByCode, now) {
+        const replacements = { now };
+        const values = [...scannedAtByCode].map(([ticketCode, scannedAt], i) => {
+            replacements[`code${i}`] = ticketCode;
+            replacements[`at${i}`] = scannedAt;
+            return `(:code${i}, CAST(:at${i} AS ${TIMESTAMP_TYPE}))`;
+        });
+
+        const startedAt = Date.now();
+        const rows = await sequelize.query(
+            `UPDATE tickets AS t
+                SET status = 'USED', check_in_timestamp = v.scanned_at, updated_at = :now
+               FROM (VALUES ${values.join(', ')}) AS v (ticket_code, scanned_at)
+              WHERE t.ticket_code = v.ticket_code AND t.status = 'VALID'
+          RETURNING t.ticket_code AS "ticketCode", t.event_id AS "eventId", t.user_id AS "userId",
+                    t.owner_name AS "ownerName", t.check_in_timestamp AS "checkInTimestamp"`,
+            { replacements, type: QueryTypes.SELECT }
+        );
+        const durationMs = Date.now() - startedAt;
+        this.stats.statements++;
+        this.stats.lastStatementMs = durationMs;
+        this.stats.maxStatementMs = Math.max(this.stats.maxStatementMs, durationMs);
+        return rows;
+    }
+
+    result(ticketCode, status, row = {}) {
+        return {
+            ticketCode,
+            status,
+            message: RESULT_MESSAGES[status],
+            checkInTimestamp: row.checkInTimestamp || null,
+            ownerName: row.ownerName || null
+        };
+    }
+
+    // Actualiza el índice del evento, si está cargado
+    remember(eventId, row) {
+        const index = this.indexes.get(indexKey(eventId));
+        if (!index) return;
+        index.tickets.set(row.ticketCode, {
+            status: row.status || 'USED',
+            checkInTimestamp: row.checkInTimestamp,
+            ownerName: row.ownerName
+        });
+    }
+
+    // Un mensaje por evento y lote en lugar de uno por entrada
+    notifyValidated(rows) {
+        const byEvent = new Map();
+        for (const row of rows) {
+            if (!byEvent.has(row.eventId)) byEvent.set(row.eventId, []);
+            byEvent.get(row.eventId).push({
+                ticketCode: row.ticketCode,
+                userId: row.userId,
+                validatedAt: row.checkInTimestamp
+            });
+        }
+        for (const [eventId, validations] of byEvent) {
+            websocketService.notifyTicketsValidated(eventId, validations);
+        }
+    }
+
+    // El índice y la sincronización exponen los códigos de todas las entradas del evento
+    assertCanManage(eventId, user) {
+        return assertCanManageEvent(eventId, user, 'No puedes gestionar el check-in de un evento que no organizas.');
+    }
+
+    /** Carga (o recarga) en memoria el estado de todas las entradas del evento. */
+    async preload(eventId, user) {
+        await this.assertCanManage(eventId, user);
+        const rows = await Ticket.findAll({
+            where: { eventId },
+            attributes: ['ticketCode', 'status', 'checkInTimestamp', 'ownerName'],
+            raw: true
+        });
+        const tickets = new Map();
+        let used = 0;
+        for (const { ticketCode, ...state } of rows) {
+            tickets.set(ticketCode, state);
+            if (state.status === 'USED') used++;
+        }
+        const loadedAt = new Date();
+        this.indexes.set(indexKey(eventId), { tickets, loadedAt });
+        return { eventId, tickets: tickets.size, used, loadedAt };
+    }
+
+    async unload(eventId, user) {
+        await this.assertCanManage(eventId, user);
+        return this.indexes.delete(indexKey(eventId));
+    }
+
+    /**
+     * Entradas del evento cambiadas desde `cursor`, en orden (updatedAt, id).
+     * Sin cursor se empieza desde el principio (descarga completa). Solo se
+     * devuelven cambios con más de CHECKIN_SYNC_SETTLE_MS de antigüedad, para
+     * que una transacción que aún no ha confirmado no quede por detrás del
+     * cursor. Con `hasMore` el escáner debe pedir la página siguiente.
+     */
+    async sync(eventId, { cursor, limit } = {}, user) {
+        await this.assertCanManage(eventId, user);
+        const pageSize = Math.min(parseInt(limit, 10) || CHECKIN_SYNC_DEFAULT_LIMIT, CHECKIN_SYNC_MAX_LIMIT);
+        const conditions = [
+            { eventId },
+            { updatedAt: { [Op.lte]: new Date(Date.now() - CHECKIN_SYNC_SETTLE_MS) } }
+        ];
+        if (cursor) {
+            const { updatedAt, id } = this.decodeSyncCursor(cursor);
+            conditions.push({
+                [Op.or]: [
+                    { updatedAt: { [Op.gt]: updatedAt } },
+                    { updatedAt, id: { [Op.gt]: id } }
+                ]
+            });
+        }
+
+        const rows = await Ticket.findAll({
+            where: { [Op.and]: conditions },
+            attributes: ['id', 'ticketCode', 'status', 'checkInTimestamp', 'updatedAt'],
+            order: [['updatedAt', 'ASC'], ['id', 'ASC']],
+            limit: pageSize + 1,
+            raw: true
+        });
+        const hasMore = rows.length > pageSize;
+        const page = hasMore ? rows.slice(0, pageSize) : rows;
+        const last = page[page.length - 1];
+
+        return {
+            tickets: page.map(({ ticketCode, status, checkInTimestamp }) => ({ ticketCode, status, checkInTimestamp })),
+            // Sin cambios nuevos el cursor no se mueve
+            cursor: last ? this.encodeSyncCursor(last) : cursor || null,
+            hasMore
+        };
+    }
+
+    encodeSyncCursor(row) {
+        return Buffer.from(JSON.stringify([new Date(row.updatedAt).toISOString(), row.id])).toString('base64url');
+    }
+
+    decodeSyncCursor(cursor) {
+        try {
+            const [updatedAt, id] = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf8'));
+            const date = new Date(updatedAt);
+            if (Number.isNaN(date.getTime()) || id === undefined) throw new Error('cursor incompleto');
+            return { updatedAt: date, id };
+        } catch (error) {
+            throw new BadRequestError('El cursor de sincronización no es válido.');
+        }
+    }
+
+    async stop() {
+        await this.flush();
+    }
+
+    getStats() {
+        return {
+            ...this.stats,
+            pending: this.pending.length,
+            batchMax: CHECKIN_BATCH_MAX,
+            flushMs: CHECKIN_FLUSH_MS,
+            indexes: [...this.indexes].map(([eventId, { tickets, loadedAt }]) => ({
+                eventId,
+                tickets: tickets.size,
+                loadedAt
+            }))
+        };
+    }
+}
+
+module.exports = new CheckInService();
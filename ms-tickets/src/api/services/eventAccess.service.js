@@ -0,0 +1,22 @@
+// src/api/services/eventAccess.service.js
+const { EventReplica } = require('../models');
+const { NotFoundError, ForbiddenError } = require('../../utils/errors');
+
+/**
+ * Comprueba que `user` (payload del JWT) puede gestionar el evento: un admin
+ * siempre, un organizer solo si es el organizador del evento según
+ * events_replica. Lanza NotFoundError o ForbiddenError (con `message`).
+ */
+const assertCanManageEvent = async (eventId, user, message) => {
+    if (user.role === 'admin') return;
+    const event = await EventReplica.findByPk(eventId, { attributes: ['id', 'organizerId'] });
+    if (!event) {
+        throw new NotFoundError(`Evento con ID ${eventId} no encontrado.`);
+    }
+    // organizer_id es INT8 (string) y `sub` del JWT es un número
+    if (String(event.organizerId) !== String(user.sub)) {
+        throw new ForbiddenError(message);
+    }
+};
+
+module.exports = { assertCanManageEvent };
@@ -1,30 +1,32 @@
 // src/api/services/order.service.js
 const { sequelize, Cart, CartItem, Order, OrderItem, TicketType } = require('../models');
-const { NotFoundError, ConflictError, BadRequestError } = require('../../utils/errors');
+const { Op } = require('sequelize');
+const { NotFoundError, ConflictError, BadRequestError, AppError } = require('../../utils/errors');
+const { findPage, parseLimit } = require('../../utils/pagination');
 const cartService = require('./cart.service'); // Reutilizamos el servicio de carrito
 const ticketService = require('./ticket.service');
-const publisherService = require('./publisher.service');
+const outboxService = require('./outbox.service');
 const websocketService = require('./websocket.service');
 const ticketTypeService = require('./ticketType.service');
+const reservationService = require('./reservation.service');
 
-// Simulación de un servicio de pasarela de pago
-const paymentGatewayService = {
-    processPayment: async (paymentMethodId, amount) => {
-        // En un sistema real, aquí se haría una llamada a Stripe, PayPal, etc.
-        console.log(`Procesando pago por ${amount} con método ${paymentMethodId}`);
-        if (paymentMethodId.startsWith('fail')) {
-            return { success: false, transactionId: null, message: 'Pago rechazado por la pasarela.' };
-        }
-        return { success: true, transactionId: `pi_${Date.now()}`, message: 'Pago exitoso.' };
-    }
-};
+const paymentGatewayService = require('./paymentGateway.service');
+const orderQueueService = require('./orderQueue.service');
+
+// Un pedido asíncrono que sigue PENDING pasado este tiempo se da por perdido
+// (p. ej. la instancia que lo aceptó se reinició) y se libera su reserva.
+const PENDING_ORDER_TIMEOUT_MS = parseInt(process.env.PENDING_ORDER_TIMEOUT_MS, 10) || 10 * 60 * 1000;
 
 class OrderService {
 
-    async createOrderFromCart(userId, paymentDetails, userEmail) {
+    async createOrderFromCart(userId, paymentDetails, userEmail, correlationId) {
         const transaction = await sequelize.transaction();
+        let paymentResult = null;
+        let totalAmount = 0;
         try {
-            // 1. Obtener el carrito del usuario y validar que no esté vacío o expirado
+            // 1. Obtener el carrito del usuario y validar que no esté vacío o expirado.
+            // Se bloquea la fila del carrito para que su reserva no se libere mientras se compra.
+            await Cart.findOne({ where: { userId }, attributes: ['id'], lock: transaction.LOCK.UPDATE, transaction });
             const cart = await Cart.findOne({
                 where: { userId },
                 include: [{ model: CartItem, as: 'items', include: [{ model: TicketType, as: 'ticketType' }] }],
@@ -36,7 +38,6 @@ class OrderService {
             }
 
             // 2. Verificar stock por última vez (race condition) y calcular total
-            let totalAmount = 0;
             for (const item of cart.items) {
                 const ticketType = item.ticketType;
                 if (item.quantity > ticketType.quantity - ticketType.sold) {
@@ -54,7 +55,7 @@ class OrderService {
             });
 
             // 4. Procesar el pago
-            const paymentResult = await paymentGatewayService.processPayment(
+            paymentResult = await paymentGatewayService.processPayment(
                 paymentDetails.paymentMethodId,
                 totalAmount
             );
@@ -86,44 +87,35 @@ class OrderService {
                 billingAddress: paymentDetails.billingAddress
             }, { transaction });
 
-            // 5. Mover ítems del carrito a ítems del pedido, actualizar stock y GENERAR ENTRADAS
-            for (const item of cart.items) {
-                const orderItem = await OrderItem.create({
-                    orderId: order.id,
-                    ticketTypeId: item.ticketTypeId,
-                    quantity: item.quantity,
-                    priceAtPurchase: item.priceAtReservation,
-                }, { transaction });
-
-                // Actualizar la cantidad vendida del tipo de ticket
-                await TicketType.increment('sold', {
-                    by: item.quantity,
-                    where: { id: item.ticketTypeId },
-                    transaction
-                });
-
-                // *** NUEVO: Generar las entradas para este OrderItem ***
-                await ticketService.generateTicketsForOrderItem(orderItem, transaction);
+            // 5. Mover ítems del carrito a ítems del pedido, actualizar stock y GENERAR ENTRADAS.
+            // Son sentencias sobre el conjunto de ítems: el número de viajes a la base
+            // de datos (y el tiempo con la transacción abierta) no crece con el carrito.
+            const orderItems = await OrderItem.bulkCreate(cart.items.map(item => ({
+                orderId: order.id,
+                ticketTypeId: item.ticketTypeId,
+                quantity: item.quantity,
+                priceAtPurchase: item.priceAtReservation,
+            })), { transaction, returning: true });
 
-                // *** WebSocket: Notificar cambio de stock ***
-                const updatedTicketType = await TicketType.findByPk(item.ticketTypeId);
-                ticketTypeService.notifyStockChange(updatedTicketType);
+            // Pasar la reserva del carrito a vendidas; falla entero si algún tipo se agotó
+            const updatedTicketTypes = await reservationService.commitSale(cart.items, transaction);
+            if (!updatedTicketTypes) {
+                throw new ConflictError('No hay suficientes entradas para completar el pedido.');
             }
 
-            // 6. Vaciar el carrito
+            const ticketTypesById = new Map(cart.items.map(item => [item.ticketTypeId, item.ticketType]));
+            await ticketService.generateTicketsForOrder(order, orderItems, ticketTypesById, transaction);
+
+            // 6. Vaciar el carrito (su reserva ya se contabilizó como vendida)
             await CartItem.destroy({ where: { cartId: cart.id }, transaction });
 
+            // 7. purchase.completed se publica desde el outbox si la transacción se confirma
+            await outboxService.add('purchase.completed', this.purchaseCompletedPayload(order, { userEmail, correlationId }),
+                transaction, { correlationId });
+
             // Si todo fue exitoso hasta aquí, confirmar la transacción
             await transaction.commit();
 
-            // *** WebSocket: Notificar tickets generados ***
-            const totalTickets = cart.items.reduce((sum, item) => sum + item.quantity, 0);
-            websocketService.notifyTicketsGenerated(userId, {
-                orderId: order.id,
-                ticketsCount: totalTickets,
-                downloadUrl: `/api/v1/orders/${order.id}/tickets`
-            });
-
             // Preparar datos para retornar
             const orderResponse = {
                 id: order.id,
@@ -133,26 +125,7 @@ class OrderService {
                 mensaje: '¡Gracias por tu compra! Tus entradas han sido generadas.'
             };
 
-            // Intentar enviar evento de notificación (no crítico, la orden ya fue creada)
-            try {
-                // En un sistema real, aquí se emitiría un evento para el microservicio de tickets/notificaciones
-                // para generar los tickets QR y enviarlos al usuario.
-                const eventPayload = {
-                    userEmail: userEmail, // Ahora incluimos el email del usuario
-                    userName: paymentDetails.billingAddress.nombreCompleto,
-                    orderDetails: {
-                        id: order.id,
-                        codigoPedido: order.orderCode,
-                        totalAmount: parseFloat(order.totalAmount),
-                        currency: order.currency
-                    }
-                };
-                await publisherService.publishMessage('purchase.completed', eventPayload);
-            } catch (notificationError) {
-                // Log del error pero no fallar la operación ya que la orden se creó exitosamente
-                console.error('Error enviando notificación de compra completada:', notificationError);
-                // Opcionalmente, podrías agregar aquí lógica para reintento posterior
-            }
+            this.notifyOrderCompleted(order, cart.items, updatedTicketTypes);
 
             return orderResponse;
 
@@ -160,32 +133,329 @@ class OrderService {
             // Solo hacer rollback si la transacción no ha sido committeada
             if (!transaction.finished) {
                 await transaction.rollback();
+                // Cobrado pero sin pedido: se devuelve el pago antes de propagar el error
+                if (paymentResult && paymentResult.success) {
+                    await this.refundCharge(userId, null, paymentResult.transactionId, totalAmount,
+                        'No se pudo completar el pedido. Se ha reembolsado el pago.');
+                }
             }
             throw error;
         }
     }
 
-    async findUserOrders(userId, { page = 1, limit = 10 }) {
-        const offset = (page - 1) * limit;
-        const { count, rows } = await Order.findAndCountAll({
-            where: { userId },
-            limit,
-            offset,
-            order: [['createdAt', 'DESC']],
-            attributes: ['id', 'orderCode', 'totalAmount', 'status', 'createdAt'],
+    /**
+     * Checkout asíncrono: convierte el carrito en un pedido PENDING en una
+     * transacción corta (sin llamar a la pasarela) y encola el pago. El resultado
+     * llega por websocket (payment-status / tickets-generated) y se puede
+     * consultar en GET /api/v1/orders/:id.
+     *
+     * La reserva del carrito pasa al pedido pendiente: sus cantidades siguen
+     * contando en ticket_types.reserved hasta que el worker las vende o las libera.
+     */
+    async acceptOrderFromCart(userId, paymentDetails, userEmail, correlationId) {
+        if (orderQueueService.isFull()) {
+            orderQueueService.reject();
+            throw new AppError('Hay demasiados pedidos en proceso. Inténtalo de nuevo en unos segundos.', 503);
+        }
+
+        const order = await sequelize.transaction(async (transaction) => {
+            await Cart.findOne({ where: { userId }, attributes: ['id'], lock: transaction.LOCK.UPDATE, transaction });
+            const cart = await Cart.findOne({
+                where: { userId },
+                include: [{ model: CartItem, as: 'items' }],
+                transaction
+            });
+
+            if (!cart || cart.items.length === 0 || new Date(cart.expiresAt) < new Date()) {
+                throw new BadRequestError('El carrito está vacío o la reserva ha expirado.');
+            }
+
+            const totalAmount = parseFloat(cart.items
+                .reduce((sum, item) => sum + item.quantity * item.priceAtReservation, 0)
+                .toFixed(2));
+
+            const pendingOrder = await Order.create({
+                userId,
+                totalAmount,
+                currency: 'USD',
+                status: 'PENDING',
+                billingAddress: paymentDetails.billingAddress
+            }, { transaction });
+
+            await OrderItem.bulkCreate(cart.items.map(item => ({
+                orderId: pendingOrder.id,
+                ticketTypeId: item.ticketTypeId,
+                quantity: item.quantity,
+                priceAtPurchase: item.priceAtReservation,
+            })), { transaction });
+
+            // Los ítems salen del carrito sin liberar su reserva: ahora la retiene el pedido
+            await CartItem.destroy({ where: { cartId: cart.id }, transaction });
+            return pendingOrder;
+        });
+
+        orderQueueService.enqueue(() => this.processPendingOrder(order.id, paymentDetails.paymentMethodId, {
+            userEmail,
+            correlationId
+        }));
+
+        websocketService.notifyPaymentStatus(userId, {
+            orderId: order.id,
+            status: 'processing',
+            amount: order.totalAmount,
+            message: 'Procesando pago...'
+        });
+
+        return {
+            id: order.id,
+            codigoPedido: order.orderCode,
+            estado: order.status,
+            total: order.totalAmount,
+            mensaje: 'Pedido recibido. Te avisaremos cuando el pago se haya procesado.'
+        };
+    }
+
+    /**
+     * Trabajo de la cola: cobra el pedido fuera de cualquier transacción y después
+     * lo confirma (vende la reserva y genera las entradas) o lo marca FAILED y
+     * libera la reserva.
+     */
+    async processPendingOrder(orderId, paymentMethodId, { userEmail, correlationId } = {}) {
+        const order = await Order.findByPk(orderId, {
+            include: [{ model: OrderItem, as: 'items', include: [{ model: TicketType, as: 'ticketType' }] }]
+        });
+        if (!order || order.status !== 'PENDING') {
+            return;
+        }
+
+        const paymentResult = await paymentGatewayService.processPayment(paymentMethodId, order.totalAmount);
+        if (!paymentResult.success) {
+            await this.failPendingOrder(order, `Error de pago: ${paymentResult.message}`);
+            return;
+        }
+
+        // Desde aquí el cliente ya pagó: cualquier salida sin entradas pasa por refundChargedOrder
+        let updatedTicketTypes;
+        try {
+            updatedTicketTypes = await this.completePendingOrder(order, paymentResult.transactionId, { userEmail, correlationId });
+        } catch (error) {
+            // ConflictError no debería ocurrir porque el pedido retiene su reserva
+            if (!(error instanceof ConflictError)) {
+                console.error(`❌ Error confirmando el pedido ${order.id} ya cobrado:`, error);
+            }
+            await this.refundChargedOrder(order, paymentResult.transactionId,
+                'No se pudo completar el pedido. Se ha reembolsado el pago.');
+            return;
+        }
+        if (!updatedTicketTypes) {
+            // expireStalePendingOrders lo marcó FAILED mientras se cobraba
+            await this.refundChargedOrder(order, paymentResult.transactionId,
+                'El pedido expiró mientras se procesaba el pago. Se ha reembolsado el pago.');
+            return;
+        }
+
+        order.status = 'COMPLETED';
+        order.paymentGatewayId = paymentResult.transactionId;
+        websocketService.notifyPaymentStatus(order.userId, {
+            orderId: order.id,
+            status: 'success',
+            amount: order.totalAmount,
+            message: 'Pago procesado exitosamente'
+        });
+        this.notifyOrderCompleted(order, order.items, updatedTicketTypes);
+    }
+
+    async completePendingOrder(order, transactionId, { userEmail, correlationId } = {}) {
+        return sequelize.transaction(async (transaction) => {
+            // Solo un worker puede confirmar el pedido (y no si ya expiró por timeout)
+            const [claimed] = await Order.update(
+                { status: 'COMPLETED', paymentGatewayId: transactionId },
+                { where: { id: order.id, status: 'PENDING' }, transaction }
+            );
+            if (claimed === 0) {
+                return null;
+            }
+
+            const rows = await reservationService.commitSale(order.items, transaction);
+            if (!rows) {
+                throw new ConflictError(`No hay suficientes entradas para completar el pedido ${order.id}.`);
+            }
+
+            const ticketTypesById = new Map(order.items.map(item => [item.ticketTypeId, item.ticketType]));
+            await ticketService.generateTicketsForOrder(order, order.items, ticketTypesById, transaction);
+
+            const completedOrder = { ...order.get({ plain: true }), paymentGatewayId: transactionId };
+            await outboxService.add('purchase.completed', this.purchaseCompletedPayload(completedOrder, { userEmail, correlationId }),
+                transaction, { correlationId });
+            return rows;
+        });
+    }
+
+    async failPendingOrder(order, message) {
+        const failed = await sequelize.transaction(async (transaction) => {
+            const [updated] = await Order.update(
+                { status: 'FAILED' },
+                { where: { id: order.id, status: 'PENDING' }, transaction }
+            );
+            if (updated > 0) {
+                await reservationService.release(order.items, transaction);
+            }
+            return updated > 0;
+        });
+
+        if (failed) {
+            websocketService.notifyPaymentStatus(order.userId, {
+                orderId: order.id,
+                status: 'failed',
+                amount: order.totalAmount,
+                message
+            });
+        }
+    }
+
+    /**
+     * Pedido cobrado que no se pudo completar: queda REFUND_REQUIRED con el id
+     * del cobro (y sin reserva), se pide el reembolso a la pasarela y, si se
+     * emite, pasa a REFUNDED. Si el reembolso falla queda REFUND_REQUIRED para
+     * devolverlo a mano. Si el pedido ya está COMPLETED no se toca nada. En
+     * todos los casos se avisa al comprador por payment-status.
+     */
+    async refundChargedOrder(order, transactionId, message) {
+        let claimed;
+        try {
+            claimed = await sequelize.transaction(async (transaction) => {
+                const changes = { status: 'REFUND_REQUIRED', paymentGatewayId: transactionId };
+                const [fromPending] = await Order.update(changes, { where: { id: order.id, status: 'PENDING' }, transaction });
+                if (fromPending > 0) {
+                    await reservationService.release(order.items, transaction);
+                    return true;
+                }
+                // Si ya está FAILED su reserva la liberó expireStalePendingOrders
+                const [fromFailed] = await Order.update(changes, { where: { id: order.id, status: 'FAILED' }, transaction });
+                return fromFailed > 0;
+            });
+        } catch (error) {
+            // Sin saber en qué estado quedó no se reembolsa solo: se deja para conciliar a mano
+            console.error(`❌ Pedido ${order.id} cobrado (${transactionId}) sin poder marcarlo REFUND_REQUIRED:`, error);
+            websocketService.notifyPaymentStatus(order.userId, {
+                orderId: order.id,
+                status: 'refund_pending',
+                amount: order.totalAmount,
+                message: 'No se pudo completar el pedido. Tu pago será reembolsado.'
+            });
+            return;
+        }
+        if (!claimed) {
+            return;
+        }
+        await this.refundCharge(order.userId, order.id, transactionId, order.totalAmount, message);
+    }
+
+    async refundCharge(userId, orderId, transactionId, amount, message) {
+        let refunded = false;
+        try {
+            const refund = await paymentGatewayService.refundPayment(transactionId, amount);
+            refunded = refund.success;
+            if (refunded && orderId) {
+                await Order.update({ status: 'REFUNDED' }, { where: { id: orderId, status: 'REFUND_REQUIRED' } });
+            }
+        } catch (error) {
+            console.error(`❌ Error reembolsando el cobro ${transactionId} (pedido ${orderId}):`, error);
+        }
+        if (!refunded) {
+            console.error(`⚠️ Cobro ${transactionId} (pedido ${orderId}) pendiente de reembolso manual`);
+        }
+
+        websocketService.notifyPaymentStatus(userId, {
+            orderId,
+            status: refunded ? 'refunded' : 'refund_pending',
+            amount,
+            message: refunded ? message : 'No se pudo completar el pedido. Tu pago será reembolsado.'
         });
+    }
 
+    /**
+     * Marca como FAILED (y libera su reserva) los pedidos asíncronos que llevan
+     * más de PENDING_ORDER_TIMEOUT_MS sin procesarse.
+     */
+    async expireStalePendingOrders() {
+        const staleOrders = await Order.findAll({
+            where: { status: 'PENDING', createdAt: { [Op.lt]: new Date(Date.now() - PENDING_ORDER_TIMEOUT_MS) } },
+            include: [{ model: OrderItem, as: 'items', attributes: ['id', 'ticketTypeId', 'quantity'] }]
+        });
+        for (const order of staleOrders) {
+            await this.failPendingOrder(order, 'El pago no se pudo procesar a tiempo. Tus entradas se han liberado.');
+        }
+        return staleOrders.length;
+    }
+
+    /**
+     * Avisos por websocket tras confirmar un pedido: stock (con las filas que
+     * devolvió el UPDATE) y tickets-generated al comprador. purchase.completed
+     * ya va en el outbox, escrito en la transacción del pedido.
+     */
+    notifyOrderCompleted(order, items, updatedTicketTypes) {
+        // *** WebSocket: Notificar cambio de stock con las filas ya actualizadas ***
+        for (const ticketType of updatedTicketTypes) {
+            ticketTypeService.notifyStockChange(ticketType);
+        }
+
+        // *** WebSocket: Notificar tickets generados ***
+        const totalTickets = items.reduce((sum, item) => sum + item.quantity, 0);
+        websocketService.notifyTicketsGenerated(order.userId, {
+            orderId: order.id,
+            ticketsCount: totalTickets,
+            downloadUrl: `/api/v1/orders/${order.id}/tickets`
+        });
+    }
+
+    // Mensaje purchase.completed para ms-notifications
+    purchaseCompletedPayload(order, { userEmail, correlationId }) {
         return {
-            pagination: {
-                totalItems: count,
-                totalPages: Math.ceil(count / limit),
-                currentPage: parseInt(page),
-                pageSize: limit
-            },
-            data: rows
+            userEmail: userEmail,
+            userName: order.billingAddress.nombreCompleto,
+            correlationId,
+            orderDetails: {
+                id: order.id,
+                codigoPedido: order.orderCode,
+                totalAmount: parseFloat(order.totalAmount),
+                currency: order.currency
+            }
         };
     }
 
+    /**
+     * Historial de pedidos del usuario. Por defecto pagina por cursor; `page`
+     * mantiene la paginación por OFFSET (con total) para los clientes que la usan.
+     */
+    async findUserOrders(userId, { page, limit, cursor, includeTotal = false }) {
+        const attributes = ['id', 'orderCode', 'totalAmount', 'status', 'createdAt'];
+
+        if (page && !cursor) {
+            const pageSize = parseLimit(limit);
+            const { count, rows } = await Order.findAndCountAll({
+                where: { userId },
+                limit: pageSize,
+                offset: (page - 1) * pageSize,
+                order: [['createdAt', 'DESC'], ['id', 'DESC']],
+                attributes,
+                useReplica: true
+            });
+
+            return {
+                pagination: {
+                    totalItems: count,
+                    totalPages: Math.ceil(count / pageSize),
+                    currentPage: parseInt(page),
+                    pageSize
+                },
+                data: rows
+            };
+        }
+
+        return findPage(Order, { where: { userId }, attributes, limit, cursor, includeTotal, useReplica: true });
+    }
+
     async findOrderById(userId, orderId) {
         const order = await Order.findOne({
             where: { id: orderId, userId },
@@ -0,0 +1,81 @@
+// src/api/services/orderQueue.service.js
+
+const ORDER_WORKERS = parseInt(process.env.ORDER_WORKERS, 10) || 8;
+const ORDER_QUEUE_MAX = parseInt(process.env.ORDER_QUEUE_MAX, 10) || 1000;
+
+/**
+ * Cola en memoria con un número acotado de workers para el checkout asíncrono.
+ *
+ * Cada trabajo es una función async; como mucho ORDER_WORKERS se ejecutan a la
+ * vez (y por tanto como mucho ORDER_WORKERS conexiones del pool ocupadas por
+ * pagos), y con ORDER_QUEUE_MAX trabajos en espera la cola se declara llena
+ * para que la API responda 503 en lugar de acumular pedidos sin límite.
+ */
+class OrderQueueService {
+    constructor(concurrency = ORDER_WORKERS, maxQueued = ORDER_QUEUE_MAX) {
+        this.concurrency = concurrency;
+        this.maxQueued = maxQueued;
+        this.queue = [];
+        this.active = 0;
+        this.stats = {
+            enqueued: 0,
+            completed: 0,
+            errors: 0,
+            rejected: 0,
+            maxQueued: 0,
+            totalWaitMs: 0,
+            totalProcessMs: 0
+        };
+    }
+
+    isFull() {
+        return this.queue.length >= this.maxQueued;
+    }
+
+    reject() {
+        this.stats.rejected++;
+    }
+
+    enqueue(job) {
+        this.queue.push({ job, enqueuedAt: Date.now() });
+        this.stats.enqueued++;
+        this.stats.maxQueued = Math.max(this.stats.maxQueued, this.queue.length);
+        this.drain();
+    }
+
+    drain() {
+        while (this.active < this.concurrency && this.queue.length > 0) {
+            const { job, enqueuedAt } = this.queue.shift();
+            this.active++;
+            this.run(job, enqueuedAt).finally(() => {
+                this.active--;
+                this.drain();
+            });
+        }
+    }
+
+    async run(job, enqueuedAt) {
+        const startedAt = Date.now();
+        this.stats.totalWaitMs += startedAt - enqueuedAt;
+        try {
+            await job();
+            this.stats.completed++;
+        } catch (error) {
+            this.stats.errors++;
+            console.error('❌ Error procesando pedido en cola:', error);
+        } finally {
+            this.stats.totalProcessMs += Date.now() - startedAt;
+        }
+    }
+
+    getStats() {
+        return {
+            ...this.stats,
+            queued: this.queue.length,
+            active: this.active,
+            concurrency: this.concurrency
+        };
+    }
+}
+
+module.exports = new OrderQueueService();
@@ -0,0 +1,38 @@
+// src/api/services/paymentGateway.service.js
+
+// Pasarela de pago simulada. La latencia y la tasa de rechazos son configurables
+// para poder medir el checkout con tiempos de pago parecidos a los de un proveedor real.
+const LATENCY_MS = parseInt(process.env.PAYMENT_GATEWAY_LATENCY_MS, 10) || 0;
+const LATENCY_JITTER_MS = parseInt(process.env.PAYMENT_GATEWAY_LATENCY_JITTER_MS, 10) || 0;
+const FAILURE_RATE = parseFloat(process.env.PAYMENT_GATEWAY_FAILURE_RATE) || 0;
+
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+class PaymentGatewayService {
+    async processPayment(paymentMethodId, amount) {
+        // En un sistema real, aquí se haría una llamada a Stripe, PayPal, etc.
+        console.log(`Procesando pago por ${amount} con método ${paymentMethodId}`);
+
+        const latency = LATENCY_MS + Math.round(Math.random() * LATENCY_JITTER_MS);
+        if (latency > 0) {
+            await sleep(latency);
+        }
+
+        if (paymentMethodId.startsWith('fail') || Math.random() < FAILURE_RATE) {
+            return { success: false, transactionId: null, message: 'Pago rechazado por la pasarela.' };
+        }
+        return { success: true, transactionId: `pi_${Date.now()}`, message: 'Pago exitoso.' };
+    }
+
+    async refundPayment(transactionId, amount) {
+        console.log(`Reembolsando ${amount} del cobro ${transactionId}`);
+
+        const latency = LATENCY_MS + Math.round(Math.random() * LATENCY_JITTER_MS);
+        if (latency > 0) {
+            await sleep(latency);
+        }
+        return { success: true, refundId: `re_${Date.now()}`, message: 'Reembolso emitido.' };
+    }
+}
+
+module.exports = new PaymentGatewayService();
@@ -0,0 +1,158 @@
+// src/api/services/reservation.service.js
+const { sequelize, CartItem } = require('../models');
+const { QueryTypes } = require('sequelize');
+
+/**
+ * Libro de reservas por tipo de ticket.
+ *
+ * `ticket_types.reserved` lleva la suma de las cantidades que hay en carritos
+ * todavía no liberados, de modo que el stock disponible para un carrito nuevo es
+ * `quantity - sold - reserved` y se comprueba con una sola lectura indexada por
+ * PK, en lugar de sumar los ítems de todos los carritos activos.
+ *
+ * Invariante: para cada tipo de ticket, `reserved` es igual a la suma de
+ * `cart_items.quantity` más la de los ítems de pedidos PENDING (checkout
+ * asíncrono, ver OrderService.acceptOrderFromCart). Toda operación que cree,
+ * modifique o borre esos ítems debe ajustar el contador en la misma transacción.
+ *
+ * Un carrito expirado sigue reteniendo su reserva hasta que el barrido de
+ * carritos (cartSweeper.service) borra sus ítems: antes el recuento de
+ * carritos activos lo ignoraba al leer, ahora el stock vuelve cuando pasa el
+ * barrido (cada CART_SWEEP_INTERVAL_MS). Con CART_SWEEP_ENABLED=false en todas
+ * las réplicas ese stock no se libera nunca.
+ */
+class ReservationService {
+
+    /**
+     * Reserva `quantity` entradas si hay stock. La comprobación y el incremento
+     * son una única sentencia condicional, así que dos reservas concurrentes no
+     * pueden dejar el contador por encima del stock.
+     * @returns {Promise<boolean>} false si no hay stock suficiente.
+     */
+    async reserve(ticketTypeId, quantity, transaction) {
+        const [, affectedRows] = await sequelize.query(
+            `UPDATE ticket_types
+                SET reserved = reserved + :quantity, updated_at = NOW()
+              WHERE id = :ticketTypeId AND quantity - sold - reserved >= :quantity`,
+            { replacements: { ticketTypeId, quantity }, type: QueryTypes.UPDATE, transaction }
+        );
+        return affectedRows > 0;
+    }
+
+    /**
+     * Devuelve al stock las cantidades de los ítems indicados (agrupadas por tipo
+     * de ticket en una sola sentencia). Los ítems ya deben estar borrados o a
+     * punto de borrarse en la misma transacción.
+     */
+    async release(items, transaction) {
+        const byTicketType = this.groupByTicketType(items);
+        if (byTicketType.size === 0) {
+            return;
+        }
+
+        const { values, replacements } = this.valuesList(byTicketType);
+        await sequelize.query(
+            `UPDATE ticket_types AS t
+                SET reserved = t.reserved - v.quantity, updated_at = NOW()
+               FROM (VALUES ${values}) AS v (id, quantity)
+              WHERE t.id = v.id`,
+            { replacements, type: QueryTypes.UPDATE, transaction }
+        );
+    }
+
+    /**
+     * Convierte en vendidas las cantidades reservadas por los ítems de un
+     * carrito, con una sola sentencia para todos los tipos de ticket. Las filas
+     * que se quedarían por encima de su cantidad total no se actualizan; en ese
+     * caso devuelve null y el llamador debe deshacer la transacción.
+     * @returns {Promise<Array|null>} filas actualizadas (id, eventId, quantity,
+     *   sold, reserved) o null si la venta sobrepasaría el stock.
+     */
+    async commitSale(items, transaction) {
+        const byTicketType = this.groupByTicketType(items);
+        const { values, replacements } = this.valuesList(byTicketType);
+
+        const rows = await sequelize.query(
+            `UPDATE ticket_types AS t
+                SET sold = t.sold + v.quantity, reserved = t.reserved - v.quantity, updated_at = NOW()
+               FROM (VALUES ${values}) AS v (id, quantity)
+              WHERE t.id = v.id AND t.sold + v.quantity <= t.quantity
+          RETURNING t.id, t.event_id AS "eventId", t.quantity, t.sold, t.reserved`,
+            { replacements, type: QueryTypes.SELECT, transaction }
+        );
+        return rows.length === byTicketType.size ? rows : null;
+    }
+
+    /**
+     * Borra los ítems de un carrito y libera su reserva. Devuelve los ítems
+     * borrados para que el llamador pueda notificar el cambio de stock.
+     */
+    async releaseCart(cartId, transaction) {
+        const items = await CartItem.findAll({
+            where: { cartId },
+            attributes: ['id', 'ticketTypeId', 'quantity'],
+            transaction
+        });
+        if (items.length === 0) {
+            return items;
+        }
+
+        await CartItem.destroy({ where: { cartId }, transaction });
+        await this.release(items, transaction);
+        return items;
+    }
+
+    /**
+     * Migración del libro de reservas, en el arranque de cada réplica y en todos
+     * los entornos (ms-tickets no tiene migraciones): crea la columna `reserved`
+     * si falta y la recalcula. Es idempotente y el recálculo es una sola
+     * sentencia, así que no se descuadra con otras réplicas reservando a la vez.
+     */
+    async migrate() {
+        // SQLite (NODE_ENV=test) no admite ADD COLUMN IF NOT EXISTS; ahí crea la tabla sync()
+        if (sequelize.getDialect() !== 'sqlite') {
+            await sequelize.query('ALTER TABLE ticket_types ADD COLUMN IF NOT EXISTS reserved INTEGER NOT NULL DEFAULT 0');
+        }
+        await this.rebuild();
+    }
+
+    /**
+     * Recalcula los contadores desde cart_items y los pedidos pendientes. Pone al
+     * día una base de datos que tenía carritos antes de existir la columna
+     * `reserved` (ver migrate).
+     */
+    async rebuild() {
+        await sequelize.query(
+            `UPDATE ticket_types AS t
+                SET reserved = COALESCE((SELECT SUM(ci.quantity) FROM cart_items AS ci WHERE ci.ticket_type_id = t.id), 0)
+                             + COALESCE((SELECT SUM(oi.quantity) FROM order_items AS oi
+                                           JOIN orders AS o ON o.id = oi.order_id
+                                          WHERE oi.ticket_type_id = t.id AND o.status = 'PENDING'), 0)`,
+            { type: QueryTypes.UPDATE }
+        );
+    }
+
+    // Lista `(:id0, :quantity0), ...` para un VALUES con sus replacements. Los ids
+    // INT8 llegan como strings: sin el CAST las columnas de VALUES serían texto
+    valuesList(byTicketType) {
+        const replacements = {};
+        const values = [...byTicketType].map(([ticketTypeId, quantity], i) => {
+            replacements[`id${i}`] = ticketTypeId;
+            replacements[`quantity${i}`] = quantity;
+            return `(CAST(:id${i} AS INT8), CAST(:quantity${i} AS INT8))`;
+        });
+        return { values: values.join(', '), replacements };
+    }
+
+    // Ids y cantidades pueden llegar como número o como string (INT8, consultas crudas)
+    groupByTicketType(items) {
+        const byTicketType = new Map();
+        for (const item of items) {
+            const ticketTypeId = String(item.ticketTypeId);
+            byTicketType.set(ticketTypeId, (byTicketType.get(ticketTypeId) || 0) + Number(item.quantity));
+        }
+        return byTicketType;
+    }
+}
+
+module.exports = new ReservationService();
@@ -0,0 +1,50 @@
+// src/api/services/schema.service.js
+const { sequelize } = require('../models');
+
+// Mismos nombres que les da sync() a partir de los modelos, para no duplicarlos en desarrollo
+const STATEMENTS = [
+    // Outbox de eventos de dominio (outbox.service): order.service escribe en ella dentro del checkout
+    `CREATE TABLE IF NOT EXISTS outbox_messages (
+        id BIGSERIAL PRIMARY KEY,
+        routing_key VARCHAR(255) NOT NULL,
+        payload JSONB NOT NULL,
+        correlation_id VARCHAR(255),
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+        last_error TEXT,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE NOT NULL
+    )`,
+    'ALTER TABLE outbox_messages ADD COLUMN IF NOT EXISTS correlation_id VARCHAR(255)',
+    // El relay toma los mensajes vencidos por orden de llegada
+    'CREATE INDEX IF NOT EXISTS outbox_messages_next_attempt_at_id ON outbox_messages (next_attempt_at, id)',
+    // Historial de pedidos y listado de entradas del usuario paginados por cursor (utils/pagination)
+    'CREATE INDEX IF NOT EXISTS orders_user_id_created_at_id ON orders (user_id, created_at, id)',
+    'CREATE INDEX IF NOT EXISTS tickets_user_id_created_at_id ON tickets (user_id, created_at, id)',
+    'CREATE INDEX IF NOT EXISTS tickets_user_id_event_id_created_at_id ON tickets (user_id, event_id, created_at, id)',
+    // Barrido de carritos expirados (cartSweeper.service) y borrado de sus ítems
+    'CREATE INDEX IF NOT EXISTS carts_expires_at ON carts (expires_at)',
+    'CREATE INDEX IF NOT EXISTS cart_items_cart_id ON cart_items (cart_id)',
+    // Sincronización de los escáneres de check-in por cursor (checkIn.service.sync)
+    'CREATE INDEX IF NOT EXISTS tickets_event_id_updated_at_id ON tickets (event_id, updated_at, id)',
+];
+
+/**
+ * DDL de arranque de ms-tickets, que no tiene migraciones: las tablas e índices
+ * que los modelos declaran y que fuera de desarrollo no crea `sync()`. Todas
+ * las sentencias son idempotentes (IF NOT EXISTS) y se ejecutan en cada
+ * réplica al arrancar y en todos los entornos.
+ */
+class SchemaService {
+    async migrate() {
+        // SQLite (NODE_ENV=test) no admite parte de este DDL; ahí lo crea todo sync()
+        if (sequelize.getDialect() === 'sqlite') {
+            return;
+        }
+        for (const statement of STATEMENTS) {
+            await sequelize.query(statement);
+        }
+    }
+}
+
+module.exports = new SchemaService();
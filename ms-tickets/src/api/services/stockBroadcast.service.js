@@ -0,0 +1,157 @@
+// src/api/services/stockBroadcast.service.js
+const websocketService = require('./websocket.service');
+
+const WINDOW_MS = parseInt(process.env.STOCK_BROADCAST_WINDOW_MS, 10) || 250;
+const LOW_STOCK_THRESHOLD = parseInt(process.env.LOW_STOCK_THRESHOLD, 10) || 10;
+// Tiempo sin cambios tras el que se olvida lo último enviado de un tipo de ticket
+const STATE_TTL_MS = parseInt(process.env.STOCK_BROADCAST_STATE_TTL_MS, 10) || 10 * 60 * 1000;
+
+/**
+ * Agrega los cambios de stock antes de enviarlos por websocket.
+ *
+ * Durante STOCK_BROADCAST_WINDOW_MS se guarda solo el último estado de cada
+ * tipo de ticket; al cerrar la ventana se envía un único `stock-updated` por
+ * evento con los tipos que cambiaron respecto a lo último enviado. Así una
+ * venta masiva emite como mucho un mensaje por evento y ventana, en lugar de
+ * uno por ítem de pedido.
+ *
+ * `low-stock-alert` se envía solo al cruzar el umbral hacia abajo (y se rearma
+ * si el stock vuelve a subir por encima), no en cada cambio por debajo de él.
+ *
+ * Lo último enviado de cada tipo de ticket se olvida al agotarse o tras
+ * STOCK_BROADCAST_STATE_TTL_MS sin cambios, para que `lastSent` no crezca con
+ * cada tipo de ticket vendido desde el arranque. Después de olvidarlo, el
+ * siguiente cambio se envía siempre y cuenta como "sin dato previo" para la alerta.
+ *
+ * Los contadores comparan con lo que se habría enviado sin agregar: un mensaje
+ * por cambio, con el formato anterior de stock-updated.
+ */
+class StockBroadcastService {
+    constructor() {
+        this.pending = new Map(); // eventId -> Map<ticketTypeId, stock>
+        this.lastSent = new Map(); // `${eventId}:${ticketTypeId}` -> { stock, sentAt }
+        this.prunedAt = Date.now();
+        this.timer = null;
+        this.stats = {
+            updatesReceived: 0,
+            updatesCoalesced: 0,
+            messagesEmitted: 0,
+            socketMessagesEmitted: 0,
+            bytesEmitted: 0,
+            uncoalescedBytes: 0,
+            bytesSaved: 0,
+            lowStockAlerts: 0,
+            lowStockSuppressed: 0,
+            flushes: 0,
+            statesForgotten: 0
+        };
+    }
+
+    push(eventId, ticketTypeId, stock) {
+        this.stats.updatesReceived++;
+        // Lo que habría ocupado el mensaje individual de este cambio
+        this.stats.uncoalescedBytes += Buffer.byteLength(JSON.stringify({
+            eventId, ticketTypeId, ...stock, timestamp: new Date().toISOString()
+        }));
+        if (stock.available <= LOW_STOCK_THRESHOLD && stock.available > 0) {
+            this.stats.lowStockSuppressed++;
+        }
+
+        if (!this.pending.has(eventId)) {
+            this.pending.set(eventId, new Map());
+        }
+        const updates = this.pending.get(eventId);
+        if (updates.has(ticketTypeId)) {
+            this.stats.updatesCoalesced++;
+        }
+        updates.set(ticketTypeId, stock);
+
+        if (!this.timer) {
+            this.timer = setTimeout(() => this.flush(), WINDOW_MS);
+            this.timer.unref();
+        }
+    }
+
+    flush() {
+        clearTimeout(this.timer);
+        this.timer = null;
+        const pending = this.pending;
+        this.pending = new Map();
+        this.stats.flushes++;
+        const now = Date.now();
+
+        for (const [eventId, updates] of pending) {
+            const delta = [];
+            for (const [ticketTypeId, stock] of updates) {
+                const key = `${eventId}:${ticketTypeId}`;
+                const previous = this.lastSent.get(key)?.stock;
+                if (previous && previous.available === stock.available && previous.sold === stock.sold && previous.total === stock.total) {
+                    continue;
+                }
+                // Agotado: ya no habrá más cambios que deduplicar hasta una devolución
+                if (stock.available <= 0) {
+                    this.forget(key);
+                } else {
+                    this.lastSent.set(key, { stock, sentAt: now });
+                }
+                delta.push({ ticketTypeId, ...stock });
+                this.checkLowStock(eventId, ticketTypeId, previous, stock);
+            }
+            if (delta.length === 0) continue;
+
+            const sent = websocketService.notifyStockUpdate(eventId, delta);
+            if (sent) {
+                this.stats.messagesEmitted++;
+                this.stats.socketMessagesEmitted += sent.recipients;
+                this.stats.bytesEmitted += sent.bytes;
+            }
+        }
+        this.stats.bytesSaved = Math.max(0, this.stats.uncoalescedBytes - this.stats.bytesEmitted);
+
+        if (now - this.prunedAt >= STATE_TTL_MS) {
+            this.prune(now);
+        }
+    }
+
+    prune(now) {
+        this.prunedAt = now;
+        for (const [key, { sentAt }] of this.lastSent) {
+            if (now - sentAt >= STATE_TTL_MS) {
+                this.forget(key);
+            }
+        }
+    }
+
+    forget(key) {
+        if (this.lastSent.delete(key)) {
+            this.stats.statesForgotten++;
+        }
+    }
+
+    // Solo al pasar de estar por encima del umbral (o sin dato previo) a estar por debajo
+    checkLowStock(eventId, ticketTypeId, previous, stock) {
+        const isLow = stock.available <= LOW_STOCK_THRESHOLD && stock.available > 0;
+        const wasLow = previous && previous.available <= LOW_STOCK_THRESHOLD;
+        if (isLow && !wasLow) {
+            websocketService.notifyLowStock(eventId, ticketTypeId, { ...stock, threshold: LOW_STOCK_THRESHOLD });
+            this.stats.lowStockAlerts++;
+            this.stats.lowStockSuppressed--;
+        }
+    }
+
+    stop() {
+        this.flush();
+    }
+
+    getStats() {
+        return {
+            ...this.stats,
+            windowMs: WINDOW_MS,
+            lowStockThreshold: LOW_STOCK_THRESHOLD,
+            pendingEvents: this.pending.size,
+            trackedTicketTypes: this.lastSent.size
+        };
+    }
+}
+
+module.exports = new StockBroadcastService();
@@ -1,61 +1,55 @@
 // src/api/services/ticket.service.js
 const { Ticket, OrderItem, TicketType } = require('../models');
-const { NotFoundError, ConflictError, AppError } = require('../../utils/errors');
-const crypto = require('crypto'); // Para firmar el QR
-const websocketService = require('./websocket.service');
-
-const JWT_SECRET = process.env.JWT_SECRET || 'tu-jwt-secret-super-secreto';
+const { NotFoundError, ConflictError } = require('../../utils/errors');
+const { findPage } = require('../../utils/pagination');
+const checkInService = require('./checkIn.service');
 
 class TicketService {
 
     /**
-     * Genera las entradas para un ítem de pedido específico.
-     * Esta función es llamada internamente por el OrderService.
+     * Genera en un único bulk insert las entradas de todos los ítems de un pedido.
+     * Esta función es llamada internamente por el OrderService, que ya tiene el
+     * pedido y los tipos de ticket, así que no hace ninguna consulta adicional.
+     * @param {Map<number, {eventId: number}>} ticketTypes tipos de ticket por id
      */
-    async generateTicketsForOrderItem(orderItem, transaction) {
-        const ticketType = await orderItem.getTicketType({ transaction });
-        const order = await orderItem.getOrder({ transaction });
-        
-        // Preparar todos los tickets para bulk insert
+    async generateTicketsForOrder(order, orderItems, ticketTypes, transaction) {
         const ticketsData = [];
-        for (let i = 0; i < orderItem.quantity; i++) {
-            const ticketCode = `TKT-E${ticketType.eventId}-T${orderItem.id}-${i + 1}`;
-
-            const qrPayload = {
-                ticketCode: ticketCode,
-                eventId: ticketType.eventId,
-                userId: order.userId,
-            };
-
-            // Firmamos el payload para evitar falsificaciones
-            const signature = crypto.createHmac('sha256', JWT_SECRET).update(JSON.stringify(qrPayload)).digest('hex');
-            qrPayload.sig = signature;
-
-            ticketsData.push({
-                ticketCode,
-                orderItemId: orderItem.id,
-                userId: order.userId,
-                eventId: ticketType.eventId,
-                status: 'VALID',
-                qrCodeData: JSON.stringify(qrPayload),
-                ownerName: order.billingAddress.nombreCompleto
-            });
+        for (const orderItem of orderItems) {
+            const eventId = ticketTypes.get(orderItem.ticketTypeId).eventId;
+            for (let i = 0; i < orderItem.quantity; i++) {
+                const ticketCode = `TKT-E${eventId}-T${orderItem.id}-${i + 1}`;
+
+                const qrPayload = {
+                    ticketCode: ticketCode,
+                    eventId: eventId,
+                    userId: order.userId,
+                };
+
+                // Firmamos el payload para evitar falsificaciones
+                qrPayload.sig = checkInService.sign(qrPayload);
+
+                ticketsData.push({
+                    ticketCode,
+                    orderItemId: orderItem.id,
+                    userId: order.userId,
+                    eventId: eventId,
+                    status: 'VALID',
+                    qrCodeData: JSON.stringify(qrPayload),
+                    ownerName: order.billingAddress.nombreCompleto
+                });
+            }
         }
-        
+
         // Bulk insert - mucho más eficiente
-        const tickets = await Ticket.bulkCreate(ticketsData, { transaction });
-        return tickets;
+        return await Ticket.bulkCreate(ticketsData, { transaction });
     }
 
-    async findUserTickets(userId, filters = {}) {
+    async findUserTickets(userId, filters = {}, { limit, cursor, includeTotal = false } = {}) {
         const whereClause = { userId };
         if (filters.eventId) whereClause.eventId = filters.eventId;
         if (filters.status) whereClause.status = filters.status;
 
-        return await Ticket.findAll({
-            where: whereClause,
-            order: [['createdAt', 'DESC']]
-        });
+        return await findPage(Ticket, { where: whereClause, limit, cursor, includeTotal, useReplica: true });
     }
 
     async findTicketById(userId, ticketId) {
@@ -67,53 +61,20 @@ class TicketService {
     }
 
     /**
-     * Valida una entrada en el punto de acceso (check-in).
+     * Valida una entrada en el punto de acceso (check-in). Pasa por el motor
+     * de check-in, que agrupa los escaneos simultáneos en una sola sentencia.
      */
     async checkIn(qrCodeData) {
-        let payload;
-        try {
-            payload = JSON.parse(qrCodeData);
-        } catch (e) {
-            throw new AppError('Formato de QR inválido.', 400);
-        }
-
-        const { sig, ...dataToVerify } = payload;
-        if (!sig) {
-            throw new AppError('Firma del QR ausente.', 400);
-        }
-
-        const expectedSignature = crypto.createHmac('sha256', JWT_SECRET).update(JSON.stringify(dataToVerify)).digest('hex');
-
-        if (sig !== expectedSignature) {
-            throw new AppError('Firma del QR inválida. Posible falsificación.', 400);
-        }
-
-        const ticket = await Ticket.findOne({ where: { ticketCode: payload.ticketCode } });
-        if (!ticket) {
-            throw new NotFoundError('La entrada no existe en el sistema.');
-        }
-
-        if (ticket.status === 'USED') {
-            return { status: 'VALIDADO', message: 'Acceso permitido (previamente validado).', ticket };
-        }
-        if (ticket.status === 'CANCELLED') {
-            throw new AppError('La entrada ha sido cancelada o reembolsada.', 410); // 410 Gone
-        }
-
-        ticket.status = 'USED';
-        ticket.checkInTimestamp = new Date();
-        await ticket.save();
-
-        // *** WebSocket: Notificar validación de ticket ***
-        websocketService.notifyTicketValidated(ticket.eventId, {
-            ticketCode: ticket.ticketCode,
-            userId: ticket.userId,
-            timestamp: ticket.checkInTimestamp,
-            status: 'valid',
-            message: 'Ticket validado correctamente'
-        });
-
-        return { status: 'VALIDADO', message: 'Acceso permitido.', ticket };
+        const result = await checkInService.checkIn(qrCodeData);
+        return {
+            status: 'VALIDADO',
+            message: result.message,
+            ticket: {
+                ticketCode: result.ticketCode,
+                checkInTimestamp: result.checkInTimestamp,
+                ownerName: result.ownerName
+            }
+        };
     }
 }
 
@@ -1,7 +1,7 @@
 // src/api/services/ticketType.service.js
 const { TicketType } = require('../models');
 const { NotFoundError, ConflictError } = require('../../utils/errors');
-const websocketService = require('./websocket.service');
+const stockBroadcastService = require('./stockBroadcast.service');
 
 class TicketTypeService {
     // Mapear campos de la API a la base de datos
@@ -34,7 +34,8 @@ class TicketTypeService {
     }
 
     async findByEventId(eventId) {
-        const ticketTypes = await TicketType.findAll({ where: { eventId } });
+        // Catálogo: puede leerse de una réplica
+        const ticketTypes = await TicketType.findAll({ where: { eventId }, useReplica: true });
         
         // Mapear los campos para que coincidan con la especificación de la API
         return ticketTypes.map(ticketType => ({
@@ -45,7 +46,7 @@ class TicketTypeService {
             moneda: ticketType.currency,
             totalDisponibles: ticketType.quantity,
             vendidos: ticketType.sold,
-            disponibles: ticketType.quantity - ticketType.sold,
+            disponibles: this.availableStock(ticketType),
             enVentaDesde: ticketType.saleStartDate,
             enVentaHasta: ticketType.saleEndDate,
             minPorCompra: ticketType.minPerPurchase,
@@ -85,29 +86,18 @@ class TicketTypeService {
         await ticketType.destroy();
     }
 
-    // Método auxiliar para notificar cambios de stock vía WebSocket
+    // Entradas que aún se pueden añadir a un carrito (descuenta las reservadas)
+    availableStock(ticketType) {
+        return ticketType.quantity - ticketType.sold - (ticketType.reserved || 0);
+    }
+
+    // Método auxiliar para notificar cambios de stock vía WebSocket (agregados por evento)
     notifyStockChange(ticketType) {
-        const stockData = {
-            available: ticketType.quantity - ticketType.sold,
+        stockBroadcastService.push(ticketType.eventId, ticketType.id, {
+            available: this.availableStock(ticketType),
             total: ticketType.quantity,
             sold: ticketType.sold
-        };
-
-        // Notificar cambio de stock
-        websocketService.notifyStockUpdate(
-            ticketType.eventId,
-            ticketType.id,
-            stockData
-        );
-
-        // Alertar si stock está bajo (menos de 10)
-        if (stockData.available <= 10 && stockData.available > 0) {
-            websocketService.notifyLowStock(
-                ticketType.eventId,
-                ticketType.id,
-                { ...stockData, threshold: 10 }
-            );
-        }
+        });
     }
 
     // Método para obtener stock en tiempo real
@@ -116,9 +106,10 @@ class TicketTypeService {
         return {
             ticketTypeId: ticketType.id,
             eventId: ticketType.eventId,
-            available: ticketType.quantity - ticketType.sold,
+            available: this.availableStock(ticketType),
             total: ticketType.quantity,
             sold: ticketType.sold,
+            reserved: ticketType.reserved,
             percentage: ((ticketType.sold / ticketType.quantity) * 100).toFixed(1)
         };
     }
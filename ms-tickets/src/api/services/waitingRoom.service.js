@@ -0,0 +1,207 @@
+// src/api/services/waitingRoom.service.js
+const crypto = require('crypto');
+const { TicketType } = require('../models');
+const { NotFoundError } = require('../../utils/errors');
+const { assertCanManageEvent } = require('./eventAccess.service');
+const { createStore } = require('./waitingRoom.store');
+const websocketService = require('./websocket.service');
+
+const JWT_SECRET = process.env.JWT_SECRET || 'tu-jwt-secret-super-secreto';
+const TICK_MS = parseInt(process.env.WAITING_ROOM_TICK_MS, 10) || 1000;
+const DEFAULT_RATE_PER_SECOND = parseFloat(process.env.WAITING_ROOM_RATE_PER_SECOND) || 50;
+const MAX_CATCH_UP_TICKS = 5;
+
+// Los id de CockroachDB son INT8: pg los devuelve como string y pueden pasar de
+// 2^53, así que las salas se indexan siempre por el id en string
+const roomKey = (eventId) => String(eventId);
+
+/**
+ * Sala de espera por evento delante del carrito.
+ *
+ * Cada usuario que entra recibe un turno correlativo y un token firmado con
+ * ese turno. Un temporizador deja pasar `ratePerSecond` turnos por segundo;
+ * POST /cart/items exige un token cuyo turno ya haya pasado (middleware
+ * requireAdmission). Como solo se puede comprar lo que está en el carrito, el
+ * checkout queda detrás de la misma sala.
+ *
+ * En cada tick se envía `waiting-room-update` a la sala `event-${eventId}` con
+ * el último turno admitido: cada cliente calcula su posición y su ETA con su
+ * propio turno, sin un mensaje por usuario.
+ *
+ * Solo el organizador del evento (según events_replica) o un admin pueden
+ * abrir, reconfigurar o cerrar su sala.
+ */
+class WaitingRoomService {
+    constructor() {
+        this.store = createStore();
+        this.rooms = new Map(); // eventId -> { config, issued, admitted } (copia local, se refresca en cada tick)
+        this.ticketTypeEvents = new Map(); // ticketTypeId -> eventId
+        this.timer = null;
+        this.lastAdvanceAt = Date.now();
+        this.carry = new Map(); // eventId -> fracción de turno pendiente de admitir
+    }
+
+    start() {
+        if (this.timer) return;
+        this.lastAdvanceAt = Date.now();
+        this.timer = setInterval(() => {
+            this.tick().catch(error => console.error('❌ Error en la sala de espera:', error));
+        }, TICK_MS);
+        this.timer.unref();
+        this.refresh().catch(error => console.error('❌ Error cargando las salas de espera:', error));
+    }
+
+    async stop() {
+        clearInterval(this.timer);
+        this.timer = null;
+        await this.store.close();
+    }
+
+    assertCanManage(eventId, user) {
+        return assertCanManageEvent(eventId, user, 'No puedes gestionar la sala de espera de un evento que no organizas.');
+    }
+
+    async openRoom(eventId, { ratePerSecond = DEFAULT_RATE_PER_SECOND } = {}, user) {
+        eventId = roomKey(eventId);
+        await this.assertCanManage(eventId, user);
+        const config = { ratePerSecond: parseFloat(ratePerSecond), openedAt: new Date().toISOString() };
+        await this.store.openRoom(eventId, config);
+        await this.refresh();
+        return this.getRoom(eventId);
+    }
+
+    async closeRoom(eventId, user) {
+        eventId = roomKey(eventId);
+        await this.assertCanManage(eventId, user);
+        await this.store.closeRoom(eventId);
+        this.rooms.delete(eventId);
+        this.carry.delete(eventId);
+    }
+
+    getRoom(eventId) {
+        eventId = roomKey(eventId);
+        const room = this.rooms.get(eventId);
+        if (!room) {
+            throw new NotFoundError(`El evento ${eventId} no tiene sala de espera abierta.`);
+        }
+        return { eventId, ...room.config, issued: room.issued, admitted: room.admitted };
+    }
+
+    hasOpenRooms() {
+        return this.rooms.size > 0;
+    }
+
+    isOpen(eventId) {
+        return this.rooms.has(roomKey(eventId));
+    }
+
+    async join(eventId, userId) {
+        eventId = roomKey(eventId);
+        const ticket = await this.store.join(eventId, userId);
+        if (ticket === null) {
+            throw new NotFoundError(`El evento ${eventId} no tiene sala de espera abierta.`);
+        }
+        return { ...(await this.status(eventId, ticket)), token: this.signToken(eventId, userId, ticket) };
+    }
+
+    /**
+     * Posición y ETA de un turno. Usa los contadores del store (no la copia local)
+     * para que la respuesta sea exacta aunque otra réplica lleve los ticks.
+     */
+    async status(eventId, ticket) {
+        eventId = roomKey(eventId);
+        const room = this.rooms.get(eventId);
+        const counters = await this.store.counters(eventId);
+        if (!room || !counters) {
+            throw new NotFoundError(`El evento ${eventId} no tiene sala de espera abierta.`);
+        }
+        const position = Math.max(0, ticket - counters.admitted);
+        return {
+            eventId,
+            ticket,
+            position,
+            admitted: position === 0,
+            etaSeconds: Math.ceil(position / room.config.ratePerSecond),
+            inQueue: Math.max(0, counters.issued - counters.admitted)
+        };
+    }
+
+    // --- Tokens: `${ticket}.${firma}`, la firma cubre evento, usuario y turno ---
+
+    signToken(eventId, userId, ticket) {
+        const signature = crypto.createHmac('sha256', JWT_SECRET)
+            .update(`waiting-room:${roomKey(eventId)}:${userId}:${ticket}`)
+            .digest('base64url');
+        return `${ticket}.${signature}`;
+    }
+
+    /** Devuelve el turno del token o null si no es válido para ese evento y usuario. */
+    verifyToken(token, eventId, userId) {
+        const [ticketPart, signature] = (token || '').split('.');
+        const ticket = parseInt(ticketPart, 10);
+        if (!ticket || !signature) return null;
+        const expected = this.signToken(eventId, userId, ticket).split('.')[1];
+        const valid = signature.length === expected.length
+            && crypto.timingSafeEqual(Buffer.from(signature), Buffer.from(expected));
+        return valid ? ticket : null;
+    }
+
+    /** Comprueba contra la copia local, así el camino caliente no consulta el store. */
+    isAdmitted(eventId, ticket) {
+        const room = this.rooms.get(roomKey(eventId));
+        return !room || ticket <= room.admitted;
+    }
+
+    async eventIdForTicketType(ticketTypeId) {
+        const key = String(ticketTypeId);
+        if (!this.ticketTypeEvents.has(key)) {
+            const ticketType = await TicketType.findByPk(ticketTypeId, { attributes: ['id', 'eventId'] });
+            if (!ticketType) return null;
+            this.ticketTypeEvents.set(key, roomKey(ticketType.eventId));
+        }
+        return this.ticketTypeEvents.get(key);
+    }
+
+    // --- Tick ---
+
+    async refresh() {
+        const rooms = new Map();
+        for (const { eventId, config } of await this.store.listRooms()) {
+            const counters = await this.store.counters(eventId);
+            rooms.set(roomKey(eventId), { config, ...counters });
+        }
+        this.rooms = rooms;
+    }
+
+    async tick() {
+        await this.refresh();
+        if (this.rooms.size === 0) return;
+
+        // El cupo se calcula con el tiempo desde el último avance de esta réplica
+        // (acotado) para no perder admisiones en los ticks en que no fue líder
+        const leader = await this.store.tryLead(Math.max(TICK_MS - 100, TICK_MS / 2));
+        const now = Date.now();
+        const elapsedSeconds = Math.min(now - this.lastAdvanceAt, MAX_CATCH_UP_TICKS * TICK_MS) / 1000;
+        if (leader) {
+            this.lastAdvanceAt = now;
+        }
+        for (const [eventId, room] of this.rooms) {
+            if (leader) {
+                const quota = room.config.ratePerSecond * elapsedSeconds + (this.carry.get(eventId) || 0);
+                const whole = Math.floor(quota);
+                this.carry.set(eventId, quota - whole);
+                if (whole > 0) {
+                    room.admitted = await this.store.advance(eventId, whole);
+                }
+            }
+            websocketService.notifyWaitingRoom(eventId, {
+                admittedUpTo: room.admitted,
+                issued: room.issued,
+                inQueue: room.issued - room.admitted,
+                ratePerSecond: room.config.ratePerSecond
+            });
+        }
+    }
+}
+
+module.exports = new WaitingRoomService();
@@ -0,0 +1,258 @@
+// src/api/services/waitingRoom.store.js
+const net = require('net');
+
+/**
+ * Almacenes del estado de las salas de espera (ver waitingRoom.service).
+ *
+ * Por sala se guardan tres cosas: la configuración, el número de turnos
+ * emitidos (`issued`) y hasta qué turno se ha dejado pasar (`admitted`).
+ * Con una sola instancia basta MemoryStore; con varias réplicas de ms-tickets
+ * todas deben compartir RedisStore para que los turnos sean únicos.
+ *
+ * Los eventId llegan ya como string (ver roomKey en waitingRoom.service).
+ */
+class MemoryStore {
+    constructor() {
+        this.rooms = new Map(); // eventId -> { config, issued, admitted, users: Map<userId, ticket> }
+    }
+
+    async openRoom(eventId, config) {
+        const room = this.rooms.get(eventId);
+        if (room) {
+            room.config = config;
+        } else {
+            this.rooms.set(eventId, { config, issued: 0, admitted: 0, users: new Map() });
+        }
+    }
+
+    async closeRoom(eventId) {
+        this.rooms.delete(eventId);
+    }
+
+    async listRooms() {
+        const rooms = [];
+        for (const [eventId, room] of this.rooms) {
+            rooms.push({ eventId, config: room.config });
+        }
+        return rooms;
+    }
+
+    async join(eventId, userId) {
+        const room = this.rooms.get(eventId);
+        if (!room) return null;
+        if (!room.users.has(userId)) {
+            room.users.set(userId, ++room.issued);
+        }
+        return room.users.get(userId);
+    }
+
+    async counters(eventId) {
+        const room = this.rooms.get(eventId);
+        return room ? { issued: room.issued, admitted: room.admitted } : null;
+    }
+
+    async advance(eventId, by) {
+        const room = this.rooms.get(eventId);
+        if (!room) return 0;
+        room.admitted = Math.min(room.issued, room.admitted + by);
+        return room.admitted;
+    }
+
+    async tryLead() {
+        return true;
+    }
+
+    async close() { }
+}
+
+// Turno idempotente por usuario: INCR + SET en un único paso atómico
+const JOIN_SCRIPT = `
+if redis.call('SISMEMBER', KEYS[1], ARGV[1]) == 0 then return false end
+local ticket = redis.call('HGET', KEYS[2], ARGV[2])
+if ticket then return tonumber(ticket) end
+ticket = redis.call('INCR', KEYS[3])
+redis.call('HSET', KEYS[2], ARGV[2], ticket)
+return ticket`;
+
+// Avanza `admitted` sin pasar de `issued`
+const ADVANCE_SCRIPT = `
+local issued = tonumber(redis.call('GET', KEYS[1]) or '0')
+local admitted = tonumber(redis.call('GET', KEYS[2]) or '0')
+local nextAdmitted = math.min(issued, admitted + tonumber(ARGV[1]))
+redis.call('SET', KEYS[2], nextAdmitted)
+return nextAdmitted`;
+
+class RedisStore {
+    constructor(url, prefix = 'waiting-room') {
+        this.client = new RespClient(url);
+        this.prefix = prefix;
+        this.instanceId = `${process.pid}-${Math.random().toString(36).slice(2)}`;
+    }
+
+    key(...parts) {
+        return [this.prefix, ...parts].join(':');
+    }
+
+    async openRoom(eventId, config) {
+        await this.client.command('SET', this.key(eventId, 'config'), JSON.stringify(config));
+        await this.client.command('SADD', this.key('rooms'), String(eventId));
+    }
+
+    async closeRoom(eventId) {
+        await this.client.command('SREM', this.key('rooms'), String(eventId));
+        await this.client.command('DEL', this.key(eventId, 'config'), this.key(eventId, 'users'),
+            this.key(eventId, 'issued'), this.key(eventId, 'admitted'));
+    }
+
+    async listRooms() {
+        const eventIds = await this.client.command('SMEMBERS', this.key('rooms'));
+        const rooms = [];
+        for (const eventId of eventIds) {
+            const config = await this.client.command('GET', this.key(eventId, 'config'));
+            if (config) {
+                rooms.push({ eventId, config: JSON.parse(config) });
+            }
+        }
+        return rooms;
+    }
+
+    async join(eventId, userId) {
+        return this.client.command('EVAL', JOIN_SCRIPT, '3',
+            this.key('rooms'), this.key(eventId, 'users'), this.key(eventId, 'issued'),
+            String(eventId), String(userId));
+    }
+
+    async counters(eventId) {
+        const [issued, admitted] = await this.client.command('MGET', this.key(eventId, 'issued'), this.key(eventId, 'admitted'));
+        return { issued: parseInt(issued, 10) || 0, admitted: parseInt(admitted, 10) || 0 };
+    }
+
+    async advance(eventId, by) {
+        return this.client.command('EVAL', ADVANCE_SCRIPT, '2',
+            this.key(eventId, 'issued'), this.key(eventId, 'admitted'), String(by));
+    }
+
+    // Solo una réplica avanza los turnos en cada intervalo
+    async tryLead(ttlMs) {
+        const result = await this.client.command('SET', this.key('leader'), this.instanceId, 'NX', 'PX', String(ttlMs));
+        return result === 'OK';
+    }
+
+    async close() {
+        this.client.close();
+    }
+}
+
+/**
+ * Cliente RESP mínimo (lo justo para RedisStore) para no añadir una dependencia:
+ * una conexión, comandos en cola y respuestas en el mismo orden.
+ */
+class RespClient {
+    constructor(url) {
+        const { hostname, port, password } = new URL(url);
+        this.host = hostname || 'localhost';
+        this.port = parseInt(port, 10) || 6379;
+        this.password = password ? decodeURIComponent(password) : null;
+        this.socket = null;
+        this.pending = [];
+        this.buffer = Buffer.alloc(0);
+    }
+
+    connect() {
+        if (this.socket) return;
+        this.socket = net.createConnection({ host: this.host, port: this.port });
+        this.socket.setNoDelay(true);
+        this.socket.on('data', (chunk) => this.onData(chunk));
+        this.socket.on('error', (error) => this.failAll(error));
+        this.socket.on('close', () => {
+            this.socket = null;
+            this.buffer = Buffer.alloc(0);
+            this.failAll(new Error('Conexión con Redis cerrada'));
+        });
+        if (this.password) {
+            this.command('AUTH', this.password).catch(() => { });
+        }
+    }
+
+    command(...args) {
+        this.connect();
+        return new Promise((resolve, reject) => {
+            this.pending.push({ resolve, reject });
+            let payload = `*${args.length}\r\n`;
+            for (const arg of args) {
+                payload += `$${Buffer.byteLength(arg)}\r\n${arg}\r\n`;
+            }
+            this.socket.write(payload);
+        });
+    }
+
+    onData(chunk) {
+        this.buffer = Buffer.concat([this.buffer, chunk]);
+        while (this.pending.length > 0) {
+            const parsed = this.parse(0);
+            if (!parsed) return;
+            this.buffer = this.buffer.subarray(parsed.end);
+            const { resolve, reject } = this.pending.shift();
+            if (parsed.value instanceof Error) reject(parsed.value);
+            else resolve(parsed.value);
+        }
+    }
+
+    // Devuelve { value, end } o null si la respuesta aún no está completa
+    parse(offset) {
+        const lineEnd = this.buffer.indexOf('\r\n', offset);
+        if (lineEnd === -1) return null;
+        const type = String.fromCharCode(this.buffer[offset]);
+        const line = this.buffer.toString('utf8', offset + 1, lineEnd);
+        const next = lineEnd + 2;
+
+        switch (type) {
+            case '+':
+                return { value: line, end: next };
+            case '-':
+                return { value: new Error(line), end: next };
+            case ':':
+                return { value: parseInt(line, 10), end: next };
+            case '$': {
+                const length = parseInt(line, 10);
+                if (length === -1) return { value: null, end: next };
+                if (this.buffer.length < next + length + 2) return null;
+                return { value: this.buffer.toString('utf8', next, next + length), end: next + length + 2 };
+            }
+            case '*': {
+                const count = parseInt(line, 10);
+                if (count === -1) return { value: null, end: next };
+                const values = [];
+                let end = next;
+                for (let i = 0; i < count; i++) {
+                    const item = this.parse(end);
+                    if (!item) return null;
+                    values.push(item.value);
+                    end = item.end;
+                }
+                return { value: values, end };
+            }
+            default:
+                return { value: new Error(`Respuesta RESP inesperada: ${type}`), end: next };
+        }
+    }
+
+    failAll(error) {
+        const pending = this.pending;
+        this.pending = [];
+        for (const { reject } of pending) reject(error);
+    }
+
+    close() {
+        if (this.socket) this.socket.end();
+    }
+}
+
+const createStore = () => {
+    if (process.env.WAITING_ROOM_STORE === 'redis') {
+        return new RedisStore(process.env.REDIS_URL || 'redis://localhost:6379');
+    }
+    return new MemoryStore();
+};
+
+module.exports = { MemoryStore, RedisStore, createStore };
@@ -1,6 +1,7 @@
 // src/api/services/websocket.service.js
 const { Server } = require('socket.io');
 const jwt = require('jsonwebtoken');
+const metrics = require('../../utils/metrics');
 
 const JWT_SECRET = process.env.JWT_SECRET || 'tickets-jwt-secret-super-secreto-2025';
 
@@ -20,6 +21,7 @@ class WebSocketService {
             path: '/ws'
         });
 
+        metrics.instrumentSocketIo(this.io);
         this.setupAuthentication();
         this.setupEventHandlers();
         
@@ -92,23 +94,28 @@ class WebSocketService {
         });
     }
 
-    // ALTA PRIORIDAD: Notificar cambios de stock en tiempo real
-    notifyStockUpdate(eventId, ticketTypeId, stockData) {
-        if (!this.io) return;
+    /**
+     * ALTA PRIORIDAD: cambios de stock en tiempo real. Un mensaje por evento con
+     * los tipos de ticket que cambiaron (lo agrega stockBroadcast.service).
+     * Devuelve el tamaño del mensaje y a cuántos sockets se envió.
+     */
+    notifyStockUpdate(eventId, updates) {
+        if (!this.io) return null;
 
+        const room = `event-${eventId}`;
         const updateData = {
             eventId,
-            ticketTypeId,
-            available: stockData.available,
-            total: stockData.total,
-            sold: stockData.sold,
+            updates: updates.map(({ ticketTypeId, available, total, sold }) => ({ ticketTypeId, available, total, sold })),
             timestamp: new Date().toISOString()
         };
 
         // Notificar a todos los usuarios viendo este evento
-        this.io.to(`event-${eventId}`).emit('stock-updated', updateData);
-        
-        console.log(`📊 Stock actualizado para evento ${eventId}, ticket ${ticketTypeId}: ${stockData.available} disponibles`);
+        this.io.to(room).emit('stock-updated', updateData);
+
+        return {
+            bytes: Buffer.byteLength(JSON.stringify(updateData)),
+            recipients: this.io.sockets.adapter.rooms.get(room)?.size || 0
+        };
     }
 
     // ALTA PRIORIDAD: Alertar cuando stock está bajo
@@ -129,6 +136,20 @@ class WebSocketService {
         console.log(`⚠️ Alerta de stock bajo: evento ${eventId}, ticket ${ticketTypeId}`);
     }
 
+    // Sala de espera: último turno admitido, para que cada cliente calcule su posición y ETA
+    notifyWaitingRoom(eventId, roomData) {
+        if (!this.io) return;
+
+        this.io.to(`event-${eventId}`).emit('waiting-room-update', {
+            eventId,
+            admittedUpTo: roomData.admittedUpTo,
+            issued: roomData.issued,
+            inQueue: roomData.inQueue,
+            ratePerSecond: roomData.ratePerSecond,
+            timestamp: new Date().toISOString()
+        });
+    }
+
     // ALTA PRIORIDAD: Notificar cuando carrito expira
     notifyCartExpired(userId, cartData) {
         if (!this.io) return;
@@ -156,7 +177,7 @@ class WebSocketService {
         if (socketId) {
             const paymentUpdate = {
                 orderId: paymentData.orderId,
-                status: paymentData.status, // 'processing', 'success', 'failed'
+                status: paymentData.status, // 'processing', 'success', 'failed', 'refunded', 'refund_pending'
                 amount: paymentData.amount,
                 message: paymentData.message,
                 timestamp: new Date().toISOString()
@@ -187,23 +208,19 @@ class WebSocketService {
     }
 
     // ALTA PRIORIDAD: Notificar validación de ticket en punto de entrada
-    notifyTicketValidated(eventId, validationData) {
+    /**
+     * Notifica las entradas validadas de un evento en un solo mensaje por lote
+     * de check-in: { eventId, validations: [{ ticketCode, userId, validatedAt }], timestamp }.
+     */
+    notifyTicketsValidated(eventId, validations) {
         if (!this.io) return;
 
-        const validationUpdate = {
+        // Notificar a organizadores del evento (si están conectados)
+        this.io.to(`event-${eventId}`).emit('ticket-validated', {
             eventId,
-            ticketCode: validationData.ticketCode,
-            userId: validationData.userId,
-            validatedAt: validationData.timestamp,
-            status: validationData.status, // 'valid', 'used', 'invalid'
-            message: validationData.message,
+            validations,
             timestamp: new Date().toISOString()
-        };
-
-        // Notificar a organizadores del evento (si están conectados)
-        this.io.to(`event-${eventId}`).emit('ticket-validated', validationUpdate);
-        
-        console.log(`✅ Validación de ticket notificada para evento ${eventId}`);
+        });
     }
 
     // Método para obtener estadísticas de conexiones
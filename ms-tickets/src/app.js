@@ -1,9 +1,20 @@
 const express = require('express');
 const config = require('./config');
 const consumerService = require('./api/services/consumer.service');
+const cartSweeperService = require('./api/services/cartSweeper.service');
+const orderQueueService = require('./api/services/orderQueue.service');
+const outboxService = require('./api/services/outbox.service');
+const stockBroadcastService = require('./api/services/stockBroadcast.service');
+const checkInService = require('./api/services/checkIn.service');
+const tokenCache = require('./utils/tokenCache');
+const { dbRouting } = require('./config/database');
+const metrics = require('./utils/metrics');
 
 const app = express();
 
+// Latencia por ruta para GET /metrics (antes que el resto de middlewares)
+app.use(metrics.httpMiddleware());
+
 // Aplicar configuraciones
 config.express(app);
 config.cors(app);
@@ -22,14 +33,33 @@ app.get('/status', (req, res) => {
     });
 });
 
+// Estadísticas de cada componente: en JSON en /health y como app_stat en /metrics
+const componentStats = {
+    cartSweeper: () => cartSweeperService.getStats(),
+    orderQueue: () => orderQueueService.getStats(),
+    eventsConsumer: () => consumerService.getStats(),
+    outbox: () => outboxService.getStats(),
+    stockBroadcast: () => stockBroadcastService.getStats(),
+    checkIn: () => checkInService.getStats(),
+    tokenCache: () => tokenCache.getStats(),
+    database: () => dbRouting.getStats()
+};
+for (const [component, getStats] of Object.entries(componentStats)) {
+    metrics.registerStats(component, getStats);
+}
+
 app.get('/health', (req, res) => {
+    const stats = Object.fromEntries(Object.entries(componentStats).map(([component, getStats]) => [component, getStats()]));
     res.json({
         status: 'OK',
         timestamp: new Date().toISOString(),
-        uptime: process.uptime()
+        uptime: process.uptime(),
+        ...stats
     });
 });
 
+app.get('/metrics', metrics.handler());
+
 // Rutas de la API
 const apiRoutes = require('./api/routes');
 app.use('/api/v1', apiRoutes);
@@ -1,4 +1,6 @@
 const { Sequelize } = require('sequelize');
+const dbRouting = require('../utils/dbRouting');
+const metrics = require('../utils/metrics');
 
 const isTest = process.env.NODE_ENV === 'test';
 
@@ -18,27 +20,39 @@ if (isTest) {
         }
     });
 } else {
-    // Configuración para producción/desarrollo con DATABASE_URL
-    sequelize = new Sequelize(process.env.DATABASE_URL, {
+    // Configuración para producción/desarrollo con DATABASE_URL. Las lecturas
+    // marcadas con `useReplica` van a DATABASE_REPLICA_URLS (separadas por comas)
+    const replicaUrls = (process.env.DATABASE_REPLICA_URLS || '').split(',').map(url => url.trim()).filter(Boolean);
+    const connectionOptions = {
         dialect: process.env.DB_DIALECT || 'postgres',
-        logging: process.env.NODE_ENV === 'development' ? console.log : false,
-        pool: {
-            max: 5,
-            min: 1,
-            acquire: 60000,
-            idle: 10000,
-            evict: 1000
-        },
         dialectOptions: {
             ssl: process.env.NODE_ENV === 'production' ? {
                 require: true,
                 rejectUnauthorized: false
             } : false
         }
+    };
+    sequelize = new Sequelize(process.env.DATABASE_URL, {
+        ...connectionOptions,
+        logging: process.env.NODE_ENV === 'development' ? console.log : false,
+        replication: dbRouting.replicationOptions(replicaUrls),
+        // Con réplicas cada pool (escritura y lectura) tiene este tamaño
+        pool: {
+            max: parseInt(process.env.DB_POOL_MAX, 10) || 5,
+            min: parseInt(process.env.DB_POOL_MIN, 10) || 1,
+            acquire: parseInt(process.env.DB_POOL_ACQUIRE_MS, 10) || 60000,
+            idle: parseInt(process.env.DB_POOL_IDLE_MS, 10) || 10000,
+            evict: parseInt(process.env.DB_POOL_EVICT_MS, 10) || 1000
+        }
     });
+    dbRouting.attach(sequelize, replicaUrls, connectionOptions);
 }
 
+// Tiempo por consulta y espera por conexión en GET /metrics
+metrics.instrumentSequelize(sequelize);
+
 module.exports = {
     sequelize,
-    Sequelize
+    Sequelize,
+    dbRouting
 };
\ No newline at end of file
@@ -1,8 +1,20 @@
 require('dotenv').config();
 const app = require('./app');
 const { sequelize } = require('./api/models');
+const { dbRouting } = require('./config/database');
 const publisherService = require('./api/services/publisher.service');
 const websocketService = require('./api/services/websocket.service');
+const schemaService = require('./api/services/schema.service');
+const reservationService = require('./api/services/reservation.service');
+const cartSweeperService = require('./api/services/cartSweeper.service');
+const orderService = require('./api/services/order.service');
+const waitingRoomService = require('./api/services/waitingRoom.service');
+const consumerService = require('./api/services/consumer.service');
+const outboxService = require('./api/services/outbox.service');
+const stockBroadcastService = require('./api/services/stockBroadcast.service');
+const checkInService = require('./api/services/checkIn.service');
+
+const PENDING_ORDER_CHECK_MS = 60 * 1000;
 
 const PORT = process.env.PORT || 3000;
 
@@ -12,6 +24,8 @@ const startServer = async () => {
         // Verificar conexión a la base de datos
         await sequelize.authenticate();
         console.log('✅ Conexión a la base de datos establecida correctamente');
+        // Retraso de las réplicas de lectura (si hay DATABASE_REPLICA_URLS)
+        dbRouting.start();
 
         // Sincronizar modelos (solo en desarrollo)
         if (process.env.NODE_ENV === 'development') {
@@ -19,6 +33,14 @@ const startServer = async () => {
             console.log('📊 Modelos sincronizados con la base de datos');
         }
 
+        // Tablas e índices que solo declaran los modelos (outbox, índices de paginación...)
+        await schemaService.migrate();
+        console.log('📊 Esquema de la base de datos al día');
+
+        // Libro de reservas: columna `reserved` y recálculo desde los carritos abiertos
+        await reservationService.migrate();
+        console.log('📊 Libro de reservas recalculado');
+
         // Iniciar servidor
         await publisherService.start();
         const server = app.listen(PORT, () => {
@@ -30,9 +52,37 @@ const startServer = async () => {
         // Inicializar WebSocket Server
         websocketService.initialize(server);
 
+        // Barrido periódico de carritos expirados: es quien devuelve su reserva al stock
+        if (process.env.CART_SWEEP_ENABLED !== 'false') {
+            cartSweeperService.start();
+        } else {
+            console.warn('⚠️ Barrido de carritos desactivado: los carritos expirados retienen su reserva hasta que otra réplica los barra');
+        }
+
+        // Relay del outbox: publica purchase.completed fuera del camino de la petición
+        outboxService.start();
+
+        // Salas de espera (admisión al carrito por evento)
+        waitingRoomService.start();
+
+        // Pedidos asíncronos que se quedaron PENDING (p. ej. tras un reinicio)
+        const expirePendingOrders = () => orderService.expireStalePendingOrders().catch(error => {
+            console.error('❌ Error liberando pedidos pendientes:', error);
+        });
+        expirePendingOrders();
+        setInterval(expirePendingOrders, PENDING_ORDER_CHECK_MS).unref();
+
         // Manejo de cierre graceful
         process.on('SIGTERM', async () => {
             console.log('🔄 Cerrando servidor...');
+            cartSweeperService.stop();
+            stockBroadcastService.stop();
+            await checkInService.stop();
+            await waitingRoomService.stop();
+            await consumerService.stop();
+            await outboxService.stop();
+            await publisherService.stop();
+            await dbRouting.stop();
             await sequelize.close();
             server.close(() => {
                 console.log('✅ Servidor cerrado correctamente');
@@ -0,0 +1,5 @@
+// src/utils/dbRouting.js
+const sequelize = require('sequelize');
+const { DbRouting } = require('@ticket-slave/service-kit');
+
+module.exports = new DbRouting(sequelize);
@@ -20,6 +20,12 @@ class BadRequestError extends AppError {
     }
 }
 
+class ForbiddenError extends AppError {
+    constructor(message = 'Prohibido') {
+        super(message, 403);
+    }
+}
+
 class ConflictError extends AppError {
     constructor(message = 'Conflicto de recursos') {
         super(message, 409);
@@ -30,5 +36,6 @@ module.exports = {
     AppError,
     NotFoundError,
     BadRequestError,
+    ForbiddenError,
     ConflictError,
 };
\ No newline at end of file
@@ -0,0 +1,78 @@
+// src/utils/pagination.js
+const { Op } = require('sequelize');
+const { BadRequestError } = require('./errors');
+
+const DEFAULT_LIMIT = parseInt(process.env.PAGINATION_DEFAULT_LIMIT, 10) || 20;
+const MAX_LIMIT = parseInt(process.env.PAGINATION_MAX_LIMIT, 10) || 100;
+
+/**
+ * Paginación por cursor (keyset) para los listados ordenados por
+ * `createdAt DESC, id DESC`.
+ *
+ * El cursor es la pareja (createdAt, id) de la última fila devuelta, en
+ * base64url. La página siguiente filtra por "estrictamente anterior a esa
+ * pareja", así que con el índice (user_id, created_at, id) cada página cuesta
+ * lo mismo sin importar lo lejos que esté, a diferencia de OFFSET.
+ */
+const parseLimit = (limit) => {
+    const value = parseInt(limit, 10);
+    if (!value || value < 1) return DEFAULT_LIMIT;
+    return Math.min(value, MAX_LIMIT);
+};
+
+const encodeCursor = (row) => Buffer
+    .from(JSON.stringify([new Date(row.createdAt).toISOString(), row.id]))
+    .toString('base64url');
+
+const decodeCursor = (cursor) => {
+    try {
+        const [createdAt, id] = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf8'));
+        const date = new Date(createdAt);
+        if (Number.isNaN(date.getTime()) || id === undefined) throw new Error('cursor incompleto');
+        return { createdAt: date, id };
+    } catch (error) {
+        throw new BadRequestError('El cursor de paginación no es válido.');
+    }
+};
+
+/** Condición WHERE de las filas posteriores al cursor en orden createdAt DESC, id DESC. */
+const afterCursor = (cursor) => {
+    const { createdAt, id } = decodeCursor(cursor);
+    return {
+        [Op.or]: [
+            { createdAt: { [Op.lt]: createdAt } },
+            { createdAt, id: { [Op.lt]: id } },
+        ]
+    };
+};
+
+const KEYSET_ORDER = [['createdAt', 'DESC'], ['id', 'DESC']];
+
+/**
+ * Lee una página pidiendo `limit + 1` filas: la sobrante solo indica que hay
+ * más y no se devuelve. El total (COUNT) únicamente se calcula si se pide.
+ * Con `useReplica` ambas lecturas pueden ir a una réplica (ver dbRouting).
+ */
+const findPage = async (model, { where, attributes, include, limit, cursor, includeTotal = false, useReplica = false }) => {
+    const pageSize = parseLimit(limit);
+    const pageWhere = cursor ? { [Op.and]: [where, afterCursor(cursor)] } : where;
+
+    const [rows, totalItems] = await Promise.all([
+        model.findAll({ where: pageWhere, attributes, include, order: KEYSET_ORDER, limit: pageSize + 1, useReplica }),
+        includeTotal ? model.count({ where, useReplica }) : Promise.resolve(undefined),
+    ]);
+
+    const hasMore = rows.length > pageSize;
+    const data = hasMore ? rows.slice(0, pageSize) : rows;
+    const pagination = {
+        pageSize,
+        hasMore,
+        nextCursor: hasMore ? encodeCursor(data[data.length - 1]) : null,
+    };
+    if (includeTotal) {
+        pagination.totalItems = totalItems;
+    }
+    return { pagination, data };
+};
+
+module.exports = { DEFAULT_LIMIT, MAX_LIMIT, parseLimit, encodeCursor, decodeCursor, afterCursor, findPage };
@@ -0,0 +1,5 @@
+// src/utils/tokenCache.js
+const jwt = require('jsonwebtoken');
+const { TokenCache } = require('@ticket-slave/service-kit');
+
+module.exports = new TokenCache(jwt);
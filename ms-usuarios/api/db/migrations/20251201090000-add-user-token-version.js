@@ -0,0 +1,18 @@
+'use strict';
+
+const { UserSchema, USER_TABLE } = require('../models/user.model');
+
+/** @type {import('sequelize-cli').Migration} */
+module.exports = {
+  async up(queryInterface, Sequelize) {
+    // create-user ya la crea en instalaciones nuevas (usa UserSchema)
+    const columns = await queryInterface.describeTable(USER_TABLE);
+    if (!columns.token_version) {
+      await queryInterface.addColumn(USER_TABLE, 'token_version', UserSchema.tokenVersion);
+    }
+  },
+
+  async down(queryInterface, Sequelize) {
+    await queryInterface.removeColumn(USER_TABLE, 'token_version');
+  }
+};
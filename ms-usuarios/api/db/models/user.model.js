@@ -59,6 +59,13 @@ const UserSchema = {
     type: DataTypes.STRING,
     allowNull: true,
   },
+  // Se incrementa al cambiar la contraseña o cerrar sesión: invalida los refresh tokens anteriores
+  tokenVersion: {
+    allowNull: false,
+    type: DataTypes.INTEGER,
+    field: 'token_version',
+    defaultValue: 0,
+  },
   createdAt: {
     allowNull: false,
     type: DataTypes.DATE,
@@ -0,0 +1,67 @@
+'use strict';
+const bcrypt = require('bcrypt');
+
+// Cuentas para pruebas de carga (locust). El pool de tokens de locust reparte
+// los usuarios virtuales entre estas cuentas en lugar de usar solo customer@test.com.
+const LOAD_TEST_CUSTOMERS = parseInt(process.env.LOAD_TEST_CUSTOMERS, 10) || 500;
+const LOAD_TEST_ORGANIZERS = parseInt(process.env.LOAD_TEST_ORGANIZERS, 10) || 20;
+const LOAD_TEST_PASSWORD = process.env.LOAD_TEST_PASSWORD || 'password';
+const BATCH_SIZE = 500;
+
+/** @type {import('sequelize-cli').Migration} */
+module.exports = {
+  async up(queryInterface, Sequelize) {
+    const now = new Date();
+    // Un solo hash para todas las cuentas: el seeder no debe pagar N veces bcrypt
+    const hashedPassword = await bcrypt.hash(LOAD_TEST_PASSWORD, 10);
+
+    const roles = await queryInterface.sequelize.query(
+      `SELECT id, nombre FROM roles WHERE nombre IN ('customer', 'organizer')`,
+      { type: Sequelize.QueryTypes.SELECT }
+    );
+    const roleMap = roles.reduce((acc, role) => {
+      acc[role.nombre] = role.id;
+      return acc;
+    }, {});
+
+    const users = [];
+    for (let i = 1; i <= LOAD_TEST_CUSTOMERS; i++) {
+      users.push({
+        nombre: 'Customer',
+        apellido: `Load ${i}`,
+        email: `loadtest.customer${i}@test.com`,
+        password: hashedPassword,
+        status: 'active',
+        fechaNacimiento: '1995-10-20',
+        pais: 'EC',
+        aceptaTerminos: true,
+        role_id: roleMap.customer,
+        created_at: now
+      });
+    }
+    for (let i = 1; i <= LOAD_TEST_ORGANIZERS; i++) {
+      users.push({
+        nombre: 'Organizer',
+        apellido: `Load ${i}`,
+        email: `loadtest.organizer${i}@test.com`,
+        password: hashedPassword,
+        status: 'active',
+        fechaNacimiento: '1992-05-15',
+        pais: 'EC',
+        aceptaTerminos: true,
+        role_id: roleMap.organizer,
+        created_at: now
+      });
+    }
+
+    for (let i = 0; i < users.length; i += BATCH_SIZE) {
+      await queryInterface.bulkInsert('users', users.slice(i, i + BATCH_SIZE), {});
+    }
+  },
+
+  async down(queryInterface, Sequelize) {
+    await queryInterface.bulkDelete('users', {
+      email: { [Sequelize.Op.like]: 'loadtest.%@test.com' }
+    }, {});
+  }
+};
@@ -1,6 +1,8 @@
 const express = require('express');
 const cors = require('cors');
 const routerApi = require('./routes');
+const tokenCache = require('./utils/auth/tokenCache');
+const metrics = require('./libs/metrics');
 const { logErrors,
   errorHandler,
   sequelizeHandler,
@@ -9,6 +11,8 @@ const { logErrors,
 const app = express();
 const port = process.env.PORT || 3000;
 
+// Latencia por ruta para GET /metrics (antes que el resto de middlewares)
+app.use(metrics.httpMiddleware());
 app.use(express.json());
 
 app.use(cors());
@@ -23,10 +27,14 @@ app.get('/status', (req, res) => {
     res.json({
         message: 'Microservicio funcionando correctamente USUARIOS',
         timestamp: new Date().toISOString(),
-        version: '1.0.0'
+        version: '1.0.0',
+        tokenCache: tokenCache.getStats()
     });
 });
 
+metrics.registerStats('tokenCache', () => tokenCache.getStats());
+app.get('/metrics', metrics.handler());
+
 routerApi(app);
 
 app.use(logErrors);
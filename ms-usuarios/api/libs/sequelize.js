@@ -3,6 +3,7 @@ const { Sequelize } = require('sequelize');
 
 const { config } = require('../config/config');
 const { setupModels } = require('../db/models');
+const metrics = require('./metrics');
 
 const USER = encodeURIComponent(config.dbUser);
 const PASSWORD = encodeURIComponent(config.dbPassword);
@@ -34,6 +35,7 @@ console.log('URI:', URI);
 console.log('=======================================================')
 
 const sequelize = new Sequelize(URI, options);
+metrics.instrumentSequelize(sequelize);
 
 sequelize.authenticate()
   .then(() => {
@@ -43,7 +43,6 @@ function checkPermissions(...permissions) {
 
 function checkRole(role) {
   return (req, res, next) => {
-    console.log(req.user);
     const userRole = req.user.role;
     if (userRole !== role) {
       next(boom.unauthorized('Rol no autorizado'));
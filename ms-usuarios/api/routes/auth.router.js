@@ -2,7 +2,7 @@ const express = require('express');
 const passport = require('passport');
 
 const AuthService = require('../services/auth.service');
-const { createUserSchema, loginSchema, logoutSchema, recoverySchema, changePasswordSchema } = require('../schemas/auth.schema');
+const { createUserSchema, loginSchema, logoutSchema, refreshSchema, recoverySchema, changePasswordSchema } = require('../schemas/auth.schema');
 const validatorHandler = require('../middlewares/validator.handler');
 const service = new AuthService();
 
@@ -38,18 +38,30 @@ router.post('/login',
   }
 );
 
+router.post('/refresh',
+  validatorHandler(refreshSchema, 'body'),
+  async (req, res, next) => {
+    try {
+      const { refreshToken } = req.body;
+      res.json(await service.refresh(refreshToken));
+    } catch (error) {
+      next(error);
+    }
+  }
+);
+
 router.post('/logout',
   validatorHandler(logoutSchema, 'body'),
   async (req, res, next) => {
     try {
+      // token es el refresh token de la sesión
       const { token } = req.body;
-
+      res.json(await service.logout(token));
     } catch (error) {
       next(error);
     }
   }
-
-)
+);
 
 router.post('/recover',
   validatorHandler(recoverySchema, 'body'),
@@ -11,6 +11,7 @@ const passwordConfirmation = Joi.string()
     'any.only': 'Password confirmation must match the password.',
   });
 const token = Joi.string().required();
+const refreshToken = Joi.string().required();
 const apellido = Joi.string();
 const status = Joi.string().valid('active', 'inactive').default('active');
 const fechaNacimiento = Joi.date();
@@ -39,6 +40,10 @@ const logoutSchema = Joi.object({
   token,
 });
 
+const refreshSchema = Joi.object({
+  refreshToken,
+});
+
 const recoverySchema = Joi.object({
   email,
 });
@@ -53,6 +58,7 @@ module.exports = {
   createUserSchema,
   loginSchema,
   logoutSchema,
+  refreshSchema,
   recoverySchema,
   changePasswordSchema
 };
@@ -84,6 +90,11 @@ Ejemplo para logoutSchema:
   "token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9"
 }
 
+Ejemplo para refreshSchema:
+{
+  "refreshToken": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9"
+}
+
 Ejemplo para recoverySchema:
 {
   "email": "carlos.ramirez@example.com"
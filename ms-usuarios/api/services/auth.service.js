@@ -58,15 +58,58 @@ class AuthService {
       role: user.role.nombre
     }
     const secret = config.jwtSecret;
-    const token = jwt.sign(payload, secret);
+    const token = jwt.sign(payload, secret, { expiresIn: config.jwtExpiresIn });
+    // El refresh token va firmado con otro secreto: el resto de servicios no lo acepta como token de acceso.
+    // `ver` es la versión de tokens del usuario; refresh() rechaza los de una versión anterior
+    const refreshToken = jwt.sign(
+      { sub: user.id, ver: user.tokenVersion },
+      config.jwtRefreshSecret,
+      { expiresIn: config.jwtRefreshExpiresIn }
+    );
+    const { iat, exp } = jwt.decode(token);
     return {
       token,
+      refreshToken,
+      expiresIn: exp - iat,
       user
     };
   }
 
-  async logout(token) {
-    return { message: 'Logged out successfully', token, email };
+  /**
+   * Emite un token de acceso nuevo a partir de un refresh token, sin pasar por
+   * bcrypt: basta con verificar la firma y releer el usuario con su rol. El
+   * refresh token tiene que ser de la versión actual del usuario: cambiar la
+   * contraseña o cerrar sesión la incrementa y revoca los emitidos antes.
+   */
+  async refresh(refreshToken) {
+    const payload = this.verifyRefreshToken(refreshToken);
+    const user = await this.model.findByPk(payload.sub, {
+      include: ['role'],
+      attributes: { exclude: ['password', 'recoveryToken'] }
+    });
+    if (!user || (payload.ver ?? 0) !== user.tokenVersion) {
+      throw boom.unauthorized('Invalid refresh token');
+    }
+    return this.signToken(user);
+  }
+
+  /** Revoca todos los refresh tokens del usuario (en todos sus dispositivos). */
+  async logout(refreshToken) {
+    const payload = this.verifyRefreshToken(refreshToken);
+    await this.revokeRefreshTokens(payload.sub);
+    return { message: 'Logged out successfully' };
+  }
+
+  verifyRefreshToken(refreshToken) {
+    try {
+      return jwt.verify(refreshToken, config.jwtRefreshSecret);
+    } catch (error) {
+      throw boom.unauthorized('Invalid refresh token');
+    }
+  }
+
+  async revokeRefreshTokens(userId) {
+    await this.model.increment('tokenVersion', { where: { id: userId } });
   }
 
   async resetPassword(email) {
@@ -104,6 +147,7 @@ class AuthService {
 
       const hash = await bcrypt.hash(password, 10);
       await userService.update(user.id, { password: hash, recoveryToken: null });
+      await this.revokeRefreshTokens(user.id);
 
       return { message: 'Password changed' };
     } catch (error) {
@@ -0,0 +1,4 @@
+const jwt = require('jsonwebtoken');
+const { TokenCache } = require('@ticket-slave/service-kit');
+
+module.exports = new TokenCache(jwt);
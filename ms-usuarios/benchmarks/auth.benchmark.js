@@ -0,0 +1,95 @@
+// benchmarks/auth.benchmark.js
+//
+// Compara, en un solo proceso y sin base de datos:
+// - Logins por segundo con contraseña (bcrypt.compare + firma) frente a
+//   renovaciones con refresh token (verificación + firma). La lectura del
+//   usuario que hacen ambos caminos no se incluye.
+// - Coste de verificar el token en cada petición con jwt.verify frente a la
+//   caché de tokens verificados (utils/auth/tokenCache) que usan los servicios.
+//
+// Uso: npm run bench:auth -- [segundos por prueba] [tokens distintos] [peticiones de verificación]
+const bcrypt = require('bcrypt');
+const jwt = require('jsonwebtoken');
+
+process.env.JWT_CACHE_ENABLED = 'true';
+const tokenCache = require('../api/utils/auth/tokenCache');
+
+const SECONDS = parseFloat(process.argv[2]) || 3;
+const DISTINCT_TOKENS = parseInt(process.argv[3], 10) || 1000;
+const VERIFY_REQUESTS = parseInt(process.argv[4], 10) || 200000;
+// bcrypt corre en el threadpool de libuv (4 hilos por defecto)
+const CONCURRENCY = parseInt(process.env.UV_THREADPOOL_SIZE, 10) || 4;
+
+const SECRET = 'bench-secret';
+const REFRESH_SECRET = 'bench-secret:refresh';
+const user = { id: 1, email: 'bench@test.com', role: { nombre: 'customer' } };
+
+// Misma firma que AuthService.signToken
+function signToken(u) {
+  const token = jwt.sign({ sub: u.id, email: u.email, role: u.role.nombre }, SECRET, { expiresIn: '15m' });
+  const refreshToken = jwt.sign({ sub: u.id }, REFRESH_SECRET, { expiresIn: '7d' });
+  return { token, refreshToken };
+}
+
+async function throughput(operation) {
+  const deadline = Date.now() + SECONDS * 1000;
+  let count = 0;
+  const worker = async () => {
+    while (Date.now() < deadline) {
+      await operation();
+      count++;
+    }
+  };
+  const startedAt = process.hrtime.bigint();
+  await Promise.all(Array.from({ length: CONCURRENCY }, worker));
+  const seconds = Number(process.hrtime.bigint() - startedAt) / 1e9;
+  return Math.round(count / seconds);
+}
+
+function perRequestMicros(verify, tokens) {
+  const startedAt = process.hrtime.bigint();
+  for (let i = 0; i < VERIFY_REQUESTS; i++) {
+    verify(tokens[i % tokens.length]);
+  }
+  return Number(process.hrtime.bigint() - startedAt) / 1e3 / VERIFY_REQUESTS;
+}
+
+async function main() {
+  const hash = await bcrypt.hash('password', 10);
+  const { refreshToken } = signToken(user);
+
+  console.log(`Benchmark de autenticación: ${SECONDS}s por prueba, concurrencia ${CONCURRENCY}`);
+  const loginPerSec = await throughput(async () => {
+    await bcrypt.compare('password', hash);
+    signToken(user);
+  });
+  const refreshPerSec = await throughput(async () => {
+    jwt.verify(refreshToken, REFRESH_SECRET);
+    signToken(user);
+  });
+  console.table([
+    { camino: 'POST /auth/login (bcrypt)', 'ops/s': loginPerSec },
+    { camino: 'POST /auth/refresh', 'ops/s': refreshPerSec, 'x login': Number((refreshPerSec / loginPerSec).toFixed(1)) },
+  ]);
+
+  const tokens = Array.from({ length: DISTINCT_TOKENS }, (_, i) =>
+    signToken({ ...user, id: i + 1, email: `bench${i + 1}@test.com` }).token);
+  const plainMicros = perRequestMicros(token => jwt.verify(token, SECRET), tokens);
+  const cachedMicros = perRequestMicros(token => tokenCache.verify(token, SECRET), tokens);
+  const stats = tokenCache.getStats();
+  console.log(`\nVerificación de ${VERIFY_REQUESTS} peticiones con ${DISTINCT_TOKENS} tokens distintos`);
+  console.table([
+    { verificación: 'jwt.verify en cada petición', 'µs/petición': Number(plainMicros.toFixed(2)) },
+    {
+      verificación: 'tokenCache',
+      'µs/petición': Number(cachedMicros.toFixed(2)),
+      'x jwt.verify': Number((plainMicros / cachedMicros).toFixed(1)),
+      hitRatio: stats.hitRatio,
+    },
+  ]);
+}
+
+main().catch(error => {
+  console.error('❌ Error en el benchmark:', error);
+  process.exit(1);
+});
@@ -0,0 +1,184 @@
+// dbRouting.js
+const DB_REPLICA_LAG_CHECK_MS = parseInt(process.env.DB_REPLICA_LAG_CHECK_MS, 10) || 10000;
+const DB_REPLICA_MAX_LAG_MS = parseInt(process.env.DB_REPLICA_MAX_LAG_MS, 10) || 5000;
+
+// En el primario pg_is_in_recovery() es false; en una réplica al día lo recibido y lo aplicado coinciden
+const REPLICA_LAG_SQL = `
+    SELECT CASE
+             WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+             ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) * 1000
+           END AS "lagMs"`;
+
+/** Host, puerto, usuario, contraseña y base de datos de una URL, como los espera `replication.read`. */
+const connectionFromUrl = (url) => {
+    const parsed = new URL(url);
+    return {
+        host: parsed.hostname,
+        port: parsed.port ? parseInt(parsed.port, 10) : undefined,
+        username: decodeURIComponent(parsed.username),
+        password: decodeURIComponent(parsed.password),
+        database: parsed.pathname.slice(1)
+    };
+};
+
+const newWaitStats = () => ({ acquisitions: 0, timeouts: 0, totalWaitMs: 0, maxWaitMs: 0, lastWaitMs: 0 });
+
+/**
+ * Separación de lecturas y escrituras sobre la `replication` de Sequelize.
+ *
+ * Sequelize manda a las réplicas todo SELECT fuera de una transacción,
+ * incluidas las consultas crudas con RETURNING y las lecturas que siguen a
+ * una escritura. Aquí es al revés: todo va al primario salvo las lecturas que
+ * lo piden con `useReplica: true` (catálogo, historial de pedidos, listado de
+ * entradas). Las transacciones siempre usan el primario.
+ *
+ * Además mide la espera por conexión de cada pool y comprueba cada
+ * DB_REPLICA_LAG_CHECK_MS el retraso de cada réplica; si alguna supera
+ * DB_REPLICA_MAX_LAG_MS o no responde, las lecturas vuelven al primario
+ * hasta que se recupere.
+ *
+ * Tras `markWrite()` las lecturas `useReplica` también van al primario durante
+ * DB_REPLICA_MAX_LAG_MS: una réplica sana puede ir hasta ese tiempo por
+ * detrás y no debe devolver (ni dejar cachear) lo de antes de la escritura.
+ *
+ * Recibe el módulo `sequelize` del servicio, que es quien lo tiene como
+ * dependencia: `new DbRouting(require('sequelize'))`.
+ */
+class DbRouting {
+    constructor({ Sequelize, QueryTypes }) {
+        this.Sequelize = Sequelize;
+        this.QueryTypes = QueryTypes;
+        this.sequelize = null;
+        this.replicas = []; // { name, url, probe, lagMs, checkedAt, error }
+        this.timer = null;
+        this.primaryUntil = 0;
+        this.stats = {
+            read: newWaitStats(),
+            write: newWaitStats(),
+            replicaReads: 0,
+            primaryFallbacks: 0,
+            readYourWrites: 0
+        };
+    }
+
+    /** Opciones `replication` para el constructor de Sequelize, o undefined sin réplicas. */
+    replicationOptions(replicaUrls) {
+        if (replicaUrls.length === 0) return undefined;
+        return { read: replicaUrls.map(connectionFromUrl), write: {} };
+    }
+
+    /**
+   * Envuelve la obtención de conexiones de `sequelize` para decidir el pool
+   * y medir la espera. `probeOptions` son las opciones de las conexiones que
+   * comprueban el retraso (dialecto, SSL).
+   */
+    attach(sequelize, replicaUrls = [], probeOptions = {}) {
+        this.sequelize = sequelize;
+        this.replicas = replicaUrls.map(url => {
+            const { host, port } = connectionFromUrl(url);
+            return { name: port ? `${host}:${port}` : host, url, probeOptions, probe: null, lagMs: null, checkedAt: null, error: null };
+        });
+
+        const connectionManager = sequelize.connectionManager;
+        const getConnection = connectionManager.getConnection.bind(connectionManager);
+        connectionManager.getConnection = async (options = {}) => {
+            const wantsReplica = options.useReplica === true && options.type === this.QueryTypes.SELECT && this.replicas.length > 0;
+            const afterWrite = wantsReplica && Date.now() < this.primaryUntil;
+            const useReplica = wantsReplica && !afterWrite && this.replicasHealthy();
+            if (afterWrite) this.stats.readYourWrites++;
+            else if (wantsReplica && !useReplica) this.stats.primaryFallbacks++;
+            if (useReplica) this.stats.replicaReads++;
+
+            const stats = useReplica ? this.stats.read : this.stats.write;
+            const startedAt = process.hrtime.bigint();
+            try {
+                return await getConnection({ ...options, useMaster: !useReplica });
+            } catch (error) {
+                if (error.name === 'SequelizeConnectionAcquireTimeoutError') stats.timeouts++;
+                throw error;
+            } finally {
+                const waitMs = Number(process.hrtime.bigint() - startedAt) / 1e6;
+                stats.acquisitions++;
+                stats.totalWaitMs += waitMs;
+                stats.lastWaitMs = waitMs;
+                stats.maxWaitMs = Math.max(stats.maxWaitMs, waitMs);
+            }
+        };
+        return sequelize;
+    }
+
+    /** Se acaba de confirmar una escritura: las réplicas pueden no tenerla todavía. */
+    markWrite() {
+        if (this.replicas.length === 0) return;
+        this.primaryUntil = Date.now() + DB_REPLICA_MAX_LAG_MS;
+    }
+
+    // Sin comprobar todavía cuenta como sana: el primer chequeo llega en cuanto arranca el monitor
+    replicasHealthy() {
+        return this.replicas.every(replica => !replica.error && (replica.lagMs === null || replica.lagMs <= DB_REPLICA_MAX_LAG_MS));
+    }
+
+    /** Empieza a comprobar el retraso de las réplicas. */
+    start() {
+        if (this.replicas.length === 0 || this.timer) return;
+        this.checkReplicas();
+        this.timer = setInterval(() => this.checkReplicas(), DB_REPLICA_LAG_CHECK_MS);
+        this.timer.unref();
+    }
+
+    async checkReplicas() {
+        await Promise.all(this.replicas.map(async (replica) => {
+            try {
+                if (!replica.probe) {
+                    // Una conexión propia por réplica: el pool de lectura no deja elegir a cuál se va
+                    replica.probe = new this.Sequelize(replica.url, {
+                        ...replica.probeOptions,
+                        logging: false,
+                        pool: { max: 1, min: 0, idle: DB_REPLICA_LAG_CHECK_MS * 2 }
+                    });
+                }
+                const [row] = await replica.probe.query(REPLICA_LAG_SQL, { type: this.QueryTypes.SELECT });
+                replica.lagMs = Math.round(Number(row.lagMs));
+                replica.error = null;
+            } catch (error) {
+                replica.error = error.message;
+            }
+            replica.checkedAt = new Date();
+        }));
+    }
+
+    async stop() {
+        clearInterval(this.timer);
+        this.timer = null;
+        await Promise.all(this.replicas.filter(replica => replica.probe).map(replica => replica.probe.close()));
+    }
+
+    getStats() {
+        const pools = this.sequelize ? this.sequelize.connectionManager.pool : null;
+        const poolStats = (pool, waits) => ({
+            size: pool?.size,
+            available: pool?.available,
+            using: pool?.using,
+            waiting: pool?.waiting,
+            max: pool?.maxSize,
+            acquisitions: waits.acquisitions,
+            timeouts: waits.timeouts,
+            avgWaitMs: waits.acquisitions ? Number((waits.totalWaitMs / waits.acquisitions).toFixed(2)) : 0,
+            maxWaitMs: Number(waits.maxWaitMs.toFixed(2)),
+            lastWaitMs: Number(waits.lastWaitMs.toFixed(2))
+        });
+        const replicated = this.replicas.length > 0;
+
+        return {
+            write: poolStats(replicated ? pools?.write : pools, this.stats.write),
+            read: replicated ? poolStats(pools?.read, this.stats.read) : null,
+            replicaReads: this.stats.replicaReads,
+            primaryFallbacks: this.stats.primaryFallbacks,
+            readYourWrites: this.stats.readYourWrites,
+            maxLagMs: DB_REPLICA_MAX_LAG_MS,
+            replicas: this.replicas.map(({ name, lagMs, checkedAt, error }) => ({ name, lagMs, checkedAt, error }))
+        };
+    }
+}
+
+module.exports = DbRouting;
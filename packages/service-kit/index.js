@@ -0,0 +1,10 @@
+// index.js
+const metrics = require('./metrics');
+const TokenCache = require('./tokenCache');
+const DbRouting = require('./dbRouting');
+
+module.exports = {
+    metrics,
+    TokenCache,
+    DbRouting
+};
@@ -0,0 +1,316 @@
+// metrics.js
+const { monitorEventLoopDelay } = require('perf_hooks');
+
+// Segundos: de 1 ms a 10 s
+const DEFAULT_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];
+
+const escapeLabel = (value) => String(value).replace(/\\/g, '\\\\').replace(/\n/g, '\\n').replace(/"/g, '\\"');
+
+const formatLabels = (labels) => {
+    const entries = Object.entries(labels);
+    if (entries.length === 0) return '';
+    return `{${entries.map(([name, value]) => `${name}="${escapeLabel(value)}"`).join(',')}}`;
+};
+
+const secondsSince = (startedAt) => Number(process.hrtime.bigint() - startedAt) / 1e9;
+
+class Metric {
+    constructor(name, help, type, labelNames) {
+        this.name = name;
+        this.help = help;
+        this.type = type;
+        this.labelNames = labelNames;
+        this.series = new Map(); // clave de etiquetas -> { labels, ... }
+    }
+
+    entry(labels, create) {
+        const values = this.labelNames.map(name => labels[name] === undefined ? '' : String(labels[name]));
+        const key = values.join('\u0000');
+        let entry = this.series.get(key);
+        if (!entry) {
+            entry = create(Object.fromEntries(this.labelNames.map((name, i) => [name, values[i]])));
+            this.series.set(key, entry);
+        }
+        return entry;
+    }
+
+    header() {
+        return `# HELP ${this.name} ${this.help}\n# TYPE ${this.name} ${this.type}\n`;
+    }
+
+    render() {
+        let out = this.header();
+        for (const { labels, value } of this.series.values()) {
+            out += `${this.name}${formatLabels(labels)} ${value}\n`;
+        }
+        return out;
+    }
+}
+
+class Counter extends Metric {
+    constructor(name, help, labelNames) {
+        super(name, help, 'counter', labelNames);
+    }
+
+    inc(labels = {}, value = 1) {
+        this.entry(labels, l => ({ labels: l, value: 0 })).value += value;
+    }
+}
+
+class Gauge extends Metric {
+    constructor(name, help, labelNames) {
+        super(name, help, 'gauge', labelNames);
+    }
+
+    set(labels = {}, value) {
+        this.entry(labels, l => ({ labels: l, value: 0 })).value = value;
+    }
+}
+
+class Histogram extends Metric {
+    constructor(name, help, labelNames, buckets = DEFAULT_BUCKETS) {
+        super(name, help, 'histogram', labelNames);
+        this.buckets = buckets;
+    }
+
+    observe(labels = {}, seconds) {
+        const entry = this.entry(labels, l => ({ labels: l, counts: new Array(this.buckets.length).fill(0), sum: 0, count: 0 }));
+        const i = this.buckets.findIndex(bound => seconds <= bound);
+        if (i !== -1) entry.counts[i]++;
+        entry.sum += seconds;
+        entry.count++;
+    }
+
+    /** Devuelve una función que, al llamarla, registra el tiempo transcurrido. */
+    startTimer(labels = {}) {
+        const startedAt = process.hrtime.bigint();
+        return (extraLabels = {}) => this.observe({ ...labels, ...extraLabels }, secondsSince(startedAt));
+    }
+
+    render() {
+        let out = this.header();
+        for (const { labels, counts, sum, count } of this.series.values()) {
+            let cumulative = 0;
+            this.buckets.forEach((bound, i) => {
+                cumulative += counts[i];
+                out += `${this.name}_bucket${formatLabels({ ...labels, le: bound })} ${cumulative}\n`;
+            });
+            out += `${this.name}_bucket${formatLabels({ ...labels, le: '+Inf' })} ${count}\n`;
+            out += `${this.name}_sum${formatLabels(labels)} ${sum}\n`;
+            out += `${this.name}_count${formatLabels(labels)} ${count}\n`;
+        }
+        return out;
+    }
+}
+
+/**
+ * Métricas del servicio en formato de texto de Prometheus (GET /metrics).
+ *
+ * Recoge la latencia por ruta HTTP, el tiempo de cada consulta de Sequelize
+ * y la espera por conexión del pool, el retraso del event loop, la latencia
+ * de publicación y consumo de RabbitMQ y los emits de socket.io. Las
+ * estadísticas de /health se exportan como `app_stat{component,stat}`.
+ * ms-tickets, ms-eventos, ms-usuarios y ms-notifications la usan tal cual,
+ * así que los nombres de las métricas son los mismos en todos.
+ */
+class Metrics {
+    constructor() {
+        this.metrics = [];
+        this.collectors = [];
+        this.eventLoop = monitorEventLoopDelay({ resolution: 10 });
+        this.eventLoop.enable();
+
+        this.httpDuration = this.histogram('http_request_duration_seconds',
+            'Duración de las peticiones HTTP por ruta', ['method', 'route', 'status']);
+        this.dbQueryDuration = this.histogram('db_query_duration_seconds',
+            'Duración de las consultas de Sequelize', ['model', 'type']);
+        this.dbPoolAcquire = this.histogram('db_pool_acquire_seconds',
+            'Espera hasta obtener una conexión del pool');
+        this.dbPoolConnections = this.gauge('db_pool_connections',
+            'Conexiones del pool por estado', ['pool', 'state']);
+        this.amqpPublish = this.histogram('amqp_publish_duration_seconds',
+            'Publicación en RabbitMQ: hasta que el canal acepta el mensaje (single) o hasta el ack del broker (batch)',
+            ['exchange', 'mode']);
+        this.amqpPublished = this.counter('amqp_published_messages_total',
+            'Mensajes publicados en RabbitMQ', ['exchange', 'routing_key']);
+        this.amqpConsume = this.histogram('amqp_consume_duration_seconds',
+            'Tiempo de proceso de los mensajes consumidos', ['queue', 'routing_key']);
+        this.amqpConsumeLag = this.histogram('amqp_consume_lag_seconds',
+            'Retraso entre la publicación de un mensaje y su consumo', ['queue'],
+            [0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300]);
+        this.websocketEmits = this.counter('websocket_emits_total',
+            'Emits de socket.io a salas o a todos los clientes', ['event']);
+        this.websocketClients = this.gauge('websocket_connected_clients', 'Clientes de socket.io conectados');
+        this.eventLoopLag = this.gauge('nodejs_eventloop_lag_seconds',
+            'Retraso del event loop desde el último scrape', ['quantile']);
+        this.processStats = this.gauge('nodejs_process', 'Memoria (bytes) y uptime (segundos) del proceso', ['stat']);
+        this.appStats = this.gauge('app_stat', 'Estadísticas numéricas de /health', ['component', 'stat']);
+    }
+
+    counter(name, help, labelNames = []) {
+        return this.register(new Counter(name, help, labelNames));
+    }
+
+    gauge(name, help, labelNames = []) {
+        return this.register(new Gauge(name, help, labelNames));
+    }
+
+    histogram(name, help, labelNames = [], buckets) {
+        return this.register(new Histogram(name, help, labelNames, buckets));
+    }
+
+    register(metric) {
+        this.metrics.push(metric);
+        return metric;
+    }
+
+    /** `collect()` se llama en cada scrape, antes de generar la salida. */
+    addCollector(collect) {
+        this.collectors.push(collect);
+    }
+
+    /**
+     * Exporta los valores numéricos de `getStats()` como app_stat; los
+     * objetos anidados se aplanan con puntos (p. ej. `read.avgWaitMs`).
+     */
+    registerStats(component, getStats) {
+        this.addCollector(() => {
+            const flatten = (prefix, value) => {
+                if (typeof value === 'number' && Number.isFinite(value)) {
+                    this.appStats.set({ component, stat: prefix }, value);
+                } else if (typeof value === 'boolean') {
+                    this.appStats.set({ component, stat: prefix }, value ? 1 : 0);
+                } else if (value && typeof value === 'object' && !Array.isArray(value) && !(value instanceof Date)) {
+                    for (const [key, nested] of Object.entries(value)) {
+                        flatten(prefix ? `${prefix}.${key}` : key, nested);
+                    }
+                }
+            };
+            flatten('', getStats());
+        });
+    }
+
+    /** Middleware de Express: latencia por ruta (la plantilla, no la URL). */
+    httpMiddleware() {
+        return (req, res, next) => {
+            const startedAt = process.hrtime.bigint();
+            res.on('finish', () => {
+                const route = req.route ? `${req.baseUrl}${req.route.path}` : 'unmatched';
+                this.httpDuration.observe({ method: req.method, route, status: res.statusCode }, secondsSince(startedAt));
+            });
+            next();
+        };
+    }
+
+    /** Handler de GET /metrics. */
+    handler() {
+        return (req, res) => {
+            res.set('Content-Type', 'text/plain; version=0.0.4; charset=utf-8');
+            res.send(this.render());
+        };
+    }
+
+    /** Tiempo por consulta con los hooks de Sequelize y espera por conexión del pool. */
+    instrumentSequelize(sequelize) {
+        const startedAt = new WeakMap();
+        sequelize.addHook('beforeQuery', (options, query) => {
+            startedAt.set(query, process.hrtime.bigint());
+        });
+        sequelize.addHook('afterQuery', (options, query) => {
+            const start = startedAt.get(query);
+            if (start === undefined) return;
+            startedAt.delete(query);
+            this.dbQueryDuration.observe({
+                model: options.model ? options.model.name : 'raw',
+                type: options.type || 'RAW'
+            }, secondsSince(start));
+        });
+
+        const connectionManager = sequelize.connectionManager;
+        const getConnection = connectionManager.getConnection.bind(connectionManager);
+        connectionManager.getConnection = async (options) => {
+            const observe = this.dbPoolAcquire.startTimer();
+            try {
+                return await getConnection(options);
+            } finally {
+                observe();
+            }
+        };
+
+        this.addCollector(() => {
+            const pools = connectionManager.pool;
+            // Con réplicas hay un pool de escritura y otro de lectura
+            const byName = pools && pools.read && pools.write ? { write: pools.write, read: pools.read } : { write: pools };
+            for (const [pool, stats] of Object.entries(byName)) {
+                if (!stats || stats.size === undefined) continue;
+                this.dbPoolConnections.set({ pool, state: 'size' }, stats.size);
+                this.dbPoolConnections.set({ pool, state: 'using' }, stats.using);
+                this.dbPoolConnections.set({ pool, state: 'available' }, stats.available);
+                this.dbPoolConnections.set({ pool, state: 'waiting' }, stats.waiting);
+            }
+        });
+        return sequelize;
+    }
+
+    /**
+     * Cuenta los emits a salas y a todos los clientes (pasan por el adapter
+     * del namespace) y los clientes conectados.
+     */
+    instrumentSocketIo(io) {
+        const adapter = io.of('/').adapter;
+        const broadcast = adapter.broadcast.bind(adapter);
+        adapter.broadcast = (packet, opts) => {
+            const event = Array.isArray(packet.data) ? packet.data[0] : 'unknown';
+            this.websocketEmits.inc({ event });
+            return broadcast(packet, opts);
+        };
+        this.addCollector(() => this.websocketClients.set({}, io.engine ? io.engine.clientsCount : 0));
+        return io;
+    }
+
+    /** Latencia de consumo y retraso desde la publicación. */
+    observeConsume(queue, msg, startedAt) {
+        this.amqpConsume.observe({ queue, routing_key: msg.fields.routingKey }, secondsSince(startedAt));
+        const publishedAtMs = this.publishedAtMs(msg);
+        if (publishedAtMs) {
+            this.amqpConsumeLag.observe({ queue }, Math.max(0, Date.now() - publishedAtMs) / 1000);
+        }
+    }
+
+    /**
+     * Hora de publicación en ms: la cabecera x-published-at-ms o, si no viene,
+     * la propiedad AMQP timestamp (en segundos).
+     */
+    publishedAtMs(msg) {
+        const headerMs = msg.properties.headers && msg.properties.headers['x-published-at-ms'];
+        if (headerMs) return Number(headerMs);
+        return msg.properties.timestamp ? msg.properties.timestamp * 1000 : null;
+    }
+
+    collect() {
+        for (const collect of this.collectors) {
+            try {
+                collect();
+            } catch (error) {
+                console.error('❌ Error recogiendo métricas:', error.message);
+            }
+        }
+        // El histograma del event loop se reinicia: cada scrape ve su propio intervalo
+        this.eventLoopLag.set({ quantile: '0.5' }, this.eventLoop.percentile(50) / 1e9);
+        this.eventLoopLag.set({ quantile: '0.99' }, this.eventLoop.percentile(99) / 1e9);
+        this.eventLoopLag.set({ quantile: '1' }, this.eventLoop.max / 1e9);
+        this.eventLoop.reset();
+
+        const memory = process.memoryUsage();
+        this.processStats.set({ stat: 'resident_memory_bytes' }, memory.rss);
+        this.processStats.set({ stat: 'heap_used_bytes' }, memory.heapUsed);
+        this.processStats.set({ stat: 'uptime_seconds' }, process.uptime());
+    }
+
+    render() {
+        this.collect();
+        return this.metrics.map(metric => metric.render()).join('');
+    }
+}
+
+module.exports = new Metrics();
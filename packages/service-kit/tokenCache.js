@@ -0,0 +1,81 @@
+// tokenCache.js
+const crypto = require('crypto');
+
+const JWT_CACHE_ENABLED = process.env.JWT_CACHE_ENABLED !== 'false';
+const JWT_CACHE_TTL_MS = parseInt(process.env.JWT_CACHE_TTL_MS, 10) || 60000;
+const JWT_CACHE_MAX_ENTRIES = parseInt(process.env.JWT_CACHE_MAX_ENTRIES, 10) || 10000;
+
+/**
+ * Caché LRU de tokens JWT ya verificados, indexada por el SHA-256 del token.
+ *
+ * La firma se comprueba una vez y el payload se reutiliza durante
+ * JWT_CACHE_TTL_MS, o hasta el `exp` del token si llega antes, así que un
+ * token caducado nunca sale de la caché. Los tokens inválidos no se guardan.
+ *
+ * Recibe `jsonwebtoken` del servicio, que es quien lo tiene como dependencia:
+ * `new TokenCache(require('jsonwebtoken'))`.
+ */
+class TokenCache {
+    constructor(jwt) {
+        this.jwt = jwt;
+        this.entries = new Map(); // hash -> { payload, expiresAt }
+        this.stats = {
+            hits: 0,
+            misses: 0,
+            expirations: 0,
+            evictions: 0,
+            failures: 0
+        };
+    }
+
+    /** Como jwt.verify(token, secret): devuelve el payload o lanza el error de jsonwebtoken. */
+    verify(token, secret) {
+        if (!JWT_CACHE_ENABLED) {
+            return this.jwt.verify(token, secret);
+        }
+        const key = crypto.createHash('sha256').update(token).digest('base64');
+        const now = Date.now();
+        const entry = this.entries.get(key);
+        if (entry) {
+            if (entry.expiresAt > now) {
+                // Al final del Map: es el más reciente
+                this.entries.delete(key);
+                this.entries.set(key, entry);
+                this.stats.hits++;
+                return { ...entry.payload };
+            }
+            this.entries.delete(key);
+            this.stats.expirations++;
+        }
+
+        this.stats.misses++;
+        let payload;
+        try {
+            payload = this.jwt.verify(token, secret);
+        } catch (error) {
+            this.stats.failures++;
+            throw error;
+        }
+        const expiresAt = payload.exp ? Math.min(now + JWT_CACHE_TTL_MS, payload.exp * 1000) : now + JWT_CACHE_TTL_MS;
+        this.entries.set(key, { payload, expiresAt });
+        if (this.entries.size > JWT_CACHE_MAX_ENTRIES) {
+            this.entries.delete(this.entries.keys().next().value);
+            this.stats.evictions++;
+        }
+        return { ...payload };
+    }
+
+    getStats() {
+        const lookups = this.stats.hits + this.stats.misses;
+        return {
+            ...this.stats,
+            hitRatio: lookups ? Number((this.stats.hits / lookups).toFixed(4)) : 0,
+            size: this.entries.size,
+            maxEntries: JWT_CACHE_MAX_ENTRIES,
+            ttlMs: JWT_CACHE_TTL_MS,
+            enabled: JWT_CACHE_ENABLED
+        };
+    }
+}
+
+module.exports = TokenCache;
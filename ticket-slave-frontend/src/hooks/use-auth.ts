@@ -1,7 +1,7 @@
 'use client'
 
 import { useState, useEffect, useCallback, useContext } from 'react'
-import { authAPI, getAuthToken, setAuthToken, removeAuthToken } from '@/lib/api'
+import { authAPI, getAuthToken, setAuthToken, removeAuthToken, setRefreshToken } from '@/lib/api'
 import { AuthContext } from '@/lib/auth-context'
 import type { User, AuthResponse } from '@/types'
 
@@ -58,6 +58,9 @@ export function useAuthProvider() {
       const authData: AuthResponse = response.data
       
       setAuthToken(authData.token)
+      if (authData.refreshToken) {
+        setRefreshToken(authData.refreshToken)
+      }
       setUser(authData.user)
       
       // Guardar datos del usuario en localStorage para persistir sin /auth/me
@@ -103,6 +106,9 @@ export function useAuthProvider() {
       const authData: AuthResponse = response.data
       
       setAuthToken(authData.token)
+      if (authData.refreshToken) {
+        setRefreshToken(authData.refreshToken)
+      }
       setUser(authData.user)
       
       // Guardar datos del usuario en localStorage para persistir sin /auth/me
@@ -1,5 +1,5 @@
-import axios, { AxiosResponse } from 'axios'
-import type { OrderCreateRequest, User, Role } from '@/types'
+import axios, { AxiosResponse, InternalAxiosRequestConfig } from 'axios'
+import type { OrderCreateRequest, User, Role, RefreshTokenResponse } from '@/types'
 
 // Kong Gateway base URL
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
@@ -30,9 +30,45 @@ const setAuthToken = (token: string): void => {
 const removeAuthToken = (): void => {
   if (typeof window !== 'undefined') {
     localStorage.removeItem('authToken')
+    localStorage.removeItem('refreshToken')
   }
 }
 
+const getRefreshToken = (): string | null => {
+  if (typeof window !== 'undefined') {
+    return localStorage.getItem('refreshToken')
+  }
+  return null
+}
+
+const setRefreshToken = (token: string): void => {
+  if (typeof window !== 'undefined') {
+    localStorage.setItem('refreshToken', token)
+  }
+}
+
+// El token de acceso caduca a los pocos minutos: se renueva con el refresh token.
+// Una sola renovación en curso aunque fallen varias peticiones a la vez.
+let refreshInFlight: Promise<string> | null = null
+
+const refreshAccessToken = (refreshToken: string): Promise<string> => {
+  if (!refreshInFlight) {
+    refreshInFlight = axios
+      .post<RefreshTokenResponse>(`${API_BASE_URL}/api/v1/auth/refresh`, { refreshToken })
+      .then(({ data }) => {
+        setAuthToken(data.token)
+        if (data.refreshToken) {
+          setRefreshToken(data.refreshToken)
+        }
+        return data.token
+      })
+      .finally(() => {
+        refreshInFlight = null
+      })
+  }
+  return refreshInFlight
+}
+
 // Request interceptor to add auth token
 api.interceptors.request.use(
   (config) => {
@@ -52,7 +88,19 @@ api.interceptors.response.use(
   (response: AxiosResponse) => {
     return response
   },
-  (error) => {
+  async (error) => {
+    const original = error.config as (InternalAxiosRequestConfig & { _retried?: boolean }) | undefined
+    const refreshToken = getRefreshToken()
+    if (error.response?.status === 401 && original && !original._retried && refreshToken && !original.url?.startsWith('/api/v1/auth/')) {
+      original._retried = true
+      try {
+        const token = await refreshAccessToken(refreshToken)
+        original.headers.Authorization = `Bearer ${token}`
+        return api(original)
+      } catch {
+        // Refresh token caducado o inválido: se cierra la sesión como antes
+      }
+    }
     if (error.response?.status === 401) {
       // Token expired or invalid
       removeAuthToken()
@@ -64,6 +112,27 @@ api.interceptors.response.use(
   }
 )
 
+// Los listados paginan por cursor (GET /events en la cabecera X-Next-Cursor,
+// GET /tickets en pagination.nextCursor): se siguen todas las páginas para que
+// el catálogo y "mis entradas" no se corten en la primera.
+const MAX_PAGES = 50
+
+const followCursor = async <T>(
+  url: string,
+  params: Record<string, unknown>,
+  readPage: (response: AxiosResponse) => { items: T[]; nextCursor?: string | null },
+): Promise<{ response: AxiosResponse; items: T[] }> => {
+  let response = await api.get(url, { params })
+  let page = readPage(response)
+  const items = [...page.items]
+  for (let pages = 1; page.nextCursor && pages < MAX_PAGES; pages++) {
+    response = await api.get(url, { params: { ...params, cursor: page.nextCursor } })
+    page = readPage(response)
+    items.push(...page.items)
+  }
+  return { response, items }
+}
+
 // API Functions for different microservices
 
 // Authentication (ms-usuarios) - SOLO endpoints que existen en el HAR
@@ -72,6 +141,10 @@ export const authAPI = {
   login: (email: string, password: string) => 
     api.post('/api/v1/auth/login', { email, password }),
     
+  // POST /api/v1/auth/refresh - renueva el token de acceso sin contraseña
+  refresh: (refreshToken: string) =>
+    api.post<RefreshTokenResponse>('/api/v1/auth/refresh', { refreshToken }),
+
   // POST /api/v1/auth/register - VERIFICADO en HAR (status 201)
   register: (userData: { 
     nombre: string
@@ -84,10 +157,13 @@ export const authAPI = {
     aceptaTerminos: boolean
   }) => api.post('/api/v1/auth/register', userData),
     
-  // Logout local (no hay endpoint en HAR)
+  // POST /api/v1/auth/logout - revoca los refresh tokens del usuario
   logout: () => {
+    const refreshToken = getRefreshToken()
     removeAuthToken()
-    return Promise.resolve()
+    return refreshToken
+      ? api.post('/api/v1/auth/logout', { token: refreshToken }).then(() => undefined)
+      : Promise.resolve()
   },
     
   // POST /api/v1/auth/recover - VERIFICADO en HAR
@@ -378,9 +454,14 @@ export const devAPI = {
 
 // Events Management (ms-eventos) - Endpoints basados en HAR
 export const eventsAPI = {
-  // GET /api/v1/events - VERIFICADO en HAR
-  getEvents: () =>
-    api.get('/api/v1/events'),
+  // GET /api/v1/events - VERIFICADO en HAR (todas las páginas; el cuerpo de cada una es un array)
+  getEvents: async (params?: { categoryId?: string; venueId?: string }) => {
+    const { response, items } = await followCursor('/api/v1/events', { ...params, limit: 200 }, (page) => ({
+      items: page.data,
+      nextCursor: page.headers['x-next-cursor'] as string | undefined,
+    }))
+    return { ...response, data: items }
+  },
     
   // GET /api/v1/events/{id} - VERIFICADO en HAR
   getEvent: (id: string) =>
@@ -532,8 +613,17 @@ export const ticketsAPI = {
   getOrder: (id: string) =>
     api.get(`/api/v1/orders/${id}`),
     
-  getTickets: (params?: { eventId?: string; status?: string }) =>
-    api.get('/api/v1/tickets', { params }),
+  // Todas las páginas, con la forma { data, pagination } de una sola
+  getTickets: async (params?: { eventId?: string; status?: string }) => {
+    const { response, items } = await followCursor('/api/v1/tickets', { ...params, limit: 100 }, (page) => ({
+      items: page.data.data,
+      nextCursor: page.data.pagination?.nextCursor,
+    }))
+    return {
+      ...response,
+      data: { ...response.data, data: items, pagination: { ...response.data.pagination, hasMore: false, nextCursor: null } },
+    }
+  },
     
   getTicket: (id: string) =>
     api.get(`/api/v1/tickets/${id}`),
@@ -543,7 +633,7 @@ export const ticketsAPI = {
 }
 
 // Export token management functions
-export { getAuthToken, setAuthToken, removeAuthToken }
+export { getAuthToken, setAuthToken, removeAuthToken, getRefreshToken, setRefreshToken }
 
 // Types for API responses
 export interface ApiResponse<T = unknown> {
@@ -69,9 +69,12 @@ export class TicketsWebSocket {
   private setupEventListeners() {
     if (!this.socket) return
 
-    // Stock updates
+    // Stock updates: el servidor los agrupa por evento y aquí se reparten uno a uno
     this.socket.on('stock-updated', (data) => {
-      this.emit('stock-updated', data)
+      const { updates = [], ...event } = data
+      for (const update of updates) {
+        this.emit('stock-updated', { ...event, ...update })
+      }
     })
 
     // Low stock alerts
@@ -94,9 +97,12 @@ export class TicketsWebSocket {
       this.emit('cart-expired', data)
     })
 
-    // Ticket validation
+    // Ticket validation: el servidor agrupa las validaciones de cada lote por evento
     this.socket.on('ticket-validated', (data) => {
-      this.emit('ticket-validated', data)
+      const { validations = [], ...event } = data
+      for (const validation of validations) {
+        this.emit('ticket-validated', { ...event, ...validation })
+      }
     })
   }
 
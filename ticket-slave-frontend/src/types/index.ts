@@ -87,6 +87,7 @@ export interface AuthResponse {
 
 export interface RefreshTokenResponse {
   token: string
+  refreshToken?: string
   expiresIn: number
 }
 